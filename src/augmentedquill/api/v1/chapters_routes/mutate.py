@@ -16,6 +16,7 @@ from augmentedquill.services.chapters.chapters_api_ops import (
     reorder_chapters_in_project,
 )
 from augmentedquill.services.projects.projects import get_active_project_dir
+from augmentedquill.utils.storage_io import run_metadata_io
 
 router = APIRouter(tags=["Chapters"])
 
@@ -50,7 +51,8 @@ async def api_update_chapter_metadata(
     from augmentedquill.services.projects.projects import update_chapter_metadata
 
     try:
-        update_chapter_metadata(
+        await run_metadata_io(
+            update_chapter_metadata,
             chap_id,
             title=title,
             summary=summary,
@@ -84,11 +86,11 @@ async def api_update_chapter_title(
     from augmentedquill.services.projects.projects import write_chapter_title
 
     try:
-        write_chapter_title(chap_id, new_title_str)
+        await run_metadata_io(write_chapter_title, chap_id, new_title_str)
     except ValueError as exc:
         return error_json(str(exc), status_code=404)
 
-    _, path, _ = _chapter_by_id_or_404(chap_id)
+    _, path, _ = await run_metadata_io(_chapter_by_id_or_404, chap_id)
     return ok_json(
         {
             "ok": True,
@@ -118,9 +120,9 @@ async def api_create_chapter(request: Request):
     )
 
     try:
-        chap_id = create_new_chapter(title, book_id=book_id)
+        chap_id = await run_metadata_io(create_new_chapter, title, book_id=book_id)
         if content:
-            write_chapter_content(chap_id, str(content))
+            await run_metadata_io(write_chapter_content, chap_id, str(content))
     except ValueError as exc:
         return error_json(str(exc), status_code=400)
     except Exception as exc:
@@ -147,10 +149,10 @@ async def api_update_chapter_content(
         return error_json("content is required", status_code=400)
 
     new_content = str(payload.get("content", ""))
-    _, path, _ = _chapter_by_id_or_404(chap_id)
+    _, path, _ = await run_metadata_io(_chapter_by_id_or_404, chap_id)
 
     try:
-        path.write_text(new_content, encoding="utf-8")
+        await run_metadata_io(path.write_text, new_content, encoding="utf-8")
     except Exception as exc:
         return error_json(f"Failed to write chapter: {exc}", status_code=500)
 
@@ -174,11 +176,11 @@ async def api_update_chapter_summary(
     from augmentedquill.services.projects.projects import write_chapter_summary
 
     try:
-        write_chapter_summary(chap_id, new_summary)
+        await run_metadata_io(write_chapter_summary, chap_id, new_summary)
     except ValueError as exc:
         return error_json(str(exc), status_code=404)
 
-    _, path, _ = _chapter_by_id_or_404(chap_id)
+    _, path, _ = await run_metadata_io(_chapter_by_id_or_404, chap_id)
     return ok_json(
         {
             "ok": True,
@@ -196,7 +198,7 @@ async def api_delete_chapter(chap_id: int = FastAPIPath(..., ge=0)):
     from augmentedquill.services.projects.projects import delete_chapter
 
     try:
-        delete_chapter(chap_id)
+        await run_metadata_io(delete_chapter, chap_id)
         return ok_json({"ok": True})
     except ValueError as exc:
         return error_json(str(exc), status_code=404)
@@ -212,7 +214,7 @@ async def api_reorder_chapters(request: Request):
 
     payload = await parse_json_body(request)
     try:
-        reorder_chapters_in_project(active, payload)
+        await run_metadata_io(reorder_chapters_in_project, active, payload)
     except LookupError as exc:
         return error_json(str(exc), status_code=404)
     except ValueError as exc:
@@ -231,7 +233,7 @@ async def api_reorder_books(request: Request):
 
     payload = await parse_json_body(request)
     try:
-        reorder_books_in_project(active, payload)
+        await run_metadata_io(reorder_books_in_project, active, payload)
     except ValueError as exc:
         return error_json(str(exc), status_code=400)
     except Exception as exc:
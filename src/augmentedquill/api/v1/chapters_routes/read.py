@@ -15,6 +15,7 @@ from augmentedquill.services.chapters.chapters_api_ops import (
 )
 from augmentedquill.services.projects.projects import get_active_project_dir
 from augmentedquill.models.chapters import ChaptersListResponse, ChapterDetailResponse
+from augmentedquill.utils.storage_io import run_metadata_io
 
 router = APIRouter(tags=["Chapters"])
 
@@ -22,19 +23,19 @@ router = APIRouter(tags=["Chapters"])
 @router.get("/chapters", response_model=ChaptersListResponse)
 async def api_chapters() -> ChaptersListResponse:
     active = get_active_project_dir()
-    return {"chapters": list_chapters_payload(active)}
+    return {"chapters": await run_metadata_io(list_chapters_payload, active)}
 
 
 @router.get("/chapters/{chap_id}", response_model=ChapterDetailResponse)
 async def api_chapter_content(
     chap_id: int = FastAPIPath(..., ge=0)
 ) -> ChapterDetailResponse:
-    _, path, _ = _chapter_by_id_or_404(chap_id)
+    _, path, _ = await run_metadata_io(_chapter_by_id_or_404, chap_id)
     active = get_active_project_dir()
-    chapter = chapter_detail_payload(active, chap_id, path)
+    chapter = await run_metadata_io(chapter_detail_payload, active, chap_id, path)
 
     try:
-        content = path.read_text(encoding="utf-8")
+        content = await run_metadata_io(path.read_text, encoding="utf-8")
     except Exception as exc:
         raise HTTPException(
             status_code=500, detail=f"Failed to read chapter: {exc}"
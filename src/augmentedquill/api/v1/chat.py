@@ -11,7 +11,6 @@ API endpoints for chat sessions and conversational interactions with the LLM wri
 """
 
 import datetime
-import base64
 import augmentedquill.services.llm.llm as llm
 from fastapi import APIRouter, Request, HTTPException
 from fastapi.responses import JSONResponse, StreamingResponse
@@ -19,7 +18,18 @@ from fastapi.responses import JSONResponse, StreamingResponse
 from augmentedquill.core.config import load_machine_config, CONFIG_DIR
 from augmentedquill.services.projects.projects import get_active_project_dir
 from augmentedquill.services.llm.llm import add_llm_log, create_log_entry
-from augmentedquill.services.chat.chat_tool_dispatcher import exec_chat_tool
+from augmentedquill.services.llm.llm_generations import (
+    GenerationCancelled,
+    guarded_stream,
+    start_generation,
+)
+from augmentedquill.services.llm.llm_image_prep import prepare_message_images
+from augmentedquill.services.llm.llm_prompt_cache import (
+    apply_prompt_cache_hints,
+    model_prompt_cache_mode,
+)
+from augmentedquill.services.chat.chat_tool_dispatcher import exec_chat_tools
+from augmentedquill.services.projects.project_context import ProjectContext
 from augmentedquill.services.chat.chat_tools_schema import get_story_tools
 from augmentedquill.services.chat.chat_api_stream_ops import (
     normalize_chat_messages,
@@ -35,6 +45,8 @@ from augmentedquill.services.chat.chat_api_session_ops import (
     delete_all_active_chats,
 )
 import augmentedquill.services.chat.chat_api_proxy_ops as _chat_api_proxy_ops
+from augmentedquill.api.v1.generations import resumable_response
+from augmentedquill.utils.storage_io import run_bulk_io, run_metadata_io
 import json as _json
 from typing import Any, Dict
 from augmentedquill.models.chat import ChatInitialStateResponse
@@ -108,26 +120,33 @@ async def api_chat_tools(request: Request) -> JSONResponse:
         if isinstance(t, list):
             tool_calls = t
 
-    appended: list[dict] = []
+    calls: list[tuple[str, dict, str]] = []
     mutations = {"story_changed": False}
 
-    for call in tool_calls:
-        if not isinstance(call, dict):
-            continue
-        call_id = str(call.get("id") or "")
-        func = call.get("function") or {}
-        name = (func.get("name") if isinstance(func, dict) else None) or ""
-        args_raw = (func.get("arguments") if isinstance(func, dict) else None) or "{}"
-        try:
-            args_obj = (
-                _json.loads(args_raw) if isinstance(args_raw, str) else (args_raw or {})
-            )
-        except Exception:
-            args_obj = {}
-        if not name or not call_id:
-            continue
-        msg = await exec_chat_tool(name, args_obj, call_id, payload, mutations)
-        appended.append(msg)
+    # One project context for the whole batch: project data is loaded once and
+    # story.json is written once when the batch is done.
+    async with ProjectContext() as ctx:
+        for call in tool_calls:
+            if not isinstance(call, dict):
+                continue
+            call_id = str(call.get("id") or "")
+            func = call.get("function") or {}
+            name = (func.get("name") if isinstance(func, dict) else None) or ""
+            args_raw = (
+                func.get("arguments") if isinstance(func, dict) else None
+            ) or "{}"
+            try:
+                args_obj = (
+                    _json.loads(args_raw)
+                    if isinstance(args_raw, str)
+                    else (args_raw or {})
+                )
+            except Exception:
+                args_obj = {}
+            if not name or not call_id:
+                continue
+            calls.append((name, args_obj, call_id))
+        appended = await exec_chat_tools(calls, payload, mutations, ctx)
 
     # Log tool execution if there were any
     if appended:
@@ -145,7 +164,7 @@ async def api_chat_tools(request: Request) -> JSONResponse:
     )
 
 
-async def _inject_project_images(messages: list[dict]):
+async def _inject_project_images(messages: list[dict], model: dict | None = None):
     if not messages:
         return
 
@@ -161,47 +180,13 @@ async def _inject_project_images(messages: list[dict]):
     if not active:
         return
 
-    images_dir = active / "images"
-    if not images_dir.exists():
-        return
-
-    found_images = []
-    # Restrict lookup to known image types so user text cannot trigger
-    # accidental binary reads from unrelated project files.
-    allowed = {".png", ".jpg", ".jpeg", ".gif", ".webp"}
-
-    for f in images_dir.iterdir():
-        if f.is_file() and f.suffix.lower() in allowed:
-            # Filename matching keeps image attachment explicit and user-controlled.
-            if f.name in content:
-                found_images.append(f)
-
-    if not found_images:
-        return
-
-    # Preserve original text and append matched images as multimodal payload items.
-    new_content = [{"type": "text", "text": content}]
-
-    for path in found_images:
-        try:
-            mime = "image/png"
-            if path.suffix.lower() in [".jpg", ".jpeg"]:
-                mime = "image/jpeg"
-            elif path.suffix.lower() == ".webp":
-                mime = "image/webp"
-            elif path.suffix.lower() == ".gif":
-                mime = "image/gif"
-
-            with open(path, "rb") as f:
-                b64 = base64.b64encode(f.read()).decode("utf-8")
-
-            new_content.append(
-                {"type": "image_url", "image_url": {"url": f"data:{mime};base64,{b64}"}}
-            )
-        except Exception:
-            pass
-
-    last_msg["content"] = new_content
+    # Only files named in the message are attached, so attachment stays
+    # explicit and user text cannot pull in unrelated project files.
+    new_content = await run_bulk_io(
+        prepare_message_images, active / "images", content, model
+    )
+    if new_content:
+        last_msg["content"] = new_content
 
 
 @router.post("/chat/stream")
@@ -245,7 +230,7 @@ async def api_chat_stream(request: Request) -> StreamingResponse:
 
     # Inject images if referenced in the last user message and supported
     if is_multimodal:
-        await _inject_project_images(req_messages)
+        await _inject_project_images(req_messages, stream_ctx["chosen"])
 
     # Prepend system message if not present
     ensure_system_message_if_missing(
@@ -253,6 +238,7 @@ async def api_chat_stream(request: Request) -> StreamingResponse:
         model_type=model_type,
         machine=machine,
         selected_name=selected_name,
+        stable_layout=model_prompt_cache_mode(stream_ctx["chosen"]) is not None,
     )
 
     if not base_url or not model_id:
@@ -293,12 +279,21 @@ async def api_chat_stream(request: Request) -> StreamingResponse:
             if tool_choice:
                 body["tool_choice"] = tool_choice
 
+    apply_prompt_cache_hints(body, base_url=base_url, model_id=model_id)
+
+    try:
+        generation = start_generation("chat", (payload or {}).get("generation_id"))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
     log_entry = create_log_entry(url, "POST", headers, body, streaming=True)
     log_entry["model_type"] = model_type
     add_llm_log(log_entry)
 
-    async def _gen():
-        async for chunk in llm.unified_chat_stream(
+    resumable = (payload or {}).get("resumable") is True
+    upstream = guarded_stream(
+        generation,
+        llm.unified_chat_stream(
             messages=req_messages,
             base_url=base_url,
             api_key=api_key,
@@ -310,26 +305,44 @@ async def api_chat_stream(request: Request) -> StreamingResponse:
             temperature=temperature,
             max_tokens=max_tokens,
             log_entry=log_entry,
-        ):
-            # Transform to client expected format
-            if "content" in chunk:
-                yield f"data: {_json.dumps({'content': chunk['content']})}\n\n"
-            if "thinking" in chunk:
-                yield f"data: {_json.dumps({'thinking': chunk['thinking']})}\n\n"
-            if "tool_calls" in chunk:
-                yield f"data: {_json.dumps({'tool_calls': chunk['tool_calls']})}\n\n"
+        ),
+        # A resumable generation outlives its connection.
+        None if resumable else request,
+    )
+
+    async def _events():
+        try:
+            async for chunk in upstream:
+                # Transform to client expected format
+                for key in ("content", "thinking", "tool_calls"):
+                    if key in chunk:
+                        yield {key: chunk[key]}
+        except GenerationCancelled:
+            log_entry["response"]["cancelled"] = generation.reason
+            log_entry["timestamp_end"] = datetime.datetime.now().isoformat()
+
+    if resumable:
+        return resumable_response(generation, _events())
 
-    return StreamingResponse(_gen(), media_type="text/event-stream")
+    async def _gen():
+        async for event in _events():
+            yield f"data: {_json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        _gen(),
+        media_type="text/event-stream",
+        headers={"X-Generation-Id": generation.id},
+    )
 
 
 @router.get("/chats")
 async def api_list_chats():
-    return list_active_chats()
+    return await run_metadata_io(list_active_chats)
 
 
 @router.get("/chats/{chat_id}")
 async def api_load_chat(chat_id: str):
-    return load_active_chat(chat_id)
+    return await run_metadata_io(load_active_chat, chat_id)
 
 
 @router.post("/chats/{chat_id}")
@@ -338,19 +351,19 @@ async def api_save_chat(chat_id: str, request: Request):
         data = await request.json()
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid JSON")
-    save_active_chat(chat_id, data)
+    await run_metadata_io(save_active_chat, chat_id, data)
     return {"ok": True}
 
 
 @router.delete("/chats/{chat_id}")
 async def api_delete_chat(chat_id: str):
-    delete_active_chat(chat_id)
+    await run_metadata_io(delete_active_chat, chat_id)
     return {"ok": True}
 
 
 @router.delete("/chats")
 async def api_delete_all_chats():
-    delete_all_active_chats()
+    await run_metadata_io(delete_all_active_chats)
     return {"ok": True}
 
 
@@ -359,9 +372,11 @@ async def proxy_list_models(request: Request) -> JSONResponse:
     """Fetch `${base_url}/models` using provided credentials.
 
     Body JSON:
-      {"base_url": str, "api_key": str | None, "timeout_s": int | None}
+      {"base_url": str, "api_key": str | None, "timeout_s": int | None,
+       "refresh": bool | None}
 
-    Returns the JSON payload from the upstream (expected to include a `data` array).
+    Returns the JSON payload from the upstream (expected to include a `data` array),
+    cached per endpoint unless refresh is set.
     """
     try:
         payload = await request.json()
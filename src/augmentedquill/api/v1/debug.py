@@ -6,16 +6,63 @@
 # (at your option) any later version.
 # Purpose: Defines the debug unit so this responsibility stays isolated, testable, and easy to evolve.
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query, Response
+from augmentedquill.core.config import (
+    clear_story_config_cache,
+    story_config_cache_stats,
+)
 from augmentedquill.services.llm.llm import llm_logs
+from augmentedquill.services.llm.llm_capabilities import capabilities
+from augmentedquill.services.llm.llm_http_pool import http_pool_stats
+from augmentedquill.services.llm.llm_model_catalog import model_catalog
+from augmentedquill.services.llm.llm_prompt_cache import prompt_cache_stats
+from augmentedquill.services.llm.llm_response_cache import response_cache
+from augmentedquill.services.llm.llm_scheduler import scheduler_stats
+from augmentedquill.utils.storage_io import run_metadata_io
 
 router = APIRouter(prefix="/debug", tags=["debug"])
 
 
 @router.get("/llm_logs")
-async def get_llm_logs():
-    """Return the list of LLM communication logs."""
-    return llm_logs
+async def get_llm_logs(
+    response: Response,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    fields: str | None = None,
+    model_type: str | None = None,
+    status: str | None = None,
+):
+    """Return a page of LLM communication logs, oldest first.
+
+    offset skips the newest matching entries. fields is a comma-separated list
+    of dotted paths (e.g. "id,model_type,response.status_code"). status is
+    "ok", "error", "pending" or an HTTP status code. The number of matching
+    entries is returned in the X-Total-Count header.
+    """
+    total, page = llm_logs.query(
+        offset=offset,
+        limit=limit,
+        model_type=model_type,
+        status=status,
+        fields=[f for f in fields.split(",") if f.strip()] if fields else None,
+    )
+    response.headers["X-Total-Count"] = str(total)
+    return page
+
+
+@router.get("/llm_logs/stats")
+async def get_llm_log_stats():
+    """Return size and eviction counters of the LLM log."""
+    return llm_logs.stats()
+
+
+@router.get("/llm_logs/{log_id}")
+async def get_llm_log(log_id: str):
+    """Return one LLM communication log entry."""
+    entry = llm_logs.get(log_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Log entry not found")
+    return entry
 
 
 @router.delete("/llm_logs")
@@ -23,3 +70,73 @@ async def clear_llm_logs():
     """Clear the LLM communication logs."""
     llm_logs.clear()
     return {"status": "ok"}
+
+
+@router.get("/http_pools")
+async def get_http_pools():
+    """Return connection statistics of the shared upstream HTTP clients."""
+    return {"pools": http_pool_stats()}
+
+
+@router.get("/prompt_cache")
+async def get_prompt_cache_stats():
+    """Return prompt and reused (prefix-cached) prompt tokens per model."""
+    return {"models": prompt_cache_stats.snapshot()}
+
+
+@router.get("/scheduler")
+async def get_scheduler_stats():
+    """Return in-flight requests, queue depth and wait times per endpoint."""
+    return {"endpoints": scheduler_stats()}
+
+
+@router.get("/response_cache")
+async def get_response_cache_stats():
+    """Return size and hit rate of the LLM response cache."""
+    return await run_metadata_io(response_cache.stats)
+
+
+@router.delete("/response_cache")
+async def clear_response_cache():
+    """Delete all cached LLM responses."""
+    await run_metadata_io(response_cache.clear)
+    return {"status": "ok"}
+
+
+@router.get("/model_capabilities")
+async def get_model_capabilities():
+    """Return the learned request capabilities per endpoint and model."""
+    return {"endpoints": await run_metadata_io(capabilities.all)}
+
+
+@router.delete("/model_capabilities")
+async def clear_model_capabilities():
+    """Forget the learned capabilities, so every feature is tried again."""
+    await run_metadata_io(capabilities.clear)
+    return {"status": "ok"}
+
+
+@router.get("/model_catalog")
+async def get_model_catalog_stats():
+    """Return hit, shared-fetch and refresh counts of the model list cache."""
+    return model_catalog.stats()
+
+
+@router.delete("/model_catalog")
+async def clear_model_catalog():
+    """Drop all cached model lists."""
+    model_catalog.clear()
+    return {"status": "ok"}
+
+
+@router.get("/story_config_cache")
+async def get_story_config_cache_stats():
+    """Return hits, misses, confirming re-reads and entries of the story.json cache."""
+    return story_config_cache_stats()
+
+
+@router.delete("/story_config_cache")
+async def clear_story_config_cache_entries():
+    """Drop all cached story configs and reset the counters."""
+    clear_story_config_cache()
+    return {"status": "ok"}
@@ -0,0 +1,79 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the generations unit so this responsibility stays isolated, testable, and easy to evolve.
+
+"""
+API endpoints to list, stop and resume streamed generations.
+"""
+
+from typing import Any, AsyncIterator, Dict
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import StreamingResponse
+
+from augmentedquill.services.llm.llm_generations import (
+    Generation,
+    active_generations,
+    cancel_generation,
+    finish_generation,
+)
+from augmentedquill.services.llm.llm_stream_buffer import (
+    get_stream_buffer,
+    sse_from_buffer,
+    start_buffered,
+)
+
+router = APIRouter(tags=["Generations"])
+
+
+def resumable_response(
+    generation: Generation, events: AsyncIterator[Dict[str, Any]]
+) -> StreamingResponse:
+    """Run events into a stream buffer and deliver them as resumable SSE.
+
+    The events must not stop on a client disconnect: a client reconnects
+    through GET /generations/{id}/stream instead.
+    """
+    try:
+        buffer = start_buffered(generation.id, events)
+    except ValueError as exc:
+        finish_generation(generation)
+        raise HTTPException(status_code=400, detail=str(exc))
+    return StreamingResponse(
+        sse_from_buffer(buffer),
+        media_type="text/event-stream",
+        headers={"X-Generation-Id": generation.id},
+    )
+
+
+@router.get("/generations")
+async def api_list_generations():
+    """Return the running generations, as announced in X-Generation-Id."""
+    return {"generations": active_generations()}
+
+
+@router.delete("/generations/{generation_id}")
+async def api_cancel_generation(generation_id: str):
+    """Stop a running generation and close its upstream stream."""
+    if not cancel_generation(generation_id):
+        raise HTTPException(status_code=404, detail="Generation not found")
+    return {"ok": True}
+
+
+@router.get("/generations/{generation_id}/stream")
+async def api_resume_generation(
+    generation_id: str, last_event_id: str | None = Header(default=None)
+):
+    """Replay a resumable generation after the Last-Event-ID event."""
+    buffer = get_stream_buffer(generation_id)
+    if buffer is None:
+        raise HTTPException(status_code=404, detail="Generation stream not found")
+    return StreamingResponse(
+        sse_from_buffer(buffer, last_event_id),
+        media_type="text/event-stream",
+        headers={"X-Generation-Id": generation_id},
+    )
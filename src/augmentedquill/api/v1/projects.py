@@ -12,6 +12,7 @@ API endpoints for project-related operations including creation, deletion, and m
 
 from fastapi import APIRouter, UploadFile, File
 from fastapi.responses import JSONResponse
+from augmentedquill.utils.storage_io import run_bulk_io, run_metadata_io
 from augmentedquill.services.projects.projects_api_manage_ops import (
     projects_listing_payload,
     delete_project_response,
@@ -50,54 +51,54 @@ router = APIRouter(tags=["Projects"])
 
 @router.get("/projects", response_model=ProjectListResponse)
 async def api_projects() -> ProjectListResponse:
-    return projects_listing_payload()
+    return await run_metadata_io(projects_listing_payload)
 
 
 @router.post("/projects/delete")
 async def api_projects_delete(body: ProjectDeleteRequest) -> JSONResponse:
-    return delete_project_response(body.name)
+    return await run_metadata_io(delete_project_response, body.name)
 
 
 @router.post("/projects/select")
 async def api_projects_select(body: ProjectSelectRequest) -> JSONResponse:
-    return select_project_response(body.name)
+    return await run_metadata_io(select_project_response, body.name)
 
 
 @router.post("/projects/create")
 async def api_projects_create(body: ProjectCreateRequest) -> JSONResponse:
-    return create_project_response(body.name, body.type)
+    return await run_metadata_io(create_project_response, body.name, body.type)
 
 
 @router.post("/projects/convert")
 async def api_projects_convert(body: ProjectConvertRequest) -> JSONResponse:
-    return convert_project_response(body.target_type)
+    return await run_metadata_io(convert_project_response, body.target_type)
 
 
 @router.post("/books/create")
 async def api_books_create(body: BookCreateRequest) -> JSONResponse:
-    return create_book_response(body.name)
+    return await run_metadata_io(create_book_response, body.name)
 
 
 @router.post("/books/delete")
 async def api_books_delete(body: BookDeleteRequest) -> JSONResponse:
-    return delete_book_response(body.name)
+    return await run_metadata_io(delete_book_response, body.name)
 
 
 @router.get("/projects/images/list")
 async def api_list_images() -> JSONResponse:
-    return list_images_response()
+    return await run_metadata_io(list_images_response)
 
 
 @router.post("/projects/images/update_description")
 async def api_update_image_description(
     body: ImageDescriptionUpdateRequest,
 ) -> JSONResponse:
-    return update_image_description_response(body.model_dump())
+    return await run_metadata_io(update_image_description_response, body.model_dump())
 
 
 @router.post("/projects/images/create_placeholder")
 async def api_create_image_placeholder(body: ImagePlaceholderRequest) -> JSONResponse:
-    return create_image_placeholder_response(body.model_dump())
+    return await run_metadata_io(create_image_placeholder_response, body.model_dump())
 
 
 @router.post("/projects/images/upload")
@@ -109,17 +110,17 @@ async def api_upload_image(
 
 @router.post("/projects/images/delete")
 async def api_delete_image(body: ImageDeleteRequest) -> JSONResponse:
-    return delete_image_response(body.model_dump())
+    return await run_metadata_io(delete_image_response, body.model_dump())
 
 
 @router.get("/projects/images/{filename}")
 async def api_projects_get_image(filename: str):
-    return get_image_file_response(filename)
+    return await run_metadata_io(get_image_file_response, filename)
 
 
 @router.get("/projects/export")
 async def api_projects_export(name: str = None):
-    return export_project_response(name=name)
+    return await run_bulk_io(export_project_response, name=name)
 
 
 @router.post("/projects/import")
@@ -12,14 +12,15 @@ API endpoints for application and machine settings management.
 
 from fastapi import APIRouter, Request, HTTPException
 from fastapi.responses import JSONResponse
-import json as _json
 
 from augmentedquill.core.config import (
     load_machine_config,
+    save_machine_config,
     CURRENT_SCHEMA_VERSION,
     BASE_DIR,
     CONFIG_DIR,
 )
+from augmentedquill.services.llm.llm_capabilities import learn, probe_capabilities
 from augmentedquill.services.projects.projects import get_active_project_dir
 from augmentedquill.core.prompts import (
     get_system_message,
@@ -42,6 +43,7 @@ from augmentedquill.services.settings.settings_machine_ops import (
 )
 from augmentedquill.services.settings.settings_update_ops import run_story_config_update
 from augmentedquill.api.v1.http_responses import error_json, ok_json
+from augmentedquill.utils.storage_io import run_metadata_io
 from pathlib import Path
 
 router = APIRouter(tags=["Settings"])
@@ -85,11 +87,10 @@ async def api_settings_post(request: Request) -> JSONResponse:
         story_path = (active / "story.json") if active else (CONFIG_DIR / "story.json")
         machine_path = CONFIG_DIR / "machine.json"
         _ensure_parent_dir(story_path)
-        _ensure_parent_dir(machine_path)
         from augmentedquill.core.config import save_story_config
 
-        save_story_config(story_path, story_cfg)
-        machine_path.write_text(_json.dumps(machine_cfg, indent=2), encoding="utf-8")
+        await run_metadata_io(save_story_config, story_path, story_cfg)
+        await run_metadata_io(save_machine_config, machine_path, machine_cfg)
     except Exception as e:
         return error_json(f"Failed to write configs: {e}", status_code=500)
 
@@ -134,8 +135,10 @@ async def api_prompts_get(model_name: str | None = None) -> JSONResponse:
 async def api_machine_test(request: Request) -> JSONResponse:
     """Test base_url + api_key and return available remote model ids.
 
-    Body: { base_url: str, api_key?: str, timeout_s?: int }
+    Body: { base_url: str, api_key?: str, timeout_s?: int, refresh?: bool }
     Returns: { ok: bool, models: str[], detail?: str }
+
+    The model list comes from the model catalog cache unless refresh is set.
     """
     try:
         payload = await request.json()
@@ -154,6 +157,7 @@ async def api_machine_test(request: Request) -> JSONResponse:
         base_url=base_url,
         api_key=api_key,
         timeout_s=timeout_s,
+        force=(payload or {}).get("refresh") is True,
     )
     return JSONResponse(
         status_code=200,
@@ -165,7 +169,8 @@ async def api_machine_test(request: Request) -> JSONResponse:
 async def api_machine_test_model(request: Request) -> JSONResponse:
     """Test whether a model is available for base_url + api_key.
 
-    Body: { base_url: str, api_key?: str, timeout_s?: int, model_id: str }
+    Body: { base_url: str, api_key?: str, timeout_s?: int, model_id: str,
+            refresh?: bool }
     Returns: { ok: bool, model_ok: bool, models: str[], detail?: str }
     """
     try:
@@ -191,6 +196,7 @@ async def api_machine_test_model(request: Request) -> JSONResponse:
         base_url=base_url,
         api_key=api_key,
         timeout_s=timeout_s,
+        force=(payload or {}).get("refresh") is True,
     )
     if not ok:
         return JSONResponse(
@@ -222,6 +228,9 @@ async def api_machine_test_model(request: Request) -> JSONResponse:
                 "model_ok": True,
                 "models": models,
                 "capabilities": caps,
+                "learned_capabilities": await _learn_model_capabilities(
+                    base_url, api_key, model_id_str, timeout_s, caps
+                ),
             },
         )
 
@@ -239,10 +248,28 @@ async def api_machine_test_model(request: Request) -> JSONResponse:
             "models": models,
             "detail": model_detail,
             "capabilities": caps if model_ok else {},
+            "learned_capabilities": (
+                await _learn_model_capabilities(
+                    base_url, api_key, model_id_str, timeout_s, caps
+                )
+                if model_ok
+                else {}
+            ),
         },
     )
 
 
+async def _learn_model_capabilities(
+    base_url: str, api_key: str | None, model_id: str, timeout_s: int, caps: dict
+) -> dict:
+    """Record the probe results so chat requests start in the working mode."""
+    if caps.get("supports_function_calling") is True:
+        # The probe sent tools with tool_choice "auto".
+        await learn(base_url, model_id, "native_tools", True)
+        await learn(base_url, model_id, "tool_choice", True)
+    return await probe_capabilities(base_url, api_key, model_id, timeout_s)
+
+
 @router.put("/machine")
 async def api_machine_put(request: Request) -> JSONResponse:
     """Persist machine config to config/machine.json.
@@ -264,9 +291,7 @@ async def api_machine_put(request: Request) -> JSONResponse:
         )
 
     try:
-        machine_path = CONFIG_DIR / "machine.json"
-        _ensure_parent_dir(machine_path)
-        machine_path.write_text(_json.dumps(machine_cfg, indent=2), encoding="utf-8")
+        save_machine_config(CONFIG_DIR / "machine.json", machine_cfg)
     except Exception as e:
         return JSONResponse(
             status_code=500,
@@ -21,8 +21,12 @@ from augmentedquill.api.v1.story_routes.generation_streaming import (
     router as generation_streaming_router,
 )
 from augmentedquill.api.v1.story_routes.metadata import router as metadata_router
+from augmentedquill.api.v1.story_routes.summary_refresh import (
+    router as summary_refresh_router,
+)
 
 router = APIRouter(tags=["Story"])
 router.include_router(generation_mutations_router)
 router.include_router(generation_streaming_router)
 router.include_router(metadata_router)
+router.include_router(summary_refresh_router)
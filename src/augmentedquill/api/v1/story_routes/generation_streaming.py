@@ -6,16 +6,29 @@
 # (at your option) any later version.
 # Purpose: Defines the generation streaming unit so this responsibility stays isolated, testable, and easy to evolve.
 
+import json
+
 from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import StreamingResponse
 
-from augmentedquill.core.config import BASE_DIR, save_story_config
-from augmentedquill.services.llm import llm
+from augmentedquill.core.config import save_story_config
+from augmentedquill.services.llm.llm_generations import (
+    Generation,
+    GenerationCancelled,
+    guarded_stream,
+    start_generation,
+)
+from augmentedquill.services.story.chapter_summary_ops import (
+    chapter_text_hash,
+    resolve_chapter_summary_messages,
+)
 from augmentedquill.services.story.story_api_prompt_ops import (
     build_suggest_prompt,
-    resolve_model_runtime,
+    relevant_sourcebook_entries,
+    resolve_prompt_runtime,
 )
 from augmentedquill.services.story.story_api_state_ops import (
+    collect_chapter_summaries,
     ensure_chapter_slot,
     get_active_story_or_http_error,
     get_chapter_locator,
@@ -28,17 +41,64 @@ from augmentedquill.services.story.story_generation_common import (
     prepare_story_summary_generation,
     prepare_write_chapter_generation,
 )
+from augmentedquill.services.story.story_suggest_ops import (
+    MAX_SUGGESTIONS,
+    stream_suggestions,
+)
 from augmentedquill.services.story.story_api_stream_ops import (
     stream_collect_and_persist,
     stream_unified_chat_content,
 )
+from augmentedquill.api.v1.generations import resumable_response
 from augmentedquill.api.v1.story_routes.common import parse_json_body
 
 router = APIRouter(tags=["Story"])
 
 
-def _as_streaming_response(gen_factory, media_type: str = "text/plain"):
-    return StreamingResponse(gen_factory(), media_type=media_type)
+def _as_streaming_response(
+    gen_factory, media_type: str = "text/plain", generation: Generation | None = None
+):
+    headers = {"X-Generation-Id": generation.id} if generation else None
+    return StreamingResponse(gen_factory(), media_type=media_type, headers=headers)
+
+
+def _start_generation(payload: dict, kind: str) -> Generation:
+    try:
+        return start_generation(kind, (payload or {}).get("generation_id"))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+def _persisted_generation_response(
+    request: Request, payload: dict, kind: str, gen_source, persist
+) -> StreamingResponse:
+    """Stream a generation that is saved once complete.
+
+    A generation stopped through DELETE /generations/{id} or by a client
+    disconnect is only saved when the payload sets persist_partial. With
+    `resumable: true` it is streamed as SSE from a buffer instead, keeps
+    running when the client disconnects and is saved regardless of delivery.
+    """
+    generation = _start_generation(payload, kind)
+    resumable = (payload or {}).get("resumable") is True
+
+    def chunks():
+        return stream_collect_and_persist(
+            gen_source,
+            persist,
+            generation=generation,
+            request=None if resumable else request,
+            persist_partial=(payload or {}).get("persist_partial") is True,
+        )
+
+    if resumable:
+
+        async def events():
+            async for chunk in chunks():
+                yield {"content": chunk}
+
+        return resumable_response(generation, events())
+    return _as_streaming_response(chunks, generation=generation)
 
 
 @router.post("/story/suggest")
@@ -49,29 +109,27 @@ async def api_story_suggest(request: Request) -> StreamingResponse:
     if not isinstance(chap_id, int):
         raise HTTPException(status_code=400, detail="chap_id is required")
 
+    n = (payload or {}).get("n")
+    if n is not None and (
+        not isinstance(n, int) or isinstance(n, bool) or not 1 <= n <= MAX_SUGGESTIONS
+    ):
+        raise HTTPException(
+            status_code=400, detail=f"n must be an integer from 1 to {MAX_SUGGESTIONS}"
+        )
+
     _, path, pos = get_chapter_locator(chap_id)
     current_text = (payload or {}).get("current_text")
     if not isinstance(current_text, str):
         current_text = read_text_or_http_500(path)
 
-    _, _, story = get_active_story_or_http_error()
+    active, _, story = get_active_story_or_http_error()
     chapters_data = get_normalized_chapters(story)
     ensure_chapter_slot(chapters_data, pos)
     summary = chapters_data[pos].get("summary", "")
     title = chapters_data[pos].get("title") or path.name
 
-    base_url, api_key, model_id, timeout_s, model_overrides = resolve_model_runtime(
-        payload=payload,
-        model_type="WRITING",
-        base_dir=BASE_DIR,
-    )
-
-    prompt = build_suggest_prompt(
-        chapter_title=title,
-        chapter_summary=summary,
-        current_text=current_text,
-        model_overrides=model_overrides,
-    )
+    runtime, context_length, stable_prefix = resolve_prompt_runtime(payload, "WRITING")
+    base_url, api_key, model_id, timeout_s, model_overrides = runtime
 
     extra_body = {
         "max_tokens": 500,
@@ -82,31 +140,61 @@ async def api_story_suggest(request: Request) -> StreamingResponse:
         "repeat_penalty": 1.0,
     }
 
-    async def generate_suggestion():
-        startFound = False
-        isNewParagraph = False
-        async for chunk in llm.openai_completions_stream(
-            prompt=prompt,
-            base_url=base_url,
-            api_key=api_key,
-            model_id=model_id,
-            timeout_s=timeout_s,
-            extra_body=extra_body,
-        ):
-            while chunk.lstrip(" \t").startswith("\n") and not startFound:
-                chunk = chunk.lstrip(" \t")[1:]
-                if not isNewParagraph:
-                    yield "\n"
-                isNewParagraph = True
-            if chunk == "":
-                continue
-            startFound = True
-            lines = chunk.splitlines()
-            yield lines[0]
-            if len(lines) > 1:
-                break
-
-    return StreamingResponse(generate_suggestion(), media_type="text/plain")
+    prompt = build_suggest_prompt(
+        chapter_title=title,
+        chapter_summary=summary,
+        current_text=current_text,
+        model_overrides=model_overrides,
+        context_length=context_length,
+        max_tokens=extra_body["max_tokens"],
+        earlier_summaries=collect_chapter_summaries(chapters_data[:pos]),
+        sourcebook_entries=(
+            relevant_sourcebook_entries(story, summary, current_text)
+            if context_length
+            else None
+        ),
+        stable_prefix=stable_prefix,
+    )
+
+    suggest_request = {
+        "prompt": prompt,
+        "base_url": base_url,
+        "api_key": api_key,
+        "model_id": model_id,
+        "timeout_s": timeout_s,
+        "extra_body": extra_body,
+        # A newer suggestion for the same chapter replaces this one.
+        "supersede_key": ("suggest", str(active), chap_id),
+    }
+
+    generation = _start_generation(payload, "suggest")
+    events = guarded_stream(
+        generation, stream_suggestions(n=n or 1, **suggest_request), request
+    )
+
+    if n is None:
+
+        async def generate_suggestion():
+            try:
+                async for event in events:
+                    if "content" in event:
+                        yield event["content"]
+            except GenerationCancelled:
+                return
+
+        return _as_streaming_response(generate_suggestion, generation=generation)
+
+    async def generate_suggestions():
+        try:
+            async for event in events:
+                yield f"data: {json.dumps(event)}\n\n"
+        except GenerationCancelled:
+            return
+        yield "data: [DONE]\n\n"
+
+    return _as_streaming_response(
+        generate_suggestions, media_type="text/event-stream", generation=generation
+    )
 
 
 @router.post("/story/summary/stream")
@@ -120,7 +208,7 @@ async def api_story_summary_stream(request: Request):
 
     async def _gen_source():
         async for chunk in stream_unified_chat_content(
-            messages=prepared["messages"],
+            messages=await resolve_chapter_summary_messages(prepared),
             base_url=prepared["base_url"],
             api_key=prepared["api_key"],
             model_id=prepared["model_id"],
@@ -130,11 +218,14 @@ async def api_story_summary_stream(request: Request):
 
     def _persist(new_summary: str) -> None:
         prepared["chapters_data"][prepared["pos"]]["summary"] = new_summary
+        prepared["chapters_data"][prepared["pos"]]["summary_hash"] = chapter_text_hash(
+            prepared["chapter_text"]
+        )
         prepared["story"]["chapters"] = prepared["chapters_data"]
         save_story_config(prepared["story_path"], prepared["story"])
 
-    return _as_streaming_response(
-        lambda: stream_collect_and_persist(_gen_source, _persist)
+    return _persisted_generation_response(
+        request, payload, "chapter_summary", _gen_source, _persist
     )
 
 
@@ -156,8 +247,8 @@ async def api_story_write_stream(request: Request):
     def _persist(content: str) -> None:
         prepared["path"].write_text(content, encoding="utf-8")
 
-    return _as_streaming_response(
-        lambda: stream_collect_and_persist(_gen_source, _persist)
+    return _persisted_generation_response(
+        request, payload, "write", _gen_source, _persist
     )
 
 
@@ -188,8 +279,8 @@ async def api_story_continue_stream(request: Request):
         )
         prepared["path"].write_text(new_content, encoding="utf-8")
 
-    return _as_streaming_response(
-        lambda: stream_collect_and_persist(_gen_source, _persist)
+    return _persisted_generation_response(
+        request, payload, "continue", _gen_source, _persist
     )
 
 
@@ -212,6 +303,6 @@ async def api_story_story_summary_stream(request: Request):
         prepared["story"]["story_summary"] = new_summary
         save_story_config(prepared["story_path"], prepared["story"])
 
-    return _as_streaming_response(
-        lambda: stream_collect_and_persist(_gen_source, _persist)
+    return _persisted_generation_response(
+        request, payload, "story_summary", _gen_source, _persist
     )
@@ -10,6 +10,7 @@ from fastapi import APIRouter, Request, HTTPException, Path as FastAPIPath
 from fastapi.responses import JSONResponse
 
 from augmentedquill.core.config import save_story_config
+from augmentedquill.utils.storage_io import run_metadata_io
 from augmentedquill.services.projects.project_helpers import (
     normalize_story_for_frontend,
 )
@@ -39,7 +40,7 @@ async def api_story_title(request: Request) -> JSONResponse:
             raise StoryBadRequestError("No active project")
 
         story["project_title"] = title
-        save_story_config(story_path, story)
+        await run_metadata_io(save_story_config, story_path, story)
         return JSONResponse(content={"ok": True})
     except Exception as exc:
         return map_story_exception(exc)
@@ -60,7 +61,7 @@ async def api_story_settings(request: Request) -> JSONResponse:
         if "image_additional_info" in payload:
             story["image_additional_info"] = str(payload["image_additional_info"])
 
-        save_story_config(story_path, story)
+        await run_metadata_io(save_story_config, story_path, story)
 
         return JSONResponse(
             status_code=200,
@@ -89,7 +90,8 @@ async def api_story_metadata(request: Request) -> JSONResponse:
         from augmentedquill.services.projects.projects import update_story_metadata
 
         try:
-            update_story_metadata(
+            await run_metadata_io(
+                update_story_metadata,
                 title=title,
                 summary=summary,
                 tags=tags,
@@ -125,7 +127,8 @@ async def api_book_metadata(
         from augmentedquill.services.projects.projects import update_book_metadata
 
         try:
-            update_book_metadata(
+            await run_metadata_io(
+                update_book_metadata,
                 book_id,
                 title=title,
                 summary=summary,
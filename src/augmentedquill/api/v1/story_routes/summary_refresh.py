@@ -0,0 +1,80 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the summary refresh unit so this responsibility stays isolated, testable, and easy to evolve.
+
+import json
+
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from augmentedquill.api.v1.story_routes.common import (
+    StoryBadRequestError,
+    map_story_exception,
+    parse_json_body,
+)
+from augmentedquill.services.story.summary_refresh_ops import (
+    cancel_summary_refresh,
+    get_summary_refresh,
+    start_summary_refresh,
+    summary_refresh_status,
+)
+from augmentedquill.utils.storage_io import run_metadata_io
+
+router = APIRouter(tags=["Story"])
+
+
+def _event_stream(job) -> StreamingResponse:
+    async def _gen():
+        async for event in job.events():
+            yield f"data: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(_gen(), media_type="text/event-stream")
+
+
+@router.post("/story/summaries/refresh")
+async def api_story_summaries_refresh(request: Request):
+    """Refresh all chapter summaries, then the story summary.
+
+    Streams progress as server-sent events. Disconnecting does not stop the
+    job; GET /story/summaries/refresh/events re-attaches to it.
+    """
+    try:
+        payload = await parse_json_body(request)
+        try:
+            job = start_summary_refresh(payload)
+        except ValueError as exc:
+            raise StoryBadRequestError(str(exc)) from exc
+        return _event_stream(job)
+    except Exception as exc:
+        return map_story_exception(exc)
+
+
+@router.get("/story/summaries/refresh")
+async def api_story_summaries_refresh_status() -> JSONResponse:
+    try:
+        return JSONResponse(content=await run_metadata_io(summary_refresh_status))
+    except ValueError as exc:
+        return map_story_exception(StoryBadRequestError(str(exc)))
+
+
+@router.get("/story/summaries/refresh/events")
+async def api_story_summaries_refresh_events():
+    try:
+        job = get_summary_refresh()
+    except ValueError as exc:
+        return map_story_exception(StoryBadRequestError(str(exc)))
+    if job is None:
+        return map_story_exception(StoryBadRequestError("No summary refresh job"))
+    return _event_stream(job)
+
+
+@router.delete("/story/summaries/refresh")
+async def api_story_summaries_refresh_cancel() -> JSONResponse:
+    try:
+        return JSONResponse(content={"ok": True, "cancelled": cancel_summary_refresh()})
+    except ValueError as exc:
+        return map_story_exception(StoryBadRequestError(str(exc)))
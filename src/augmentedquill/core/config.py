@@ -20,16 +20,28 @@ Only generic JSON dicts are returned to keep things simple in early stages.
 
 from __future__ import annotations
 
+import contextvars
+import itertools
 import json
 import os
 import re
+import threading
 from pathlib import Path
-from typing import Any, Dict, Mapping, Optional
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import jsonschema
 
 from augmentedquill.services.story.config_story_ops import (
     normalize_validate_story_config,
     clean_story_config_for_disk,
+    validate_story_config,
+)
+from augmentedquill.utils.json_file_cache import (
+    JsonFileCache,
+    copy_json_value,
+    file_signature,
 )
+from augmentedquill.utils.storage_io import serialized_write
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent.parent
 CONFIG_DIR = BASE_DIR / "resources" / "config"
@@ -42,6 +54,23 @@ STATIC_DIR = BASE_DIR / "static"
 
 CURRENT_SCHEMA_VERSION = 2
 
+# Story validation policy, selected via AUGQ_STORY_VALIDATION:
+# - "strict": validate on every write and every load, including cache hits.
+# - "normal": validate on every write and whenever a new version of a file is
+#   read from disk; configs already validated in memory are trusted.
+# - "writes": validate on writes only and trust story.json files on disk.
+STORY_VALIDATION_POLICIES = ("strict", "normal", "writes")
+DEFAULT_STORY_VALIDATION_POLICY = "normal"
+
+
+def get_story_validation_policy() -> str:
+    """Return the active story validation policy, falling back to the default."""
+    policy = os.getenv("AUGQ_STORY_VALIDATION", DEFAULT_STORY_VALIDATION_POLICY)
+    policy = policy.strip().lower()
+    if policy not in STORY_VALIDATION_POLICIES:
+        return DEFAULT_STORY_VALIDATION_POLICY
+    return policy
+
 
 def _get_story_schema(version: int) -> Dict[str, Any]:
     """Get the JSON schema for a given story config version."""
@@ -50,6 +79,34 @@ def _get_story_schema(version: int) -> Dict[str, Any]:
         return json.load(f)
 
 
+_story_validators: Dict[int, jsonschema.protocols.Validator] = {}
+_story_validators_lock = threading.Lock()
+
+
+def _get_story_validator(version: int) -> jsonschema.protocols.Validator:
+    """Return the compiled validator for a story schema version.
+
+    Each schema file is read, checked and compiled once per process.
+    """
+    validator = _story_validators.get(version)
+    if validator is not None:
+        return validator
+    with _story_validators_lock:
+        validator = _story_validators.get(version)
+        if validator is None:
+            schema = _get_story_schema(version)
+            validator_cls = jsonschema.validators.validator_for(schema)
+            validator_cls.check_schema(schema)
+            validator = validator_cls(schema)
+            _story_validators[version] = validator
+    return validator
+
+
+def warm_story_validators() -> None:
+    """Compile the current story schema ahead of the first request."""
+    _get_story_validator(CURRENT_SCHEMA_VERSION)
+
+
 _ENV_PATTERN = re.compile(r"\$\{([A-Z0-9_]+)\}")
 
 
@@ -137,6 +194,19 @@ def _env_overrides_for_openai() -> Dict[str, Any]:
     return result
 
 
+_machine_config_cache = JsonFileCache(max_entries=8)
+
+
+def _merge_machine_config(
+    json_config: Mapping[str, Any],
+    defaults: Mapping[str, Any],
+    env_overrides: Mapping[str, Any],
+) -> Dict[str, Any]:
+    # Merge JSON over defaults, then env over that
+    merged = _deep_merge(dict(defaults), _interpolate_env(json_config))
+    return _deep_merge(merged, env_overrides)
+
+
 def load_machine_config(
     path: os.PathLike[str] | str | None = "config/machine.json",
     defaults: Optional[Mapping[str, Any]] = None,
@@ -144,16 +214,167 @@ def load_machine_config(
     """Load machine configuration applying precedence and interpolation.
 
     Precedence: env overrides > JSON file > defaults
+
+    The merged result is memoized per file and reused until the file signature
+    or the OPENAI_* overrides change, or save_machine_config rewrites the file.
+    Each call returns its own copy, so one value can serve as the machine config
+    snapshot for a whole request.
     """
     defaults = dict(defaults or {})
-    json_config = load_json_file(path)
-    json_config = _interpolate_env(json_config)
-    # Merge JSON over defaults, then env over that
-    merged = _deep_merge(defaults, json_config)
-    merged = _deep_merge(merged, _env_overrides_for_openai())
+    env_overrides = _env_overrides_for_openai()
+    if path is None or defaults:
+        return _merge_machine_config(load_json_file(path), defaults, env_overrides)
+
+    key = JsonFileCache.key_for(path)
+    variant = json.dumps(env_overrides, sort_keys=True)
+    cached = _machine_config_cache.get(key, variant)
+    if cached is not None:
+        return cached
+
+    signature = file_signature(key)
+    if signature is None:
+        return _merge_machine_config({}, defaults, env_overrides)
+    with open(key, "r", encoding="utf-8") as f:
+        raw_text = f.read()
+    try:
+        data = json.loads(raw_text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON at {path}: {e}") from e
+    merged = _merge_machine_config(
+        data if isinstance(data, dict) else {}, defaults, env_overrides
+    )
+    _machine_config_cache.put(key, signature, raw_text, merged, variant)
     return merged
 
 
+def save_machine_config(path: os.PathLike[str] | str, config: Dict[str, Any]) -> None:
+    """Write machine.json and drop its memoized config so the next load sees it."""
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_text(json.dumps(config, indent=2), encoding="utf-8")
+    _machine_config_cache.invalidate(JsonFileCache.key_for(p))
+
+
+_story_config_cache = JsonFileCache()
+
+_stage_generations = itertools.count(1)
+
+
+class StoryWriteStage:
+    """Keep saves of one story.json in memory until flush().
+
+    While a stage is active (see begin_story_write_stage), save_story_config()
+    for its path validates the config and keeps it here instead of writing it,
+    and load_story_config() for that path returns the staged config. Other
+    story.json files are read and written as usual.
+
+    The file is snapshotted when the first save is staged. If another writer
+    changed it by the time of flush(), the staged changes relative to the
+    snapshot are merged into the current file instead of replacing it, and
+    flush() raises StoryMergeConflict if both changed the same value.
+    """
+
+    def __init__(self, path: os.PathLike[str] | str | None) -> None:
+        self._lock = threading.Lock()
+        self._token: Optional[contextvars.Token] = None
+        self._pending: Optional[Tuple[int, str, Dict[str, Any]]] = None
+        # (file signature, raw text) of the file when the first save was staged.
+        self._base: Optional[Tuple[Optional[Tuple[int, int]], str]] = None
+        self.retarget(path)
+
+    def retarget(self, path: os.PathLike[str] | str | None) -> None:
+        """Flush pending writes and stage a different story.json (or none)."""
+        self.flush()
+        self.path = Path(path) if path is not None else None
+        self.key = JsonFileCache.key_for(path) if path is not None else None
+
+    def covers(self, key: str) -> bool:
+        return self.key is not None and key == self.key
+
+    def get(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            pending = self._pending
+        return copy_json_value(pending[2]) if pending else None
+
+    def put(self, raw_text: str, config: Dict[str, Any]) -> None:
+        with self._lock:
+            if self._base is None and self.key is not None:
+                self._base = _story_file_snapshot(self.key)
+            self._pending = (next(_stage_generations), raw_text, config)
+
+    def signature(self) -> Optional[Tuple[str, int]]:
+        with self._lock:
+            pending = self._pending
+        return ("staged", pending[0]) if pending else None
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, None
+            base, self._base = self._base, None
+        if pending is not None and self.path is not None:
+            _write_staged_story(self.path, base, pending[1], pending[2])
+
+
+_story_write_stage: contextvars.ContextVar[Optional[StoryWriteStage]] = (
+    contextvars.ContextVar("story_write_stage", default=None)
+)
+
+
+def begin_story_write_stage(path: os.PathLike[str] | str | None) -> StoryWriteStage:
+    """Stage writes to story.json at path in the current context."""
+    stage = StoryWriteStage(path)
+    stage._token = _story_write_stage.set(stage)
+    return stage
+
+
+def end_story_write_stage(stage: StoryWriteStage) -> None:
+    """Write the staged config (if any) and stop staging."""
+    try:
+        stage.flush()
+    finally:
+        if stage._token is not None:
+            _story_write_stage.reset(stage._token)
+            stage._token = None
+
+
+def _active_stage(key: str) -> Optional[StoryWriteStage]:
+    stage = _story_write_stage.get()
+    return stage if stage is not None and stage.covers(key) else None
+
+
+def story_config_signature(path: os.PathLike[str] | str) -> Optional[Tuple]:
+    """Return a value that changes whenever the story config at path changes.
+
+    This is the file signature, or a staged marker while a write stage holds an
+    unsaved version of the file.
+    """
+    key = JsonFileCache.key_for(path)
+    stage = _active_stage(key)
+    staged = stage.signature() if stage is not None else None
+    return staged if staged is not None else file_signature(key)
+
+
+def _normalize_story_json(
+    data: Any, path_label: str, defaults: Mapping[str, Any], validate: bool = True
+) -> Dict[str, Any]:
+    json_config = _interpolate_env(data if isinstance(data, dict) else {})
+    merged = _deep_merge(dict(defaults), json_config)
+    return normalize_validate_story_config(
+        merged=merged,
+        path_label=path_label,
+        current_schema_version=CURRENT_SCHEMA_VERSION,
+        validator_loader=_get_story_validator,
+        validate=validate,
+    )
+
+
+def _parse_story_text(raw_text: str, path_label: str) -> Any:
+    try:
+        return json.loads(raw_text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON at {path_label}: {e}") from e
+
+
 def load_story_config(
     path: os.PathLike[str] | str | None = "config/story.json",
     defaults: Optional[Mapping[str, Any]] = None,
@@ -162,25 +383,176 @@ def load_story_config(
 
     Currently we do not define env var names for story config. ${VAR} placeholders
     in the JSON will still resolve using environment variables.
+
+    Results for existing files are cached per path and file signature, so repeated
+    loads of an unchanged story.json skip parsing and validation. Every call gets
+    its own copy and may mutate it freely. Placeholders are resolved when the file
+    is first read; changing the environment afterwards does not invalidate it.
+
+    Schema validation follows get_story_validation_policy().
     """
     defaults = dict(defaults or {})
-    json_config = load_json_file(path)
-    json_config = _interpolate_env(json_config)
-    merged = _deep_merge(defaults, json_config)
-    return normalize_validate_story_config(
-        merged=merged,
-        path_label=str(path),
-        current_schema_version=CURRENT_SCHEMA_VERSION,
-        schema_loader=_get_story_schema,
-    )
+    policy = get_story_validation_policy()
+    validate_on_read = policy != "writes"
+    if path is None or defaults:
+        return _normalize_story_json(
+            load_json_file(path), str(path), defaults, validate=validate_on_read
+        )
+
+    key = JsonFileCache.key_for(path)
+    stage = _active_stage(key)
+    staged = stage.get() if stage is not None else None
+    if staged is not None:
+        return staged
+
+    cached = _story_config_cache.get(key)
+    if cached is not None:
+        if policy == "strict":
+            validate_story_config(
+                cached,
+                str(path),
+                _get_story_validator(
+                    cached["metadata"].get("version", CURRENT_SCHEMA_VERSION)
+                ),
+            )
+        return cached
+
+    signature = file_signature(key)
+    if signature is None:
+        return _normalize_story_json({}, str(path), defaults, validate=validate_on_read)
+    with open(key, "r", encoding="utf-8") as f:
+        raw_text = f.read()
+    data = _parse_story_text(raw_text, str(path))
+    config = _normalize_story_json(data, str(path), defaults, validate=validate_on_read)
+    _story_config_cache.put(key, signature, raw_text, config)
+    return config
 
 
 def save_story_config(path: os.PathLike[str] | str, config: Dict[str, Any]) -> None:
+    """Validate and write a story config, updating the in-process cache.
+
+    Raises ValueError without touching the file when the config does not match
+    its schema, so an invalid story.json never reaches disk. Inside a write stage
+    for this path the validated config is staged instead of written.
+    """
     p = Path(path)
+    clean_config = clean_story_config_for_disk(config)
+    raw_text = json.dumps(clean_config, indent=2, ensure_ascii=False)
+    # Normalizing the serialized form yields exactly what a later load would
+    # parse, so the cache can be updated without reading the file back.
+    loaded = _normalize_story_json(json.loads(raw_text), str(path), {})
+
+    stage = _active_stage(JsonFileCache.key_for(p))
+    if stage is not None:
+        stage.put(raw_text, loaded)
+        return
+    _write_story_file(p, raw_text, loaded)
+
+
+@serialized_write(scope=lambda p, *args, **kwargs: p.parent)
+def _write_story_file(p: Path, raw_text: str, loaded: Dict[str, Any]) -> None:
     if not p.parent.exists():
         p.parent.mkdir(parents=True)
+    with p.open("w", encoding="utf-8") as f:
+        f.write(raw_text)
 
-    clean_config = clean_story_config_for_disk(config)
+    key = JsonFileCache.key_for(p)
+    signature = file_signature(key)
+    if signature is None:
+        _story_config_cache.invalidate(key)
+    else:
+        _story_config_cache.put(key, signature, raw_text, loaded)
 
-    with p.open("w", encoding="utf-8") as f:
-        json.dump(clean_config, f, indent=2, ensure_ascii=False)
+
+def _story_file_snapshot(key: str) -> Tuple[Optional[Tuple[int, int]], str]:
+    signature = file_signature(key)
+    try:
+        with open(key, "r", encoding="utf-8") as f:
+            return signature, f.read()
+    except OSError:
+        return None, ""
+
+
+_REMOVED: Any = object()
+
+
+class StoryMergeConflict(ValueError):
+    """A staged save and another writer changed the same story.json value."""
+
+
+def _merge_value(base: Any, staged: Any, current: Any, where: str) -> Any:
+    """Three-way merge of one value; _REMOVED stands for a missing key."""
+    if staged == base:
+        return current
+    if current == base or current == staged:
+        return staged
+    if all(isinstance(v, dict) for v in (base, staged, current)):
+        merged = {}
+        for key in dict.fromkeys([*current, *staged, *base]):
+            value = _merge_value(
+                base.get(key, _REMOVED),
+                staged.get(key, _REMOVED),
+                current.get(key, _REMOVED),
+                f"{where}.{key}" if where else key,
+            )
+            if value is not _REMOVED:
+                merged[key] = value
+        return merged
+    if all(isinstance(v, list) for v in (base, staged, current)) and (
+        len(base) == len(staged) == len(current)
+    ):
+        return [
+            _merge_value(b, s, c, f"{where}[{i}]")
+            for i, (b, s, c) in enumerate(zip(base, staged, current))
+        ]
+    raise StoryMergeConflict(f"story.json was changed concurrently at {where}")
+
+
+def _merge_staged_story(base_text: str, staged_text: str, current: Any) -> Any:
+    """Apply what staged_text changed relative to base_text onto current.
+
+    Objects merge per key and lists of unchanged length per entry, so edits to
+    different chapters or fields are both kept. Raises StoryMergeConflict when
+    both sides changed the same value, or the length of the same list.
+    """
+    base = json.loads(base_text) if base_text.strip() else {}
+    staged = json.loads(staged_text)
+    if not all(isinstance(d, dict) for d in (base, staged, current)):
+        raise StoryMergeConflict("story.json is not an object")
+    return _merge_value(base, staged, current, "")
+
+
+@serialized_write(scope=lambda p, *args, **kwargs: p.parent)
+def _write_staged_story(
+    p: Path,
+    base: Optional[Tuple[Optional[Tuple[int, int]], str]],
+    raw_text: str,
+    loaded: Dict[str, Any],
+) -> None:
+    """Write a staged config, merging it into the file if that changed since.
+
+    Raises StoryMergeConflict, leaving the file as it is, when the changes
+    cannot be merged.
+    """
+    key = JsonFileCache.key_for(p)
+    if base is not None and file_signature(key) not in (None, base[0]):
+        try:
+            current = json.loads(p.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            # Nothing readable to merge with: the staged config replaces it.
+            current = None
+        if current is not None:
+            merged = _merge_staged_story(base[1], raw_text, current)
+            raw_text = json.dumps(merged, indent=2, ensure_ascii=False)
+            loaded = _normalize_story_json(json.loads(raw_text), str(p), {})
+    _write_story_file(p, raw_text, loaded)
+
+
+def story_config_cache_stats() -> Dict[str, int]:
+    """Return hit/miss counters and entry count of the story config cache."""
+    return _story_config_cache.stats()
+
+
+def clear_story_config_cache() -> None:
+    """Drop all cached story configs and reset the counters."""
+    _story_config_cache.clear()
@@ -14,6 +14,7 @@ Includes global configuration setup, error handling, and router registration.
 from __future__ import annotations
 
 import argparse
+from contextlib import asynccontextmanager
 from typing import Optional
 import os
 
@@ -21,7 +22,12 @@ from fastapi import FastAPI, APIRouter
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 
-from augmentedquill.core.config import load_machine_config, STATIC_DIR, CONFIG_DIR
+from augmentedquill.core.config import (
+    load_machine_config,
+    warm_story_validators,
+    STATIC_DIR,
+    CONFIG_DIR,
+)
 
 # Import API routers
 from augmentedquill.api.v1.settings import router as settings_router  # noqa: E402
@@ -30,7 +36,22 @@ from augmentedquill.api.v1.chapters import router as chapters_router  # noqa: E4
 from augmentedquill.api.v1.story import router as story_router  # noqa: E402
 from augmentedquill.api.v1.chat import router as chat_router  # noqa: E402
 from augmentedquill.api.v1.debug import router as debug_router  # noqa: E402
+from augmentedquill.api.v1.generations import router as generations_router  # noqa: E402
 from augmentedquill.api.v1.sourcebook import router as sourcebook_router  # noqa: E402
+from augmentedquill.services.llm.llm_dump import close_llm_dump  # noqa: E402
+from augmentedquill.services.llm.llm_http_pool import close_http_clients  # noqa: E402
+from augmentedquill.services.llm.llm_logging import llm_logs  # noqa: E402
+from augmentedquill.utils.storage_io import shutdown_storage_io  # noqa: E402
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    yield
+    await close_http_clients()
+    await close_llm_dump()
+    llm_logs.flush(wait=True)
+    # Let in-flight storage work finish so no file is left half written.
+    shutdown_storage_io(wait=True)
 
 
 def create_app() -> FastAPI:
@@ -40,7 +61,10 @@ def create_app() -> FastAPI:
     route registration consistent across reload subprocesses.
     """
 
-    app = FastAPI(title="AugmentedQuill")
+    app = FastAPI(title="AugmentedQuill", lifespan=_lifespan)
+
+    # Compile story schema validators once up front instead of on first request.
+    warm_story_validators()
 
     # Add CORS middleware
     app.add_middleware(
@@ -62,6 +86,7 @@ def create_app() -> FastAPI:
     api_v1_router.include_router(story_router)
     api_v1_router.include_router(chat_router)
     api_v1_router.include_router(debug_router)
+    api_v1_router.include_router(generations_router)
     api_v1_router.include_router(sourcebook_router)
 
     # JSON REST APIs to serve dynamic data to the frontend (no server-side injection in HTML)
@@ -118,7 +143,7 @@ def build_arg_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         "--llm-dump-path",
         default=None,
-        help="Path for raw LLM dump file (overrides default)",
+        help="Base path for the gzip JSONL dump; each run adds its start time and pid (default: data/logs/llm_dump.jsonl.gz)",
     )
     return parser
 
@@ -6,12 +6,16 @@
 # (at your option) any later version.
 # Purpose: Defines the chapter helpers unit so this responsibility stays isolated, testable, and easy to evolve.
 
-import re
 from pathlib import Path
 from typing import List, Tuple, Dict, Any
 from fastapi import HTTPException
 
 from augmentedquill.core.config import load_story_config
+from augmentedquill.services.chapters.chapter_index import get_chapter_index
+from augmentedquill.services.chapters.chapter_matching import (
+    group_files_by_book,
+    match_chapter_entries,
+)
 
 
 def _scan_chapter_files() -> List[Tuple[str, Path]]:
@@ -34,69 +38,9 @@ def _scan_chapter_files() -> List[Tuple[str, Path]]:
     if not active:
         return []
 
-    story = load_story_config(active / "story.json") or {}
-    p_type = story.get("project_type", "novel")
-
-    if p_type == "short-story":
-        p = active / "content.md"
-        return [(1, p)]
-
-    if p_type == "series":
-        books = story.get("books", [])
-        items = []
-        global_idx = 1
-        for book in books:
-            bid = book.get("id")
-            if not bid:
-                continue
-
-            # Enforce per-book chapter directories so identical chapter filenames
-            # across books cannot collide.
-            b_dir = active / "books" / bid
-            if not b_dir.exists():
-                continue
-
-            chapters_dir = b_dir / "chapters"
-            if not chapters_dir.exists():
-                continue
-
-            book_items = []
-            for p in chapters_dir.glob("*.txt"):
-                if not p.is_file():
-                    continue
-                name = p.name
-                m = re.match(r"^(\d{4})\.txt$", name)
-                if m:
-                    idx = int(m.group(1))
-                    book_items.append((idx, p))
-
-            book_items.sort(key=lambda t: t[0])
-
-            # Expose a single linear ID space so API callers can stay agnostic
-            # to storage layout differences between project types.
-            for _, path in book_items:
-                items.append((global_idx, path))
-                global_idx += 1
-        return items
-
-    chapters_dir = active / "chapters"
-    if not chapters_dir.exists() or not chapters_dir.is_dir():
-        return []
-    items: List[Tuple[int, Path]] = []
-    for p in chapters_dir.glob("*.txt"):
-        if not p.is_file():
-            continue
-        name = p.name
-        m = re.match(r"^(\d{4})\.txt$", name)
-        if m:
-            idx = int(m.group(1))
-            items.append((idx, p))
-            continue
-    items.sort(key=lambda t: t[0])
-
-    # Keep a consistent 1-based linear ID scheme across all project modes to
-    # avoid mode-specific handling in API consumers.
-    return [(i + 1, p) for i, (_, p) in enumerate(items)]
+    # The index only rereads directories whose mtime changed, instead of
+    # globbing every chapter directory on each call.
+    return get_chapter_index(active).entries()
 
 
 def _load_chapter_titles(count: int) -> List[str]:
@@ -136,18 +80,29 @@ def _normalize_chapter_entry(entry: Any) -> Dict[str, Any]:
 
 
 def _chapter_by_id_or_404(chap_id: int) -> tuple[Path, int, int]:
-    files = _scan_chapter_files()
-    match = next(
-        ((idx, p, i) for i, (idx, p) in enumerate(files) if idx == chap_id), None
-    )
+    from augmentedquill.services.projects.projects import get_active_project_dir
+
+    active = get_active_project_dir()
+    index = get_chapter_index(active) if active else None
+    match = index.lookup(chap_id) if index else None
     if not match:
-        available = [f[0] for f in files]
+        available = [f[0] for f in index.entries()] if index else []
         raise HTTPException(
             status_code=404,
             detail=f"Chapter with ID {chap_id} not found. Available chapter IDs: {available}. "
             f"Please call get_project_overview to refresh your knowledge of chapter IDs.",
         )
-    return match  # (idx, path, pos)
+    path, pos = match
+    return chap_id, path, pos  # (idx, path, pos)
+
+
+def _as_dict_entry(entries: list, entry: Any, fname: str) -> dict:
+    """Replace a legacy non-dict chapter entry in place by its dict form."""
+    if isinstance(entry, dict):
+        return entry
+    converted = {"title": str(entry), "summary": "", "filename": fname}
+    entries[entries.index(entry)] = converted
+    return converted
 
 
 def _get_chapter_metadata_entry(
@@ -167,76 +122,39 @@ def _get_chapter_metadata_entry(
         book = next((b for b in books if b.get("id") == book_id), None)
         if not book:
             return None
-        book_chapters = book.setdefault("chapters", [])
-        book_files = [f for f in files if f[1].parent.parent.name == book_id]
-        used_ids = set()
-        for i, (f_idx, f_p) in enumerate(book_files):
-            fname = f_p.name
-            curr_match = next(
-                (
-                    c
-                    for c in book_chapters
-                    if isinstance(c, dict)
-                    and c.get("filename") == fname
-                    and id(c) not in used_ids
-                ),
-                None,
-            )
-            if not curr_match and i < len(book_chapters):
-                candidate = book_chapters[i]
-                if id(candidate) not in used_ids:
-                    if (
-                        not isinstance(candidate, dict)
-                        or not candidate.get("filename")
-                        or candidate.get("filename") == fname
-                    ):
-                        curr_match = candidate
-            if curr_match:
-                used_ids.add(id(curr_match))
-                if f_idx == chap_id:
-                    if not isinstance(curr_match, dict):
-                        idx_in_book = book_chapters.index(curr_match)
-                        curr_match = {
-                            "title": str(curr_match),
-                            "summary": "",
-                            "filename": fname,
-                        }
-                        book_chapters[idx_in_book] = curr_match
-                    return curr_match
+        entries = book.setdefault("chapters", [])
+        scope = [f for f in files if f[1].parent.parent.name == book_id]
     else:
-        chapters_data = story.setdefault("chapters", [])
-        used_ids = set()
-        for i, (f_idx, f_p) in enumerate(files):
-            fname = f_p.name
-            curr_match = next(
-                (
-                    c
-                    for c in chapters_data
-                    if isinstance(c, dict)
-                    and c.get("filename") == fname
-                    and id(c) not in used_ids
-                ),
-                None,
-            )
-            if not curr_match and i < len(chapters_data):
-                candidate = chapters_data[i]
-                if id(candidate) not in used_ids:
-                    if (
-                        not isinstance(candidate, dict)
-                        or not candidate.get("filename")
-                        or candidate.get("filename") == fname
-                    ):
-                        curr_match = candidate
-            if curr_match:
-                used_ids.add(id(curr_match))
-                if f_idx == chap_id:
-                    if not isinstance(curr_match, dict):
-                        idx_in_root = chapters_data.index(curr_match)
-                        curr_match = {
-                            "title": str(curr_match),
-                            "summary": "",
-                            "filename": fname,
-                        }
-                        chapters_data[idx_in_root] = curr_match
-                    return curr_match
+        entries = story.setdefault("chapters", [])
+        scope = files
+
+    matches = match_chapter_entries(entries, [f_p.name for _, f_p in scope])
+    for (f_idx, f_p), match in zip(scope, matches):
+        if match is not None and f_idx == chap_id:
+            return _as_dict_entry(entries, match, f_p.name)
     return None
+
+
+def _chapter_metadata_entries(story: dict, files: list) -> Dict[int, dict]:
+    """Return {virtual_id: metadata entry} for all files in one pass.
+
+    Same result as calling _get_chapter_metadata_entry for every file in order,
+    without re-matching the whole metadata list per chapter.
+    """
+    result: Dict[int, dict] = {}
+    if story.get("project_type", "novel") == "series":
+        books = story.get("books", [])
+        scopes = []
+        for book_id, book_files in group_files_by_book(files).items():
+            book = next((b for b in books if b.get("id") == book_id), None)
+            if book:
+                scopes.append((book.setdefault("chapters", []), book_files))
+    else:
+        scopes = [(story.setdefault("chapters", []), files)]
+
+    for entries, scope in scopes:
+        matches = match_chapter_entries(entries, [f_p.name for _, f_p in scope])
+        for (f_idx, f_p), match in zip(scope, matches):
+            if match is not None:
+                result[f_idx] = _as_dict_entry(entries, match, f_p.name)
+    return result
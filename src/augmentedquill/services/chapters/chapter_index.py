@@ -0,0 +1,225 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the chapter index unit so this responsibility stays isolated, testable, and easy to evolve.
+
+"""
+Per-project index of chapter files.
+
+The index maps the linear virtual chapter IDs used by the API to chapter file
+paths (and back) without walking the project tree on every lookup. It is kept
+valid by cheap stat() calls: the story.json signature (or its staged version
+during a tool batch) tells whether the set of chapter directories may have
+changed (project type, book list), and each chapter directory's mtime tells
+whether its files changed. Only directories that changed are rescanned.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from augmentedquill.core.config import load_story_config, story_config_signature
+from augmentedquill.utils.json_file_cache import RACY_WINDOW_NS
+
+_CHAPTER_FILE_RE = re.compile(r"^(\d{4})\.txt$")
+
+_MAX_PROJECTS = 16
+
+_UNSET = object()
+
+
+def _dir_mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _scan_directory(directory: Path) -> List[Tuple[int, Path]]:
+    """Return (file number, path) for chapter files in directory, sorted."""
+    items: List[Tuple[int, Path]] = []
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                m = _CHAPTER_FILE_RE.match(entry.name)
+                if m and entry.is_file():
+                    items.append((int(m.group(1)), directory / entry.name))
+    except OSError:
+        return []
+    items.sort(key=lambda t: t[0])
+    return items
+
+
+@dataclass
+class _Segment:
+    """Chapter files of one directory (the novel's chapters/ or one book's)."""
+
+    directory: Path
+    book_id: Optional[str] = None
+    mtime_ns: Optional[int] = None
+    scanned_at_ns: int = 0
+    files: List[Tuple[int, Path]] = field(default_factory=list)
+
+    def is_stale(self) -> bool:
+        mtime = _dir_mtime_ns(self.directory)
+        if mtime != self.mtime_ns:
+            return True
+        # A directory changed within the timestamp granularity of the last scan
+        # could have changed again without a visible mtime change.
+        return mtime is not None and mtime + RACY_WINDOW_NS >= self.scanned_at_ns
+
+    def rescan(self) -> None:
+        self.scanned_at_ns = time.time_ns()
+        self.mtime_ns = _dir_mtime_ns(self.directory)
+        self.files = (
+            _scan_directory(self.directory) if self.mtime_ns is not None else []
+        )
+
+
+class ChapterIndex:
+    """Virtual chapter ID <-> path index for one project directory."""
+
+    def __init__(self, project_dir: Path) -> None:
+        self._project_dir = Path(project_dir)
+        self._story_path = self._project_dir / "story.json"
+        self._lock = threading.RLock()
+        self._story_signature: object = _UNSET
+        self._layout: Optional[tuple] = None
+        self._segments: List[_Segment] = []
+        self._entries: List[Tuple[int, Path]] = []
+        self._by_id: Dict[int, Tuple[Path, int]] = {}
+        self._by_path: Dict[str, int] = {}
+
+    def entries(self) -> List[Tuple[int, Path]]:
+        """Return [(virtual_id, path)] in story order."""
+        with self._lock:
+            self._ensure_fresh()
+            return list(self._entries)
+
+    def lookup(self, chap_id: int) -> Optional[Tuple[Path, int]]:
+        """Return (path, position in entries()) for a virtual ID, or None."""
+        with self._lock:
+            self._ensure_fresh()
+            return self._by_id.get(chap_id)
+
+    def id_for_path(self, path: os.PathLike[str] | str) -> Optional[int]:
+        """Return the virtual ID of a chapter file, or None if it is not indexed."""
+        with self._lock:
+            self._ensure_fresh()
+            return self._by_path.get(os.path.abspath(os.fspath(path)))
+
+    def refresh_directory(self, directory: os.PathLike[str] | str) -> None:
+        """Rescan one chapter directory after this process changed its files.
+
+        Used by create, delete and reorder so that only the touched directory is
+        read again instead of the whole project.
+        """
+        target = os.path.abspath(os.fspath(directory))
+        with self._lock:
+            if self._story_signature is _UNSET:
+                return
+            for seg in self._segments:
+                if os.path.abspath(seg.directory) == target:
+                    seg.rescan()
+                    self._flatten()
+                    return
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._story_signature = _UNSET
+            self._layout = None
+
+    def _ensure_fresh(self) -> None:
+        signature = story_config_signature(self._story_path)
+        if signature != self._story_signature:
+            layout = self._read_layout()
+            self._story_signature = signature
+            if layout != self._layout:
+                self._layout = layout
+                self._rebuild()
+                return
+
+        changed = False
+        for seg in self._segments:
+            if seg.is_stale():
+                seg.rescan()
+                changed = True
+        if changed:
+            self._flatten()
+
+    def _read_layout(self) -> tuple:
+        story = load_story_config(self._story_path) or {}
+        p_type = story.get("project_type", "novel")
+        if p_type == "short-story":
+            return ("short-story",)
+        if p_type == "series":
+            book_ids = tuple(
+                book.get("id") for book in story.get("books", []) if book.get("id")
+            )
+            return ("series", book_ids)
+        return ("novel",)
+
+    def _rebuild(self) -> None:
+        kind = self._layout[0]
+        if kind == "short-story":
+            self._segments = []
+        elif kind == "series":
+            # Enforce per-book chapter directories so identical chapter filenames
+            # across books cannot collide.
+            self._segments = [
+                _Segment(self._project_dir / "books" / bid / "chapters", book_id=bid)
+                for bid in self._layout[1]
+            ]
+        else:
+            self._segments = [_Segment(self._project_dir / "chapters")]
+        for seg in self._segments:
+            seg.rescan()
+        self._flatten()
+
+    def _flatten(self) -> None:
+        if self._layout and self._layout[0] == "short-story":
+            entries = [(1, self._project_dir / "content.md")]
+        else:
+            # Expose a single 1-based linear ID space so API callers can stay
+            # agnostic to storage layout differences between project types.
+            entries = []
+            for seg in self._segments:
+                for _, path in seg.files:
+                    entries.append((len(entries) + 1, path))
+        self._entries = entries
+        self._by_id = {vid: (path, pos) for pos, (vid, path) in enumerate(entries)}
+        self._by_path = {os.path.abspath(path): vid for vid, path in entries}
+
+
+_indexes: "OrderedDict[str, ChapterIndex]" = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_chapter_index(project_dir: Path) -> ChapterIndex:
+    """Return the shared ChapterIndex for a project directory."""
+    key = os.path.abspath(os.fspath(project_dir))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = ChapterIndex(Path(project_dir))
+            _indexes[key] = index
+            while len(_indexes) > _MAX_PROJECTS:
+                _indexes.popitem(last=False)
+        else:
+            _indexes.move_to_end(key)
+        return index
+
+
+def clear_chapter_indexes() -> None:
+    with _indexes_lock:
+        _indexes.clear()
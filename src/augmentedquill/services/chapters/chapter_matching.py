@@ -0,0 +1,165 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the chapter matching unit so this responsibility stays isolated, testable, and easy to evolve.
+
+"""
+Matching of chapter files to their story.json metadata entries.
+
+Chapter files are matched to metadata by filename first and by position as a
+fallback, and an entry is never matched twice. The helpers here apply those
+rules in a single pass over files and entries using lookup maps, instead of
+searching the metadata list again for every file.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Set, Tuple
+
+FALLBACK_COMPATIBLE = "compatible"
+FALLBACK_UNFILED = "unfiled"
+FALLBACK_ANY = "any"
+
+
+class _FirstUnused:
+    """Return the first entry (in list order) with a key that is not used yet.
+
+    Entries are queued per key once; used ones are dropped lazily from the
+    front of their queue, so all lookups together cost O(len(entries)).
+    """
+
+    def __init__(
+        self, entries: Sequence[Any], key_fn: Callable[[Any], Optional[Hashable]]
+    ) -> None:
+        self._queues: Dict[Hashable, deque] = defaultdict(deque)
+        for entry in entries:
+            key = key_fn(entry)
+            if key is not None:
+                self._queues[key].append(entry)
+
+    def first(self, key: Hashable, used: Set[int]) -> Any:
+        queue = self._queues.get(key)
+        while queue and id(queue[0]) in used:
+            queue.popleft()
+        return queue[0] if queue else None
+
+
+def _filename_key(entry: Any) -> Optional[str]:
+    if isinstance(entry, dict):
+        filename = entry.get("filename")
+        if isinstance(filename, str) and filename:
+            return filename
+    return None
+
+
+def _positional_ok(candidate: Any, fname: str, fallback: str) -> bool:
+    if fallback == FALLBACK_ANY:
+        return True
+    if fallback == FALLBACK_UNFILED:
+        return isinstance(candidate, dict) and not candidate.get("filename")
+    return (
+        not isinstance(candidate, dict)
+        or not candidate.get("filename")
+        or candidate.get("filename") == fname
+    )
+
+
+def match_chapter_entries(
+    entries: Sequence[Any],
+    filenames: Sequence[str],
+    fallback: str = FALLBACK_COMPATIBLE,
+    used: Optional[Set[int]] = None,
+) -> List[Any]:
+    """Match each filename to an entry of one metadata list.
+
+    For the i-th file the first unused dict entry with the same filename wins.
+    Otherwise entries[i] is taken if it is unused and the fallback accepts it:
+    "compatible" accepts non-dicts and entries without or with the same
+    filename, "unfiled" only dicts without a filename, "any" every entry.
+
+    Returns one entry (or None) per filename. ``used`` holds id()s of entries
+    already matched and is updated in place, so several calls can share it.
+    """
+    if used is None:
+        used = set()
+    by_name = _FirstUnused(entries, _filename_key)
+    matches: List[Any] = []
+    for i, fname in enumerate(filenames):
+        match = by_name.first(fname, used)
+        if not match and i < len(entries):
+            candidate = entries[i]
+            if id(candidate) not in used and _positional_ok(candidate, fname, fallback):
+                match = candidate
+        if match:
+            used.add(id(match))
+            matches.append(match)
+        else:
+            matches.append(None)
+    return matches
+
+
+def match_series_entries(
+    metadata: Sequence[Dict[str, Any]], files: Sequence[Tuple[int, Path]]
+) -> List[Optional[Dict[str, Any]]]:
+    """Match series chapter files to flattened metadata across all books.
+
+    ``metadata`` entries carry their book in ``_parent_book_id``. Per file the
+    order of preference is: same filename in the same book, same filename in
+    any book, the entry at the file's position within its book (if it has no
+    or the same filename), and finally the entry at the file's global position.
+    """
+    in_book = _FirstUnused(
+        metadata,
+        lambda m: (
+            (m.get("_parent_book_id"), m.get("filename")) if m.get("filename") else None
+        ),
+    )
+    anywhere = _FirstUnused(metadata, _filename_key)
+    book_metadata: Dict[Any, List[Dict[str, Any]]] = defaultdict(list)
+    for entry in metadata:
+        book_metadata[entry.get("_parent_book_id")].append(entry)
+
+    seen_in_book: Dict[str, int] = defaultdict(int)
+    used: Set[int] = set()
+    matches: List[Optional[Dict[str, Any]]] = []
+    for i, (_, path) in enumerate(files):
+        fname = path.name
+        book_id = path.parent.parent.name
+        pos_in_book = seen_in_book[book_id]
+        seen_in_book[book_id] += 1
+
+        match = in_book.first((book_id, fname), used) or anywhere.first(fname, used)
+
+        if not match:
+            candidates = book_metadata.get(book_id, [])
+            if pos_in_book < len(candidates):
+                candidate = candidates[pos_in_book]
+                if id(candidate) not in used and (
+                    not candidate.get("filename") or candidate.get("filename") == fname
+                ):
+                    match = candidate
+
+        if not match and i < len(metadata):
+            candidate = metadata[i]
+            if id(candidate) not in used:
+                match = candidate
+
+        if match:
+            used.add(id(match))
+        matches.append(match)
+    return matches
+
+
+def group_files_by_book(
+    files: Sequence[Tuple[int, Path]],
+) -> Dict[str, List[Tuple[int, Path]]]:
+    """Group (virtual_id, path) items of a series by their book directory."""
+    groups: Dict[str, List[Tuple[int, Path]]] = defaultdict(list)
+    for item in files:
+        groups[item[1].parent.parent.name].append(item)
+    return groups
@@ -13,9 +13,17 @@ from pathlib import Path
 from augmentedquill.core.config import load_story_config, save_story_config
 from augmentedquill.services.chapters.chapter_helpers import (
     _normalize_chapter_entry,
+    _chapter_metadata_entries,
     _get_chapter_metadata_entry,
     _scan_chapter_files,
 )
+from augmentedquill.services.chapters.chapter_index import get_chapter_index
+from augmentedquill.services.chapters.chapter_matching import (
+    FALLBACK_ANY,
+    match_chapter_entries,
+    match_series_entries,
+)
+from augmentedquill.utils.storage_io import serialized_write
 
 
 def _resolve_title(path: Path, chapter_entry: dict) -> str:
@@ -37,9 +45,16 @@ def _normalize_conflicts(conflicts: list) -> list:
 
 
 def build_chapter_entry(
-    idx: int, path: Path, story: dict, files: list[tuple[int, Path]]
+    idx: int,
+    path: Path,
+    story: dict,
+    files: list[tuple[int, Path]],
+    metadata: dict[int, dict] | None = None,
 ) -> dict:
-    chapter_entry = _get_chapter_metadata_entry(story, idx, path, files) or {}
+    if metadata is not None:
+        chapter_entry = metadata.get(idx) or {}
+    else:
+        chapter_entry = _get_chapter_metadata_entry(story, idx, path, files) or {}
     conflicts = _normalize_conflicts(chapter_entry.get("conflicts") or [])
 
     book_id = chapter_entry.get("book_id", chapter_entry.get("_parent_book_id"))
@@ -63,7 +78,10 @@ def list_chapters_payload(active: Path | None) -> list[dict]:
     if not active:
         return []
     story = load_story_config(active / "story.json") or {}
-    return [build_chapter_entry(idx, path, story, files) for idx, path in files]
+    metadata = _chapter_metadata_entries(story, files)
+    return [
+        build_chapter_entry(idx, path, story, files, metadata) for idx, path in files
+    ]
 
 
 def chapter_detail_payload(active: Path | None, chap_id: int, path: Path) -> dict:
@@ -81,6 +99,7 @@ def chapter_detail_payload(active: Path | None, chap_id: int, path: Path) -> dic
     }
 
 
+@serialized_write(scope="active")
 def reorder_chapters_in_project(active: Path, payload: dict) -> None:
     story_path = active / "story.json"
     story = load_story_config(story_path) or {}
@@ -106,71 +125,12 @@ def reorder_chapters_in_project(active: Path, payload: dict) -> None:
                 norm["_original_object"] = chapter
                 all_metadata.append(norm)
 
+        matches = match_series_entries(all_metadata, all_files)
         id_to_data = {}
-        used_m_ids = set()
-        for i, (idx, path) in enumerate(all_files):
-            fname = path.name
-            f_bid = path.parent.parent.name
-
-            match = next(
-                (
-                    chapter
-                    for chapter in all_metadata
-                    if chapter.get("filename") == fname
-                    and chapter.get("_parent_book_id") == f_bid
-                    and id(chapter) not in used_m_ids
-                ),
-                None,
-            )
-
-            if not match:
-                match = next(
-                    (
-                        chapter
-                        for chapter in all_metadata
-                        if chapter.get("filename") == fname
-                        and id(chapter) not in used_m_ids
-                    ),
-                    None,
-                )
-
-            if not match:
-                book_m = [
-                    chapter
-                    for chapter in all_metadata
-                    if chapter.get("_parent_book_id") == f_bid
-                ]
-                book_files = [
-                    file_item
-                    for file_item in all_files
-                    if file_item[1].parent.parent.name == f_bid
-                ]
-                f_pos = next(
-                    (
-                        pos
-                        for pos, file_item in enumerate(book_files)
-                        if file_item[0] == idx
-                    ),
-                    0,
-                )
-                if f_pos < len(book_m):
-                    cand = book_m[f_pos]
-                    if id(cand) not in used_m_ids and (
-                        not cand.get("filename") or cand.get("filename") == fname
-                    ):
-                        match = cand
-
-            if not match and i < len(all_metadata):
-                cand = all_metadata[i]
-                if id(cand) not in used_m_ids:
-                    match = cand
-
-            if match:
-                used_m_ids.add(id(match))
-
+        for (idx, path), match in zip(all_files, matches):
             id_to_data[idx] = (
                 path,
-                match or {"title": "", "summary": "", "filename": fname},
+                match or {"title": "", "summary": "", "filename": path.name},
             )
 
         target_book = next(
@@ -200,8 +160,9 @@ def reorder_chapters_in_project(active: Path, payload: dict) -> None:
                 raise ValueError(
                     f"Chapter ID {cid} not found in project. Available: {list(id_to_data.keys())}"
                 )
+        listed_ids = set(final_ids)
         for cid in existing_ids:
-            if cid not in final_ids:
+            if cid not in listed_ids:
                 final_ids.append(cid)
 
         target_dir = active / "books" / book_id / "chapters"
@@ -261,6 +222,10 @@ def reorder_chapters_in_project(active: Path, payload: dict) -> None:
                     final_p.unlink()
                 temp_p.rename(final_p)
 
+        index = get_chapter_index(active)
+        for directory in {target_dir, *(path.parent for path, _ in triplets)}:
+            index.refresh_directory(directory)
+
         target_book["chapters"] = new_chapters_metadata
 
     else:
@@ -273,65 +238,37 @@ def reorder_chapters_in_project(active: Path, payload: dict) -> None:
 
         files = _scan_chapter_files()
         all_ids = [item[0] for item in files]
+        known_ids = set(all_ids)
 
         for cid in chapter_ids:
-            if cid not in all_ids:
+            if cid not in known_ids:
                 raise ValueError(
                     f"Chapter ID {cid} not found. Available chapter IDs: {all_ids}."
                 )
 
-        triplets = []
-        used_metadata_ids = set()
-
-        for i, (idx, path) in enumerate(files):
-            fname = path.name
-            match_data = next(
-                (
-                    chapter
-                    for chapter in chapters_data
-                    if chapter.get("filename") == fname
-                    and id(chapter) not in used_metadata_ids
-                ),
-                None,
-            )
+        matches = match_chapter_entries(
+            chapters_data, [path.name for _, path in files], fallback=FALLBACK_ANY
+        )
+        triplets = [
+            (idx, path, match or {"title": "", "summary": "", "filename": path.name})
+            for (idx, path), match in zip(files, matches)
+        ]
 
-            if not match_data and i < len(chapters_data):
-                candidate = chapters_data[i]
-                if id(candidate) not in used_metadata_ids:
-                    if (
-                        not candidate.get("filename")
-                        or candidate.get("filename") == fname
-                    ):
-                        match_data = candidate
-
-            if not match_data and i < len(chapters_data):
-                candidate = chapters_data[i]
-                if id(candidate) not in used_metadata_ids:
-                    match_data = candidate
-
-            if match_data:
-                used_metadata_ids.add(id(match_data))
-
-            triplets.append(
-                (
-                    idx,
-                    path,
-                    match_data or {"title": "", "summary": "", "filename": fname},
-                )
+        requested_pos = {}
+        for pos, cid in enumerate(chapter_ids):
+            requested_pos.setdefault(cid, pos)
+        reordered_triplets = [
+            triplets[i]
+            for i in sorted(
+                range(len(triplets)),
+                key=lambda i: requested_pos.get(triplets[i][0], len(chapter_ids) + i),
             )
-
-        reordered_triplets = sorted(
-            triplets,
-            key=lambda item: (
-                chapter_ids.index(item[0])
-                if item[0] in chapter_ids
-                else len(chapter_ids) + files.index((item[0], item[1]))
-            ),
-        )
+        ]
 
         reordered_chapters = [item[2] for item in reordered_triplets]
+        placed = {id(item[2]) for item in reordered_triplets}
         for chapter in chapters_data:
-            if not any(chapter is item[2] for item in reordered_triplets):
+            if id(chapter) not in placed:
                 reordered_chapters.append(chapter)
 
         chapters_dir = active / "chapters"
@@ -353,12 +290,14 @@ def reorder_chapters_in_project(active: Path, payload: dict) -> None:
         for temp_p, new_p in final_renames:
             if temp_p.exists():
                 temp_p.rename(new_p)
+        get_chapter_index(active).refresh_directory(chapters_dir)
 
         story["chapters"] = reordered_chapters
 
     save_story_config(story_path, story)
 
 
+@serialized_write(scope="active")
 def reorder_books_in_project(active: Path, payload: dict) -> None:
     book_ids = payload.get("book_ids", [])
     if not isinstance(book_ids, list):
@@ -8,10 +8,11 @@
 
 from __future__ import annotations
 
-import base64
 from typing import Any
 
+from augmentedquill.services.llm.llm_image_prep import prepare_message_images
 from augmentedquill.services.projects.projects import get_active_project_dir
+from augmentedquill.utils.storage_io import run_bulk_io
 
 
 def normalize_chat_messages(val: Any) -> list[dict]:
@@ -44,7 +45,7 @@ def normalize_chat_messages(val: Any) -> list[dict]:
     return out
 
 
-async def inject_project_images(messages: list[dict]):
+async def inject_project_images(messages: list[dict], model: dict | None = None):
     if not messages:
         return
 
@@ -60,40 +61,8 @@ async def inject_project_images(messages: list[dict]):
     if not active:
         return
 
-    images_dir = active / "images"
-    if not images_dir.exists():
-        return
-
-    found_images = []
-    allowed = {".png", ".jpg", ".jpeg", ".gif", ".webp"}
-
-    for image_file in images_dir.iterdir():
-        if image_file.is_file() and image_file.suffix.lower() in allowed:
-            if image_file.name in content:
-                found_images.append(image_file)
-
-    if not found_images:
-        return
-
-    new_content = [{"type": "text", "text": content}]
-
-    for path in found_images:
-        try:
-            mime = "image/png"
-            if path.suffix.lower() in [".jpg", ".jpeg"]:
-                mime = "image/jpeg"
-            elif path.suffix.lower() == ".webp":
-                mime = "image/webp"
-            elif path.suffix.lower() == ".gif":
-                mime = "image/gif"
-
-            with open(path, "rb") as file_handle:
-                b64 = base64.b64encode(file_handle.read()).decode("utf-8")
-
-            new_content.append(
-                {"type": "image_url", "image_url": {"url": f"data:{mime};base64,{b64}"}}
-            )
-        except Exception:
-            pass
-
-    last_msg["content"] = new_content
+    new_content = await run_bulk_io(
+        prepare_message_images, active / "images", content, model
+    )
+    if new_content:
+        last_msg["content"] = new_content
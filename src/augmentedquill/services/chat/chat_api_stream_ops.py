@@ -95,9 +95,21 @@ def ensure_system_message_if_missing(
     model_type: str,
     machine: dict,
     selected_name: str | None,
+    stable_layout: bool = False,
 ) -> None:
-    has_system = any(msg.get("role") == "system" for msg in req_messages)
-    if has_system:
+    """Prepend the model type's system message unless one is present.
+
+    With stable_layout, the first system message is also moved to the front
+    so the prompt starts with the same text on every request. Later system
+    messages stay where they are.
+    """
+    first_system = next(
+        (i for i, msg in enumerate(req_messages) if msg.get("role") == "system"),
+        None,
+    )
+    if first_system is not None:
+        if stable_layout and first_system > 0:
+            req_messages.insert(0, req_messages.pop(first_system))
         return
 
     sys_msg_key = "chat_llm"
@@ -14,6 +14,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List
 
+from augmentedquill.utils.storage_io import serialized_write
+
 
 def _now_iso() -> str:
     return datetime.now().isoformat()
@@ -63,6 +65,7 @@ def load_chat(project_path: Path, chat_id: str) -> Dict | None:
         return None
 
 
+@serialized_write(scope="project_path")
 def save_chat(project_path: Path, chat_id: str, chat_data: Dict) -> None:
     chats_dir = get_chats_dir(project_path)
     _ensure_dir(chats_dir)
@@ -73,6 +76,7 @@ def save_chat(project_path: Path, chat_id: str, chat_data: Dict) -> None:
     chat_file.write_text(json.dumps(chat_data, indent=2), encoding="utf-8")
 
 
+@serialized_write(scope="project_path")
 def delete_chat(project_path: Path, chat_id: str) -> bool:
     chat_file = get_chats_dir(project_path) / f"{chat_id}.json"
     if not chat_file.exists():
@@ -81,6 +85,7 @@ def delete_chat(project_path: Path, chat_id: str) -> bool:
     return True
 
 
+@serialized_write(scope="project_path")
 def delete_all_chats(project_path: Path) -> None:
     chats_dir = get_chats_dir(project_path)
     if chats_dir.exists():
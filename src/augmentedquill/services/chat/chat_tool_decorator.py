@@ -25,6 +25,14 @@ Usage:
     @chat_tool(description="Does something useful")
     async def my_tool(params: MyToolParams, payload: dict, mutations: dict):
         return {"result": params.name}
+
+Tools that read project state may also declare a ``ctx: ProjectContext``
+parameter to share the request-scoped project data of a tool batch.
+
+Tools that change nothing pass ``read_only=True``; the dispatcher may run
+them concurrently. Such a tool must do its file reads through run_metadata_io,
+or the calls only take turns on the event loop. All other tools are treated
+as mutating.
 """
 
 from __future__ import annotations
@@ -36,6 +44,8 @@ from typing import Any, get_args, get_origin
 
 from pydantic import BaseModel, ValidationError
 
+from augmentedquill.services.projects.project_context import ProjectContext
+
 # Global registry of all chat tools
 _TOOL_REGISTRY: dict[str, dict[str, Any]] = {}
 
@@ -58,6 +68,7 @@ def _tool_error(name: str, call_id: str, message: str) -> dict:
 def chat_tool(
     description: str,
     name: str | None = None,
+    read_only: bool = False,
 ) -> Callable:
     """
     Decorator for chat tools with automatic schema generation from Pydantic models.
@@ -65,11 +76,13 @@ def chat_tool(
     Args:
         description: Description of what the tool does (shown to LLM)
         name: Optional explicit tool name (defaults to function name)
+        read_only: The tool changes no project state and may run concurrently
 
     The decorated function should have signature:
         async def tool_fn(params: ParamsModel, payload: dict, mutations: dict) -> dict
 
     Where ParamsModel is a Pydantic BaseModel subclass defining the parameters.
+    An optional ``ctx`` parameter receives the request's ProjectContext.
     """
 
     def decorator(func: Callable) -> Callable:
@@ -85,6 +98,7 @@ def chat_tool(
             )
 
         params_type = params_annotation.annotation
+        wants_ctx = "ctx" in sig.parameters
 
         # Check if it's a Pydantic model
         if params_type is inspect.Parameter.empty:
@@ -126,7 +140,11 @@ def chat_tool(
 
         # Create wrapper that validates and calls the original function
         async def wrapper(
-            args_obj: dict, call_id: str, payload: dict, mutations: dict
+            args_obj: dict,
+            call_id: str,
+            payload: dict,
+            mutations: dict,
+            ctx: ProjectContext | None = None,
         ) -> dict:
             try:
                 # Validate and parse arguments using Pydantic
@@ -144,7 +162,12 @@ def chat_tool(
 
             try:
                 # Call the original function with validated params
-                result = await func(params, payload, mutations)
+                if wants_ctx:
+                    result = await func(
+                        params, payload, mutations, ctx=ctx or ProjectContext()
+                    )
+                else:
+                    result = await func(params, payload, mutations)
                 # Wrap the result in tool message format
                 return _tool_message(tool_name, call_id, result)
             except Exception as e:
@@ -155,6 +178,7 @@ def chat_tool(
             "function": wrapper,
             "schema": tool_def,
             "params_model": params_type,
+            "read_only": read_only,
         }
 
         return wrapper
@@ -173,6 +197,12 @@ def get_tool_function(name: str) -> Callable | None:
     return info["function"] if info else None
 
 
+def is_read_only_tool(name: str) -> bool:
+    """Whether a registered tool declared read_only; unknown tools are not."""
+    info = _TOOL_REGISTRY.get(name)
+    return bool(info and info["read_only"])
+
+
 def get_all_tool_names() -> list[str]:
     """Return list of all registered tool names."""
     return list(_TOOL_REGISTRY.keys())
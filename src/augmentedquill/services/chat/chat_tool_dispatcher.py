@@ -11,32 +11,63 @@ Central dispatcher for delegating LLM tool calls to their respective domain hand
 
 All tools are registered via the @chat_tool decorator and dispatched through
 the decorator-based tool registry.
+
+A batch of calls runs in order, except that consecutive read-only calls run
+concurrently, at most AUGQ_TOOL_CONCURRENCY (default 4) at a time. A mutating
+call waits for the reads before it and holds its project's lock, so mutating
+calls of concurrent requests on one project never overlap.
 """
 
 from __future__ import annotations
 
+import asyncio
 import json as _json
+import os
+import weakref
+from typing import Any, Dict, List, Tuple
 
 from fastapi import HTTPException
 
-from augmentedquill.services.chat.chat_tool_decorator import get_tool_function
+from augmentedquill.services.chat.chat_tool_decorator import (
+    get_tool_function,
+    is_read_only_tool,
+)
 from augmentedquill.services.chat.chat_tools.common import tool_error
+from augmentedquill.services.projects.project_context import ProjectContext
+from augmentedquill.utils.storage_io import run_metadata_io
 
 
 async def exec_chat_tool(
-    name: str, args_obj: dict, call_id: str, payload: dict, mutations: dict
+    name: str,
+    args_obj: dict,
+    call_id: str,
+    payload: dict,
+    mutations: dict,
+    ctx: ProjectContext | None = None,
 ) -> dict:
     """
     Dispatch a single tool call to its handler.
 
-    All tools are registered via the @chat_tool decorator.
+    All tools are registered via the @chat_tool decorator. Pass the batch's
+    ProjectContext as ctx; without one, the call gets its own context that is
+    flushed before returning.
     """
     decorator_tool = get_tool_function(name)
     if decorator_tool is None:
         return tool_error(name, call_id, f"Unknown tool: {name}")
 
+    if ctx is None:
+        with ProjectContext() as own_ctx:
+            return await exec_chat_tool(
+                name, args_obj, call_id, payload, mutations, ctx=own_ctx
+            )
+
+    # Track this call's mutation flag separately so the context only drops
+    # its derived data when this tool changed something.
+    changed_before = bool(mutations.get("story_changed"))
+    mutations["story_changed"] = False
     try:
-        return await decorator_tool(args_obj, call_id, payload, mutations)
+        return await decorator_tool(args_obj, call_id, payload, mutations, ctx=ctx)
     except HTTPException as e:
         return tool_error(name, call_id, f"Tool failed: {e.detail}")
     except Exception as e:
@@ -48,3 +79,70 @@ async def exec_chat_tool(
                 {"error": f"Tool failed with unexpected error: {e}"}
             ),
         }
+    finally:
+        changed = bool(mutations.get("story_changed"))
+        if changed:
+            ctx.invalidate()
+        mutations["story_changed"] = changed_before or changed
+
+
+_project_locks: (
+    "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Lock]]"
+) = weakref.WeakKeyDictionary()
+
+
+def _env_int(name: str, default: int, minimum: int = 0) -> int:
+    try:
+        return max(minimum, int(os.getenv(name, default)))
+    except ValueError:
+        return default
+
+
+async def _project_lock(ctx: ProjectContext) -> asyncio.Lock:
+    active = await run_metadata_io(ctx.load_active_dir)
+    per_loop = _project_locks.setdefault(asyncio.get_running_loop(), {})
+    return per_loop.setdefault(str(active), asyncio.Lock())
+
+
+async def exec_chat_tools(
+    calls: List[Tuple[str, dict, str]],
+    payload: dict,
+    mutations: dict,
+    ctx: ProjectContext,
+) -> List[dict]:
+    """Run (name, args, call_id) tool calls; messages come back in call order."""
+    results: List[Any] = [None] * len(calls)
+    limit = asyncio.Semaphore(_env_int("AUGQ_TOOL_CONCURRENCY", 4, 1))
+    reads: List[asyncio.Future] = []
+
+    async def read(index: int, name: str, args_obj: dict, call_id: str) -> None:
+        # Each concurrent call tracks its own flags; they are merged after.
+        own = {"story_changed": False}
+        async with limit:
+            results[index] = await exec_chat_tool(
+                name, args_obj, call_id, payload, own, ctx=ctx
+            )
+        for key, value in own.items():
+            if value:
+                mutations[key] = value
+
+    try:
+        for index, (name, args_obj, call_id) in enumerate(calls):
+            if is_read_only_tool(name):
+                reads.append(
+                    asyncio.ensure_future(read(index, name, args_obj, call_id))
+                )
+                continue
+            if reads:
+                await asyncio.gather(*reads)
+                reads = []
+            async with await _project_lock(ctx):
+                results[index] = await exec_chat_tool(
+                    name, args_obj, call_id, payload, mutations, ctx=ctx
+                )
+        if reads:
+            await asyncio.gather(*reads)
+    finally:
+        for task in reads:
+            task.cancel()
+    return results
@@ -7,46 +7,32 @@
 # Purpose: Defines the chapter tools unit so this responsibility stays isolated, testable, and easy to evolve.
 
 import json as _json
+from pathlib import Path
 
 from pydantic import BaseModel, Field
 
-from augmentedquill.core.config import load_story_config
+from augmentedquill.core.config import load_story_config, save_story_config
 from augmentedquill.services.chapters.chapter_helpers import (
     _chapter_by_id_or_404,
     _get_chapter_metadata_entry,
-    _scan_chapter_files,
 )
 from augmentedquill.services.chat.chat_tool_decorator import chat_tool
-from augmentedquill.services.projects.project_helpers import (
-    _chapter_content_slice,
-    _project_overview,
-)
+from augmentedquill.services.projects.project_context import ProjectContext
+from augmentedquill.services.projects.project_helpers import _chapter_content_slice
 from augmentedquill.services.story.story_generation_ops import (
     continue_chapter_from_summary,
     generate_chapter_summary,
     write_chapter_from_summary,
 )
+from augmentedquill.utils.storage_io import run_metadata_io, serialized_write
 from augmentedquill.services.projects.projects import (
     create_new_chapter as _create_new_chapter,
-    get_active_project_dir,
     update_chapter_metadata as _update_chapter_metadata,
     write_chapter_content as _write_chapter_content,
     write_chapter_summary as _write_chapter_summary,
     write_chapter_title,
 )
 
-
-def _overview_chapters():
-    ov = _project_overview()
-    chapters = []
-    if ov.get("project_type") == "series":
-        for book in ov.get("books", []):
-            chapters.extend(book.get("chapters", []))
-    else:
-        chapters = ov.get("chapters", [])
-    return ov, chapters
-
-
 # ============================================================================
 # Tool Parameter Models
 # ============================================================================
@@ -135,27 +121,58 @@ class DeleteChapterParams(BaseModel):
     confirm: bool = Field(False, description="Set to true to confirm deletion")
 
 
+@serialized_write(scope="active")
+def _delete_chapter(active: Path, path: Path, chap_id: int) -> None:
+    if path.exists():
+        path.unlink()
+
+    story_path = active / "story.json"
+    story = load_story_config(story_path) or {}
+    chapters = story.get("chapters", [])
+    if chap_id < len(chapters):
+        idx_to_remove = chap_id - 1
+        if 0 <= idx_to_remove < len(chapters):
+            chapters.pop(idx_to_remove)
+            story["chapters"] = chapters
+            save_story_config(story_path, story)
+
+
+def _chapter_metadata(ctx: ProjectContext, chap_id: int) -> dict:
+    """Metadata of a chapter; called through run_metadata_io."""
+    _, path, _ = _chapter_by_id_or_404(chap_id)
+    meta = _get_chapter_metadata_entry(ctx.story, chap_id, path, ctx.chapter_files())
+    meta = meta or {}
+    return {
+        "title": meta.get("title", "") or path.name,
+        "summary": meta.get("summary", ""),
+        "notes": meta.get("notes", ""),
+        "conflicts": meta.get("conflicts") or [],
+    }
+
+
+def _overview_chapter(ctx: ProjectContext, chap_id: int) -> dict:
+    """Overview entry of a chapter; called through run_metadata_io."""
+    _chapter_by_id_or_404(chap_id)
+    chapters = ctx.overview_chapters()
+    return next((c for c in chapters if c["id"] == chap_id), None) or {}
+
+
 # ============================================================================
 # Tool Implementations
 # ============================================================================
 
 
 @chat_tool(
-    description="Get metadata for a specific chapter including title, summary, notes, and conflicts."
+    description="Get metadata for a specific chapter including title, summary, notes, and conflicts.",
+    read_only=True,
 )
 async def get_chapter_metadata(
-    params: GetChapterMetadataParams, payload: dict, mutations: dict
+    params: GetChapterMetadataParams,
+    payload: dict,
+    mutations: dict,
+    ctx: ProjectContext,
 ):
-    active = get_active_project_dir()
-    story = load_story_config((active / "story.json") if active else None) or {}
-    _, path, _ = _chapter_by_id_or_404(params.chap_id)
-    meta = _get_chapter_metadata_entry(story, params.chap_id, path) or {}
-    return {
-        "title": meta.get("title", "") or path.name,
-        "summary": meta.get("summary", ""),
-        "notes": meta.get("notes", ""),
-        "conflicts": meta.get("conflicts") or [],
-    }
+    return await run_metadata_io(_chapter_metadata, ctx, params.chap_id)
 
 
 @chat_tool(
@@ -171,7 +188,8 @@ async def update_chapter_metadata(
         except Exception:
             conflicts = None
 
-    _update_chapter_metadata(
+    await run_metadata_io(
+        _update_chapter_metadata,
         params.chap_id,
         title=params.title,
         summary=params.summary,
@@ -184,23 +202,17 @@ async def update_chapter_metadata(
 
 
 @chat_tool(
-    description="Get summaries for all chapters in the project (across all books if series)."
+    description="Get summaries for all chapters in the project (across all books if series).",
+    read_only=True,
 )
 async def get_chapter_summaries(
-    params: GetChapterSummariesParams, payload: dict, mutations: dict
+    params: GetChapterSummariesParams,
+    payload: dict,
+    mutations: dict,
+    ctx: ProjectContext,
 ):
-    ov = _project_overview()
-    p_type = ov.get("project_type", "novel")
-
-    all_chapters = []
-    if p_type == "series":
-        for book in ov.get("books", []):
-            all_chapters.extend(book.get("chapters", []))
-    else:
-        all_chapters = ov.get("chapters", [])
-
     summaries = []
-    for chapter in all_chapters:
+    for chapter in await run_metadata_io(ctx.overview_chapters):
         if isinstance(chapter, dict):
             chap_id = chapter.get("id")
             title = chapter.get("title", "").strip() or f"Chapter {chap_id}"
@@ -212,7 +224,10 @@ async def get_chapter_summaries(
     return {"chapter_summaries": summaries}
 
 
-@chat_tool(description="Get content from a specific chapter with pagination support.")
+@chat_tool(
+    description="Get content from a specific chapter with pagination support.",
+    read_only=True,
+)
 async def get_chapter_content(
     params: GetChapterContentParams, payload: dict, mutations: dict
 ):
@@ -226,15 +241,16 @@ async def get_chapter_content(
 
     start = max(0, params.start)
     max_chars = max(1, min(8000, params.max_chars))
-    data = _chapter_content_slice(chap_id, start=start, max_chars=max_chars)
-    return data
+    return await run_metadata_io(
+        _chapter_content_slice, chap_id, start=start, max_chars=max_chars
+    )
 
 
 @chat_tool(description="Write content to a specific chapter.")
 async def write_chapter_content(
     params: WriteChapterContentParams, payload: dict, mutations: dict
 ):
-    _write_chapter_content(params.chap_id, params.content)
+    await run_metadata_io(_write_chapter_content, params.chap_id, params.content)
     mutations["story_changed"] = True
     return {"message": f"Content written to chapter {params.chap_id} successfully"}
 
@@ -243,7 +259,7 @@ async def write_chapter_content(
 async def write_chapter_summary(
     params: WriteChapterSummaryParams, payload: dict, mutations: dict
 ):
-    _write_chapter_summary(params.chap_id, params.summary)
+    await run_metadata_io(_write_chapter_summary, params.chap_id, params.summary)
     mutations["story_changed"] = True
     return {"message": f"Summary written to chapter {params.chap_id} successfully"}
 
@@ -276,14 +292,16 @@ async def continue_chapter(
 
 @chat_tool(description="Create a new chapter with an optional title and book_id.")
 async def create_new_chapter(
-    params: CreateNewChapterParams, payload: dict, mutations: dict
+    params: CreateNewChapterParams,
+    payload: dict,
+    mutations: dict,
+    ctx: ProjectContext,
 ):
-    active = get_active_project_dir()
-    if not active:
+    if not await run_metadata_io(ctx.load_active_dir):
         return {"error": "No active project"}
 
     title = params.title.strip()
-    chap_id = _create_new_chapter(title, book_id=params.book_id)
+    chap_id = await run_metadata_io(_create_new_chapter, title, book_id=params.book_id)
     mutations["story_changed"] = True
     return {
         "chap_id": chap_id,
@@ -292,15 +310,15 @@ async def create_new_chapter(
     }
 
 
-@chat_tool(description="Get the heading (title) of a specific chapter.")
+@chat_tool(description="Get the heading (title) of a specific chapter.", read_only=True)
 async def get_chapter_heading(
-    params: GetChapterHeadingParams, payload: dict, mutations: dict
+    params: GetChapterHeadingParams,
+    payload: dict,
+    mutations: dict,
+    ctx: ProjectContext,
 ):
-    _chapter_by_id_or_404(params.chap_id)
-    _, chapters = _overview_chapters()
-    chapter = next((c for c in chapters if c["id"] == params.chap_id), None)
-    heading = chapter.get("title", "") if chapter else ""
-    return {"heading": heading}
+    chapter = await run_metadata_io(_overview_chapter, ctx, params.chap_id)
+    return {"heading": chapter.get("title", "")}
 
 
 @chat_tool(description="Write the heading (title) of a specific chapter.")
@@ -308,7 +326,7 @@ async def write_chapter_heading(
     params: WriteChapterHeadingParams, payload: dict, mutations: dict
 ):
     heading = params.heading.strip()
-    write_chapter_title(params.chap_id, heading)
+    await run_metadata_io(write_chapter_title, params.chap_id, heading)
     mutations["story_changed"] = True
     return {
         "heading": heading,
@@ -316,47 +334,35 @@ async def write_chapter_heading(
     }
 
 
-@chat_tool(description="Get the summary of a specific chapter.")
+@chat_tool(description="Get the summary of a specific chapter.", read_only=True)
 async def get_chapter_summary(
-    params: GetChapterSummaryParams, payload: dict, mutations: dict
+    params: GetChapterSummaryParams,
+    payload: dict,
+    mutations: dict,
+    ctx: ProjectContext,
 ):
-    _chapter_by_id_or_404(params.chap_id)
-    _, chapters = _overview_chapters()
-    chapter = next((c for c in chapters if c["id"] == params.chap_id), None)
-    summary = chapter.get("summary", "") if chapter else ""
-    return {"summary": summary}
+    chapter = await run_metadata_io(_overview_chapter, ctx, params.chap_id)
+    return {"summary": chapter.get("summary", "")}
 
 
 @chat_tool(
     description="Delete a specific chapter. Requires confirmation by setting confirm=true."
 )
-async def delete_chapter(params: DeleteChapterParams, payload: dict, mutations: dict):
+async def delete_chapter(
+    params: DeleteChapterParams, payload: dict, mutations: dict, ctx: ProjectContext
+):
     if not params.confirm:
         return {
             "status": "confirmation_required",
             "message": "This operation deletes the chapter. Call again with confirm=true to proceed.",
         }
 
-    active = get_active_project_dir()
-    files = _scan_chapter_files()
+    files = await run_metadata_io(ctx.chapter_files)
     match = next(((idx, p) for (idx, p) in files if idx == params.chap_id), None)
     if not match:
         return {"error": "Chapter not found"}
 
-    _, path = match
-    if path.exists():
-        path.unlink()
-
-    story_path = active / "story.json"
-    story = load_story_config(story_path) or {}
-    chapters = story.get("chapters", [])
-    if params.chap_id < len(chapters):
-        idx_to_remove = params.chap_id - 1
-        if 0 <= idx_to_remove < len(chapters):
-            chapters.pop(idx_to_remove)
-            story["chapters"] = chapters
-            with open(story_path, "w", encoding="utf-8") as f:
-                _json.dump(story, f, indent=2, ensure_ascii=False)
-
+    active = await run_metadata_io(ctx.load_active_dir)
+    await run_metadata_io(_delete_chapter, active, match[1], params.chap_id)
     mutations["story_changed"] = True
     return {"ok": True, "message": "Chapter deleted"}
@@ -6,13 +6,16 @@
 # (at your option) any later version.
 # Purpose: Defines the image tools unit so this responsibility stays isolated, testable, and easy to evolve.
 
-import base64
 import uuid
 from pathlib import Path
 
 from pydantic import BaseModel, Field
 
 from augmentedquill.services.chat.chat_tool_decorator import chat_tool
+from augmentedquill.services.llm.llm_image_prep import image_data_url, image_settings
+from augmentedquill.services.llm.llm_prompt_cache import find_model_entry
+from augmentedquill.services.projects.project_context import ProjectContext
+from augmentedquill.utils.storage_io import run_bulk_io, run_metadata_io
 
 # Pydantic models for tool parameters
 
@@ -47,7 +50,9 @@ class SetImageMetadataParams(BaseModel):
 # Helper function for generating image descriptions (not a tool itself)
 
 
-async def _tool_generate_image_description(filename: str, payload: dict) -> str:
+async def _tool_generate_image_description(
+    filename: str, payload: dict, ctx: ProjectContext
+) -> str:
     from augmentedquill.services.llm import llm
     from augmentedquill.utils.image_helpers import get_images_dir, update_image_metadata
 
@@ -72,17 +77,8 @@ async def _tool_generate_image_description(filename: str, payload: dict) -> str:
             model_id = payload.get("model") or payload.get("model_name") or "dummy"
             timeout_s = int(payload.get("timeout_s") or 60)
 
-        mime_type = "image/png"
-        s = img_path.suffix.lower()
-        if s in [".jpg", ".jpeg"]:
-            mime_type = "image/jpeg"
-        elif s == ".webp":
-            mime_type = "image/webp"
-        elif s == ".gif":
-            mime_type = "image/gif"
-
-        with open(img_path, "rb") as f:
-            base64_image = base64.b64encode(f.read()).decode("utf-8")
+        max_edge, image_format = image_settings(find_model_entry(base_url, model_id))
+        image_url = await run_bulk_io(image_data_url, img_path, max_edge, image_format)
 
         messages = [
             {
@@ -95,7 +91,7 @@ async def _tool_generate_image_description(filename: str, payload: dict) -> str:
                     {"type": "text", "text": "Describe this image."},
                     {
                         "type": "image_url",
-                        "image_url": {"url": f"data:{mime_type};base64,{base64_image}"},
+                        "image_url": {"url": image_url},
                     },
                 ],
             },
@@ -107,11 +103,14 @@ async def _tool_generate_image_description(filename: str, payload: dict) -> str:
             api_key=api_key,
             model_id=model_id,
             timeout_s=timeout_s,
+            cacheable=True,
+            priority="background",
         )
 
         content = data.get("content")
         if content:
-            update_image_metadata(filename, description=content)
+            await run_metadata_io(update_image_metadata, filename, description=content)
+            ctx.invalidate()
             return content
         return "Error: Failed to generate description."
 
@@ -123,12 +122,13 @@ async def _tool_generate_image_description(filename: str, payload: dict) -> str:
 
 
 @chat_tool(
-    description="List all images in the project with their filenames, descriptions, titles, and placeholder status."
+    description="List all images in the project with their filenames, descriptions, titles, and placeholder status.",
+    read_only=True,
 )
-async def list_images(params: ListImagesParams, payload: dict, mutations: dict):
-    from augmentedquill.utils.image_helpers import get_project_images
-
-    imgs = get_project_images()
+async def list_images(
+    params: ListImagesParams, payload: dict, mutations: dict, ctx: ProjectContext
+):
+    imgs = await run_metadata_io(ctx.images)
     simple = [
         {
             "filename": i["filename"],
@@ -145,9 +145,12 @@ async def list_images(params: ListImagesParams, payload: dict, mutations: dict):
     description="Generate a detailed description for an existing image using the EDIT LLM's vision capabilities."
 )
 async def generate_image_description(
-    params: GenerateImageDescriptionParams, payload: dict, mutations: dict
+    params: GenerateImageDescriptionParams,
+    payload: dict,
+    mutations: dict,
+    ctx: ProjectContext,
 ):
-    desc = await _tool_generate_image_description(params.filename, payload)
+    desc = await _tool_generate_image_description(params.filename, payload, ctx)
     return {"description": desc}
 
 
@@ -155,12 +158,21 @@ async def generate_image_description(
     description="Create a new image placeholder with a description. Useful for noting images to be created later."
 )
 async def create_image_placeholder(
-    params: CreateImagePlaceholderParams, payload: dict, mutations: dict
+    params: CreateImagePlaceholderParams,
+    payload: dict,
+    mutations: dict,
+    ctx: ProjectContext,
 ):
     from augmentedquill.utils.image_helpers import update_image_metadata
 
     filename = f"placeholder_{uuid.uuid4().hex[:8]}.png"
-    update_image_metadata(filename, description=params.description, title=params.title)
+    await run_metadata_io(
+        update_image_metadata,
+        filename,
+        description=params.description,
+        title=params.title,
+    )
+    ctx.invalidate()
 
     return {
         "filename": filename,
@@ -173,11 +185,18 @@ async def create_image_placeholder(
     description="Update the title and/or description metadata for an existing image. Provide only the fields you want to change."
 )
 async def set_image_metadata(
-    params: SetImageMetadataParams, payload: dict, mutations: dict
+    params: SetImageMetadataParams,
+    payload: dict,
+    mutations: dict,
+    ctx: ProjectContext,
 ):
     from augmentedquill.utils.image_helpers import update_image_metadata
 
-    update_image_metadata(
-        params.filename, description=params.description, title=params.title
+    await run_metadata_io(
+        update_image_metadata,
+        params.filename,
+        description=params.description,
+        title=params.title,
     )
+    ctx.invalidate()
     return {"ok": True}
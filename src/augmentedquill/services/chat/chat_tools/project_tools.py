@@ -6,17 +6,17 @@
 # (at your option) any later version.
 # Purpose: Defines the project tools unit so this responsibility stays isolated, testable, and easy to evolve.
 
-import json as _json
+from pathlib import Path
 
 from pydantic import BaseModel, Field
 
-from augmentedquill.core.config import load_story_config
+from augmentedquill.core.config import load_story_config, save_story_config
 from augmentedquill.services.chat.chat_tool_decorator import chat_tool
-from augmentedquill.services.projects.project_helpers import _project_overview
+from augmentedquill.services.projects.project_context import ProjectContext
+from augmentedquill.utils.storage_io import run_metadata_io, serialized_write
 from augmentedquill.services.projects.projects import (
     create_project,
     delete_project,
-    get_active_project_dir,
     list_projects,
 )
 
@@ -74,16 +74,33 @@ class ChangeProjectTypeParams(BaseModel):
     new_type: str = Field(..., description="The new project type: 'novel' or 'series'")
 
 
+@serialized_write(scope=lambda story_path, *args, **kwargs: story_path.parent)
+def _delete_book(story_path: Path, book_id: str) -> bool:
+    """Remove a book from story.json; False if there is no such book."""
+    story = load_story_config(story_path) or {}
+    books = story.get("books", [])
+    new_books = [b for b in books if str(b.get("id")) != str(book_id)]
+    if len(new_books) == len(books):
+        return False
+    story["books"] = new_books
+    save_story_config(story_path, story)
+    return True
+
+
 # Tool implementations with co-located schemas
 
 
 @chat_tool(
-    description="Get project title, type, and a structured list of all books (for series) or chapters (for novels). Use this to find the correct NUMERIC chapter IDs and UUID book IDs. Never assume an ID based on a title."
+    description="Get project title, type, and a structured list of all books (for series) or chapters (for novels). Use this to find the correct NUMERIC chapter IDs and UUID book IDs. Never assume an ID based on a title.",
+    read_only=True,
 )
 async def get_project_overview(
-    params: GetProjectOverviewParams, payload: dict, mutations: dict
+    params: GetProjectOverviewParams,
+    payload: dict,
+    mutations: dict,
+    ctx: ProjectContext,
 ):
-    data = _project_overview()
+    data = await run_metadata_io(ctx.overview)
     # Return data directly - decorator handles wrapping in tool message format
     return data
 
@@ -93,20 +110,23 @@ async def get_project_overview(
     description="Create a new project with the specified name and type (novel or series).",
 )
 async def create_project_tool(
-    params: CreateProjectParams, payload: dict, mutations: dict
+    params: CreateProjectParams, payload: dict, mutations: dict, ctx: ProjectContext
 ):
-    ok, msg = create_project(params.name, params.project_type)
+    await run_metadata_io(ctx.flush)
+    ok, msg = await run_metadata_io(create_project, params.name, params.project_type)
+    await run_metadata_io(ctx.project_changed)
     return {"ok": ok, "message": msg}
 
 
 @chat_tool(
     name="list_projects",
     description="List all available projects with their names and titles.",
+    read_only=True,
 )
 async def list_projects_tool(
     params: ListProjectsParams, payload: dict, mutations: dict
 ):
-    projs = list_projects()
+    projs = await run_metadata_io(list_projects)
     simple = [{"name": p["name"], "title": p["title"]} for p in projs]
     return {"projects": simple}
 
@@ -116,43 +136,39 @@ async def list_projects_tool(
     description="Delete a project permanently. Requires confirmation with confirm=true.",
 )
 async def delete_project_tool(
-    params: DeleteProjectParams, payload: dict, mutations: dict
+    params: DeleteProjectParams, payload: dict, mutations: dict, ctx: ProjectContext
 ):
     if not params.confirm:
         return {
             "status": "confirmation_required",
             "message": "This operation deletes the project. Call again with confirm=true to proceed.",
         }
-    ok, msg = delete_project(params.name)
+    # Write pending changes first so they cannot recreate a deleted project.
+    await run_metadata_io(ctx.flush)
+    ok, msg = await run_metadata_io(delete_project, params.name)
+    await run_metadata_io(ctx.project_changed)
     return {"ok": ok, "message": msg}
 
 
 @chat_tool(
     description="Delete a book from a series project. Requires confirmation with confirm=true."
 )
-async def delete_book(params: DeleteBookParams, payload: dict, mutations: dict):
+async def delete_book(
+    params: DeleteBookParams, payload: dict, mutations: dict, ctx: ProjectContext
+):
     if not params.confirm:
         return {
             "status": "confirmation_required",
             "message": "This operation deletes the book. Call again with confirm=true to proceed.",
         }
 
-    active = get_active_project_dir()
+    active = await run_metadata_io(ctx.load_active_dir)
     if not active:
         return {"error": "No active project"}
 
-    story_path = active / "story.json"
-    story = load_story_config(story_path) or {}
-    books = story.get("books", [])
-    new_books = [b for b in books if str(b.get("id")) != str(params.book_id)]
-
-    if len(new_books) == len(books):
+    if not await run_metadata_io(_delete_book, active / "story.json", params.book_id):
         return {"error": "Book not found"}
 
-    story["books"] = new_books
-    with open(story_path, "w", encoding="utf-8") as f:
-        _json.dump(story, f, indent=2, ensure_ascii=False)
-
     mutations["story_changed"] = True
     return {"ok": True, "message": "Book deleted"}
 
@@ -163,7 +179,7 @@ async def create_new_book(params: CreateNewBookParams, payload: dict, mutations:
         create_new_book as _create_book,
     )
 
-    bid = _create_book(params.title)
+    bid = await run_metadata_io(_create_book, params.title)
     mutations["story_changed"] = True
     return {"book_id": bid, "message": "Book created"}
 
@@ -178,7 +194,7 @@ async def change_project_type(
         change_project_type as _change_type,
     )
 
-    ok, msg = _change_type(params.new_type)
+    ok, msg = await run_metadata_io(_change_type, params.new_type)
     if ok:
         mutations["story_changed"] = True
     return {"ok": ok, "message": msg}
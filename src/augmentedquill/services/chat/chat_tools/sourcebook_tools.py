@@ -16,6 +16,7 @@ from augmentedquill.services.sourcebook.sourcebook_helpers import (
     sb_search,
     sb_update,
 )
+from augmentedquill.utils.storage_io import run_metadata_io
 
 # Pydantic models for tool parameters
 
@@ -66,18 +67,21 @@ class DeleteSourcebookEntryParams(BaseModel):
 # Tool implementations with co-located schemas
 
 
-@chat_tool(description="Search the sourcebook for entries matching a query string.")
+@chat_tool(
+    description="Search the sourcebook for entries matching a query string.",
+    read_only=True,
+)
 async def search_sourcebook(
     params: SearchSourcebookParams, payload: dict, mutations: dict
 ):
-    return sb_search(params.query)
+    return await run_metadata_io(sb_search, params.query)
 
 
-@chat_tool(description="Get a specific sourcebook entry by name or ID.")
+@chat_tool(description="Get a specific sourcebook entry by name or ID.", read_only=True)
 async def get_sourcebook_entry(
     params: GetSourcebookEntryParams, payload: dict, mutations: dict
 ):
-    entry = sb_get(params.name_or_id)
+    entry = await run_metadata_io(sb_get, params.name_or_id)
     if not entry:
         return {"error": "Not found"}
     return entry
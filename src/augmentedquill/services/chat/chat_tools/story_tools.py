@@ -6,14 +6,16 @@
 # (at your option) any later version.
 # Purpose: Defines the story tools unit so this responsibility stays isolated, testable, and easy to evolve.
 
-import json as _json
+from pathlib import Path
+from typing import Any
 
 from pydantic import BaseModel, Field
 
-from augmentedquill.core.config import load_story_config
+from augmentedquill.core.config import load_story_config, save_story_config
 from augmentedquill.services.chat.chat_tool_decorator import chat_tool
+from augmentedquill.services.projects.project_context import ProjectContext
+from augmentedquill.utils.storage_io import run_metadata_io, serialized_write
 from augmentedquill.services.projects.projects import (
-    get_active_project_dir,
     read_book_content as _read_book_content,
     read_story_content as _read_story_content,
     update_book_metadata as _update_book_metadata,
@@ -113,17 +115,27 @@ class WriteStorySummaryParams(BaseModel):
     summary: str = Field(..., description="The new story summary text")
 
 
+@serialized_write(scope=lambda story_path, *args, **kwargs: story_path.parent)
+def _set_story_value(story_path: Path, key: str, value: Any) -> None:
+    story = load_story_config(story_path) or {}
+    story[key] = value
+    save_story_config(story_path, story)
+
+
 # Tool implementations with co-located schemas
 
 
 @chat_tool(
-    description="Get the overall story title, summary, notes, tags, and project type."
+    description="Get the overall story title, summary, notes, tags, and project type.",
+    read_only=True,
 )
 async def get_story_metadata(
-    params: GetStoryMetadataParams, payload: dict, mutations: dict
+    params: GetStoryMetadataParams,
+    payload: dict,
+    mutations: dict,
+    ctx: ProjectContext,
 ):
-    active = get_active_project_dir()
-    story = load_story_config((active / "story.json") if active else None) or {}
+    story = await run_metadata_io(ctx.load_story)
     return {
         "title": story.get("project_title", ""),
         "summary": story.get("story_summary", ""),
@@ -139,18 +151,24 @@ async def get_story_metadata(
 async def update_story_metadata(
     params: UpdateStoryMetadataParams, payload: dict, mutations: dict
 ):
-    _update_story_metadata(
-        title=params.title, summary=params.summary, notes=params.notes, tags=params.tags
+    await run_metadata_io(
+        _update_story_metadata,
+        title=params.title,
+        summary=params.summary,
+        notes=params.notes,
+        tags=params.tags,
     )
     mutations["story_changed"] = True
     return {"ok": True}
 
 
-@chat_tool(description="Read the story-level introduction or content file.")
+@chat_tool(
+    description="Read the story-level introduction or content file.", read_only=True
+)
 async def read_story_content(
     params: ReadStoryContentParams, payload: dict, mutations: dict
 ):
-    content = _read_story_content()
+    content = await run_metadata_io(_read_story_content)
     return {"content": content}
 
 
@@ -158,20 +176,22 @@ async def read_story_content(
 async def write_story_content(
     params: WriteStoryContentParams, payload: dict, mutations: dict
 ):
-    _write_story_content(params.content)
+    await run_metadata_io(_write_story_content, params.content)
     mutations["story_changed"] = True
     return {"ok": True}
 
 
 @chat_tool(
-    description="Get the title, summary, and notes of a specific book (only for series projects)."
+    description="Get the title, summary, and notes of a specific book (only for series projects).",
+    read_only=True,
 )
 async def get_book_metadata(
-    params: GetBookMetadataParams, payload: dict, mutations: dict
+    params: GetBookMetadataParams,
+    payload: dict,
+    mutations: dict,
+    ctx: ProjectContext,
 ):
-    active = get_active_project_dir()
-    story = load_story_config((active / "story.json") if active else None) or {}
-    books = story.get("books", [])
+    books = (await run_metadata_io(ctx.load_story)).get("books", [])
     target = next((b for b in books if b.get("id") == params.book_id), None)
     if not target:
         return {"error": f"Book ID {params.book_id} not found"}
@@ -188,18 +208,22 @@ async def get_book_metadata(
 async def update_book_metadata(
     params: UpdateBookMetadataParams, payload: dict, mutations: dict
 ):
-    _update_book_metadata(
-        params.book_id, title=params.title, summary=params.summary, notes=params.notes
+    await run_metadata_io(
+        _update_book_metadata,
+        params.book_id,
+        title=params.title,
+        summary=params.summary,
+        notes=params.notes,
     )
     mutations["story_changed"] = True
     return {"ok": True}
 
 
-@chat_tool(description="Read the content file for a specific book.")
+@chat_tool(description="Read the content file for a specific book.", read_only=True)
 async def read_book_content(
     params: ReadBookContentParams, payload: dict, mutations: dict
 ):
-    content = _read_book_content(params.book_id)
+    content = await run_metadata_io(_read_book_content, params.book_id)
     return {"content": content}
 
 
@@ -207,7 +231,7 @@ async def read_book_content(
 async def write_book_content(
     params: WriteBookContentParams, payload: dict, mutations: dict
 ):
-    _write_book_content(params.book_id, params.content)
+    await run_metadata_io(_write_book_content, params.book_id, params.content)
     mutations["story_changed"] = True
     return {"ok": True}
 
@@ -215,36 +239,35 @@ async def write_book_content(
 @chat_tool(
     name="get_story_summary",
     description="Get only the story summary (shortcut for get_story_metadata).",
+    read_only=True,
 )
 async def get_story_summary_tool(
-    params: GetStorySummaryParams, payload: dict, mutations: dict
+    params: GetStorySummaryParams,
+    payload: dict,
+    mutations: dict,
+    ctx: ProjectContext,
 ):
-    active = get_active_project_dir()
-    story = load_story_config((active / "story.json") if active else None) or {}
-    summary = story.get("story_summary", "")
+    summary = (await run_metadata_io(ctx.load_story)).get("story_summary", "")
     return {"story_summary": summary}
 
 
-@chat_tool(description="Get the list of tags for the story.")
-async def get_story_tags(params: GetStoryTagsParams, payload: dict, mutations: dict):
-    active = get_active_project_dir()
-    story = load_story_config((active / "story.json") if active else None) or {}
-    tags = story.get("tags", [])
+@chat_tool(description="Get the list of tags for the story.", read_only=True)
+async def get_story_tags(
+    params: GetStoryTagsParams, payload: dict, mutations: dict, ctx: ProjectContext
+):
+    tags = (await run_metadata_io(ctx.load_story)).get("tags", [])
     return {"tags": tags}
 
 
 @chat_tool(description="Set the tags for the story. Replaces all existing tags.")
-async def set_story_tags(params: SetStoryTagsParams, payload: dict, mutations: dict):
-    active = get_active_project_dir()
+async def set_story_tags(
+    params: SetStoryTagsParams, payload: dict, mutations: dict, ctx: ProjectContext
+):
+    active = await run_metadata_io(ctx.load_active_dir)
     if not active:
         return {"error": "No active project"}
 
-    story_path = active / "story.json"
-    story = load_story_config(story_path) or {}
-    story["tags"] = params.tags
-
-    with open(story_path, "w", encoding="utf-8") as f:
-        _json.dump(story, f, indent=2, ensure_ascii=False)
+    await run_metadata_io(_set_story_value, active / "story.json", "tags", params.tags)
 
     mutations["story_changed"] = True
     return {"tags": params.tags, "message": "Story tags updated successfully"}
@@ -267,18 +290,21 @@ async def sync_story_summary(
 
 @chat_tool(description="Directly set the story summary without LLM generation.")
 async def write_story_summary(
-    params: WriteStorySummaryParams, payload: dict, mutations: dict
+    params: WriteStorySummaryParams,
+    payload: dict,
+    mutations: dict,
+    ctx: ProjectContext,
 ):
-    active = get_active_project_dir()
+    active = await run_metadata_io(ctx.load_active_dir)
     if not active:
         return {"error": "No active project"}
 
-    story_path = active / "story.json"
-    story = load_story_config(story_path) or {}
-    story["story_summary"] = params.summary.strip()
-
-    with open(story_path, "w", encoding="utf-8") as f:
-        _json.dump(story, f, indent=2, ensure_ascii=False)
+    await run_metadata_io(
+        _set_story_value,
+        active / "story.json",
+        "story_summary",
+        params.summary.strip(),
+    )
 
     mutations["story_changed"] = True
     return {"summary": params.summary, "message": "Story summary updated successfully"}
@@ -12,10 +12,27 @@ Chat tool schemas for LLM function calling.
 All tools are now decorator-based and auto-registered via @chat_tool.
 """
 
-from augmentedquill.services.chat.chat_tool_decorator import get_tool_schemas
+from augmentedquill.services.chat.chat_tool_decorator import (
+    get_all_tool_names,
+    get_tool_schemas,
+)
 from augmentedquill.services.chat import chat_tools  # noqa: F401
+from augmentedquill.services.llm.llm_prompt_cache import canonical_tools
+
+# (registered tool names, canonical schemas) of the last call.
+_cached_tools: tuple[tuple[str, ...], list[dict]] | None = None
 
 
 def get_story_tools() -> list[dict]:
-    """Return the complete tool schema list for chat/tool calling."""
-    return get_tool_schemas()
+    """Return the complete tool schema list for chat/tool calling.
+
+    The schemas are serialized canonically and reused while the registry is
+    unchanged, so every request carries byte-identical tool definitions. The
+    list is a fresh copy per call; the schema dicts inside are shared and must
+    not be modified.
+    """
+    global _cached_tools
+    names = tuple(get_all_tool_names())
+    if _cached_tools is None or _cached_tools[0] != names:
+        _cached_tools = (names, canonical_tools(get_tool_schemas()))
+    return list(_cached_tools[1])
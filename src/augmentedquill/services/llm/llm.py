@@ -11,20 +11,39 @@
 Public API is kept stable while implementations are split into:
 - llm_stream_ops: streaming + tool parsing stream pipeline
 - llm_completion_ops: non-streaming and completions helpers
+
+unified_chat_stream and unified_chat_complete consult the opt-in response
+cache (llm_response_cache) for deterministic requests. Every upstream call
+waits for a slot of its endpoint (llm_scheduler); callers pass the request
+priority and, for supersedable work, the ticket of the operation.
 """
 
 from __future__ import annotations
 
+from contextlib import aclosing
 from typing import Any, Dict, AsyncIterator, Tuple
 import os
 
-import httpx
-
-from augmentedquill.core.config import load_machine_config, CONFIG_DIR
+from augmentedquill.core.config import (
+    load_machine_config,
+    load_story_config,
+    CONFIG_DIR,
+)
 from augmentedquill.services.llm import llm_logging as _llm_logging
 from augmentedquill.services.llm import llm_stream_ops as _llm_stream_ops
 from augmentedquill.services.llm import llm_completion_ops as _llm_completion_ops
-from augmentedquill.services.llm.llm_request_helpers import find_model_in_list
+from augmentedquill.services.llm.llm_request_helpers import (
+    find_model_in_list,
+    get_story_llm_preferences,
+)
+from augmentedquill.services.llm.llm_response_cache import (
+    response_cache,
+    response_cache_enabled,
+    response_cache_key,
+)
+from augmentedquill.services.llm.llm_scheduler import Ticket, upstream_slot
+from augmentedquill.services.projects.projects import get_active_project_dir
+from augmentedquill.utils.storage_io import run_metadata_io
 from augmentedquill.utils import llm_parsing as _llm_parsing
 
 # Backward-compatible export used by debug endpoint and tests.
@@ -36,10 +55,16 @@ strip_thinking_tags = _llm_parsing.strip_thinking_tags
 
 
 def get_selected_model_name(
-    payload: Dict[str, Any], model_type: str | None = None
+    payload: Dict[str, Any],
+    model_type: str | None = None,
+    machine: Dict[str, Any] | None = None,
 ) -> str | None:
-    """Get the selected model name based on payload and model_type."""
-    machine = load_machine_config(CONFIG_DIR / "machine.json") or {}
+    """Get the selected model name based on payload and model_type.
+
+    Pass `machine` to resolve against an already loaded config snapshot.
+    """
+    if machine is None:
+        machine = load_machine_config(CONFIG_DIR / "machine.json") or {}
     openai_cfg: Dict[str, Any] = machine.get("openai") or {}
 
     selected_name = payload.get("model_name")
@@ -59,6 +84,7 @@ def get_selected_model_name(
 def resolve_openai_credentials(
     payload: Dict[str, Any],
     model_type: str | None = None,
+    machine: Dict[str, Any] | None = None,
 ) -> Tuple[str, str | None, str, int]:
     """Resolve (base_url, api_key, model_id, timeout_s) from machine config and overrides.
 
@@ -66,11 +92,14 @@ def resolve_openai_credentials(
     1. Environment variables OPENAI_BASE_URL / OPENAI_API_KEY
     2. Payload overrides: base_url, api_key, model, timeout_s or model_name (by name)
     3. machine.json -> openai.models[] (selected by name based on model_type)
+
+    Pass `machine` to resolve against an already loaded config snapshot.
     """
-    machine = load_machine_config(CONFIG_DIR / "machine.json") or {}
+    if machine is None:
+        machine = load_machine_config(CONFIG_DIR / "machine.json") or {}
     openai_cfg: Dict[str, Any] = machine.get("openai") or {}
 
-    selected_name = get_selected_model_name(payload, model_type)
+    selected_name = get_selected_model_name(payload, model_type, machine=machine)
 
     base_url = payload.get("base_url")
     api_key = payload.get("api_key")
@@ -114,6 +143,43 @@ def resolve_openai_credentials(
     return str(base_url), (str(api_key) if api_key else None), str(model_id), ts
 
 
+def _cache_key(
+    kind: str,
+    *,
+    cacheable: bool,
+    temperature: float,
+    **request: Any,
+) -> str | None:
+    """Response cache key of a deterministic request, else None."""
+    if not response_cache_enabled():
+        return None
+    if not cacheable and temperature != 0:
+        return None
+    return response_cache_key(kind, temperature=temperature, **request)
+
+
+def _record_chunk(recorded: list[dict], chunk: dict) -> None:
+    """Keep a stream for replay, merging consecutive content-only chunks."""
+    if recorded and set(chunk) == {"content"} and set(recorded[-1]) == {"content"}:
+        recorded[-1]["content"] += chunk["content"]
+    else:
+        recorded.append(dict(chunk))
+
+
+async def _scheduled(
+    stream: AsyncIterator[Any],
+    base_url: str,
+    priority: str,
+    ticket: Ticket | None,
+) -> AsyncIterator[Any]:
+    """Iterate an upstream stream inside an endpoint slot."""
+    async with upstream_slot(base_url, priority, ticket), aclosing(stream):
+        async for item in stream:
+            if ticket is not None:
+                ticket.check()
+            yield item
+
+
 async def unified_chat_stream(
     *,
     messages: list[dict],
@@ -127,10 +193,31 @@ async def unified_chat_stream(
     temperature: float = 0.7,
     max_tokens: int | None = None,
     log_entry: dict | None = None,
+    cacheable: bool = False,
+    priority: str = "interactive",
+    ticket: Ticket | None = None,
 ) -> AsyncIterator[dict]:
-    # Keep tests monkeypatching augmentedquill.services.llm.llm.httpx effective.
-    _llm_stream_ops.httpx = httpx
-    async for chunk in _llm_stream_ops.unified_chat_stream(
+    key = _cache_key(
+        "chat_stream",
+        cacheable=cacheable,
+        temperature=temperature,
+        base_url=base_url,
+        model=model_id,
+        messages=messages,
+        tools=tools if supports_function_calling else None,
+        tool_choice=tool_choice,
+        max_tokens=max_tokens,
+    )
+    if key is not None:
+        cached = await run_metadata_io(response_cache.get, key)
+        if cached is not None:
+            for chunk in cached:
+                yield chunk
+            return
+    recorded: list[dict] = []
+    failed = False
+
+    upstream = _llm_stream_ops.unified_chat_stream(
         messages=messages,
         base_url=base_url,
         api_key=api_key,
@@ -142,8 +229,14 @@ async def unified_chat_stream(
         temperature=temperature,
         max_tokens=max_tokens,
         log_entry=log_entry,
-    ):
+    )
+    async for chunk in _scheduled(upstream, base_url, priority, ticket):
+        if key is not None:
+            failed = failed or "error" in chunk
+            _record_chunk(recorded, chunk)
         yield chunk
+    if key is not None and not failed:
+        await run_metadata_io(response_cache.put, key, recorded)
 
 
 async def unified_chat_complete(
@@ -158,20 +251,50 @@ async def unified_chat_complete(
     tool_choice: str | None = None,
     temperature: float = 0.7,
     max_tokens: int | None = None,
+    cacheable: bool = False,
+    priority: str = "interactive",
+    ticket: Ticket | None = None,
 ) -> dict:
-    _llm_completion_ops.httpx = httpx
-    return await _llm_completion_ops.unified_chat_complete(
-        messages=messages,
-        base_url=base_url,
-        api_key=api_key,
-        model_id=model_id,
-        timeout_s=timeout_s,
-        supports_function_calling=supports_function_calling,
-        tools=tools,
-        tool_choice=tool_choice,
-        temperature=temperature,
-        max_tokens=max_tokens,
-    )
+    key = None
+    if response_cache_enabled():
+        # The request is sent with the story's sampling preferences.
+        story_temperature, story_max_tokens = get_story_llm_preferences(
+            config_dir=CONFIG_DIR,
+            get_active_project_dir=get_active_project_dir,
+            load_story_config=load_story_config,
+        )
+        key = _cache_key(
+            "chat_complete",
+            cacheable=cacheable,
+            temperature=story_temperature,
+            base_url=base_url,
+            model=model_id,
+            messages=messages,
+            tools=tools if supports_function_calling else None,
+            tool_choice=tool_choice,
+            max_tokens=story_max_tokens,
+        )
+    if key is not None:
+        cached = await run_metadata_io(response_cache.get, key)
+        if cached is not None:
+            return cached
+
+    async with upstream_slot(base_url, priority, ticket):
+        result = await _llm_completion_ops.unified_chat_complete(
+            messages=messages,
+            base_url=base_url,
+            api_key=api_key,
+            model_id=model_id,
+            timeout_s=timeout_s,
+            supports_function_calling=supports_function_calling,
+            tools=tools,
+            tool_choice=tool_choice,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+    if key is not None:
+        await run_metadata_io(response_cache.put, key, result)
+    return result
 
 
 async def openai_chat_complete(
@@ -182,16 +305,18 @@ async def openai_chat_complete(
     model_id: str,
     timeout_s: int,
     extra_body: dict | None = None,
+    priority: str = "interactive",
+    ticket: Ticket | None = None,
 ) -> dict:
-    _llm_completion_ops.httpx = httpx
-    return await _llm_completion_ops.openai_chat_complete(
-        messages=messages,
-        base_url=base_url,
-        api_key=api_key,
-        model_id=model_id,
-        timeout_s=timeout_s,
-        extra_body=extra_body,
-    )
+    async with upstream_slot(base_url, priority, ticket):
+        return await _llm_completion_ops.openai_chat_complete(
+            messages=messages,
+            base_url=base_url,
+            api_key=api_key,
+            model_id=model_id,
+            timeout_s=timeout_s,
+            extra_body=extra_body,
+        )
 
 
 async def openai_completions(
@@ -203,17 +328,19 @@ async def openai_completions(
     timeout_s: int,
     n: int = 1,
     extra_body: dict | None = None,
+    priority: str = "interactive",
+    ticket: Ticket | None = None,
 ) -> dict:
-    _llm_completion_ops.httpx = httpx
-    return await _llm_completion_ops.openai_completions(
-        prompt=prompt,
-        base_url=base_url,
-        api_key=api_key,
-        model_id=model_id,
-        timeout_s=timeout_s,
-        n=n,
-        extra_body=extra_body,
-    )
+    async with upstream_slot(base_url, priority, ticket):
+        return await _llm_completion_ops.openai_completions(
+            prompt=prompt,
+            base_url=base_url,
+            api_key=api_key,
+            model_id=model_id,
+            timeout_s=timeout_s,
+            n=n,
+            extra_body=extra_body,
+        )
 
 
 async def openai_chat_complete_stream(
@@ -223,15 +350,17 @@ async def openai_chat_complete_stream(
     api_key: str | None,
     model_id: str,
     timeout_s: int,
+    priority: str = "interactive",
+    ticket: Ticket | None = None,
 ) -> AsyncIterator[str]:
-    _llm_completion_ops.httpx = httpx
-    async for chunk in _llm_completion_ops.openai_chat_complete_stream(
+    upstream = _llm_completion_ops.openai_chat_complete_stream(
         messages=messages,
         base_url=base_url,
         api_key=api_key,
         model_id=model_id,
         timeout_s=timeout_s,
-    ):
+    )
+    async for chunk in _scheduled(upstream, base_url, priority, ticket):
         yield chunk
 
 
@@ -243,14 +372,41 @@ async def openai_completions_stream(
     model_id: str,
     timeout_s: int,
     extra_body: dict | None = None,
+    priority: str = "interactive",
+    ticket: Ticket | None = None,
 ) -> AsyncIterator[str]:
-    _llm_completion_ops.httpx = httpx
-    async for chunk in _llm_completion_ops.openai_completions_stream(
+    upstream = _llm_completion_ops.openai_completions_stream(
         prompt=prompt,
         base_url=base_url,
         api_key=api_key,
         model_id=model_id,
         timeout_s=timeout_s,
         extra_body=extra_body,
-    ):
+    )
+    async for chunk in _scheduled(upstream, base_url, priority, ticket):
         yield chunk
+
+
+async def openai_completions_stream_choices(
+    *,
+    prompt: str,
+    base_url: str,
+    api_key: str | None,
+    model_id: str,
+    timeout_s: int,
+    n: int | None = None,
+    extra_body: dict | None = None,
+    priority: str = "interactive",
+    ticket: Ticket | None = None,
+) -> AsyncIterator[tuple[int, str]]:
+    upstream = _llm_completion_ops.openai_completions_stream_choices(
+        prompt=prompt,
+        base_url=base_url,
+        api_key=api_key,
+        model_id=model_id,
+        timeout_s=timeout_s,
+        n=n,
+        extra_body=extra_body,
+    )
+    async for item in _scheduled(upstream, base_url, priority, ticket):
+        yield item
@@ -0,0 +1,187 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the llm capabilities unit so this responsibility stays isolated, testable, and easy to evolve.
+
+"""Learned request capabilities per (base_url, model_id).
+
+Backends differ in which OpenAI request features they accept. Rather than
+paying a failed request every time, the llm ops record what they observe:
+
+- native_tools: `tools` is accepted (else the [TOOL_CALL] text protocol is used)
+- tool_choice: `tool_choice` is accepted
+- reasoning_content: streamed deltas carry reasoning_content
+- n: completions return several choices for n > 1
+- stream_options: `stream_options` is accepted
+
+A value is True (works), False (fails) or missing (unknown, try it).
+/machine/test_model also probes tools, n and stream_options. Values persist
+in data/model_capabilities.json, or the file named by
+AUGQ_MODEL_CAPABILITIES_PATH.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict
+
+from augmentedquill.core.config import DATA_DIR
+from augmentedquill.services.llm.llm_http_pool import pooled_client
+from augmentedquill.utils.storage_io import run_metadata_io
+
+CAPABILITIES = (
+    "native_tools",
+    "tool_choice",
+    "reasoning_content",
+    "n",
+    "stream_options",
+)
+
+
+def _endpoint(base_url: str) -> str:
+    return str(base_url or "").rstrip("/")
+
+
+class CapabilityRegistry:
+    """Capabilities per endpoint and model, kept in memory and in a JSON file."""
+
+    def __init__(self, path: Path | None = None) -> None:
+        self._path = path
+        self._lock = threading.Lock()
+        self._loaded_from: Path | None = None
+        self._data: Dict[str, Dict[str, Dict[str, bool]]] = {}
+
+    @property
+    def path(self) -> Path:
+        if self._path is not None:
+            return self._path
+        return Path(
+            os.getenv(
+                "AUGQ_MODEL_CAPABILITIES_PATH",
+                str(DATA_DIR / "model_capabilities.json"),
+            )
+        )
+
+    def _entries(self) -> Dict[str, Dict[str, Dict[str, bool]]]:
+        """The loaded data; the caller holds the lock."""
+        path = self.path
+        if self._loaded_from != path:
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                data = {}
+            self._data = data if isinstance(data, dict) else {}
+            self._loaded_from = path
+        return self._data
+
+    def _save(self) -> None:
+        path = self.path
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self._data, indent=2), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    def get(self, base_url: str, model_id: str, name: str) -> bool | None:
+        with self._lock:
+            model = self._entries().get(_endpoint(base_url), {}).get(model_id) or {}
+            value = model.get(name)
+        return value if isinstance(value, bool) else None
+
+    def model(self, base_url: str, model_id: str) -> Dict[str, bool]:
+        with self._lock:
+            return dict(
+                self._entries().get(_endpoint(base_url), {}).get(model_id) or {}
+            )
+
+    def all(self) -> Dict[str, Dict[str, Dict[str, bool]]]:
+        with self._lock:
+            return json.loads(json.dumps(self._entries()))
+
+    def record(self, base_url: str, model_id: str, name: str, value: bool) -> None:
+        """Store a capability; the file is only written when it changed."""
+        if name not in CAPABILITIES:
+            raise ValueError(f"Unknown capability: {name!r}")
+        with self._lock:
+            models = self._entries().setdefault(_endpoint(base_url), {})
+            model = models.setdefault(model_id, {})
+            if model.get(name) is value:
+                return
+            model[name] = value
+            self._save()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data = {}
+            self._loaded_from = self.path
+            try:
+                self.path.unlink(missing_ok=True)
+            except OSError:
+                pass
+
+
+capabilities = CapabilityRegistry()
+
+
+async def learn(base_url: str, model_id: str, name: str, value: bool) -> None:
+    """Record an observed capability without blocking on unchanged values."""
+    if capabilities.get(base_url, model_id, name) is not value:
+        await run_metadata_io(capabilities.record, base_url, model_id, name, value)
+
+
+async def probe_capabilities(
+    base_url: str, api_key: str | None, model_id: str, timeout_s: int = 10
+) -> Dict[str, bool]:
+    """Probe n and stream_options with minimal requests and record the answers.
+
+    Returns everything known about the model afterwards.
+    """
+    root = _endpoint(base_url)
+    headers = {"Content-Type": "application/json"}
+    if api_key:
+        headers["Authorization"] = f"Bearer {api_key}"
+
+    async def check_n(client) -> bool | None:
+        body = {"model": model_id, "prompt": ".", "max_tokens": 1, "n": 2}
+        response = await client.post(f"{root}/completions", json=body, headers=headers)
+        if response.status_code in (400, 422):
+            return False
+        if response.status_code != 200:
+            return None
+        indexes = {c.get("index") for c in response.json().get("choices") or []}
+        return len(indexes) > 1
+
+    async def check_stream_options(client) -> bool | None:
+        body = {
+            "model": model_id,
+            "messages": [{"role": "user", "content": "."}],
+            "max_tokens": 1,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+        }
+        async with client.stream(
+            "POST", f"{root}/chat/completions", json=body, headers=headers
+        ) as response:
+            await response.aread()
+            if response.status_code in (400, 422):
+                return False
+            return True if response.status_code == 200 else None
+
+    async with pooled_client(root, float(timeout_s)) as client:
+        results = await asyncio.gather(
+            check_n(client), check_stream_options(client), return_exceptions=True
+        )
+    for name, result in zip(("n", "stream_options"), results):
+        # Only answers are recorded, not a server that could not be reached.
+        if isinstance(result, bool):
+            await learn(base_url, model_id, name, result)
+    return capabilities.model(base_url, model_id)
@@ -13,7 +13,6 @@ import datetime
 import os
 import re
 
-import httpx
 
 from augmentedquill.core.config import load_story_config, CONFIG_DIR
 from augmentedquill.services.projects.projects import get_active_project_dir
@@ -21,7 +20,16 @@ from augmentedquill.utils.llm_parsing import (
     parse_tool_calls_from_content,
     strip_thinking_tags,
 )
-from augmentedquill.services.llm.llm_logging import add_llm_log, create_log_entry
+from augmentedquill.services.llm.llm_http_pool import pooled_client
+from augmentedquill.services.llm.llm_logging import (
+    add_llm_log,
+    append_stream_chunk,
+    create_log_entry,
+)
+from augmentedquill.services.llm.llm_prompt_cache import (
+    apply_prompt_cache_hints,
+    record_prompt_cache_usage,
+)
 from augmentedquill.services.llm.llm_request_helpers import (
     get_story_llm_preferences,
     build_headers,
@@ -122,6 +130,7 @@ async def openai_chat_complete(
         body["max_tokens"] = max_tokens
     if extra_body:
         body.update(extra_body)
+    apply_prompt_cache_hints(body, base_url=base_url, model_id=model_id)
 
     log_entry = create_log_entry(url, "POST", headers, body)
     add_llm_log(log_entry)
@@ -134,7 +143,7 @@ async def openai_chat_complete(
             {"url": url, "headers": log_entry["request"]["headers"], "body": body},
         )
 
-    async with httpx.AsyncClient(timeout=timeout_obj) as client:
+    async with pooled_client(url, timeout_obj) as client:
         try:
             r = await client.post(url, headers=headers, json=body)
             log_entry["timestamp_end"] = datetime.datetime.now().isoformat()
@@ -145,6 +154,7 @@ async def openai_chat_complete(
             r.raise_for_status()
             resp_json = r.json()
             log_entry["response"]["body"] = resp_json
+            record_prompt_cache_usage(log_entry, resp_json)
             return resp_json
         except Exception as e:
             log_entry["timestamp_end"] = datetime.datetime.now().isoformat()
@@ -181,6 +191,7 @@ async def openai_completions(
         body["max_tokens"] = max_tokens
     if extra_body:
         body.update(extra_body)
+    apply_prompt_cache_hints(body, base_url=base_url, model_id=model_id)
 
     log_entry = create_log_entry(url, "POST", headers, body)
     add_llm_log(log_entry)
@@ -193,7 +204,7 @@ async def openai_completions(
             {"url": url, "headers": log_entry["request"]["headers"], "body": body},
         )
 
-    async with httpx.AsyncClient(timeout=timeout_obj) as client:
+    async with pooled_client(url, timeout_obj) as client:
         try:
             r = await client.post(url, headers=headers, json=body)
             log_entry["timestamp_end"] = datetime.datetime.now().isoformat()
@@ -204,6 +215,7 @@ async def openai_completions(
             r.raise_for_status()
             resp_json = r.json()
             log_entry["response"]["body"] = resp_json
+            record_prompt_cache_usage(log_entry, resp_json)
             return resp_json
         except Exception as e:
             log_entry["timestamp_end"] = datetime.datetime.now().isoformat()
@@ -236,13 +248,14 @@ async def openai_chat_complete_stream(
     }
     if isinstance(max_tokens, int):
         body["max_tokens"] = max_tokens
+    apply_prompt_cache_hints(body, base_url=base_url, model_id=model_id)
 
     log_entry = create_log_entry(url, "POST", headers, body, streaming=True)
     add_llm_log(log_entry)
 
     timeout_obj = build_timeout(timeout_s)
 
-    async with httpx.AsyncClient(timeout=timeout_obj) as client:
+    async with pooled_client(url, timeout_obj) as client:
         try:
             async with client.stream("POST", url, headers=headers, json=body) as resp:
                 log_entry["response"]["status_code"] = resp.status_code
@@ -259,7 +272,7 @@ async def openai_chat_complete_stream(
 
                         try:
                             obj = _json.loads(data)
-                            log_entry["response"]["chunks"].append(obj)
+                            append_stream_chunk(log_entry, obj)
                         except Exception:
                             obj = None
                         if not isinstance(obj, dict):
@@ -287,6 +300,33 @@ async def openai_completions_stream(
     timeout_s: int,
     extra_body: dict | None = None,
 ) -> AsyncIterator[str]:
+    async for index, content in openai_completions_stream_choices(
+        prompt=prompt,
+        base_url=base_url,
+        api_key=api_key,
+        model_id=model_id,
+        timeout_s=timeout_s,
+        extra_body=extra_body,
+    ):
+        if index == 0:
+            yield content
+
+
+async def openai_completions_stream_choices(
+    *,
+    prompt: str,
+    base_url: str,
+    api_key: str | None,
+    model_id: str,
+    timeout_s: int,
+    n: int | None = None,
+    extra_body: dict | None = None,
+) -> AsyncIterator[tuple[int, str]]:
+    """Stream a completion as (choice index, text) pairs.
+
+    With n set, one request asks for n choices whose chunks arrive
+    interleaved; a backend that ignores n only ever sends index 0.
+    """
     url = str(base_url).rstrip("/") + "/completions"
     temperature, max_tokens = get_story_llm_preferences(
         config_dir=CONFIG_DIR,
@@ -302,17 +342,20 @@ async def openai_completions_stream(
         "temperature": temperature,
         "stream": True,
     }
+    if n is not None:
+        body["n"] = n
     if isinstance(max_tokens, int):
         body["max_tokens"] = max_tokens
     if extra_body:
         body.update(extra_body)
+    apply_prompt_cache_hints(body, base_url=base_url, model_id=model_id)
 
     log_entry = create_log_entry(url, "POST", headers, body, streaming=True)
     add_llm_log(log_entry)
 
     timeout_obj = build_timeout(timeout_s)
 
-    async with httpx.AsyncClient(timeout=timeout_obj) as client:
+    async with pooled_client(url, timeout_obj) as client:
         try:
             async with client.stream("POST", url, headers=headers, json=body) as resp:
                 log_entry["response"]["status_code"] = resp.status_code
@@ -329,18 +372,22 @@ async def openai_completions_stream(
 
                         try:
                             obj = _json.loads(data)
-                            log_entry["response"]["chunks"].append(obj)
+                            append_stream_chunk(log_entry, obj)
                         except Exception:
                             obj = None
                         if not isinstance(obj, dict):
                             continue
-                        try:
-                            content = obj["choices"][0]["text"]
-                        except Exception:
-                            content = None
-                        if content:
-                            log_entry["response"]["full_content"] += content
-                            yield content
+                        for choice in obj.get("choices") or []:
+                            if not isinstance(choice, dict):
+                                continue
+                            content = choice.get("text")
+                            if not content:
+                                continue
+                            index = choice.get("index")
+                            index = index if isinstance(index, int) else 0
+                            if index == 0:
+                                log_entry["response"]["full_content"] += content
+                            yield index, content
         except Exception as e:
             log_entry["response"]["error"] = str(e)
             raise
@@ -0,0 +1,447 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the llm dump unit so this responsibility stays isolated, testable, and easy to evolve.
+
+"""Raw upstream LLM traffic recorder (``--llm-dump``) and replay.
+
+When AUGQ_LLM_DUMP is set, the shared upstream HTTP transport (see
+llm_http_pool) reports every request and response here: the request bytes,
+the status and headers, and each response chunk as it is read. Streams are
+never buffered. Records are put on an asyncio queue and a single writer task
+per event loop appends them, in batches, to gzip-compressed JSONL. Each
+process writes a file of its own next to AUGQ_LLM_DUMP_PATH (default:
+LOGS_DIR/llm_dump.jsonl.gz), named after its start time and pid, e.g.
+llm_dump-20260101-120000-1234.jsonl.gz; a dump cut short by a crash is never
+appended to. When the queue is full, records are dropped and counted instead
+of slowing the stream down.
+
+Record types, all carrying the exchange "id":
+- request:  time, method, url, headers (Authorization masked), body
+- response: t (seconds since the request), status, headers
+- chunk:    t, seq, raw bytes
+- end:      t, error (if the exchange failed)
+
+Bytes are stored as "text" when they are valid UTF-8 and as "b64" otherwise.
+
+read_dump and replay_exchange feed a dump back through the same parsing code
+(unified_chat_stream, unified_chat_complete, openai_completions*) for offline
+benchmarking; see tools/replay_llm_dump.py.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import gzip
+import itertools
+import json
+import os
+import threading
+import time
+import weakref
+import zlib
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+from augmentedquill.core.config import LOGS_DIR
+
+DUMP_FILE_NAME = "llm_dump.jsonl.gz"
+_SUFFIX = ".jsonl.gz"
+
+_MAX_QUEUE = 10_000
+_MAX_BATCH = 256
+_STOP = object()
+
+
+def dump_enabled() -> bool:
+    return os.getenv("AUGQ_LLM_DUMP", "0") in ("1", "true", "TRUE", "yes", "on")
+
+
+def dump_path() -> Path:
+    path = os.getenv("AUGQ_LLM_DUMP_PATH")
+    return Path(path) if path else LOGS_DIR / DUMP_FILE_NAME
+
+
+def _stem(path: Path) -> str:
+    name = path.name
+    return name[: -len(_SUFFIX)] if name.endswith(_SUFFIX) else path.stem
+
+
+def session_dump_path(base: Path, started: float, pid: int) -> Path:
+    """File of one process: the configured name plus start time and pid."""
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(started))
+    return base.parent / f"{_stem(base)}-{stamp}-{pid}{_SUFFIX}"
+
+
+def latest_dump(base: Optional[Path] = None) -> Path:
+    """The most recently written dump for a configured path."""
+    base = base if base is not None else dump_path()
+    files = list(base.parent.glob(f"{_stem(base)}-*{_SUFFIX}"))
+    if base.exists():
+        files.append(base)
+    return max(files, key=lambda p: p.stat().st_mtime) if files else base
+
+
+def _payload(data: bytes) -> Dict[str, str]:
+    try:
+        return {"text": data.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"b64": base64.b64encode(data).decode("ascii")}
+
+
+def payload_bytes(record: Dict[str, Any]) -> bytes:
+    """Return the raw bytes stored in a request body or chunk record."""
+    if "b64" in record:
+        return base64.b64decode(record["b64"])
+    return str(record.get("text") or "").encode("utf-8")
+
+
+def _headers(headers: httpx.Headers) -> List[Tuple[str, str]]:
+    return [
+        (k, "***" if k.lower() == "authorization" else v)
+        for k, v in headers.multi_items()
+    ]
+
+
+class LLMDumpRecorder:
+    """Queue plus single writer task per event loop, writing this process' file."""
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self._path = Path(path) if path is not None else None
+        self._writers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[asyncio.Queue, asyncio.Task]]" = (weakref.WeakKeyDictionary())
+        self._file: Optional[gzip.GzipFile] = None
+        self._file_path: Optional[Path] = None
+        self._started = time.time()
+        self._file_lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.written = 0
+        self.dropped = 0
+
+    @property
+    def path(self) -> Path:
+        return self._path if self._path is not None else dump_path()
+
+    @property
+    def file_path(self) -> Path:
+        """The file this process writes for the configured path."""
+        return session_dump_path(self.path, self._started, os.getpid())
+
+    def next_id(self) -> str:
+        return f"{os.getpid()}-{next(self._ids)}"
+
+    def record(self, record: Dict[str, Any]) -> None:
+        """Queue a record; must be called from a running event loop."""
+        loop = asyncio.get_running_loop()
+        state = self._writers.get(loop)
+        if state is None or state[1].done():
+            queue: asyncio.Queue = asyncio.Queue(maxsize=_MAX_QUEUE)
+            state = (queue, loop.create_task(self._run_writer(queue)))
+            self._writers[loop] = state
+        try:
+            state[0].put_nowait(record)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def _run_writer(self, queue: asyncio.Queue) -> None:
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < _MAX_BATCH:
+                try:
+                    batch.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            records = [r for r in batch if r is not _STOP]
+            if records:
+                try:
+                    await asyncio.to_thread(self._write, records)
+                except Exception:
+                    self.dropped += len(records)
+            if len(records) != len(batch):
+                return
+
+    def _write(self, records: List[Dict[str, Any]]) -> None:
+        data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+        with self._file_lock:
+            if self._file is None:
+                path = self.file_path
+                path.parent.mkdir(parents=True, exist_ok=True)
+                # Only reopened by this process after a clean close.
+                self._file = gzip.open(path, "ab")
+            self._file.write(data.encode("utf-8"))
+            # Sync-flush so the dump is readable while the server runs.
+            self._file.flush()
+            self.written += len(records)
+
+    async def aclose(self) -> None:
+        """Drain the writer of the running loop and close the file."""
+        state = self._writers.pop(asyncio.get_running_loop(), None)
+        if state is not None and not state[1].done():
+            await state[0].put(_STOP)
+            await state[1]
+        with self._file_lock:
+            if self._file is not None and not self._writers:
+                self._file.close()
+                self._file = None
+
+
+recorder = LLMDumpRecorder()
+
+
+class _DumpExchange:
+    def __init__(self, rec: LLMDumpRecorder, request: httpx.Request) -> None:
+        self._rec = rec
+        self._id = rec.next_id()
+        self._start = time.perf_counter()
+        self._seq = 0
+        self._ended = False
+        try:
+            body: Optional[Dict[str, str]] = _payload(request.content)
+        except httpx.RequestNotRead:
+            body = None
+        rec.record(
+            {
+                "type": "request",
+                "id": self._id,
+                "time": time.time(),
+                "method": request.method,
+                "url": str(request.url),
+                "headers": _headers(request.headers),
+                "body": body,
+            }
+        )
+
+    def _t(self) -> float:
+        return round(time.perf_counter() - self._start, 6)
+
+    def response(self, response: httpx.Response) -> None:
+        self._rec.record(
+            {
+                "type": "response",
+                "id": self._id,
+                "t": self._t(),
+                "status": response.status_code,
+                "headers": _headers(response.headers),
+            }
+        )
+        response.stream = _DumpStream(response.stream, self)
+
+    def chunk(self, data: bytes) -> None:
+        self._rec.record(
+            {"type": "chunk", "id": self._id, "t": self._t(), "seq": self._seq}
+            | _payload(data)
+        )
+        self._seq += 1
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        if self._ended:
+            return
+        self._ended = True
+        record: Dict[str, Any] = {"type": "end", "id": self._id, "t": self._t()}
+        if error is not None:
+            record["error"] = f"{type(error).__name__}: {error}"
+        self._rec.record(record)
+
+
+class _DumpStream(httpx.AsyncByteStream):
+    """Passes response bytes through, recording each chunk as it is read."""
+
+    def __init__(self, stream: Any, exchange: _DumpExchange) -> None:
+        self._stream = stream
+        self._exchange = exchange
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in self._stream:
+                self._exchange.chunk(chunk)
+                yield chunk
+        except GeneratorExit:
+            raise
+        except BaseException as exc:
+            self._exchange.end(exc)
+            raise
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._exchange.end()
+
+
+def start_exchange(request: httpx.Request) -> Optional[_DumpExchange]:
+    """Begin recording an upstream request, or return None when dumping is off."""
+    if not dump_enabled():
+        return None
+    return _DumpExchange(recorder, request)
+
+
+async def close_llm_dump() -> None:
+    await recorder.aclose()
+
+
+# ---------------------------------------------------------------------------
+# Replay
+
+
+def iter_dump_records(path: Path) -> Iterator[Dict[str, Any]]:
+    """Yield the records of a dump, tolerating a file that is still open.
+
+    A file cut short by a crash yields its records up to the damage.
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                if line.endswith("\n") and line.strip():
+                    yield json.loads(line)
+        except (EOFError, gzip.BadGzipFile, zlib.error):
+            # Not closed cleanly: every complete line up to here is intact.
+            return
+
+
+def read_dump(path: Path) -> List[Dict[str, Any]]:
+    """Group dump records into exchanges, in request order.
+
+    Each exchange has "request", "response" (or None), "chunks" (raw bytes in
+    order) and "end" (or None).
+    """
+    exchanges: Dict[str, Dict[str, Any]] = {}
+    for record in iter_dump_records(path):
+        kind = record.get("type")
+        if kind == "request":
+            exchanges[record["id"]] = {
+                "request": record,
+                "response": None,
+                "chunks": [],
+                "end": None,
+            }
+            continue
+        exchange = exchanges.get(record.get("id"))
+        if exchange is None:
+            continue
+        if kind == "response":
+            exchange["response"] = record
+        elif kind == "chunk":
+            exchange["chunks"].append(payload_bytes(record))
+        elif kind == "end":
+            exchange["end"] = record
+    return list(exchanges.values())
+
+
+class _ReplayStream(httpx.AsyncByteStream):
+    def __init__(self, chunks: List[bytes]) -> None:
+        self._chunks = chunks
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for chunk in self._chunks:
+            yield chunk
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Answers every request with the recorded response of one exchange."""
+
+    def __init__(self, exchange: Dict[str, Any]) -> None:
+        self._exchange = exchange
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = self._exchange.get("response")
+        if response is None:
+            end = self._exchange.get("end") or {}
+            raise httpx.ConnectError(end.get("error") or "no response recorded")
+        return httpx.Response(
+            response["status"],
+            headers=[tuple(h) for h in response.get("headers") or []],
+            stream=_ReplayStream(self._exchange["chunks"]),
+            request=request,
+        )
+
+
+def exchange_operation(exchange: Dict[str, Any]) -> Optional[str]:
+    """Name the parsing path a recorded exchange is replayed through."""
+    request = exchange["request"]
+    path = httpx.URL(request["url"]).path.rstrip("/")
+    try:
+        body = json.loads(payload_bytes(request["body"] or {}) or b"{}")
+    except ValueError:
+        return None
+    stream = bool(isinstance(body, dict) and body.get("stream"))
+    if path.endswith("/chat/completions"):
+        return "chat_stream" if stream else "chat_complete"
+    if path.endswith("/completions"):
+        return "completions_stream" if stream else "completions"
+    return None
+
+
+async def replay_exchange(exchange: Dict[str, Any]) -> Optional[List[Any]]:
+    """Run a recorded exchange through the parsing pipeline; return its output.
+
+    Returns None for requests that are not chat or completion calls.
+    """
+    from augmentedquill.services.llm import llm_completion_ops, llm_stream_ops
+    from augmentedquill.services.llm.llm_http_pool import use_http_client
+
+    op = exchange_operation(exchange)
+    if op is None:
+        return None
+    request = exchange["request"]
+    body = json.loads(payload_bytes(request["body"]))
+    url = request["url"]
+    base_url = url[: url.rstrip("/").rfind("/chat/completions")]
+    if op.startswith("completions"):
+        base_url = url[: url.rstrip("/").rfind("/completions")]
+    common = {
+        "base_url": base_url,
+        "api_key": None,
+        "model_id": body.get("model", ""),
+        "timeout_s": 60,
+    }
+    tools = body.get("tools")
+
+    async with httpx.AsyncClient(transport=ReplayTransport(exchange)) as client:
+        with use_http_client(client):
+            if op == "chat_stream":
+                return [
+                    event
+                    async for event in llm_stream_ops.unified_chat_stream(
+                        messages=body.get("messages") or [],
+                        supports_function_calling=bool(tools),
+                        tools=tools,
+                        tool_choice=body.get("tool_choice"),
+                        temperature=body.get("temperature", 0.7),
+                        max_tokens=body.get("max_tokens"),
+                        **common,
+                    )
+                ]
+            if op == "chat_complete":
+                return [
+                    await llm_completion_ops.unified_chat_complete(
+                        messages=body.get("messages") or [],
+                        supports_function_calling=bool(tools),
+                        tools=tools,
+                        tool_choice=body.get("tool_choice"),
+                        **common,
+                    )
+                ]
+            if op == "completions_stream" and body.get("n"):
+                return [
+                    choice
+                    async for choice in llm_completion_ops.openai_completions_stream_choices(
+                        prompt=body.get("prompt") or "", n=body["n"], **common
+                    )
+                ]
+            if op == "completions_stream":
+                return [
+                    text
+                    async for text in llm_completion_ops.openai_completions_stream(
+                        prompt=body.get("prompt") or "", **common
+                    )
+                ]
+            return [
+                await llm_completion_ops.openai_completions(
+                    prompt=body.get("prompt") or "", **common
+                )
+            ]
@@ -0,0 +1,170 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the llm generations unit so this responsibility stays isolated, testable, and easy to evolve.
+
+"""Registry of running streamed generations, so they can be stopped.
+
+Each streaming route registers a Generation under an id (chosen by the client
+as `generation_id`, or generated) and returns it in the X-Generation-Id
+header. guarded_stream() iterates the upstream stream until it ends, the
+generation is cancelled through DELETE /api/v1/generations/{id}, or the
+client disconnects; in the latter two cases the upstream stream is closed
+right away, which frees the backend slot, and GenerationCancelled is raised.
+
+The client connection is polled every AUGQ_DISCONNECT_POLL_S seconds
+(default 0.5), since a disconnect is otherwise only noticed on the next
+write.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+import time
+import uuid
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict, List
+
+_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# Registered generations whose stream never started are dropped after this.
+_UNSTARTED_TTL_S = 60.0
+
+
+class GenerationCancelled(Exception):
+    """The generation was cancelled or its client went away."""
+
+
+class Generation:
+    def __init__(self, generation_id: str, kind: str) -> None:
+        self.id = generation_id
+        self.kind = kind
+        self.created = time.time()
+        self.streaming = False
+        self.reason: str | None = None
+        self._cancelled = asyncio.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        if not self.cancelled:
+            self.reason = reason
+            self._cancelled.set()
+
+
+_generations: Dict[str, Generation] = {}
+
+
+def _disconnect_poll_s() -> float:
+    try:
+        return max(0.05, float(os.getenv("AUGQ_DISCONNECT_POLL_S", 0.5)))
+    except ValueError:
+        return 0.5
+
+
+def start_generation(kind: str, generation_id: Any = None) -> Generation:
+    """Register a generation; raises ValueError for a bad or busy id."""
+    now = time.time()
+    for stale in [
+        g
+        for g in _generations.values()
+        if not g.streaming and now - g.created > _UNSTARTED_TTL_S
+    ]:
+        _generations.pop(stale.id, None)
+    if generation_id is None:
+        generation_id = uuid.uuid4().hex
+    elif not isinstance(generation_id, str) or not _ID_RE.match(generation_id):
+        raise ValueError("generation_id must be 1-64 letters, digits, '_' or '-'")
+    elif generation_id in _generations:
+        raise ValueError(f"Generation {generation_id} is already running")
+    generation = Generation(generation_id, kind)
+    _generations[generation_id] = generation
+    return generation
+
+
+def finish_generation(generation: Generation) -> None:
+    if _generations.get(generation.id) is generation:
+        del _generations[generation.id]
+
+
+def cancel_generation(generation_id: str) -> bool:
+    """Cancel a running generation; False when the id is unknown."""
+    generation = _generations.get(generation_id)
+    if generation is None:
+        return False
+    generation.cancel("cancelled")
+    return True
+
+
+def active_generations() -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": g.id,
+            "kind": g.kind,
+            "created": g.created,
+            "streaming": g.streaming,
+            "cancelled": g.cancelled,
+        }
+        for g in _generations.values()
+    ]
+
+
+async def _watch_disconnect(request: Any, generation: Generation) -> None:
+    poll_s = _disconnect_poll_s()
+    while True:
+        await asyncio.sleep(poll_s)
+        if await request.is_disconnected():
+            generation.cancel("disconnected")
+            return
+
+
+async def guarded_stream(
+    generation: Generation,
+    source: AsyncIterator[Any],
+    request: Any = None,
+) -> AsyncIterator[Any]:
+    """Yield from source until it ends or the generation is cancelled.
+
+    Pass the route's request to cancel the generation when its client
+    disconnects. The generation is unregistered when the stream ends.
+    """
+    generation.streaming = True
+    stop = asyncio.ensure_future(generation._cancelled.wait())
+    watcher = (
+        asyncio.create_task(_watch_disconnect(request, generation))
+        if request is not None
+        else None
+    )
+    pending: asyncio.Future | None = None
+    try:
+        async with aclosing(source):
+            while True:
+                pending = asyncio.ensure_future(anext(source))
+                await asyncio.wait({pending, stop}, return_when=asyncio.FIRST_COMPLETED)
+                if not pending.done():
+                    # Closing the upstream stream stops the backend generating.
+                    pending.cancel()
+                    await asyncio.gather(pending, return_exceptions=True)
+                    raise GenerationCancelled(generation.reason)
+                try:
+                    item = pending.result()
+                except StopAsyncIteration:
+                    return
+                finally:
+                    pending = None
+                yield item
+    finally:
+        if pending is not None:
+            pending.cancel()
+            await asyncio.gather(pending, return_exceptions=True)
+        stop.cancel()
+        if watcher is not None:
+            watcher.cancel()
+        finish_generation(generation)
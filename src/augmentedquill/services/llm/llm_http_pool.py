@@ -0,0 +1,268 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the llm http pool unit so this responsibility stays isolated, testable, and easy to evolve.
+
+"""Shared keep-alive HTTP clients for upstream LLM traffic.
+
+Every upstream call used to open its own httpx.AsyncClient, so every token
+stream and tool round trip paid for a new TCP connection (and TLS handshake).
+Clients are now shared per (origin, timeout profile) and keep their
+connections alive between requests.
+
+Limits are read from the environment:
+- AUGQ_HTTP_MAX_CONNECTIONS (default 20) per client
+- AUGQ_HTTP_MAX_KEEPALIVE (default 10) idle connections kept open
+- AUGQ_HTTP_KEEPALIVE_EXPIRY_S (default 60)
+- AUGQ_HTTP2=1 enables HTTP/2 when the optional ``h2`` package is installed
+
+httpx connections belong to the event loop that opened them, so clients are
+kept per running loop. Statistics are kept per pool key across loops.
+
+With --llm-dump the transport also reports raw traffic to llm_dump.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import os
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+from augmentedquill.services.llm import llm_dump
+
+PoolKey = Tuple[str, Tuple[Any, ...]]
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, default)))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return max(0.0, float(os.getenv(name, default)))
+    except ValueError:
+        return default
+
+
+def _http2_enabled() -> bool:
+    if os.getenv("AUGQ_HTTP2", "0") not in ("1", "true", "TRUE", "yes", "on"):
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=_env_int("AUGQ_HTTP_MAX_CONNECTIONS", 20),
+        max_keepalive_connections=_env_int("AUGQ_HTTP_MAX_KEEPALIVE", 10),
+        keepalive_expiry=_env_float("AUGQ_HTTP_KEEPALIVE_EXPIRY_S", 60.0),
+    )
+
+
+def _as_timeout(timeout: httpx.Timeout | float | int | None) -> httpx.Timeout:
+    if isinstance(timeout, httpx.Timeout):
+        return timeout
+    try:
+        return httpx.Timeout(float(timeout or 60))
+    except (TypeError, ValueError):
+        return httpx.Timeout(60.0)
+
+
+def _pool_key(base_url: str, timeout: httpx.Timeout) -> PoolKey:
+    url = httpx.URL(str(base_url))
+    origin = f"{url.scheme}://{url.host}"
+    if url.port:
+        origin += f":{url.port}"
+    profile = (timeout.connect, timeout.read, timeout.write, timeout.pool)
+    return origin, profile
+
+
+@dataclass
+class PoolStats:
+    """Counters for one pool key."""
+
+    origin: str
+    timeout: Tuple[Any, ...]
+    requests: int = 0
+    new_connections: int = 0
+    reused_connections: int = 0
+    wait_s_total: float = 0.0
+    wait_s_max: float = 0.0
+    open_connections: int = 0
+
+    def record(self, *, new_connection: bool, wait_s: float) -> None:
+        self.requests += 1
+        if new_connection:
+            self.new_connections += 1
+        else:
+            self.reused_connections += 1
+        self.wait_s_total += wait_s
+        self.wait_s_max = max(self.wait_s_max, wait_s)
+
+    def as_dict(self) -> Dict[str, Any]:
+        acquired = self.new_connections + self.reused_connections
+        return {
+            "origin": self.origin,
+            "timeout": list(self.timeout),
+            "requests": self.requests,
+            "open_connections": self.open_connections,
+            "new_connections": self.new_connections,
+            "reused_connections": self.reused_connections,
+            "reuse_ratio": (self.reused_connections / acquired) if acquired else 0.0,
+            "avg_wait_ms": (self.wait_s_total / acquired * 1000) if acquired else 0.0,
+            "max_wait_ms": self.wait_s_max * 1000,
+        }
+
+
+class _InstrumentedTransport(httpx.AsyncHTTPTransport):
+    """Transport that records connection reuse and pool wait time per request.
+
+    httpcore reports the first step of every request through the "trace"
+    extension: either opening a TCP connection (new) or sending the request
+    headers (reused). The time until that step is the wait for a free
+    connection.
+    """
+
+    def __init__(self, stats: PoolStats, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self._stats = stats
+
+    def open_connections(self) -> int:
+        pool = getattr(self, "_pool", None)
+        return len(getattr(pool, "connections", None) or [])
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        acquired = False
+        outer_trace = request.extensions.get("trace")
+        stats = self._stats
+
+        async def trace(name: str, info: Dict[str, Any]) -> None:
+            nonlocal acquired
+            if not acquired and name.endswith(".started"):
+                new_connection = name.startswith("connection.connect_")
+                if new_connection or "send_request_headers" in name:
+                    acquired = True
+                    stats.record(
+                        new_connection=new_connection,
+                        wait_s=time.perf_counter() - started,
+                    )
+            if outer_trace is not None:
+                await outer_trace(name, info)
+
+        request.extensions = {**request.extensions, "trace": trace}
+        dump = llm_dump.start_exchange(request)
+        try:
+            response = await super().handle_async_request(request)
+        except BaseException as exc:
+            if dump is not None:
+                dump.end(exc)
+            raise
+        finally:
+            stats.open_connections = self.open_connections()
+        if dump is not None:
+            dump.response(response)
+        return response
+
+
+_stats: Dict[PoolKey, PoolStats] = {}
+_client_override: contextvars.ContextVar[Optional[httpx.AsyncClient]] = (
+    contextvars.ContextVar("augq_http_client_override", default=None)
+)
+_stats_lock = threading.Lock()
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[PoolKey, httpx.AsyncClient]]" = (weakref.WeakKeyDictionary())
+
+
+def _stats_for(key: PoolKey) -> PoolStats:
+    with _stats_lock:
+        stats = _stats.get(key)
+        if stats is None:
+            stats = PoolStats(origin=key[0], timeout=key[1])
+            _stats[key] = stats
+        return stats
+
+
+def get_http_client(
+    base_url: str, timeout: httpx.Timeout | float | int | None = None
+) -> httpx.AsyncClient:
+    """Return the shared client for base_url's origin and the timeout profile.
+
+    Must be called from a running event loop. The client must not be closed
+    by the caller.
+    """
+    override = _client_override.get()
+    if override is not None:
+        return override
+    timeout_obj = _as_timeout(timeout)
+    key = _pool_key(base_url, timeout_obj)
+    loop = asyncio.get_running_loop()
+    clients = _clients.setdefault(loop, {})
+    client = clients.get(key)
+    if client is None or client.is_closed:
+        transport = _InstrumentedTransport(
+            _stats_for(key), limits=_pool_limits(), http2=_http2_enabled()
+        )
+        client = httpx.AsyncClient(timeout=timeout_obj, transport=transport)
+        clients[key] = client
+    return client
+
+
+@asynccontextmanager
+async def pooled_client(
+    base_url: str, timeout: httpx.Timeout | float | int | None = None
+) -> AsyncIterator[httpx.AsyncClient]:
+    """Drop-in for ``async with httpx.AsyncClient(...)`` that keeps the client open."""
+    yield get_http_client(base_url, timeout)
+
+
+@contextmanager
+def use_http_client(client: httpx.AsyncClient) -> Iterator[httpx.AsyncClient]:
+    """Route all pooled upstream calls in this context through client.
+
+    Used to replay recorded traffic (see llm_dump).
+    """
+    token = _client_override.set(client)
+    try:
+        yield client
+    finally:
+        _client_override.reset(token)
+
+
+async def close_http_clients() -> None:
+    """Close the shared clients of the running loop (app shutdown)."""
+    clients = _clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        try:
+            await client.aclose()
+        except Exception:
+            pass
+
+
+def http_pool_stats() -> List[Dict[str, Any]]:
+    """Return per-pool statistics for the debug API."""
+    with _stats_lock:
+        return [stats.as_dict() for stats in _stats.values()]
+
+
+def reset_http_pool_stats() -> None:
+    with _stats_lock:
+        for key, stats in _stats.items():
+            # Reset in place: live transports keep a reference to their stats.
+            stats.__init__(origin=key[0], timeout=key[1])
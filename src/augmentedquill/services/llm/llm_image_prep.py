@@ -0,0 +1,206 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the llm image prep unit so this responsibility stays isolated, testable, and easy to evolve.
+
+"""Prepare project images for vision requests.
+
+Images are downscaled so that their longest edge fits the model's
+image_max_edge and re-encoded as image_format ("jpeg", "webp", "png" or
+"original"), both configurable per model in machine.json. The resulting
+data URL is stored under data/cache/images/, keyed by the file's content hash
+and the target size and format, so an image is only encoded once.
+
+Resizing needs Pillow; without it (or for files Pillow cannot read) the
+original bytes are sent unchanged, still from the cache.
+
+Settings are read from the environment:
+- AUGQ_IMAGE_MAX_EDGE (default 1536, 0 keeps the original size) for models
+  without image_max_edge
+- AUGQ_IMAGE_FORMAT (default "jpeg") for models without image_format
+- AUGQ_IMAGE_QUALITY (default 85) for lossy re-encoding
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import io
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from augmentedquill.core.config import DATA_DIR
+
+CACHE_DIR = DATA_DIR / "cache" / "images"
+
+IMAGE_FORMATS = ("jpeg", "webp", "png", "original")
+
+MIME_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+}
+
+_PIL_FORMATS = {"jpeg": "JPEG", "webp": "WEBP", "png": "PNG"}
+
+_lock = threading.Lock()
+# images dir -> (directory mtime, {filename: path})
+_indexes: Dict[str, Tuple[int, Dict[str, Path]]] = {}
+# (path, size, mtime) -> sha256 of the content
+_hashes: Dict[Tuple[str, int, int], str] = {}
+_MAX_HASHES = 1024
+
+
+def _env_int(name: str, default: int, minimum: int = 0) -> int:
+    try:
+        return max(minimum, int(os.getenv(name, default)))
+    except ValueError:
+        return default
+
+
+def image_settings(model: dict | None) -> Tuple[int, str]:
+    """(max edge, format) for a machine.json model entry."""
+    model = model or {}
+    max_edge = model.get("image_max_edge")
+    if not isinstance(max_edge, int) or isinstance(max_edge, bool) or max_edge < 0:
+        max_edge = _env_int("AUGQ_IMAGE_MAX_EDGE", 1536)
+    image_format = model.get("image_format")
+    if image_format not in IMAGE_FORMATS:
+        image_format = os.getenv("AUGQ_IMAGE_FORMAT", "jpeg")
+        if image_format not in IMAGE_FORMATS:
+            image_format = "jpeg"
+    return max_edge, image_format
+
+
+def image_index(images_dir: Path) -> Dict[str, Path]:
+    """Image files of a project by name, rescanned only when the dir changes."""
+    try:
+        mtime = images_dir.stat().st_mtime_ns
+    except OSError:
+        return {}
+    key = str(images_dir)
+    with _lock:
+        cached = _indexes.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+    index = {
+        f.name: f
+        for f in sorted(images_dir.iterdir())
+        if f.suffix.lower() in MIME_TYPES and f.is_file()
+    }
+    with _lock:
+        _indexes[key] = (mtime, index)
+    return index
+
+
+def find_referenced_images(images_dir: Path, text: str) -> List[Path]:
+    """Images whose file name appears in text."""
+    return [path for name, path in image_index(images_dir).items() if name in text]
+
+
+def _content_hash(path: Path) -> str:
+    stat = path.stat()
+    key = (str(path), stat.st_size, stat.st_mtime_ns)
+    with _lock:
+        digest = _hashes.get(key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        digest = h.hexdigest()
+        with _lock:
+            if len(_hashes) >= _MAX_HASHES:
+                _hashes.clear()
+            _hashes[key] = digest
+    return digest
+
+
+def _encode(data: bytes, suffix: str, max_edge: int, image_format: str):
+    """Return (mime type, bytes), resized and re-encoded where possible."""
+    mime = MIME_TYPES.get(suffix, "image/png")
+    try:
+        from PIL import Image
+    except ImportError:
+        return mime, data
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            img.load()
+            resize = bool(max_edge) and max(img.size) > max_edge
+            target = image_format
+            if target == "original":
+                if not resize:
+                    return mime, data
+                target = {".jpg": "jpeg", ".jpeg": "jpeg", ".webp": "webp"}.get(
+                    suffix, "png"
+                )
+            if resize:
+                img.thumbnail((max_edge, max_edge))
+            if target == "jpeg" and img.mode != "RGB":
+                img = img.convert("RGBA")
+                flat = Image.new("RGB", img.size, (255, 255, 255))
+                flat.paste(img, mask=img.getchannel("A"))
+                img = flat
+            elif img.mode not in ("RGB", "RGBA", "L", "LA"):
+                img = img.convert("RGBA")
+            out = io.BytesIO()
+            options = {}
+            if target in ("jpeg", "webp"):
+                options["quality"] = _env_int("AUGQ_IMAGE_QUALITY", 85, 1)
+            img.save(out, format=_PIL_FORMATS[target], **options)
+    except Exception:
+        return mime, data
+    encoded = out.getvalue()
+    if not resize and len(encoded) >= len(data):
+        return mime, data
+    return f"image/{target}", encoded
+
+
+def image_data_url(path: Path, max_edge: int = 0, image_format: str = "original"):
+    """Data URL of a prepared image, from the disk cache when possible."""
+    digest = _content_hash(path)
+    cache_file = CACHE_DIR / f"{digest}-{max_edge}-{image_format}.txt"
+    try:
+        return cache_file.read_text(encoding="ascii")
+    except OSError:
+        pass
+    mime, encoded = _encode(
+        path.read_bytes(), path.suffix.lower(), max_edge, image_format
+    )
+    url = f"data:{mime};base64,{base64.b64encode(encoded).decode('ascii')}"
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = cache_file.with_suffix(".tmp")
+        tmp.write_text(url, encoding="ascii")
+        os.replace(tmp, cache_file)
+    except OSError:
+        pass
+    return url
+
+
+def prepare_message_images(
+    images_dir: Path, text: str, model: dict | None = None
+) -> List[dict] | None:
+    """Multimodal content for text plus the images it names (blocking I/O).
+
+    Returns None when text names no image.
+    """
+    found = find_referenced_images(images_dir, text)
+    if not found:
+        return None
+    max_edge, image_format = image_settings(model)
+    content: List[dict] = [{"type": "text", "text": text}]
+    for path in found:
+        try:
+            url = image_data_url(path, max_edge, image_format)
+        except OSError:
+            continue
+        content.append({"type": "image_url", "image_url": {"url": url}})
+    return content
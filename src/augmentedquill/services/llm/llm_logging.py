@@ -6,21 +6,393 @@
 # (at your option) any later version.
 # Purpose: Defines the llm logging unit so this responsibility stays isolated, testable, and easy to evolve.
 
+"""In-memory log of LLM communication for the debug view.
+
+Entries hold whole request bodies (chapter texts, inline images) and streamed
+responses, so the log is bounded by the serialized size of its entries rather
+than their count. When the budget is exceeded the oldest finished entries are
+evicted and appended to rotating JSONL files under LOGS_DIR.
+
+Settings are read from the environment:
+- AUGQ_LLM_LOG_MAX_BYTES (default 32 MiB) kept in memory
+- AUGQ_LLM_LOG_SPILL=0 drops evicted entries instead of writing them
+- AUGQ_LLM_LOG_FILE_MAX_BYTES (default 16 MiB) per spill file
+- AUGQ_LLM_LOG_FILES (default 5) rotated spill files kept
+
+Streamed responses keep their text deltas coalesced: consecutive chunks that
+only carry text are merged into one, and response.chunk_count records how many
+chunks arrived.
+
+An entry is serialized to measure it when it is added and once more when it
+is seen finished; in between, append_stream_chunk adds the size of each chunk,
+so adding an entry never re-serializes the others.
+"""
+
 from __future__ import annotations
 
 import datetime
+import json
+import os
+import threading
+import time
 import uuid
-from typing import Any, Dict, List
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from augmentedquill.core.config import LOGS_DIR
+from augmentedquill.services.llm.llm_prompt_cache import record_prompt_cache_usage
+
+SPILL_FILE_NAME = "llm_logs.jsonl"
+
+# Entries still being filled in are measured exactly once they have a
+# timestamp_end, or after this long (e.g. an abandoned stream).
+_OPEN_GRACE_S = 600.0
+
+_TEXT_DELTA_KEYS = ("content", "reasoning_content")
+
+
+def _env_int(name: str, default: int, minimum: int = 0) -> int:
+    try:
+        return max(minimum, int(os.getenv(name, default)))
+    except ValueError:
+        return default
+
+
+def _entry_bytes(entry: Dict[str, Any]) -> int:
+    """Size of the entry as a JSONL line (ASCII-escaped, so chars == bytes)."""
+    return len(json.dumps(entry, default=str)) + 1
+
+
+class LLMLogStore:
+    """Recent LLM log entries, bounded by their total serialized size."""
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        spill_dir: Optional[Path] = None,
+        spill: Optional[bool] = None,
+        file_max_bytes: Optional[int] = None,
+        max_files: Optional[int] = None,
+    ) -> None:
+        if max_bytes is None:
+            max_bytes = _env_int("AUGQ_LLM_LOG_MAX_BYTES", 32 * 1024 * 1024)
+        if spill is None:
+            spill = os.getenv("AUGQ_LLM_LOG_SPILL", "1") not in ("0", "false", "no")
+        if file_max_bytes is None:
+            file_max_bytes = _env_int(
+                "AUGQ_LLM_LOG_FILE_MAX_BYTES", 16 * 1024 * 1024, minimum=1
+            )
+        if max_files is None:
+            max_files = _env_int("AUGQ_LLM_LOG_FILES", 5)
+        self.max_bytes = max_bytes
+        self.spill_dir = Path(spill_dir) if spill_dir is not None else None
+        self.spill = spill
+        self.file_max_bytes = file_max_bytes
+        self.max_files = max_files
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        # id -> time the entry was added, for entries that may still grow.
+        self._open: Dict[str, float] = {}
+        self._bytes = 0
+        self._evicted = 0
+        self._spilled = 0
+        self._spill_errors = 0
+        self._writer: Optional[ThreadPoolExecutor] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            return iter(list(self._entries.values()))
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        key = str(entry.get("id") or uuid.uuid4())
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._sizes.pop(key, 0)
+                del self._entries[key]
+            self._entries[key] = entry
+            self._sizes[key] = _entry_bytes(entry)
+            self._bytes += self._sizes[key]
+            if entry.get("timestamp_end") is None:
+                self._open[key] = time.monotonic()
+            self._settle_open()
+            evicted = self._trim()
+        if evicted and self.spill:
+            self._submit_spill(evicted)
+
+    def grow(self, entry_id: str, nbytes: int) -> None:
+        """Count bytes appended to an entry that is still being filled in."""
+        with self._lock:
+            if entry_id in self._open:
+                self._sizes[entry_id] += nbytes
+                self._bytes += nbytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._open.clear()
+            self._bytes = 0
+
+    def get(self, entry_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._entries.get(entry_id)
+
+    def query(
+        self,
+        *,
+        offset: int = 0,
+        limit: int = 50,
+        model_type: Optional[str] = None,
+        status: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """Return (total matches, page) for the debug API.
+
+        offset skips the newest matching entries, so offset=0 is the latest
+        page. The page itself is in chronological order.
+        """
+        with self._lock:
+            entries = list(self._entries.values())
+        matches = [e for e in entries if _matches(e, model_type, status)]
+        total = len(matches)
+        stop = max(0, total - max(0, offset))
+        page = matches[max(0, stop - max(0, limit)) : stop]
+        if fields:
+            page = [_project(e, fields) for e in page]
+        return total, page
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._settle_open()
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evicted": self._evicted,
+                "spilled": self._spilled,
+                "spill_errors": self._spill_errors,
+                "spill_dir": str(self._spill_dir()) if self.spill else None,
+            }
+
+    def flush(self, wait: bool = True) -> None:
+        """Finish pending spill writes and stop the writer thread."""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.shutdown(wait=wait)
+
+    def _settle_open(self) -> None:
+        """Measure entries that finished since the last call, once each."""
+        now = time.monotonic()
+        for key, added in list(self._open.items()):
+            entry = self._entries.get(key)
+            if entry is None:
+                del self._open[key]
+                continue
+            if entry.get("timestamp_end") is None and now - added <= _OPEN_GRACE_S:
+                continue
+            size = _entry_bytes(entry)
+            self._bytes += size - self._sizes[key]
+            self._sizes[key] = size
+            del self._open[key]
+
+    def _trim(self) -> List[Dict[str, Any]]:
+        """Evict the oldest finished entries until the byte budget is met."""
+        evicted: List[Dict[str, Any]] = []
+        if self._bytes <= self.max_bytes:
+            return evicted
+        for key in list(self._entries):
+            if self._bytes <= self.max_bytes or len(self._entries) <= 1:
+                break
+            if key in self._open:
+                continue
+            evicted.append(self._entries.pop(key))
+            self._bytes -= self._sizes.pop(key)
+            self._evicted += 1
+        return evicted
+
+    def _spill_dir(self) -> Path:
+        return self.spill_dir if self.spill_dir is not None else LOGS_DIR
+
+    def _submit_spill(self, entries: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            if self._writer is None:
+                # One thread keeps lines and rotations in order.
+                self._writer = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="augq-llm-log"
+                )
+            writer = self._writer
+        writer.submit(self._write_spill, entries)
+
+    def _write_spill(self, entries: List[Dict[str, Any]]) -> None:
+        try:
+            directory = self._spill_dir()
+            directory.mkdir(parents=True, exist_ok=True)
+            path = directory / SPILL_FILE_NAME
+            for entry in entries:
+                line = json.dumps(entry, default=str) + "\n"
+                size = path.stat().st_size if path.exists() else 0
+                if size and size + len(line) > self.file_max_bytes:
+                    self._rotate(path)
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write(line)
+                with self._lock:
+                    self._spilled += 1
+        except Exception:
+            with self._lock:
+                self._spill_errors += 1
+
+    def _rotate(self, path: Path) -> None:
+        """Shift llm_logs.jsonl -> .1 -> .2 ..., dropping the oldest file."""
+        if self.max_files <= 0:
+            path.unlink(missing_ok=True)
+            return
+        path.with_name(f"{path.name}.{self.max_files}").unlink(missing_ok=True)
+        for i in range(self.max_files - 1, 0, -1):
+            src = path.with_name(f"{path.name}.{i}")
+            if src.exists():
+                src.replace(path.with_name(f"{path.name}.{i + 1}"))
+        path.replace(path.with_name(f"{path.name}.1"))
+
+
+def _status_matches(entry: Dict[str, Any], status: str) -> bool:
+    response = entry.get("response") or {}
+    code = response.get("status_code")
+    failed = bool(response.get("error")) or (isinstance(code, int) and code >= 400)
+    status = status.strip().lower()
+    if status == "pending":
+        return entry.get("timestamp_end") is None
+    if status == "error":
+        return failed
+    if status == "ok":
+        return code is not None and not failed
+    return str(code) == status
+
+
+def _matches(
+    entry: Dict[str, Any], model_type: Optional[str], status: Optional[str]
+) -> bool:
+    if model_type and str(entry.get("model_type") or "").upper() != model_type.upper():
+        return False
+    if status and not _status_matches(entry, status):
+        return False
+    return True
+
+
+def _project(entry: Dict[str, Any], fields: Sequence[str]) -> Dict[str, Any]:
+    """Copy only the dotted paths in fields (e.g. "response.status_code")."""
+    out: Dict[str, Any] = {}
+    for path in fields:
+        parts = [p for p in path.strip().split(".") if p]
+        if not parts:
+            continue
+        value: Any = entry
+        for part in parts:
+            if not isinstance(value, dict) or part not in value:
+                break
+            value = value[part]
+        else:
+            target = out
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            target[parts[-1]] = value
+    return out
+
+
+def _text_only_choice(chunk: Any) -> Optional[Dict[str, Any]]:
+    """Return the single choice of a chunk that carries nothing but text."""
+    if not isinstance(chunk, dict) or chunk.get("usage"):
+        return None
+    choices = chunk.get("choices")
+    if not isinstance(choices, list) or len(choices) != 1:
+        return None
+    choice = choices[0]
+    if not isinstance(choice, dict):
+        return None
+    for key, value in choice.items():
+        if key == "delta":
+            if not isinstance(value, dict):
+                return None
+            for dkey, dvalue in value.items():
+                if dkey == "role":
+                    continue
+                if dkey not in _TEXT_DELTA_KEYS or not (
+                    dvalue is None or isinstance(dvalue, str)
+                ):
+                    return None
+        elif key == "text":
+            if not isinstance(value, str):
+                return None
+        elif key != "index" and value is not None:
+            # finish_reason, logprobs, tool_calls, ...
+            return None
+    return choice
+
+
+def _merge_text_chunk(last: Any, chunk: Dict[str, Any]) -> bool:
+    last_choice = _text_only_choice(last)
+    choice = _text_only_choice(chunk)
+    if last_choice is None or choice is None:
+        return False
+    if last_choice.get("index") != choice.get("index"):
+        return False
+    if ("delta" in last_choice) != ("delta" in choice):
+        return False
+    if "delta" in choice:
+        delta, last_delta = choice["delta"], last_choice["delta"]
+        role = delta.get("role")
+        if role is not None and role != last_delta.get("role"):
+            return False
+        for key in _TEXT_DELTA_KEYS:
+            if delta.get(key):
+                last_delta[key] = (last_delta.get(key) or "") + delta[key]
+    else:
+        last_choice["text"] = last_choice.get("text", "") + choice.get("text", "")
+    return True
+
+
+def append_stream_chunk(log_entry: Dict[str, Any], chunk: Any) -> None:
+    """Record one parsed SSE chunk, merging it into the previous text chunk."""
+    record_prompt_cache_usage(log_entry, chunk)
+    response = log_entry["response"]
+    response["chunk_count"] = response.get("chunk_count", 0) + 1
+    chunks = response.get("chunks")
+    if chunks is None:
+        chunks = response["chunks"] = []
+    choice = _text_only_choice(chunk)
+    if choice is not None:
+        # The text is stored in the chunks and again in full_content.
+        delta = choice.get("delta") or {}
+        texts = [delta.get(k) or "" for k in _TEXT_DELTA_KEYS] + [choice.get("text")]
+        grown = sum(2 * (len(json.dumps(t)) - 2) for t in texts if t)
+    else:
+        grown = len(json.dumps(chunk, default=str)) + 2
+    llm_logs.grow(str(log_entry.get("id")), grown)
+    if chunks and _merge_text_chunk(chunks[-1], chunk):
+        return
+    if choice is not None:
+        # Stored chunks are extended in place by later merges: copy them.
+        choice = dict(choice)
+        if "delta" in choice:
+            choice["delta"] = dict(choice["delta"])
+        chunk = {**chunk, "choices": [choice]}
+    chunks.append(chunk)
+
 
-# Global list to store LLM communication logs for the current session
-llm_logs: List[Dict[str, Any]] = []
+# Global store of LLM communication logs for the current session
+llm_logs = LLMLogStore()
 
 
 def add_llm_log(log_entry: Dict[str, Any]):
-    """Add a log entry to the global list, keeping only the last 100 entries."""
-    llm_logs.append(log_entry)
-    if len(llm_logs) > 100:
-        llm_logs.pop(0)
+    """Add a log entry, evicting old entries beyond the byte budget."""
+    llm_logs.add(log_entry)
 
 
 def create_log_entry(
@@ -44,6 +416,7 @@ def create_log_entry(
             "status_code": None,
             "streaming": streaming,
             "chunks": [] if streaming else None,
+            "chunk_count": 0 if streaming else None,
             "full_content": "" if streaming else None,
             "body": None if not streaming else None,
         },
@@ -0,0 +1,185 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the llm model catalog unit so this responsibility stays isolated, testable, and easy to evolve.
+
+"""Cached `GET {base_url}/models` responses.
+
+/openai/models, /machine/test and /machine/test_model all read the model
+list of an endpoint through model_catalog. A successful answer is kept per
+endpoint and API key for AUGQ_MODEL_LIST_TTL_S seconds (default 300, 0
+disables the cache). Once an entry is three quarters through its TTL, it is
+still served while a background fetch replaces it, so a model list in
+regular use does not go cold. Concurrent requests for the same endpoint
+share one upstream fetch. Callers pass force=True to fetch anew.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import hashlib
+import os
+import time
+from typing import Any, Dict, Tuple
+
+import httpx
+
+from augmentedquill.services.llm.llm import add_llm_log, create_log_entry
+from augmentedquill.services.llm.llm_http_pool import pooled_client
+
+# Fraction of the TTL after which an entry is refreshed in the background.
+_REFRESH_AFTER = 0.75
+
+
+def _env_int(name: str, default: int, minimum: int = 0) -> int:
+    try:
+        return max(minimum, int(os.getenv(name, default)))
+    except ValueError:
+        return default
+
+
+def _catalog_key(base_url: str, api_key: str | None) -> Tuple[str, str]:
+    digest = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+    return str(base_url or "").strip().rstrip("/"), digest
+
+
+async def _fetch(base_url: str, api_key: str | None, timeout: float) -> Tuple[int, Any]:
+    """One logged GET of the model list; raises httpx.HTTPError."""
+    url = str(base_url or "").strip().rstrip("/") + "/models"
+    headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+    log_entry = create_log_entry(url, "GET", headers, None)
+    add_llm_log(log_entry)
+    try:
+        async with pooled_client(url, httpx.Timeout(timeout)) as client:
+            response = await client.get(url, headers=headers)
+    except httpx.HTTPError as exc:
+        log_entry["timestamp_end"] = datetime.datetime.now().isoformat()
+        log_entry["response"]["error"] = str(exc)
+        raise
+    log_entry["response"]["status_code"] = response.status_code
+    log_entry["timestamp_end"] = datetime.datetime.now().isoformat()
+    try:
+        content = response.json()
+    except ValueError:
+        content = {"raw": response.text}
+    log_entry["response"]["body"] = content
+    if not response.is_success:
+        log_entry["response"]["error"] = f"HTTP {response.status_code}"
+    return response.status_code, content
+
+
+class ModelCatalog:
+    """Model lists per endpoint with TTL, shared fetches and refresh-ahead."""
+
+    def __init__(self) -> None:
+        # key -> (fetched at, status code, content)
+        self._entries: Dict[Tuple[str, str], Tuple[float, int, Any]] = {}
+        self._inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+        self._hits = 0
+        self._misses = 0
+        self._shared = 0
+        self._refreshes = 0
+
+    def _start_fetch(
+        self, key: Tuple[str, str], base_url: str, api_key: str | None, timeout: float
+    ) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            self._shared += 1
+            return task
+
+        async def fetch() -> Tuple[int, Any]:
+            status, content = await _fetch(base_url, api_key, timeout)
+            if 200 <= status < 300:
+                self._entries[key] = (time.monotonic(), status, content)
+            return status, content
+
+        task = asyncio.ensure_future(fetch())
+        self._inflight[key] = task
+
+        def done(finished: asyncio.Task) -> None:
+            if self._inflight.get(key) is finished:
+                del self._inflight[key]
+            if not finished.cancelled():
+                # Retrieve the error of unawaited background refreshes.
+                finished.exception()
+
+        task.add_done_callback(done)
+        return task
+
+    async def get(
+        self,
+        base_url: str,
+        api_key: str | None,
+        timeout_s: float = 10,
+        *,
+        force: bool = False,
+    ) -> Tuple[int, Any]:
+        """(status code, JSON content) of GET {base_url}/models.
+
+        Raises httpx.HTTPError when the endpoint cannot be reached.
+        """
+        ttl_s = _env_int("AUGQ_MODEL_LIST_TTL_S", 300)
+        key = _catalog_key(base_url, api_key)
+        timeout = float(timeout_s or 10)
+        entry = self._entries.get(key)
+        if entry is not None and not force and ttl_s:
+            age = time.monotonic() - entry[0]
+            if age < ttl_s:
+                self._hits += 1
+                if age >= ttl_s * _REFRESH_AFTER and key not in self._inflight:
+                    self._refreshes += 1
+                    self._start_fetch(key, base_url, api_key, timeout)
+                return entry[1], entry[2]
+        self._misses += 1
+        # Callers that go away must not cancel a fetch others are waiting on.
+        return await asyncio.shield(self._start_fetch(key, base_url, api_key, timeout))
+
+    def cached(self, base_url: str, api_key: str | None) -> Any | None:
+        """Content of a fresh entry without fetching, else None."""
+        ttl_s = _env_int("AUGQ_MODEL_LIST_TTL_S", 300)
+        entry = self._entries.get(_catalog_key(base_url, api_key))
+        if entry is None or not ttl_s or time.monotonic() - entry[0] >= ttl_s:
+            return None
+        return entry[2]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "in_flight": len(self._inflight),
+            "hits": self._hits,
+            "misses": self._misses,
+            "shared_fetches": self._shared,
+            "background_refreshes": self._refreshes,
+            "ttl_s": _env_int("AUGQ_MODEL_LIST_TTL_S", 300),
+        }
+
+
+model_catalog = ModelCatalog()
+
+
+def model_ids(content: Any) -> list[str]:
+    """Model ids of a /models response, in order and without duplicates."""
+    models: list[str] = []
+    if isinstance(content, dict) and isinstance(content.get("data"), list):
+        for item in content.get("data") or []:
+            if isinstance(item, dict):
+                model_id = item.get("id")
+                if isinstance(model_id, str) and model_id.strip():
+                    models.append(model_id.strip())
+    elif isinstance(content, dict) and isinstance(content.get("models"), list):
+        for item in content.get("models") or []:
+            if isinstance(item, str) and item.strip():
+                models.append(item.strip())
+            elif isinstance(item, dict):
+                model_id = item.get("id")
+                if isinstance(model_id, str) and model_id.strip():
+                    models.append(model_id.strip())
+    return list(dict.fromkeys(models))
@@ -0,0 +1,195 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the llm prompt cache unit so this responsibility stays isolated, testable, and easy to evolve.
+
+"""Prefix-cache friendly requests and prompt cache telemetry.
+
+Local backends (llama.cpp, vLLM) reuse their KV cache only for a
+byte-identical prompt prefix. A model entry in machine.json opts in with
+"prompt_cache":
+
+- "layout": only lay prompts out so that stable content comes first
+- "cache_prompt": layout plus llama.cpp's `cache_prompt: true`
+- "prompt_cache_key": layout plus a `prompt_cache_key` derived from the
+  stable prefix (OpenAI and compatible servers)
+
+Opted-in requests also ask streamed responses for usage, so that the number
+of reused prompt tokens (usage.prompt_tokens_details.cached_tokens, or
+llama.cpp's timings) ends up in the LLM log and in the per-model prefix
+reuse statistics of the debug API.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from typing import Any, Dict, List
+
+from augmentedquill.core.config import CONFIG_DIR, load_machine_config
+
+PROMPT_CACHE_MODES = ("layout", "cache_prompt", "prompt_cache_key")
+
+
+def canonical_tools(tools: List[dict]) -> List[dict]:
+    """Return tool schemas ordered by name with all object keys sorted.
+
+    Serializing the result always yields the same bytes for the same tools,
+    whatever order they were registered or built in.
+    """
+    ordered = sorted(
+        tools,
+        key=lambda t: str(((t or {}).get("function") or {}).get("name") or ""),
+    )
+    return json.loads(json.dumps(ordered, sort_keys=True))
+
+
+def find_model_entry(base_url: str, model_id: str) -> dict | None:
+    """The machine.json model entry serving model_id, preferring base_url."""
+    machine = load_machine_config(CONFIG_DIR / "machine.json") or {}
+    models = (machine.get("openai") or {}).get("models")
+    if not isinstance(models, list):
+        return None
+    base = str(base_url or "").rstrip("/")
+    fallback = None
+    for model in models:
+        if not isinstance(model, dict) or model.get("model") != model_id:
+            continue
+        if str(model.get("base_url") or "").rstrip("/") == base:
+            return model
+        fallback = fallback or model
+    return fallback
+
+
+def prompt_cache_mode(base_url: str, model_id: str) -> str | None:
+    """The configured prompt_cache mode of a model, or None when off."""
+    model = find_model_entry(base_url, model_id)
+    mode = (model or {}).get("prompt_cache")
+    return mode if mode in PROMPT_CACHE_MODES else None
+
+
+def model_prompt_cache_mode(chosen: dict | None) -> str | None:
+    mode = (chosen or {}).get("prompt_cache")
+    return mode if mode in PROMPT_CACHE_MODES else None
+
+
+def _stable_prefix(body: Dict[str, Any]) -> str:
+    """The part of a request expected to repeat: model, tools, system text."""
+    messages = body.get("messages")
+    system = []
+    if isinstance(messages, list):
+        for message in messages:
+            if not isinstance(message, dict) or message.get("role") != "system":
+                break
+            system.append(message.get("content"))
+    return json.dumps(
+        [body.get("model"), body.get("tools"), system],
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+
+
+def apply_prompt_cache_hints(
+    body: Dict[str, Any], *, base_url: str, model_id: str
+) -> str | None:
+    """Add the configured backend hints to a request body; return the mode."""
+    mode = prompt_cache_mode(base_url, model_id)
+    if mode is None:
+        return None
+    if mode == "cache_prompt":
+        body["cache_prompt"] = True
+    elif mode == "prompt_cache_key":
+        digest = hashlib.sha256(_stable_prefix(body).encode("utf-8")).hexdigest()
+        body["prompt_cache_key"] = f"augq-{digest[:32]}"
+    if body.get("stream"):
+        body["stream_options"] = {"include_usage": True}
+    return mode
+
+
+def extract_prompt_cache_usage(payload: Any) -> Dict[str, int] | None:
+    """Read prompt and cached token counts from a response body or chunk."""
+    if not isinstance(payload, dict):
+        return None
+    usage = payload.get("usage")
+    if isinstance(usage, dict) and isinstance(usage.get("prompt_tokens"), int):
+        details = usage.get("prompt_tokens_details") or {}
+        cached = details.get("cached_tokens") if isinstance(details, dict) else None
+        return {
+            "prompt_tokens": usage["prompt_tokens"],
+            "cached_tokens": cached if isinstance(cached, int) else 0,
+        }
+    timings = payload.get("timings")
+    if isinstance(timings, dict) and isinstance(timings.get("prompt_n"), int):
+        # llama.cpp: prompt_n tokens were evaluated, cache_n came from the cache.
+        cached = timings.get("cache_n")
+        cached = cached if isinstance(cached, int) else 0
+        return {
+            "prompt_tokens": timings["prompt_n"] + cached,
+            "cached_tokens": cached,
+        }
+    return None
+
+
+class PromptCacheStats:
+    """Prompt and reused prompt tokens per model."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._models: Dict[str, Dict[str, int]] = {}
+
+    def record(
+        self,
+        model: str,
+        usage: Dict[str, int],
+        previous: Dict[str, int] | None = None,
+    ) -> None:
+        """Count usage; previous is what the same request reported before."""
+        with self._lock:
+            stats = self._models.setdefault(
+                model, {"requests": 0, "prompt_tokens": 0, "cached_tokens": 0}
+            )
+            if previous is None:
+                stats["requests"] += 1
+            else:
+                stats["prompt_tokens"] -= previous["prompt_tokens"]
+                stats["cached_tokens"] -= previous["cached_tokens"]
+            stats["prompt_tokens"] += usage["prompt_tokens"]
+            stats["cached_tokens"] += usage["cached_tokens"]
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                model: {
+                    **stats,
+                    "reuse_rate": (
+                        round(stats["cached_tokens"] / stats["prompt_tokens"], 4)
+                        if stats["prompt_tokens"]
+                        else None
+                    ),
+                }
+                for model, stats in self._models.items()
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+
+
+prompt_cache_stats = PromptCacheStats()
+
+
+def record_prompt_cache_usage(log_entry: Dict[str, Any], payload: Any) -> None:
+    """Store usage found in payload on the log entry and in the statistics."""
+    usage = extract_prompt_cache_usage(payload)
+    if usage is None:
+        return
+    response = log_entry["response"]
+    previous = response.get("prompt_cache")
+    response["prompt_cache"] = usage
+    body = (log_entry.get("request") or {}).get("body")
+    model = str((body or {}).get("model") or "") if isinstance(body, dict) else ""
+    prompt_cache_stats.record(model, usage, previous)
@@ -0,0 +1,191 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the llm response cache unit so this responsibility stays isolated, testable, and easy to evolve.
+
+"""Opt-in, content-addressed cache of LLM responses on disk.
+
+Enabled with AUGQ_LLM_RESPONSE_CACHE=1. Only deterministic requests are
+cached: temperature 0, or callers that pass cacheable=True (summaries of
+unchanged text, image descriptions, capability probes). The key is a hash of
+the endpoint, model id, messages, tools and sampling parameters; each
+response is one JSON file under data/cache/llm_responses/.
+
+Settings are read from the environment:
+- AUGQ_LLM_RESPONSE_CACHE_MAX_BYTES (default 64 MiB) before the least
+  recently used responses are deleted
+- AUGQ_LLM_RESPONSE_CACHE_TTL_S (default 7 days) after which a response is
+  stale
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from augmentedquill.core.config import DATA_DIR
+
+CACHE_DIR = DATA_DIR / "cache" / "llm_responses"
+
+
+def _env_int(name: str, default: int, minimum: int = 0) -> int:
+    try:
+        return max(minimum, int(os.getenv(name, default)))
+    except ValueError:
+        return default
+
+
+def response_cache_enabled() -> bool:
+    return os.getenv("AUGQ_LLM_RESPONSE_CACHE", "0") in ("1", "true", "yes", "on")
+
+
+def response_cache_key(kind: str, **request: Any) -> str:
+    """Hash of a request; kind separates e.g. streamed from complete results."""
+    raw = json.dumps(
+        [kind, request], sort_keys=True, ensure_ascii=False, default=str
+    ).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+class ResponseCache:
+    """Responses stored as files, bounded by total size and age."""
+
+    def __init__(
+        self,
+        directory: Path,
+        max_bytes: Optional[int] = None,
+        ttl_s: Optional[float] = None,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = (
+            max_bytes
+            if max_bytes is not None
+            else _env_int("AUGQ_LLM_RESPONSE_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+        )
+        self.ttl_s = (
+            ttl_s
+            if ttl_s is not None
+            else _env_int("AUGQ_LLM_RESPONSE_CACHE_TTL_S", 7 * 24 * 3600)
+        )
+        self._lock = threading.Lock()
+        # key -> (size, created), least recently used first.
+        self._index: "OrderedDict[str, Tuple[int, float]] | None" = None
+        self._bytes = 0
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "expired": 0,
+            "evicted": 0,
+        }
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _load_index(self) -> "OrderedDict[str, Tuple[int, float]]":
+        if self._index is None:
+            found = []
+            try:
+                for path in self.directory.glob("*.json"):
+                    try:
+                        stat = path.stat()
+                    except OSError:
+                        continue
+                    found.append(
+                        (stat.st_atime, path.stem, stat.st_size, stat.st_mtime)
+                    )
+            except OSError:
+                pass
+            found.sort()
+            self._index = OrderedDict(
+                (key, (size, created)) for _, key, size, created in found
+            )
+            self._bytes = sum(size for size, _ in self._index.values())
+        return self._index
+
+    def _drop(self, key: str) -> None:
+        size, _ = self._index.pop(key)
+        self._bytes -= size
+        self._path(key).unlink(missing_ok=True)
+
+    def get(self, key: str) -> Any:
+        """Return the cached value, or None on a miss."""
+        with self._lock:
+            index = self._load_index()
+            meta = index.get(key)
+            if meta is not None and time.time() - meta[1] > self.ttl_s:
+                self._drop(key)
+                self._counters["expired"] += 1
+                meta = None
+            if meta is None:
+                self._counters["misses"] += 1
+                return None
+            try:
+                value = json.loads(self._path(key).read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self._drop(key)
+                self._counters["misses"] += 1
+                return None
+            index.move_to_end(key)
+            self._counters["hits"] += 1
+        # Keep the order across restarts, where the index is rebuilt by atime.
+        try:
+            os.utime(self._path(key), (time.time(), meta[1]))
+        except OSError:
+            pass
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        payload = json.dumps(value, ensure_ascii=False)
+        size = len(payload.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            index = self._load_index()
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self._path(key)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(payload, encoding="utf-8")
+            os.replace(tmp, path)
+            if key in index:
+                self._bytes -= index.pop(key)[0]
+            index[key] = (size, time.time())
+            self._bytes += size
+            self._counters["stores"] += 1
+            while self._bytes > self.max_bytes and len(index) > 1:
+                self._drop(next(iter(index)))
+                self._counters["evicted"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            index = self._load_index()
+            for key in list(index):
+                self._drop(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            index = self._load_index()
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                "enabled": response_cache_enabled(),
+                "entries": len(index),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_s": self.ttl_s,
+                **self._counters,
+                "hit_rate": (
+                    round(self._counters["hits"] / lookups, 4) if lookups else None
+                ),
+            }
+
+
+response_cache = ResponseCache(CACHE_DIR)
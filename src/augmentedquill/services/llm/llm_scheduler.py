@@ -0,0 +1,258 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the llm scheduler unit so this responsibility stays isolated, testable, and easy to evolve.
+
+"""Priority-aware admission of upstream LLM requests per endpoint.
+
+Every request through the llm facade takes a slot of its endpoint (base_url)
+first. An endpoint runs at most max_in_flight requests at a time: the
+smallest `max_in_flight` among the machine.json models using it, else
+AUGQ_LLM_MAX_IN_FLIGHT (default 4). Waiting requests are admitted by
+priority class, interactive > suggest > background, first come first served
+within a class. A request gains one class for every
+AUGQ_LLM_PRIORITY_AGING_S (default 30) it waits, so background work is
+delayed but never starved.
+
+Requests that only matter until the user asks again (e.g. autocomplete for a
+chapter) run under supersede_previous(key): a newer request with the same
+key makes the older one raise RequestSuperseded, whether it is still queued
+or already streaming.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import os
+import time
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Hashable, Iterator, List, Set
+
+from augmentedquill.core.config import CONFIG_DIR, load_machine_config
+
+PRIORITIES = ("interactive", "suggest", "background")
+
+
+class RequestSuperseded(Exception):
+    """A newer request with the same key replaced this one."""
+
+
+class Ticket:
+    """Marks the requests made on behalf of one supersedable operation."""
+
+    def __init__(self, key: Hashable) -> None:
+        self.key = key
+        self.superseded = False
+        self._waiting: Set[asyncio.Future] = set()
+
+    def check(self) -> None:
+        if self.superseded:
+            raise RequestSuperseded(f"superseded: {self.key!r}")
+
+    def supersede(self) -> None:
+        self.superseded = True
+        for future in self._waiting:
+            if not future.done():
+                future.set_exception(RequestSuperseded(f"superseded: {self.key!r}"))
+
+
+def _env_int(name: str, default: int, minimum: int = 0) -> int:
+    try:
+        return max(minimum, int(os.getenv(name, default)))
+    except ValueError:
+        return default
+
+
+def _endpoint(base_url: str) -> str:
+    return str(base_url or "").rstrip("/")
+
+
+def endpoint_limit(base_url: str) -> int:
+    """Max in-flight requests for an endpoint."""
+    machine = load_machine_config(CONFIG_DIR / "machine.json") or {}
+    models = (machine.get("openai") or {}).get("models")
+    limits = [
+        model["max_in_flight"]
+        for model in (models if isinstance(models, list) else [])
+        if isinstance(model, dict)
+        and _endpoint(model.get("base_url")) == _endpoint(base_url)
+        and isinstance(model.get("max_in_flight"), int)
+        and model["max_in_flight"] > 0
+    ]
+    if limits:
+        return min(limits)
+    return _env_int("AUGQ_LLM_MAX_IN_FLIGHT", 4, 1)
+
+
+@dataclass
+class _Waiter:
+    priority: int
+    seq: int
+    enqueued: float
+    future: asyncio.Future
+
+
+@dataclass
+class _ClassStats:
+    served: int = 0
+    superseded: int = 0
+    wait_total_s: float = 0.0
+    wait_max_s: float = 0.0
+
+
+class EndpointScheduler:
+    """Slots of one endpoint on one event loop."""
+
+    def __init__(self, endpoint: str, max_in_flight: int) -> None:
+        self.endpoint = endpoint
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._stats = {name: _ClassStats() for name in PRIORITIES}
+
+    def _rank(self, waiter: _Waiter, now: float) -> tuple:
+        aging_s = _env_int("AUGQ_LLM_PRIORITY_AGING_S", 30)
+        promoted = int((now - waiter.enqueued) / aging_s) if aging_s else 0
+        return (max(0, waiter.priority - promoted), waiter.seq)
+
+    def _admit(self) -> None:
+        now = time.monotonic()
+        while self.in_flight < self.max_in_flight and self._waiters:
+            waiter = min(self._waiters, key=lambda w: self._rank(w, now))
+            self._waiters.remove(waiter)
+            if waiter.future.done():
+                continue
+            self.in_flight += 1
+            waiter.future.set_result(None)
+
+    async def acquire(self, priority: str, ticket: Ticket | None = None) -> None:
+        stats = self._stats[priority]
+        if ticket is not None:
+            ticket.check()
+        self.max_in_flight = endpoint_limit(self.endpoint)
+        self._admit()
+        start = time.monotonic()
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            waiter = _Waiter(PRIORITIES.index(priority), next(self._seq), start, future)
+            self._waiters.append(waiter)
+            if ticket is not None:
+                ticket._waiting.add(future)
+            try:
+                await future
+            except BaseException as exc:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                elif (
+                    future.done() and not future.cancelled() and not future.exception()
+                ):
+                    # Admitted, but cancelled before the caller got the slot.
+                    self.release()
+                if isinstance(exc, RequestSuperseded):
+                    self.note_superseded(priority)
+                raise
+            finally:
+                if ticket is not None:
+                    ticket._waiting.discard(future)
+        waited = time.monotonic() - start
+        stats.served += 1
+        stats.wait_total_s += waited
+        stats.wait_max_s = max(stats.wait_max_s, waited)
+
+    def note_superseded(self, priority: str) -> None:
+        self._stats[priority].superseded += 1
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._admit()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "classes": {
+                name: {
+                    "queued": sum(
+                        1 for w in self._waiters if w.priority == PRIORITIES.index(name)
+                    ),
+                    "served": stats.served,
+                    "superseded": stats.superseded,
+                    "avg_wait_ms": (
+                        round(stats.wait_total_s / stats.served * 1000, 1)
+                        if stats.served
+                        else None
+                    ),
+                    "max_wait_ms": round(stats.wait_max_s * 1000, 1),
+                }
+                for name, stats in self._stats.items()
+            },
+        }
+
+
+_schedulers: (
+    "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, EndpointScheduler]]"
+) = weakref.WeakKeyDictionary()
+_tickets: (
+    "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, Ticket]]"
+) = weakref.WeakKeyDictionary()
+
+
+def endpoint_scheduler(base_url: str) -> EndpointScheduler:
+    """The scheduler of base_url on the running event loop."""
+    per_loop = _schedulers.setdefault(asyncio.get_running_loop(), {})
+    key = _endpoint(base_url)
+    scheduler = per_loop.get(key)
+    if scheduler is None:
+        scheduler = EndpointScheduler(key, endpoint_limit(key))
+        per_loop[key] = scheduler
+    return scheduler
+
+
+@asynccontextmanager
+async def upstream_slot(
+    base_url: str, priority: str = "interactive", ticket: Ticket | None = None
+) -> AsyncIterator[None]:
+    """Hold one in-flight slot of base_url for the duration of the block."""
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown request priority: {priority!r}")
+    scheduler = endpoint_scheduler(base_url)
+    await scheduler.acquire(priority, ticket)
+    try:
+        yield
+    except RequestSuperseded:
+        scheduler.note_superseded(priority)
+        raise
+    finally:
+        scheduler.release()
+
+
+@contextmanager
+def supersede_previous(key: Hashable) -> Iterator[Ticket]:
+    """Claim key for the block, superseding whoever held it before."""
+    per_loop = _tickets.setdefault(asyncio.get_running_loop(), {})
+    ticket = Ticket(key)
+    previous = per_loop.get(key)
+    per_loop[key] = ticket
+    if previous is not None:
+        previous.supersede()
+    try:
+        yield ticket
+    finally:
+        if per_loop.get(key) is ticket:
+            del per_loop[key]
+
+
+def scheduler_stats() -> Dict[str, Dict[str, Any]]:
+    """Queue depth and wait times per endpoint on the running event loop."""
+    per_loop = _schedulers.get(asyncio.get_running_loop(), {})
+    return {endpoint: s.stats() for endpoint, s in sorted(per_loop.items())}
@@ -0,0 +1,195 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the llm stream buffer unit so this responsibility stays isolated, testable, and easy to evolve.
+
+"""Resumable streams: generation decoupled from delivery.
+
+A request with `resumable: true` runs its generation in a background task
+that appends every event to a StreamBuffer under the generation id. The
+response, and any later GET /api/v1/generations/{id}/stream, replay the
+buffer as server-sent events with `id: <seq>`; a client that lost its
+connection reconnects with the Last-Event-ID header and continues after that
+event. A dropped connection does not stop the generation; DELETE
+/api/v1/generations/{id} still does.
+
+Settings are read from the environment:
+- AUGQ_STREAM_BUFFER_MEMORY_BYTES (default 256 KiB) of events kept in
+  memory per stream before they are appended to a file under
+  data/cache/streams/
+- AUGQ_STREAM_BUFFER_TTL_S (default 600) a finished stream stays resumable
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+from augmentedquill.core.config import DATA_DIR
+from augmentedquill.utils.storage_io import run_metadata_io
+
+SPILL_DIR = DATA_DIR / "cache" / "streams"
+
+
+def _env_int(name: str, default: int, minimum: int = 0) -> int:
+    try:
+        return max(minimum, int(os.getenv(name, default)))
+    except ValueError:
+        return default
+
+
+class StreamBuffer:
+    """Append-only, sequence-numbered events of one generation."""
+
+    def __init__(self, generation_id: str) -> None:
+        self.id = generation_id
+        self.finished_at: float | None = None
+        self._events: List[Tuple[int, str]] = []
+        self._memory_bytes = 0
+        self._next_seq = 0
+        # Events with a lower seq than this are only in the spill file.
+        self._spilled_before = 0
+        self._changed = asyncio.Event()
+        self._spill_lock = asyncio.Lock()
+
+    @property
+    def spill_path(self):
+        return SPILL_DIR / f"{self.id}.jsonl"
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def append(self, event: Dict[str, Any]) -> int:
+        seq = self._next_seq
+        self._next_seq += 1
+        data = json.dumps(event)
+        self._events.append((seq, data))
+        self._memory_bytes += len(data)
+        if self._memory_bytes > _env_int("AUGQ_STREAM_BUFFER_MEMORY_BYTES", 256 << 10):
+            await self._spill()
+        self._notify()
+        return seq
+
+    async def _spill(self) -> None:
+        async with self._spill_lock:
+            events, self._events = self._events, []
+            self._memory_bytes = 0
+            if not events:
+                return
+            lines = "".join(json.dumps([seq, data]) + "\n" for seq, data in events)
+            await run_metadata_io(_append_lines, self.spill_path, lines)
+            self._spilled_before = events[-1][0] + 1
+
+    def finish(self) -> None:
+        self.finished_at = time.time()
+        self._notify()
+
+    async def _read_spilled(self, after: int) -> List[Tuple[int, str]]:
+        async with self._spill_lock:
+            text = await run_metadata_io(_read_text, self.spill_path)
+        events = [tuple(json.loads(line)) for line in text.splitlines() if line]
+        return [(seq, data) for seq, data in events if seq > after]
+
+    async def events(self, after: int = -1) -> AsyncIterator[Tuple[int, str]]:
+        """Yield (seq, json data) after the given seq until the stream ends."""
+        while True:
+            changed = self._changed
+            if after + 1 < self._spilled_before:
+                for seq, data in await self._read_spilled(after):
+                    yield seq, data
+                    after = seq
+                continue
+            pending = [(s, d) for s, d in self._events if s > after]
+            for seq, data in pending:
+                yield seq, data
+                after = seq
+            if pending:
+                continue
+            if self.finished:
+                return
+            await changed.wait()
+
+    def discard(self) -> None:
+        try:
+            self.spill_path.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+def _append_lines(path, lines: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(lines)
+
+
+def _read_text(path) -> str:
+    try:
+        return path.read_text(encoding="utf-8")
+    except OSError:
+        return ""
+
+
+_buffers: Dict[str, StreamBuffer] = {}
+_pumps: Dict[str, asyncio.Task] = {}
+
+
+def _expire() -> None:
+    ttl_s = _env_int("AUGQ_STREAM_BUFFER_TTL_S", 600)
+    now = time.time()
+    for buffer in list(_buffers.values()):
+        if buffer.finished and now - buffer.finished_at > ttl_s:
+            del _buffers[buffer.id]
+            buffer.discard()
+
+
+def get_stream_buffer(generation_id: str) -> StreamBuffer | None:
+    _expire()
+    return _buffers.get(generation_id)
+
+
+def start_buffered(
+    generation_id: str, events: AsyncIterator[Dict[str, Any]]
+) -> StreamBuffer:
+    """Run events into a new buffer in the background; ValueError if taken."""
+    _expire()
+    if generation_id in _buffers:
+        raise ValueError(f"Generation {generation_id} is already running")
+    buffer = StreamBuffer(generation_id)
+    _buffers[generation_id] = buffer
+
+    async def pump() -> None:
+        try:
+            async for event in events:
+                await buffer.append(event)
+        except Exception as exc:
+            await buffer.append({"error": str(exc)})
+        finally:
+            buffer.finish()
+            _pumps.pop(generation_id, None)
+
+    _pumps[generation_id] = asyncio.create_task(pump())
+    return buffer
+
+
+async def sse_from_buffer(
+    buffer: StreamBuffer, last_event_id: Any = None
+) -> AsyncIterator[str]:
+    """Server-sent events of a buffer, resuming after last_event_id."""
+    try:
+        after = int(last_event_id)
+    except (TypeError, ValueError):
+        after = -1
+    async for seq, data in buffer.events(after):
+        yield f"id: {seq}\ndata: {data}\n\n"
+    yield "data: [DONE]\n\n"
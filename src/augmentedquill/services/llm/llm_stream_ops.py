@@ -12,11 +12,27 @@ from typing import Any, Dict, AsyncIterator
 import datetime
 import json as _json
 
-import httpx
 
+from augmentedquill.services.llm.llm_capabilities import capabilities, learn
+from augmentedquill.services.llm.llm_http_pool import pooled_client
+from augmentedquill.services.llm.llm_logging import append_stream_chunk
+from augmentedquill.services.llm.llm_prompt_cache import (
+    apply_prompt_cache_hints,
+    record_prompt_cache_usage,
+)
 from augmentedquill.utils.stream_helpers import ChannelFilter
 from augmentedquill.utils.llm_parsing import parse_tool_calls_from_content
 
+# Optional request fields a backend may reject; they are dropped and learned.
+_OPTIONAL_FIELDS = ("tool_choice", "stream_options")
+
+
+def _rejected_field(body: Dict[str, Any], error_text: str) -> str | None:
+    for field in _OPTIONAL_FIELDS:
+        if field in body and field in error_text:
+            return field
+    return None
+
 
 def _normalize_tool_name(name: str) -> str:
     cleaned = name.strip()
@@ -55,13 +71,27 @@ async def unified_chat_stream(
 
     if supports_function_calling and tools and tool_choice != "none":
         body["tools"] = tools
-        if tool_choice:
+        if (
+            tool_choice
+            and capabilities.get(base_url, model_id, "tool_choice") is not False
+        ):
             body["tool_choice"] = tool_choice
+    apply_prompt_cache_hints(body, base_url=base_url, model_id=model_id)
+    if capabilities.get(base_url, model_id, "stream_options") is False:
+        body.pop("stream_options", None)
 
     attempts = 2 if supports_function_calling and tools else 1
-
-    for attempt in range(attempts):
+    # Models known to reject native tools go straight to the text protocol.
+    attempt = (
+        1
+        if attempts == 2
+        and capabilities.get(base_url, model_id, "native_tools") is False
+        else 0
+    )
+
+    while attempt < attempts:
         is_fallback = attempt == 1
+        attempt += 1
         channel_filter = ChannelFilter()
         sent_tool_call_ids = set()
         full_content = ""
@@ -105,9 +135,7 @@ async def unified_chat_stream(
                 )
 
         try:
-            async with httpx.AsyncClient(
-                timeout=httpx.Timeout(float(timeout_s or 60))
-            ) as client:
+            async with pooled_client(url, float(timeout_s or 60)) as client:
                 async with client.stream(
                     "POST", url, headers=headers, json=current_body
                 ) as resp:
@@ -116,12 +144,21 @@ async def unified_chat_stream(
 
                     if resp.status_code >= 400:
                         error_content = await resp.aread()
-                        if not is_fallback and supports_function_calling:
-                            err_text_check = error_content.decode(
-                                "utf-8", errors="ignore"
-                            )
-                            if "tool choice requires" in err_text_check:
-                                continue
+                        err_text_check = error_content.decode("utf-8", errors="ignore")
+                        if (
+                            not is_fallback
+                            and supports_function_calling
+                            and "tool choice requires" in err_text_check
+                        ):
+                            await learn(base_url, model_id, "native_tools", False)
+                            continue
+                        rejected = _rejected_field(current_body, err_text_check)
+                        if rejected and resp.status_code in (400, 422):
+                            # Retry the same attempt without the field.
+                            await learn(base_url, model_id, rejected, False)
+                            body.pop(rejected, None)
+                            attempt -= 1
+                            continue
 
                         if log_entry:
                             log_entry["timestamp_end"] = (
@@ -147,12 +184,22 @@ async def unified_chat_stream(
                             }
                         return
 
+                    for field in ("tools", *_OPTIONAL_FIELDS):
+                        if field in current_body:
+                            await learn(
+                                base_url,
+                                model_id,
+                                "native_tools" if field == "tools" else field,
+                                True,
+                            )
+
                     content_type = resp.headers.get("content-type", "")
                     if "text/event-stream" not in content_type:
                         try:
                             response_data = await resp.json()
                             if log_entry:
                                 log_entry["response"]["body"] = response_data
+                                record_prompt_cache_usage(log_entry, response_data)
                                 log_entry["timestamp_end"] = (
                                     datetime.datetime.now().isoformat()
                                 )
@@ -277,7 +324,7 @@ async def unified_chat_stream(
                             try:
                                 chunk = _json.loads(data_str)
                                 if log_entry:
-                                    log_entry["response"]["chunks"].append(chunk)
+                                    append_stream_chunk(log_entry, chunk)
 
                                 choices = chunk.get("choices", [])
                                 if not choices:
@@ -286,6 +333,9 @@ async def unified_chat_stream(
 
                                 reasoning = delta.get("reasoning_content")
                                 if reasoning:
+                                    await learn(
+                                        base_url, model_id, "reasoning_content", True
+                                    )
                                     yield {"thinking": reasoning}
 
                                 content = delta.get("content")
@@ -379,3 +429,6 @@ async def unified_chat_stream(
                 log_entry["response"]["error"] = str(e)
             yield {"error": "Connection error", "message": str(e)}
             break
+
+    if log_entry and log_entry.get("timestamp_end") is None:
+        log_entry["timestamp_end"] = datetime.datetime.now().isoformat()
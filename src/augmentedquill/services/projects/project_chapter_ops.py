@@ -17,14 +17,19 @@ from augmentedquill.services.chapters.chapter_helpers import (
     _get_chapter_metadata_entry,
     _scan_chapter_files,
 )
+from augmentedquill.services.chapters.chapter_index import get_chapter_index
+from augmentedquill.services.chapters.chapter_matching import match_chapter_entries
+from augmentedquill.utils.storage_io import serialized_write
 
 
+@serialized_write
 def write_chapter_content_in_project(chap_id: int, content: str) -> None:
     """Write content to a chapter by its ID."""
     _, path, _ = _chapter_by_id_or_404(chap_id)
     path.write_text(content, encoding="utf-8")
 
 
+@serialized_write(scope="active")
 def update_chapter_metadata_in_project(
     active: Path,
     chap_id: int,
@@ -88,6 +93,7 @@ def update_chapter_metadata_in_project(
         )
 
 
+@serialized_write(scope="active")
 def add_chapter_conflict_in_project(
     active: Path, chap_id: int, description: str, resolution: str, index: int = None
 ) -> None:
@@ -112,6 +118,7 @@ def add_chapter_conflict_in_project(
     save_story_config(story_path, story)
 
 
+@serialized_write(scope="active")
 def update_chapter_conflict_in_project(
     active: Path,
     chap_id: int,
@@ -143,6 +150,7 @@ def update_chapter_conflict_in_project(
     save_story_config(story_path, story)
 
 
+@serialized_write(scope="active")
 def remove_chapter_conflict_in_project(active: Path, chap_id: int, index: int) -> None:
     """Remove a conflict from a chapter by its index."""
     _, path, _ = _chapter_by_id_or_404(chap_id)
@@ -164,6 +172,7 @@ def remove_chapter_conflict_in_project(active: Path, chap_id: int, index: int) -
     save_story_config(story_path, story)
 
 
+@serialized_write(scope="active")
 def reorder_chapter_conflicts_in_project(
     active: Path, chap_id: int, new_indices: List[int]
 ) -> None:
@@ -191,6 +200,7 @@ def reorder_chapter_conflicts_in_project(
     save_story_config(story_path, story)
 
 
+@serialized_write(scope="active")
 def write_chapter_title_in_project(active: Path, chap_id: int, title: str) -> None:
     """Update the title of a chapter in the story.json across all project types."""
     _, path, _ = _chapter_by_id_or_404(chap_id)
@@ -212,12 +222,21 @@ def write_chapter_title_in_project(active: Path, chap_id: int, title: str) -> No
         raise ValueError(f"Could not find metadata entry for chapter {chap_id}")
 
 
+def _matched_entry(entries: list, files: list, chap_id: int):
+    matches = match_chapter_entries(entries, [f_p.name for _, f_p in files])
+    return next(
+        (m for (f_idx, _), m in zip(files, matches) if f_idx == chap_id and m), None
+    )
+
+
+@serialized_write(scope="active")
 def delete_chapter_in_project(active: Path, chap_id: int) -> None:
     """Delete a chapter file and remove its metadata from story.json."""
     _, path, _ = _chapter_by_id_or_404(chap_id)
     files = _scan_chapter_files()
 
     path.unlink()
+    get_chapter_index(active).refresh_directory(path.parent)
 
     story_path = active / "story.json"
     story = load_story_config(story_path) or {}
@@ -230,72 +249,13 @@ def delete_chapter_in_project(active: Path, chap_id: int) -> None:
         if book:
             book_chapters = book.get("chapters", [])
             book_files = [f for f in files if f[1].parent.parent.name == book_id]
-
-            target_id = None
-            used_ids = set()
-            for i, (f_idx, f_p) in enumerate(book_files):
-                fname = f_p.name
-                curr_match = next(
-                    (
-                        c
-                        for c in book_chapters
-                        if isinstance(c, dict)
-                        and c.get("filename") == fname
-                        and id(c) not in used_ids
-                    ),
-                    None,
-                )
-                if not curr_match and i < len(book_chapters):
-                    candidate = book_chapters[i]
-                    if id(candidate) not in used_ids:
-                        if (
-                            not isinstance(candidate, dict)
-                            or not candidate.get("filename")
-                            or candidate.get("filename") == fname
-                        ):
-                            curr_match = candidate
-
-                if curr_match:
-                    used_ids.add(id(curr_match))
-                    if f_idx == chap_id:
-                        target_id = id(curr_match)
-                        break
-
-            if target_id:
-                book["chapters"] = [c for c in book_chapters if id(c) != target_id]
+            target = _matched_entry(book_chapters, book_files, chap_id)
+            if target is not None:
+                book["chapters"] = [c for c in book_chapters if c is not target]
     else:
         chapters_data = story.get("chapters") or []
-        used_ids = set()
-        target_id = None
-        for i, (f_idx, f_p) in enumerate(files):
-            fname = f_p.name
-            curr_match = next(
-                (
-                    c
-                    for c in chapters_data
-                    if isinstance(c, dict)
-                    and c.get("filename") == fname
-                    and id(c) not in used_ids
-                ),
-                None,
-            )
-            if not curr_match and i < len(chapters_data):
-                candidate = chapters_data[i]
-                if id(candidate) not in used_ids:
-                    if (
-                        not isinstance(candidate, dict)
-                        or not candidate.get("filename")
-                        or candidate.get("filename") == fname
-                    ):
-                        curr_match = candidate
-
-            if curr_match:
-                used_ids.add(id(curr_match))
-                if f_idx == chap_id:
-                    target_id = id(curr_match)
-                    break
-
-        if target_id:
-            story["chapters"] = [c for c in chapters_data if id(c) != target_id]
+        target = _matched_entry(chapters_data, files, chap_id)
+        if target is not None:
+            story["chapters"] = [c for c in chapters_data if c is not target]
 
     save_story_config(story_path, story)
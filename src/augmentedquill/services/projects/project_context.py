@@ -0,0 +1,152 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the project context unit so this responsibility stays isolated, testable, and easy to evolve.
+
+"""
+Request-scoped view of the active project for batches of chat tool calls.
+
+One /chat/tools request can run many tools. Without shared state each one
+resolves the active project, loads story.json and builds the project overview
+again. A ProjectContext loads these lazily, once per request, and drops the
+derived data when a tool reports a mutation.
+
+Used as a context manager, it also stages writes to the active story.json (see
+core.config.StoryWriteStage). Mutating tools still call the normal service
+functions, which read back what earlier tools of the batch saved. story.json is
+written once when the batch ends.
+
+The loaders are thread-safe, so read-only tools can run them on storage
+threads (run_metadata_io) concurrently; each item is still loaded only once.
+"""
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from augmentedquill.core.config import (
+    StoryWriteStage,
+    begin_story_write_stage,
+    end_story_write_stage,
+    load_story_config,
+)
+from augmentedquill.services.chapters.chapter_helpers import _scan_chapter_files
+from augmentedquill.services.projects.project_helpers import _project_overview
+from augmentedquill.services.projects.projects import get_active_project_dir
+from augmentedquill.utils.storage_io import run_metadata_io
+
+_UNSET: Any = object()
+
+
+class ProjectContext:
+    """Lazily loaded project state shared by the tool calls of one request."""
+
+    def __init__(self) -> None:
+        self._stage: Optional[StoryWriteStage] = None
+        self._active_dir: Any = _UNSET
+        self._derived: Dict[str, Any] = {}
+        self._locks = {
+            name: threading.Lock()
+            for name in ("active_dir", "story", "overview", "chapter_files", "images")
+        }
+
+    def __enter__(self) -> "ProjectContext":
+        self._stage = begin_story_write_stage(self._story_path())
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        stage, self._stage = self._stage, None
+        if stage is not None:
+            end_story_write_stage(stage)
+
+    async def __aenter__(self) -> "ProjectContext":
+        # Resolve the active project on a storage thread, not on the loop.
+        await run_metadata_io(self.load_active_dir)
+        return self.__enter__()
+
+    async def __aexit__(self, *exc_info) -> None:
+        # Write story.json on a storage thread; the stage must still be reset
+        # in the context that began it.
+        try:
+            if self._stage is not None:
+                await run_metadata_io(self._stage.flush)
+        finally:
+            self.__exit__(*exc_info)
+
+    def _reset_derived(self) -> None:
+        # Replaced, not cleared: a load still running keeps filling the old dict.
+        self._derived = {}
+
+    def _load(self, name: str, loader: Callable[[], Any]) -> Any:
+        derived = self._derived
+        if name not in derived:
+            with self._locks[name]:
+                if name not in derived:
+                    derived[name] = loader()
+        return derived[name]
+
+    def _story_path(self) -> Optional[Path]:
+        active = self.active_dir
+        return (active / "story.json") if active else None
+
+    @property
+    def active_dir(self) -> Optional[Path]:
+        if self._active_dir is _UNSET:
+            with self._locks["active_dir"]:
+                if self._active_dir is _UNSET:
+                    self._active_dir = get_active_project_dir()
+        return self._active_dir
+
+    def load_active_dir(self) -> Optional[Path]:
+        """The active_dir property as a method, for run_metadata_io."""
+        return self.active_dir
+
+    @property
+    def story(self) -> Dict[str, Any]:
+        """The active story config. Shared by all tools: do not modify it."""
+        return self.load_story()
+
+    def load_story(self) -> Dict[str, Any]:
+        """The story property as a method, for run_metadata_io."""
+        return self._load("story", lambda: load_story_config(self._story_path()) or {})
+
+    def overview(self) -> Dict[str, Any]:
+        """The project overview as returned by get_project_overview. Read-only."""
+        return self._load("overview", _project_overview)
+
+    def overview_chapters(self) -> List[Dict[str, Any]]:
+        """Chapters of the overview, across all books for series."""
+        ov = self.overview()
+        if ov.get("project_type") == "series":
+            return [c for book in ov.get("books", []) for c in book.get("chapters", [])]
+        return ov.get("chapters", [])
+
+    def chapter_files(self) -> List[Tuple[int, Path]]:
+        return self._load("chapter_files", _scan_chapter_files)
+
+    def images(self) -> List[Dict[str, Any]]:
+        from augmentedquill.utils.image_helpers import get_project_images
+
+        return self._load("images", get_project_images)
+
+    def invalidate(self) -> None:
+        """Forget derived data after a tool changed the project."""
+        self._reset_derived()
+
+    def flush(self) -> None:
+        """Write the staged story.json now."""
+        if self._stage is not None:
+            self._stage.flush()
+
+    def project_changed(self) -> None:
+        """Flush and start over after the active project was created, switched or deleted."""
+        self.flush()
+        self._active_dir = _UNSET
+        self._reset_derived()
+        if self._stage is not None:
+            self._stage.retarget(self._story_path())
@@ -13,6 +13,11 @@ from augmentedquill.services.chapters.chapter_helpers import (
     _normalize_chapter_entry,
     _chapter_by_id_or_404,
 )
+from augmentedquill.services.chapters.chapter_matching import (
+    FALLBACK_UNFILED,
+    group_files_by_book,
+    match_chapter_entries,
+)
 
 
 def normalize_story_for_frontend(story: dict) -> dict:
@@ -159,48 +164,41 @@ def _project_overview() -> dict:
                 norm["_parent_book_id"] = bid
                 all_meta.append(norm)
 
+        files_by_book = group_files_by_book(files)
+        meta_by_book: dict = {}
+        for m in all_meta:
+            meta_by_book.setdefault(m.get("_parent_book_id"), []).append(m)
+
         id_to_meta = {}
         used_m_ids = set()
         for b in books:
             bid = b.get("id") or b.get("folder")
-            book_files = [(idx, p) for (idx, p) in files if p.parent.parent.name == bid]
-            book_meta = [m for m in all_meta if m.get("_parent_book_id") == bid]
-
-            for i, (idx, p) in enumerate(book_files):
-                fname = p.name
-                match = next(
-                    (
-                        c
-                        for c in book_meta
-                        if c.get("filename") == fname and id(c) not in used_m_ids
-                    ),
-                    None,
-                )
-                if not match and i < len(book_meta):
-                    cand = book_meta[i]
-                    if not cand.get("filename") and id(cand) not in used_m_ids:
-                        match = cand
-
+            book_files = files_by_book.get(bid, [])
+            matches = match_chapter_entries(
+                meta_by_book.get(bid, []),
+                [p.name for _, p in book_files],
+                fallback=FALLBACK_UNFILED,
+                used=used_m_ids,
+            )
+            for (idx, _), match in zip(book_files, matches):
                 if match:
-                    used_m_ids.add(id(match))
                     id_to_meta[idx] = match
 
         for b in books:
             bid = b.get("id") or b.get("folder")
             b_chapters = []
-            for vid, path in files:
-                if f"books/{bid}/" in str(path):
-                    meta = id_to_meta.get(vid, {})
-                    b_chapters.append(
-                        {
-                            "id": vid,
-                            "filename": path.name,
-                            "title": meta.get("title") or path.stem,
-                            "summary": meta.get("summary") or "",
-                            "notes": meta.get("notes") or "",
-                            "conflicts": meta.get("conflicts") or [],
-                        }
-                    )
+            for vid, path in files_by_book.get(bid, []):
+                meta = id_to_meta.get(vid, {})
+                b_chapters.append(
+                    {
+                        "id": vid,
+                        "filename": path.name,
+                        "title": meta.get("title") or path.stem,
+                        "summary": meta.get("summary") or "",
+                        "notes": meta.get("notes") or "",
+                        "conflicts": meta.get("conflicts") or [],
+                    }
+                )
             enriched_books.append(
                 {
                     "id": bid,
@@ -213,13 +211,12 @@ def _project_overview() -> dict:
     chapters_meta = [_normalize_chapter_entry(c) for c in (story.get("chapters") or [])]
     files = _scan_chapter_files()
     out: list[dict] = []
-    for idx, path in files:
-        pos = next((i for i, (cid, _) in enumerate(files) if cid == idx), None)
+    for pos, (idx, path) in enumerate(files):
         title = None
         summary = ""
         notes = ""
         conflicts = []
-        if isinstance(pos, int) and pos < len(chapters_meta):
+        if pos < len(chapters_meta):
             title = chapters_meta[pos].get("title")
             summary = chapters_meta[pos].get("summary") or ""
             notes = chapters_meta[pos].get("notes") or ""
@@ -14,8 +14,12 @@ from pathlib import Path
 from typing import Callable, Dict, List, Tuple
 
 from augmentedquill.core.config import load_story_config, save_story_config
+from augmentedquill.utils.storage_io import serialized_write
 
 
+@serialized_write(
+    scope=lambda name, projects_root, *args, **kwargs: projects_root / name
+)
 def delete_project_under_root(
     name: str,
     projects_root: Path,
@@ -106,6 +110,7 @@ def validate_project_dir_data(path: Path) -> Tuple[bool, str]:
     return True, "ok_no_chapters_dir"
 
 
+@serialized_write(scope="path")
 def initialize_project_dir_data(
     path: Path,
     project_title: str,
@@ -179,6 +184,10 @@ def list_projects_under_root(
     return items
 
 
+@serialized_write(
+    scope=lambda name, project_type, projects_root, *args, **kwargs: projects_root
+    / name
+)
 def create_project_under_root(
     name: str,
     project_type: str,
@@ -214,6 +223,9 @@ def create_project_under_root(
     return True, f"Project created: {project_path.name}", project_path
 
 
+@serialized_write(
+    scope=lambda name, projects_root, *args, **kwargs: projects_root / name
+)
 def select_project_under_root(
     name: str,
     projects_root: Path,
@@ -9,9 +9,19 @@
 from __future__ import annotations
 
 import json
+import os
+import threading
+import time
 from pathlib import Path
 from typing import Dict, List
 
+from augmentedquill.utils.json_file_cache import file_signature
+
+# How long the in-memory registry is trusted before its file is stat'ed again.
+# Writes made through this process are always visible immediately; the interval
+# only bounds how quickly edits by other processes are noticed.
+DEFAULT_REVALIDATE_INTERVAL_S = float(os.getenv("AUGQ_REGISTRY_REVALIDATE_S", "1.0"))
+
 
 def load_registry_from_path(registry_path: Path) -> Dict:
     if not registry_path.exists():
@@ -31,7 +41,7 @@ def load_registry_from_path(registry_path: Path) -> Dict:
     }
 
 
-def save_registry_to_path(registry_path: Path, current: str, recent: List[str]) -> None:
+def save_registry_to_path(registry_path: Path, current: str, recent: List[str]) -> Dict:
     registry_path.parent.mkdir(parents=True, exist_ok=True)
     seen = set()
     deduped: List[str] = []
@@ -43,6 +53,7 @@ def save_registry_to_path(registry_path: Path, current: str, recent: List[str])
     final_list = deduped[:5]
     payload = {"current": current, "recent": final_list}
     registry_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    return payload
 
 
 def set_active_project_in_registry(
@@ -74,3 +85,78 @@ def get_active_project_dir_from_registry(current_registry: Dict) -> Path | None:
         except Exception:
             pass
     return None
+
+
+class ProjectRegistry:
+    """In-memory view of projects.json with write-through persistence.
+
+    Reads are served from memory. The file is re-read only when its signature
+    (mtime, size) changes, and that check runs at most once per revalidation
+    interval, so resolving the active project on hot paths normally costs no
+    filesystem access at all.
+    """
+
+    def __init__(
+        self, revalidate_interval_s: float = DEFAULT_REVALIDATE_INTERVAL_S
+    ) -> None:
+        self._lock = threading.RLock()
+        self._revalidate_interval_s = revalidate_interval_s
+        self._path: Path | None = None
+        self._data: Dict = {"current": "", "recent": []}
+        self._active: Path | None = None
+        self._signature: tuple[int, int] | None = None
+        self._checked_at = 0.0
+
+    def load(self, registry_path: Path) -> Dict:
+        """Return a copy of the registry stored at registry_path."""
+        with self._lock:
+            self._refresh(registry_path)
+            return {
+                "current": self._data["current"],
+                "recent": list(self._data["recent"]),
+            }
+
+    def active_project_dir(self, registry_path: Path) -> Path | None:
+        with self._lock:
+            self._refresh(registry_path)
+            return self._active
+
+    def save(self, registry_path: Path, current: str, recent: List[str]) -> None:
+        """Persist the registry and update the in-memory view in one step."""
+        with self._lock:
+            payload = save_registry_to_path(registry_path, current, recent)
+            self._store(registry_path, payload, file_signature(str(registry_path)))
+
+    def invalidate(self) -> None:
+        """Force the next access to re-read the registry file."""
+        with self._lock:
+            self._path = None
+
+    def _refresh(self, registry_path: Path) -> None:
+        now = time.monotonic()
+        if (
+            self._path == registry_path
+            and now - self._checked_at < self._revalidate_interval_s
+        ):
+            return
+        signature = file_signature(str(registry_path))
+        if self._path != registry_path or signature != self._signature:
+            self._store(
+                registry_path, load_registry_from_path(registry_path), signature
+            )
+        self._checked_at = now
+
+    def _store(
+        self,
+        registry_path: Path,
+        data: Dict,
+        signature: tuple[int, int] | None,
+    ) -> None:
+        self._path = registry_path
+        self._data = {
+            "current": str(data.get("current") or ""),
+            "recent": [str(item) for item in data.get("recent") or []],
+        }
+        self._active = get_active_project_dir_from_registry(self._data)
+        self._signature = signature
+        self._checked_at = time.monotonic()
@@ -12,8 +12,10 @@ from pathlib import Path
 from typing import List
 
 from augmentedquill.core.config import load_story_config, save_story_config
+from augmentedquill.utils.storage_io import serialized_write
 
 
+@serialized_write(scope="active")
 def update_book_metadata_in_project(
     active: Path,
     book_id: str,
@@ -52,6 +54,7 @@ def read_book_content_in_project(active: Path, book_id: str) -> str:
     return content_path.read_text(encoding="utf-8")
 
 
+@serialized_write(scope="active")
 def write_book_content_in_project(active: Path, book_id: str, content: str) -> None:
     book_dir = active / "books" / book_id
     book_dir.mkdir(parents=True, exist_ok=True)
@@ -59,6 +62,7 @@ def write_book_content_in_project(active: Path, book_id: str, content: str) -> N
     content_path.write_text(content, encoding="utf-8")
 
 
+@serialized_write(scope="active")
 def update_story_metadata_in_project(
     active: Path,
     title: str = None,
@@ -99,6 +103,7 @@ def read_story_content_in_project(active: Path) -> str:
     return content_path.read_text(encoding="utf-8")
 
 
+@serialized_write(scope="active")
 def write_story_content_in_project(active: Path, content: str) -> None:
     story = load_story_config(active / "story.json") or {}
     project_type = story.get("project_type", "novel")
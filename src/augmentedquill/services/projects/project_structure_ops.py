@@ -19,12 +19,15 @@ from augmentedquill.services.chapters.chapter_helpers import (
     _normalize_chapter_entry,
     _scan_chapter_files,
 )
+from augmentedquill.services.chapters.chapter_index import get_chapter_index
+from augmentedquill.utils.storage_io import serialized_write
 
 
 def _ensure_dir(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
 
 
+@serialized_write(scope="active")
 def create_new_chapter_in_project(
     active: Path, title: str = "", book_id: str = None
 ) -> int:
@@ -89,12 +92,9 @@ def create_new_chapter_in_project(
 
         save_story_config(story_path, story)
 
-        all_files = _scan_chapter_files()
-        for virtual_id, chapter_path in all_files:
-            if chapter_path.absolute() == path.absolute():
-                return virtual_id
-
-        return 0
+        index = get_chapter_index(active)
+        index.refresh_directory(chapters_dir)
+        return index.id_for_path(path) or 0
 
     files = _scan_chapter_files()
     next_idx = files[-1][0] + 1 if files else 1
@@ -114,9 +114,11 @@ def create_new_chapter_in_project(
     story["chapters"] = chapters_data
 
     save_story_config(story_path, story)
+    get_chapter_index(active).refresh_directory(chapters_dir)
     return next_idx
 
 
+@serialized_write(scope="active")
 def create_new_book_in_project(active: Path, title: str) -> str:
     """Create a new book in a series project under active project path."""
     story_path = active / "story.json"
@@ -143,6 +145,7 @@ def create_new_book_in_project(active: Path, title: str) -> str:
     return book_id
 
 
+@serialized_write(scope="active")
 def change_project_type_in_project(active: Path, new_type: str) -> Tuple[bool, str]:
     """Convert active project to a new type in-place."""
     story_path = active / "story.json"
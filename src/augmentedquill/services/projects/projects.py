@@ -46,10 +46,8 @@ from augmentedquill.services.projects.project_chapter_ops import (
     delete_chapter_in_project,
 )
 from augmentedquill.services.projects.project_registry_ops import (
-    load_registry_from_path,
-    save_registry_to_path,
+    ProjectRegistry,
     set_active_project_in_registry,
-    get_active_project_dir_from_registry,
 )
 from augmentedquill.services.projects.project_lifecycle_ops import (
     delete_project_under_root,
@@ -99,12 +97,15 @@ def _ensure_dir(p: Path) -> None:
     p.mkdir(parents=True, exist_ok=True)
 
 
+_registry = ProjectRegistry()
+
+
 def load_registry() -> Dict:
-    return load_registry_from_path(get_registry_path())
+    return _registry.load(get_registry_path())
 
 
 def save_registry(current: str, recent: List[str]) -> None:
-    save_registry_to_path(get_registry_path(), current, recent)
+    _registry.save(get_registry_path(), current, recent)
 
 
 def set_active_project(path: Path) -> None:
@@ -138,7 +139,7 @@ def delete_all_chats(project_path: Path) -> None:
 
 
 def get_active_project_dir() -> Path | None:
-    return get_active_project_dir_from_registry(load_registry())
+    return _registry.active_project_dir(get_registry_path())
 
 
 def _require_active_project() -> Path:
@@ -26,11 +26,13 @@ from augmentedquill.utils.image_helpers import (
 from augmentedquill.services.projects.projects import (
     get_active_project_dir,
     get_projects_root,
+    get_registry_path,
     list_projects,
     load_registry,
     select_project,
 )
 from augmentedquill.services.projects.projects_api_manage_ops import normalize_registry
+from augmentedquill.utils.storage_io import run_bulk_io, serialized_write
 
 
 def list_images_response() -> JSONResponse:
@@ -103,7 +105,7 @@ async def upload_image_response(
 
     try:
         content = await file.read()
-        target_path.write_bytes(content)
+        await run_bulk_io(target_path.write_bytes, content)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save image: {e}")
 
@@ -175,12 +177,17 @@ async def import_project_response(file: UploadFile) -> JSONResponse:
     if not file.filename.endswith(".zip"):
         raise HTTPException(status_code=400, detail="File must be a ZIP archive")
 
+    content = await file.read()
+    return await run_bulk_io(_import_project_archive, content)
+
+
+def _import_project_archive(content: bytes) -> JSONResponse:
+    # Extraction needs no lock: nothing else knows the temporary directory.
     projects_root = get_projects_root()
     temp_dir = projects_root / f"temp_{uuid.uuid4()}"
     temp_dir.mkdir(exist_ok=True)
 
     try:
-        content = await file.read()
         with zipfile.ZipFile(io.BytesIO(content)) as zf:
             zf.extractall(temp_dir)
 
@@ -198,16 +205,7 @@ async def import_project_response(file: UploadFile) -> JSONResponse:
         if not proposed_name:
             proposed_name = "imported_project"
 
-        final_name = proposed_name
-        counter = 1
-        while (projects_root / final_name).exists():
-            final_name = f"{proposed_name}_{counter}"
-            counter += 1
-
-        final_path = projects_root / final_name
-        temp_dir.rename(final_path)
-
-        select_project(final_name)
+        final_name = _install_imported_project(temp_dir, proposed_name)
         reg = load_registry()
         normalized_reg = normalize_registry(reg)
         available = list_projects()
@@ -227,3 +225,18 @@ async def import_project_response(file: UploadFile) -> JSONResponse:
         if isinstance(e, HTTPException):
             raise
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@serialized_write(scope=lambda *args, **kwargs: get_registry_path())
+def _install_imported_project(temp_dir: Path, proposed_name: str) -> str:
+    """Move an extracted project to a free name and select it."""
+    projects_root = get_projects_root()
+    final_name = proposed_name
+    counter = 1
+    while (projects_root / final_name).exists():
+        final_name = f"{proposed_name}_{counter}"
+        counter += 1
+
+    temp_dir.rename(projects_root / final_name)
+    select_project(final_name)
+    return final_name
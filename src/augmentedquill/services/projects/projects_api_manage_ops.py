@@ -25,10 +25,12 @@ from augmentedquill.services.projects.projects import (
     create_project,
     delete_project,
     get_active_project_dir,
+    get_registry_path,
     list_projects,
     load_registry,
     select_project,
 )
+from augmentedquill.utils.storage_io import serialized_write
 
 
 def normalize_registry(reg: dict) -> dict:
@@ -50,6 +52,7 @@ def projects_listing_payload() -> dict:
     }
 
 
+@serialized_write(scope=lambda *args, **kwargs: get_registry_path())
 def delete_project_response(name: str) -> JSONResponse:
     ok, msg = delete_project(name)
     if not ok:
@@ -69,6 +72,7 @@ def delete_project_response(name: str) -> JSONResponse:
     )
 
 
+@serialized_write(scope=lambda *args, **kwargs: get_registry_path())
 def select_project_response(name: str) -> JSONResponse:
     ok, msg = select_project(name)
     if not ok:
@@ -123,6 +127,7 @@ def select_project_response(name: str) -> JSONResponse:
     )
 
 
+@serialized_write(scope=lambda *args, **kwargs: get_registry_path())
 def create_project_response(name: str, project_type: str) -> JSONResponse:
     ok, msg = create_project(name, project_type=project_type)
     if not ok:
@@ -143,6 +148,7 @@ def create_project_response(name: str, project_type: str) -> JSONResponse:
     )
 
 
+@serialized_write
 def convert_project_response(new_type: str) -> JSONResponse:
     if not new_type:
         raise HTTPException(status_code=400, detail="new_type is required")
@@ -163,6 +169,7 @@ def convert_project_response(new_type: str) -> JSONResponse:
     )
 
 
+@serialized_write
 def create_book_response(title: str) -> JSONResponse:
     if not title:
         raise HTTPException(status_code=400, detail="Book title is required")
@@ -184,6 +191,7 @@ def create_book_response(title: str) -> JSONResponse:
         return JSONResponse(status_code=400, content={"ok": False, "detail": str(e)})
 
 
+@serialized_write
 def delete_book_response(book_id: str) -> JSONResponse:
     if not book_id:
         raise HTTPException(status_code=400, detail="book_id is required")
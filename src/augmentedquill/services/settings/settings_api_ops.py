@@ -12,6 +12,8 @@ from pathlib import Path
 
 from augmentedquill.core.config import load_story_config, save_story_config
 from augmentedquill.services.chapters.chapter_helpers import _normalize_chapter_entry
+from augmentedquill.services.llm.llm_image_prep import IMAGE_FORMATS
+from augmentedquill.services.llm.llm_prompt_cache import PROMPT_CACHE_MODES
 
 
 def ensure_parent_dir(path: Path) -> None:
@@ -26,7 +28,7 @@ def build_story_cfg_from_payload(story: dict) -> dict:
         "project_title": (story.get("project_title") or "Untitled Project"),
         "format": (story.get("format") or "markdown"),
         "story_summary": (story.get("story_summary") or ""),
-        "tags": (story.get("tags") or ""),
+        "tags": (story.get("tags") or []),
         "chapters": normalized_chapters,
         "llm_prefs": {
             "temperature": float(story.get("llm_prefs", {}).get("temperature", 0.7)),
@@ -114,6 +116,26 @@ def clean_machine_openai_cfg_for_put(
             timeout_s_int = int(timeout_s)
         except Exception:
             timeout_s_int = 60
+        try:
+            context_length = int(model.get("context_length") or 0) or None
+        except Exception:
+            context_length = None
+        prompt_cache = model.get("prompt_cache")
+        if prompt_cache not in PROMPT_CACHE_MODES:
+            prompt_cache = None
+        try:
+            max_in_flight = int(model.get("max_in_flight") or 0) or None
+        except Exception:
+            max_in_flight = None
+        image_max_edge = model.get("image_max_edge")
+        if image_max_edge is not None:
+            try:
+                image_max_edge = max(0, int(image_max_edge))
+            except Exception:
+                image_max_edge = None
+        image_format = model.get("image_format")
+        if image_format not in IMAGE_FORMATS:
+            image_format = None
 
         cleaned_models.append(
             {
@@ -122,7 +144,12 @@ def clean_machine_openai_cfg_for_put(
                 "api_key": api_key,
                 "timeout_s": timeout_s_int,
                 "model": model_id,
+                "context_length": context_length,
+                "prompt_cache": prompt_cache,
+                "max_in_flight": max_in_flight,
                 "is_multimodal": model.get("is_multimodal"),
+                "image_max_edge": image_max_edge,
+                "image_format": image_format,
                 "supports_function_calling": model.get("supports_function_calling"),
                 "prompt_overrides": prompt_overrides,
             }
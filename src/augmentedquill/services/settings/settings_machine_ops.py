@@ -13,6 +13,8 @@ import datetime
 import httpx
 
 from augmentedquill.services.llm.llm import add_llm_log, create_log_entry
+from augmentedquill.services.llm.llm_http_pool import pooled_client
+from augmentedquill.services.llm.llm_model_catalog import model_catalog, model_ids
 
 
 def normalize_base_url(base_url: str) -> str:
@@ -38,56 +40,18 @@ def parse_connection_payload(payload: dict | None) -> tuple[str, str | None, int
 
 
 async def list_remote_models(
-    *, base_url: str, api_key: str | None, timeout_s: int
+    *, base_url: str, api_key: str | None, timeout_s: int, force: bool = False
 ) -> tuple[bool, list[str], str | None]:
-    url = normalize_base_url(base_url) + "/models"
-    headers = auth_headers(api_key)
-    log_entry = create_log_entry(url, "GET", headers, None)
-    add_llm_log(log_entry)
-
+    """Model ids of an endpoint, from the model catalog cache unless forced."""
     try:
-        timeout_obj = httpx.Timeout(float(timeout_s))
-    except Exception:
-        timeout_obj = httpx.Timeout(10.0)
-
-    try:
-        async with httpx.AsyncClient(timeout=timeout_obj) as client:
-            response = await client.get(url, headers=headers)
-            log_entry["response"]["status_code"] = response.status_code
-            log_entry["timestamp_end"] = datetime.datetime.now().isoformat()
-            if not response.is_success:
-                log_entry["response"]["error"] = f"HTTP {response.status_code}"
-                return False, [], f"HTTP {response.status_code}"
-            data = response.json()
-            log_entry["response"]["body"] = data
+        status, content = await model_catalog.get(
+            normalize_base_url(base_url), api_key, timeout_s, force=force
+        )
     except Exception as exc:
-        log_entry["timestamp_end"] = datetime.datetime.now().isoformat()
-        log_entry["response"]["error"] = str(exc)
         return False, [], str(exc)
-
-    models: list[str] = []
-    if isinstance(data, dict) and isinstance(data.get("data"), list):
-        for item in data.get("data") or []:
-            if isinstance(item, dict):
-                model_id = item.get("id")
-                if isinstance(model_id, str) and model_id.strip():
-                    models.append(model_id.strip())
-    elif isinstance(data, dict) and isinstance(data.get("models"), list):
-        for item in data.get("models") or []:
-            if isinstance(item, str) and item.strip():
-                models.append(item.strip())
-            elif isinstance(item, dict):
-                model_id = item.get("id")
-                if isinstance(model_id, str) and model_id.strip():
-                    models.append(model_id.strip())
-
-    seen: set[str] = set()
-    deduped: list[str] = []
-    for model in models:
-        if model not in seen:
-            seen.add(model)
-            deduped.append(model)
-    return True, deduped, None
+    if not 200 <= status < 300:
+        return False, [], f"HTTP {status}"
+    return True, model_ids(content), None
 
 
 async def remote_model_exists(
@@ -97,6 +61,8 @@ async def remote_model_exists(
     model_id = str(model_id or "").strip()
     if not model_id:
         return False, "Missing model_id"
+    if model_id in model_ids(model_catalog.cached(base, api_key)):
+        return True, None
 
     try:
         timeout_obj = httpx.Timeout(float(timeout_s))
@@ -106,7 +72,7 @@ async def remote_model_exists(
     headers = {"Content-Type": "application/json", **auth_headers(api_key)}
 
     try:
-        async with httpx.AsyncClient(timeout=timeout_obj) as client:
+        async with pooled_client(base, timeout_obj) as client:
             url1 = f"{base}/models/{model_id}"
             log_entry1 = create_log_entry(url1, "GET", auth_headers(api_key), None)
             add_llm_log(log_entry1)
@@ -0,0 +1,354 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the chapter summary ops unit so this responsibility stays isolated, testable, and easy to evolve.
+
+"""
+Map-reduce summarization of long chapters.
+
+A chapter that fits into one summarization chunk is summarized with a single
+request, as before. Longer chapters are split at scene and paragraph
+boundaries, the parts are summarized concurrently (at most
+AUGQ_SUMMARY_CONCURRENCY requests per endpoint), and the part summaries are
+combined into the chapter summary by a final request, which is the one that
+gets streamed. If the part summaries are themselves too long they are
+summarized again in groups first.
+
+Chunk boundaries are content-defined: besides scene breaks and the size
+limit, a chunk ends after a paragraph whose checksum hits a fixed pattern
+once the chunk is half full. An edit therefore only moves the boundaries
+next to it, and part summaries are cached by a hash of the exact request
+(model, prompt and chunk text), so re-summarizing after a small edit only
+sends the changed chunks upstream.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import weakref
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List
+
+from augmentedquill.core.config import DATA_DIR
+from augmentedquill.core.prompts import get_system_message, get_user_prompt
+from augmentedquill.services.llm import llm
+from augmentedquill.services.story.story_api_prompt_ops import (
+    estimate_tokens,
+    fit_text_tail,
+    prompt_token_budget,
+)
+from augmentedquill.utils.storage_io import run_metadata_io
+
+DEFAULT_CHUNK_TOKENS = 6000
+DEFAULT_CONCURRENCY = 4
+DEFAULT_CACHE_ENTRIES = 4096
+# Combining rounds before the part summaries are cut to fit.
+_MAX_REDUCE_ROUNDS = 4
+# A chunk ends at a paragraph whose crc32 is 0 modulo this, once half full.
+_BOUNDARY_MODULUS = 4
+
+_SCENE_BREAK_RE = re.compile(
+    r"^\s*(?:(?:\*\s*){3,}|(?:-\s*){3,}|(?:_\s*){3,}|(?:~\s*){3,}|#{1,6}(?:\s.*)?)\s*$"
+)
+_PIECE_RE = re.compile(r"[^\n]*\n*")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?…])(?=\s)")
+_WORD_RE = re.compile(r"\s*\S+|\s+")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, default)))
+    except ValueError:
+        return default
+
+
+class SummaryCache:
+    """Persistent LRU map from request hash to part summary."""
+
+    def __init__(self, path: Path, max_entries: int | None = None):
+        self.path = path
+        self.max_entries = max_entries or _env_int(
+            "AUGQ_SUMMARY_CACHE_ENTRIES", DEFAULT_CACHE_ENTRIES
+        )
+        self._entries: OrderedDict[str, str] | None = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> OrderedDict[str, str]:
+        if self._entries is None:
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                data = {}
+            self._entries = OrderedDict(
+                (k, v) for k, v in data.items() if isinstance(v, str)
+            )
+        return self._entries
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entries = self._load()
+            value = entries.get(key)
+            if value is not None:
+                entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: str) -> None:
+        with self._lock:
+            entries = self._load()
+            entries[key] = value
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+            self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty or self._entries is None:
+                return
+            payload = json.dumps(self._entries, ensure_ascii=False)
+            self._dirty = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(payload, encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = OrderedDict()
+            self._dirty = True
+
+
+summary_cache = SummaryCache(DATA_DIR / "cache" / "chapter_summary_parts.json")
+
+
+_semaphores: (
+    "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]"
+) = weakref.WeakKeyDictionary()
+
+
+def summary_concurrency() -> int:
+    """Concurrent summarization requests allowed per endpoint."""
+    return _env_int("AUGQ_SUMMARY_CONCURRENCY", DEFAULT_CONCURRENCY)
+
+
+def endpoint_semaphore(base_url: str) -> asyncio.Semaphore:
+    """Per event loop and endpoint limit for concurrent summarization requests."""
+    per_loop = _semaphores.setdefault(asyncio.get_running_loop(), {})
+    key = base_url.rstrip("/")
+    semaphore = per_loop.get(key)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(summary_concurrency())
+        per_loop[key] = semaphore
+    return semaphore
+
+
+def _split_long(piece: str, max_tokens: int) -> List[str]:
+    """Break one overlong paragraph at sentence ends, or words if need be."""
+    units: List[str] = []
+    for sentence in _SENTENCE_END_RE.split(piece):
+        if estimate_tokens(sentence) <= max_tokens:
+            units.append(sentence)
+        else:
+            units.extend(_WORD_RE.findall(sentence))
+    out: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for unit in units:
+        tokens = estimate_tokens(unit)
+        if current and current_tokens + tokens > max_tokens:
+            out.append("".join(current))
+            current, current_tokens = [], 0
+        current.append(unit)
+        current_tokens += tokens
+    if current:
+        out.append("".join(current))
+    return out
+
+
+def _pieces(text: str, max_tokens: int) -> List[str]:
+    """Split text into paragraphs (with their newlines), breaking overlong ones."""
+    pieces: List[str] = []
+    for match in _PIECE_RE.finditer(text):
+        piece = match.group(0)
+        if not piece:
+            continue
+        if estimate_tokens(piece) <= max_tokens:
+            pieces.append(piece)
+        else:
+            pieces.extend(_split_long(piece, max_tokens))
+    return pieces
+
+
+def split_chapter_text(text: str, max_tokens: int) -> List[str]:
+    """Split text into chunks of at most max_tokens at scene/paragraph breaks.
+
+    The chunks concatenate back to text exactly.
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    half = max_tokens // 2
+    for piece in _pieces(text, max_tokens):
+        tokens = estimate_tokens(piece)
+        scene_break = bool(_SCENE_BREAK_RE.match(piece.strip("\n")))
+        if current and (
+            current_tokens + tokens > max_tokens
+            or (scene_break and current_tokens >= max_tokens // 8)
+        ):
+            chunks.append("".join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += tokens
+        stripped = piece.strip()
+        if (
+            current_tokens >= half
+            and stripped
+            and zlib.crc32(stripped.encode("utf-8")) % _BOUNDARY_MODULUS == 0
+        ):
+            chunks.append("".join(current))
+            current, current_tokens = [], 0
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def chapter_text_hash(text: str) -> str:
+    """Hash of chapter text, stored as summary_hash next to its summary."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _request_key(model_id: str, messages: list[dict]) -> str:
+    raw = json.dumps([model_id, messages], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _chunk_token_limit(prepared: dict, fixed_text: str) -> int:
+    limit = _env_int("AUGQ_SUMMARY_CHUNK_TOKENS", DEFAULT_CHUNK_TOKENS)
+    budget = prompt_token_budget(
+        prepared.get("context_length"),
+        max_tokens=prepared.get("max_tokens"),
+        fixed_text=fixed_text,
+    )
+    if budget is not None:
+        limit = min(limit, budget)
+    return max(limit, 1)
+
+
+async def _summarize_parts(
+    prepared: dict, chunks: List[str], priority: str = "interactive"
+) -> List[str]:
+    """Summarize chunks concurrently, serving unchanged ones from the cache."""
+    overrides = prepared["model_overrides"]
+    system = {
+        "role": "system",
+        "content": get_system_message("chapter_summarizer", overrides),
+    }
+    semaphore = endpoint_semaphore(prepared["base_url"])
+    results: List[str] = [""] * len(chunks)
+
+    async def summarize(index: int, chunk: str) -> None:
+        messages = [
+            system,
+            {
+                "role": "user",
+                "content": get_user_prompt(
+                    "chapter_summary_part",
+                    chunk_text=chunk.strip(),
+                    user_prompt_overrides=overrides,
+                ),
+            },
+        ]
+        key = _request_key(prepared["model_id"], messages)
+        cached = summary_cache.get(key)
+        if cached is not None:
+            results[index] = cached
+            return
+        async with semaphore:
+            data = await llm.unified_chat_complete(
+                messages=messages,
+                base_url=prepared["base_url"],
+                api_key=prepared["api_key"],
+                model_id=prepared["model_id"],
+                timeout_s=prepared["timeout_s"],
+                priority=priority,
+            )
+        summary = (data.get("content") or "").strip()
+        results[index] = summary
+        if summary:
+            summary_cache.put(key, summary)
+
+    try:
+        async with asyncio.TaskGroup() as group:
+            for index, chunk in enumerate(chunks):
+                group.create_task(summarize(index, chunk))
+    finally:
+        await run_metadata_io(summary_cache.save)
+    return results
+
+
+def _combine_messages(prepared: dict, part_summaries: str) -> list[dict]:
+    overrides = prepared["model_overrides"]
+    system = {
+        "role": "system",
+        "content": get_system_message("chapter_summarizer", overrides),
+    }
+    if prepared["mode"] == "discard" or not prepared["current_summary"]:
+        user_prompt = get_user_prompt(
+            "chapter_summary_combine",
+            part_summaries=part_summaries,
+            user_prompt_overrides=overrides,
+        )
+    else:
+        user_prompt = get_user_prompt(
+            "chapter_summary_combine_update",
+            existing_summary=prepared["current_summary"],
+            part_summaries=part_summaries,
+            user_prompt_overrides=overrides,
+        )
+    return [system, {"role": "user", "content": user_prompt}]
+
+
+async def resolve_chapter_summary_messages(
+    prepared: dict, priority: str = "interactive"
+) -> list[dict]:
+    """Return the messages whose answer is the chapter summary.
+
+    prepared comes from prepare_chapter_summary_generation. Chapters within
+    one chunk keep their single-request messages; longer ones are reduced to
+    a request that combines concurrently produced part summaries, requested
+    with the given scheduler priority.
+    """
+    chapter_text = prepared["chapter_text"]
+    part_fixed = get_system_message(
+        "chapter_summarizer", prepared["model_overrides"]
+    ) + get_user_prompt(
+        "chapter_summary_part",
+        chunk_text="",
+        user_prompt_overrides=prepared["model_overrides"],
+    )
+    limit = _chunk_token_limit(prepared, part_fixed)
+    if estimate_tokens(chapter_text) <= limit:
+        return prepared["messages"]
+
+    text = chapter_text
+    for _ in range(_MAX_REDUCE_ROUNDS):
+        parts = await _summarize_parts(
+            prepared, split_chapter_text(text, limit), priority
+        )
+        text = "\n\n".join(p for p in parts if p)
+        if estimate_tokens(text) <= limit:
+            break
+    else:
+        text = fit_text_tail(text, limit)
+    return _combine_messages(prepared, text)
@@ -13,12 +13,33 @@ from typing import Any, Callable, Dict
 import jsonschema
 
 
+def validate_story_config(
+    config: Dict[str, Any],
+    path_label: str,
+    validator: jsonschema.protocols.Validator,
+) -> None:
+    """Validate a normalized story config with a precompiled schema validator.
+
+    Reports the same error jsonschema.validate would pick, without rebuilding
+    the validator for every call.
+    """
+    error = jsonschema.exceptions.best_match(validator.iter_errors(config))
+    if error is not None:
+        raise ValueError(f"Invalid story config at {path_label}: {error.message}")
+
+    if "tags" in config and not isinstance(config["tags"], list):
+        raise ValueError(
+            f"Invalid story config at {path_label}: 'tags' must be an array"
+        )
+
+
 def normalize_validate_story_config(
     *,
     merged: Dict[str, Any],
     path_label: str,
     current_schema_version: int,
-    schema_loader: Callable[[int], Dict[str, Any]],
+    validator_loader: Callable[[int], jsonschema.protocols.Validator],
+    validate: bool = True,
 ) -> Dict[str, Any]:
     metadata = merged.get("metadata")
     if not isinstance(metadata, dict):
@@ -89,17 +110,9 @@ def normalize_validate_story_config(
                         if isinstance(conflict, dict) and "resolution" not in conflict:
                             conflict["resolution"] = ""
 
-    version = merged.get("metadata", {}).get("version", current_schema_version)
-    schema = schema_loader(version)
-    try:
-        jsonschema.validate(merged, schema)
-    except jsonschema.ValidationError as exc:
-        raise ValueError(f"Invalid story config at {path_label}: {exc.message}")
-
-    if "tags" in merged and not isinstance(merged["tags"], list):
-        raise ValueError(
-            f"Invalid story config at {path_label}: 'tags' must be an array"
-        )
+    if validate:
+        version = merged.get("metadata", {}).get("version", current_schema_version)
+        validate_story_config(merged, path_label, validator_loader(version))
 
     if merged.get("project_type") == "series" and "books" in merged:
         for book in merged["books"]:
@@ -8,10 +8,12 @@
 
 from __future__ import annotations
 
-from pathlib import Path
+import re
 
 from augmentedquill.services.llm import llm
-from augmentedquill.core.config import load_machine_config
+from augmentedquill.services.llm.llm_prompt_cache import model_prompt_cache_mode
+from augmentedquill.services.llm.llm_request_helpers import find_model_in_list
+from augmentedquill.core.config import load_machine_config, CONFIG_DIR
 from augmentedquill.core.prompts import (
     get_system_message,
     get_user_prompt,
@@ -19,37 +21,295 @@ from augmentedquill.core.prompts import (
 )
 
 
-def resolve_model_runtime(payload: dict, model_type: str, base_dir: Path):
+def _model_runtime(payload: dict, model_type: str, machine_config: dict):
     base_url, api_key, model_id, timeout_s = llm.resolve_openai_credentials(
-        payload, model_type=model_type
+        payload, model_type=model_type, machine=machine_config
+    )
+    selected_model_name = llm.get_selected_model_name(
+        payload, model_type=model_type, machine=machine_config
     )
-    machine_config = load_machine_config(base_dir / "config" / "machine.json") or {}
-    selected_model_name = llm.get_selected_model_name(payload, model_type=model_type)
     model_overrides = load_model_prompt_overrides(machine_config, selected_model_name)
     return base_url, api_key, model_id, timeout_s, model_overrides
 
 
+def resolve_model_runtime(payload: dict, model_type: str):
+    """Resolve credentials, model and prompt overrides from one machine snapshot."""
+    machine_config = load_machine_config(CONFIG_DIR / "machine.json") or {}
+    return _model_runtime(payload, model_type, machine_config)
+
+
+# Room kept for the completion when the story sets no max_tokens.
+DEFAULT_COMPLETION_TOKENS = 1024
+# estimate_tokens is a heuristic; never plan for the last 10% of the window.
+_CONTEXT_SAFETY = 0.9
+# Share of the prompt budget that earlier summaries and sourcebook entries may
+# take before the chapter tail gets the rest.
+_BACKGROUND_SHARE = 0.25
+_TRUNCATION_MARKER = "[...]\n"
+# Only the end of long texts is scanned for sourcebook mentions.
+_RELEVANCE_CHARS = 20000
+
+
+def _chosen_model(payload: dict, model_type: str, machine_config: dict) -> dict | None:
+    models = (machine_config.get("openai") or {}).get("models")
+    if not (isinstance(models, list) and models):
+        return None
+    selected_model_name = llm.get_selected_model_name(
+        payload, model_type=model_type, machine=machine_config
+    )
+    return find_model_in_list(models, selected_model_name) or models[0]
+
+
+def _context_length(chosen: dict | None) -> int | None:
+    if chosen is None:
+        return None
+    try:
+        context_length = int(chosen.get("context_length") or 0)
+    except (TypeError, ValueError):
+        return None
+    return context_length if context_length > 0 else None
+
+
+def resolve_prompt_runtime(payload: dict, model_type: str):
+    """Resolve the model runtime and its prompt settings from one machine snapshot.
+
+    Returns (runtime, context_length, stable_prefix): runtime is the tuple
+    resolve_model_runtime returns; context_length is
+    openai.models[].context_length of the selected model, None when the
+    window is unknown and prompts are sent unbudgeted; stable_prefix tells
+    whether the model wants prefix-cache friendly prompts.
+    """
+    machine_config = load_machine_config(CONFIG_DIR / "machine.json") or {}
+    chosen = _chosen_model(payload, model_type, machine_config)
+    return (
+        _model_runtime(payload, model_type, machine_config),
+        _context_length(chosen),
+        model_prompt_cache_mode(chosen) is not None,
+    )
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap, tokenizer-free token estimate that errs on the high side.
+
+    ASCII text averages about four characters per token for common
+    tokenizers; other scripts are counted as one token per character.
+    """
+    if not text:
+        return 0
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def prompt_token_budget(
+    context_length: int | None, *, max_tokens: int | None, fixed_text: str
+) -> int | None:
+    """Tokens left for variable prompt content, or None when unbudgeted.
+
+    fixed_text is the prompt rendered without its variable parts; the
+    completion's max_tokens (or DEFAULT_COMPLETION_TOKENS) is reserved too.
+    """
+    if not context_length:
+        return None
+    reserve = max_tokens if isinstance(max_tokens, int) and max_tokens > 0 else None
+    budget = (
+        int(context_length * _CONTEXT_SAFETY)
+        - (reserve or DEFAULT_COMPLETION_TOKENS)
+        - estimate_tokens(fixed_text)
+    )
+    return max(budget, 0)
+
+
+def _stable_cut(text: str, lo: int, step: int) -> int | None:
+    """First paragraph start at or after lo that is an anchor, if any.
+
+    Anchors are the paragraph starts where the running token estimate from
+    the beginning of text crosses a multiple of step. They depend only on the
+    text before them, so appending to text keeps the cut (and with it the
+    prompt prefix) in place until the window has moved a whole step.
+    """
+    threshold = step
+    tokens = 0
+    start = 0
+    while True:
+        end = text.find("\n", start)
+        if end == -1:
+            return None
+        tokens += estimate_tokens(text[start : end + 1])
+        start = end + 1
+        if tokens < threshold:
+            continue
+        threshold = (tokens // step + 1) * step
+        if start >= lo:
+            return start
+
+
+def fit_text_tail(text: str, max_tokens: int, *, stable: bool = False) -> str:
+    """Return the longest tail of text within max_tokens.
+
+    The cut is moved forward to the next paragraph or word boundary and
+    marked, so the model sees where the text was shortened. With stable the
+    cut only moves in steps of a quarter of max_tokens (see _stable_cut), at
+    the price of sending up to that much less text.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    room = max_tokens - estimate_tokens(_TRUNCATION_MARKER)
+    if room <= 0:
+        return ""
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if estimate_tokens(text[mid:]) <= room:
+            hi = mid
+        else:
+            lo = mid + 1
+    window = len(text) - lo
+    anchor = _stable_cut(text, lo, max(room // 4, 1)) if stable else None
+    if anchor is not None:
+        lo = anchor
+    else:
+        for boundary in ("\n", " "):
+            cut = text.find(boundary, lo, lo + window // 4)
+            if cut != -1:
+                lo = cut + 1
+                break
+    tail = text[lo:].lstrip()
+    return _TRUNCATION_MARKER + tail if tail else ""
+
+
+def relevant_sourcebook_entries(story: dict, *texts: str) -> list[str]:
+    """Format the sourcebook entries whose name or a synonym occurs in texts.
+
+    Only the last _RELEVANCE_CHARS of each text are scanned; entries mentioned
+    closest to the end of the last text come first.
+    """
+    text = "\n".join(t[-_RELEVANCE_CHARS:] for t in texts if t)
+    sourcebook = story.get("sourcebook") if isinstance(story, dict) else None
+    if not isinstance(sourcebook, dict) or not text:
+        return []
+    ranked: list[tuple[int, str]] = []
+    for name, data in sourcebook.items():
+        if not isinstance(data, dict):
+            continue
+        terms = [name] + [s for s in data.get("synonyms") or [] if isinstance(s, str)]
+        pattern = "|".join(re.escape(t.strip()) for t in terms if t.strip())
+        if not pattern:
+            continue
+        last = None
+        for last in re.finditer(rf"\b(?:{pattern})\b", text, re.IGNORECASE):
+            pass
+        if last is None:
+            continue
+        description = str(data.get("description") or "").strip()
+        entry = f"{name}: {description}" if description else name
+        ranked.append((last.start(), entry))
+    ranked.sort(key=lambda item: item[0], reverse=True)
+    return [entry for _, entry in ranked]
+
+
+def pack_story_context(
+    *,
+    budget: int | None,
+    text: str,
+    earlier_summaries: list[str] | None = None,
+    sourcebook_entries: list[str] | None = None,
+    stable_prefix: bool = False,
+    model_overrides: dict | None = None,
+) -> tuple[str, str]:
+    """Split a token budget between background context and the text tail.
+
+    Returns (story_context, text). Without a budget the text is returned
+    whole and no background is added, so unbudgeted prompts stay unchanged.
+    Otherwise the most recent earlier chapter summaries and the given
+    sourcebook entries fill up to a quarter of the budget, and the text is
+    cut to the most recent tail that fits into the remainder. stable_prefix
+    keeps the prompt prefix reusable by a backend's prompt cache: sourcebook
+    entries are listed by name instead of by recency and the text is cut at
+    stable anchors. The section headings are the story_context_summaries and
+    story_context_reference prompts.
+    """
+    if budget is None:
+        return "", text
+
+    background_budget = int(budget * _BACKGROUND_SHARE)
+    used = 0
+    summaries: list[str] = []
+    for summary in reversed(earlier_summaries or []):
+        cost = estimate_tokens(summary) + 1
+        if used + cost > background_budget:
+            break
+        summaries.insert(0, summary)
+        used += cost
+    entries: list[str] = []
+    for entry in sourcebook_entries or []:
+        cost = estimate_tokens(entry) + 1
+        if used + cost > background_budget:
+            continue
+        entries.append(entry)
+        used += cost
+
+    if stable_prefix:
+        entries.sort()
+
+    sections = []
+    if summaries:
+        sections.append(
+            get_user_prompt(
+                "story_context_summaries",
+                summaries="\n\n".join(summaries),
+                user_prompt_overrides=model_overrides or {},
+            )
+        )
+    if entries:
+        sections.append(
+            get_user_prompt(
+                "story_context_reference",
+                entries="\n".join(entries),
+                user_prompt_overrides=model_overrides or {},
+            )
+        )
+    story_context = "".join(section + "\n\n" for section in sections)
+    tail = fit_text_tail(
+        text, budget - estimate_tokens(story_context), stable=stable_prefix
+    )
+    return story_context, tail
+
+
 def build_chapter_summary_messages(
-    *, mode: str, current_summary: str, chapter_text: str, model_overrides: dict
+    *,
+    mode: str,
+    current_summary: str,
+    chapter_text: str,
+    model_overrides: dict,
+    context_length: int | None = None,
+    max_tokens: int | None = None,
 ):
     sys_msg = {
         "role": "system",
         "content": get_system_message("chapter_summarizer", model_overrides),
     }
-    if mode == "discard" or not current_summary:
-        user_prompt = get_user_prompt(
-            "chapter_summary_new",
-            chapter_text=chapter_text,
-            user_prompt_overrides=model_overrides,
-        )
-    else:
-        user_prompt = get_user_prompt(
+
+    def render(text: str) -> str:
+        if mode == "discard" or not current_summary:
+            return get_user_prompt(
+                "chapter_summary_new",
+                chapter_text=text,
+                user_prompt_overrides=model_overrides,
+            )
+        return get_user_prompt(
             "chapter_summary_update",
             existing_summary=current_summary,
-            chapter_text=chapter_text,
+            chapter_text=text,
             user_prompt_overrides=model_overrides,
         )
-    return [sys_msg, {"role": "user", "content": user_prompt}]
+
+    budget = prompt_token_budget(
+        context_length,
+        max_tokens=max_tokens,
+        fixed_text=sys_msg["content"] + render(""),
+    )
+    _, chapter_text = pack_story_context(budget=budget, text=chapter_text)
+    return [sys_msg, {"role": "user", "content": render(chapter_text)}]
 
 
 def build_story_summary_messages(
@@ -106,19 +366,41 @@ def build_continue_chapter_messages(
     chapter_summary: str,
     existing_text: str,
     model_overrides: dict,
+    context_length: int | None = None,
+    max_tokens: int | None = None,
+    earlier_summaries: list[str] | None = None,
+    sourcebook_entries: list[str] | None = None,
+    stable_prefix: bool = False,
 ):
     sys_msg = {
         "role": "system",
         "content": get_system_message("story_continuer", model_overrides),
     }
-    user_prompt = get_user_prompt(
-        "continue_chapter",
-        chapter_title=chapter_title,
-        chapter_summary=chapter_summary,
-        existing_text=existing_text,
-        user_prompt_overrides=model_overrides,
+
+    def render(story_context: str, text: str) -> str:
+        return get_user_prompt(
+            "continue_chapter",
+            story_context=story_context,
+            chapter_title=chapter_title,
+            chapter_summary=chapter_summary,
+            existing_text=text,
+            user_prompt_overrides=model_overrides,
+        )
+
+    budget = prompt_token_budget(
+        context_length,
+        max_tokens=max_tokens,
+        fixed_text=sys_msg["content"] + render("", ""),
     )
-    return [sys_msg, {"role": "user", "content": user_prompt}]
+    story_context, existing_text = pack_story_context(
+        budget=budget,
+        text=existing_text,
+        earlier_summaries=earlier_summaries,
+        sourcebook_entries=sourcebook_entries,
+        stable_prefix=stable_prefix,
+        model_overrides=model_overrides,
+    )
+    return [sys_msg, {"role": "user", "content": render(story_context, existing_text)}]
 
 
 def build_suggest_prompt(
@@ -127,11 +409,31 @@ def build_suggest_prompt(
     chapter_summary: str,
     current_text: str,
     model_overrides: dict,
+    context_length: int | None = None,
+    max_tokens: int | None = None,
+    earlier_summaries: list[str] | None = None,
+    sourcebook_entries: list[str] | None = None,
+    stable_prefix: bool = False,
 ) -> str:
-    return get_user_prompt(
-        "suggest_continuation",
-        chapter_title=chapter_title or "",
-        chapter_summary=chapter_summary or "",
-        current_text=current_text or "",
-        user_prompt_overrides=model_overrides,
+    def render(story_context: str, text: str) -> str:
+        return get_user_prompt(
+            "suggest_continuation",
+            story_context=story_context,
+            chapter_title=chapter_title or "",
+            chapter_summary=chapter_summary or "",
+            current_text=text,
+            user_prompt_overrides=model_overrides,
+        )
+
+    budget = prompt_token_budget(
+        context_length, max_tokens=max_tokens, fixed_text=render("", "")
+    )
+    story_context, current_text = pack_story_context(
+        budget=budget,
+        text=current_text or "",
+        earlier_summaries=earlier_summaries,
+        sourcebook_entries=sourcebook_entries,
+        stable_prefix=stable_prefix,
+        model_overrides=model_overrides,
     )
+    return render(story_context, current_text)
@@ -75,3 +75,9 @@ def collect_chapter_summaries(chapters_data: list[dict]) -> list[str]:
         if summary:
             chapter_summaries.append(f"{title}:\n{summary}")
     return chapter_summaries
+
+
+def get_story_max_tokens(story: dict) -> int | None:
+    prefs = story.get("llm_prefs") if isinstance(story, dict) else None
+    max_tokens = prefs.get("max_tokens") if isinstance(prefs, dict) else None
+    return max_tokens if isinstance(max_tokens, int) else None
@@ -10,8 +10,16 @@ from __future__ import annotations
 
 import asyncio
 from collections.abc import AsyncIterator, Callable
+from contextlib import aclosing
+from typing import Any
 
 from augmentedquill.services.llm import llm
+from augmentedquill.services.llm.llm_generations import (
+    Generation,
+    GenerationCancelled,
+    guarded_stream,
+)
+from augmentedquill.utils.storage_io import run_metadata_io
 
 
 async def stream_unified_chat_content(
@@ -29,20 +37,44 @@ async def stream_unified_chat_content(
             yield chunk
 
 
+async def _persist_quietly(persist: Callable[[str], None], text: str) -> None:
+    try:
+        await run_metadata_io(persist, text)
+    except Exception:
+        pass
+
+
 async def stream_collect_and_persist(
     stream_factory: Callable[[], AsyncIterator[str]],
     persist_on_complete: Callable[[str], None],
+    *,
+    generation: Generation | None = None,
+    request: Any = None,
+    persist_partial: bool = False,
 ) -> AsyncIterator[str]:
+    """Stream chunks and persist the full text once the stream completed.
+
+    With a generation, the stream stops as soon as it is cancelled or the
+    request's client disconnects. An interrupted stream is only persisted
+    when persist_partial is set.
+    """
     buf: list[str] = []
+    source = stream_factory()
+    if generation is not None:
+        source = guarded_stream(generation, source, request)
     try:
-        async for chunk in stream_factory():
-            if chunk:
-                buf.append(chunk)
-                yield chunk
-    except asyncio.CancelledError:
+        async with aclosing(source):
+            async for chunk in source:
+                if chunk:
+                    buf.append(chunk)
+                    yield chunk
+    except GenerationCancelled:
+        if persist_partial and buf:
+            await _persist_quietly(persist_on_complete, "".join(buf))
         return
+    except (asyncio.CancelledError, GeneratorExit):
+        if persist_partial and buf:
+            await _persist_quietly(persist_on_complete, "".join(buf))
+        raise
 
-    try:
-        persist_on_complete("".join(buf))
-    except Exception:
-        pass
+    await _persist_quietly(persist_on_complete, "".join(buf))
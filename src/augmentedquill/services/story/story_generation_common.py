@@ -10,13 +10,14 @@ from __future__ import annotations
 
 from fastapi import HTTPException
 
-from augmentedquill.core.config import BASE_DIR
 from augmentedquill.services.story.story_api_prompt_ops import (
     build_chapter_summary_messages,
     build_continue_chapter_messages,
     build_story_summary_messages,
     build_write_chapter_messages,
+    relevant_sourcebook_entries,
     resolve_model_runtime,
+    resolve_prompt_runtime,
 )
 from augmentedquill.services.story.story_api_state_ops import (
     collect_chapter_summaries,
@@ -25,6 +26,7 @@ from augmentedquill.services.story.story_api_state_ops import (
     get_all_normalized_chapters,
     get_chapter_locator,
     get_normalized_chapters,
+    get_story_max_tokens,
     read_text_or_http_500,
 )
 
@@ -45,7 +47,6 @@ def prepare_story_summary_generation(payload: dict, mode: str) -> dict:
     base_url, api_key, model_id, timeout_s, model_overrides = resolve_model_runtime(
         payload=payload,
         model_type="EDITING",
-        base_dir=BASE_DIR,
     )
     messages = build_story_summary_messages(
         mode=mode,
@@ -64,6 +65,43 @@ def prepare_story_summary_generation(payload: dict, mode: str) -> dict:
     }
 
 
+def chapter_summary_request(
+    *,
+    mode: str,
+    chapter_text: str,
+    current_summary: str,
+    runtime: tuple,
+    context_length: int | None,
+    max_tokens: int | None,
+) -> dict:
+    """Return the request fields resolve_chapter_summary_messages works from.
+
+    runtime is the tuple returned by resolve_model_runtime for EDITING.
+    """
+    base_url, api_key, model_id, timeout_s, model_overrides = runtime
+    messages = build_chapter_summary_messages(
+        mode=mode,
+        current_summary=current_summary,
+        chapter_text=chapter_text,
+        model_overrides=model_overrides,
+        context_length=context_length,
+        max_tokens=max_tokens,
+    )
+    return {
+        "messages": messages,
+        "mode": mode,
+        "chapter_text": chapter_text,
+        "current_summary": current_summary,
+        "model_overrides": model_overrides,
+        "context_length": context_length,
+        "max_tokens": max_tokens,
+        "base_url": base_url,
+        "api_key": api_key,
+        "model_id": model_id,
+        "timeout_s": timeout_s,
+    }
+
+
 def prepare_chapter_summary_generation(payload: dict, chap_id: int, mode: str) -> dict:
     if not isinstance(chap_id, int):
         raise HTTPException(status_code=400, detail="chap_id is required")
@@ -79,18 +117,7 @@ def prepare_chapter_summary_generation(payload: dict, chap_id: int, mode: str) -
     chapters_data = get_normalized_chapters(story)
     ensure_chapter_slot(chapters_data, pos)
     current_summary = chapters_data[pos].get("summary", "")
-
-    base_url, api_key, model_id, timeout_s, model_overrides = resolve_model_runtime(
-        payload=payload,
-        model_type="EDITING",
-        base_dir=BASE_DIR,
-    )
-    messages = build_chapter_summary_messages(
-        mode=mode,
-        current_summary=current_summary,
-        chapter_text=chapter_text,
-        model_overrides=model_overrides,
-    )
+    runtime, context_length, _ = resolve_prompt_runtime(payload, "EDITING")
 
     return {
         "path": path,
@@ -98,11 +125,14 @@ def prepare_chapter_summary_generation(payload: dict, chap_id: int, mode: str) -
         "story": story,
         "story_path": story_path,
         "chapters_data": chapters_data,
-        "messages": messages,
-        "base_url": base_url,
-        "api_key": api_key,
-        "model_id": model_id,
-        "timeout_s": timeout_s,
+        **chapter_summary_request(
+            mode=mode,
+            chapter_text=chapter_text,
+            current_summary=current_summary,
+            runtime=runtime,
+            context_length=context_length,
+            max_tokens=get_story_max_tokens(story),
+        ),
     }
 
 
@@ -125,7 +155,6 @@ def prepare_write_chapter_generation(payload: dict, chap_id: int) -> dict:
     base_url, api_key, model_id, timeout_s, model_overrides = resolve_model_runtime(
         payload=payload,
         model_type="WRITING",
-        base_dir=BASE_DIR,
     )
     messages = build_write_chapter_messages(
         project_title=story.get("project_title", "Story"),
@@ -162,16 +191,22 @@ def prepare_continue_chapter_generation(payload: dict, chap_id: int) -> dict:
     summary = chapters_data[pos].get("summary", "")
     title = chapters_data[pos].get("title") or path.name
 
-    base_url, api_key, model_id, timeout_s, model_overrides = resolve_model_runtime(
-        payload=payload,
-        model_type="WRITING",
-        base_dir=BASE_DIR,
-    )
+    runtime, context_length, stable_prefix = resolve_prompt_runtime(payload, "WRITING")
+    base_url, api_key, model_id, timeout_s, model_overrides = runtime
     messages = build_continue_chapter_messages(
         chapter_title=title,
         chapter_summary=summary,
         existing_text=existing,
         model_overrides=model_overrides,
+        context_length=context_length,
+        max_tokens=get_story_max_tokens(story),
+        earlier_summaries=collect_chapter_summaries(chapters_data[:pos]),
+        sourcebook_entries=(
+            relevant_sourcebook_entries(story, summary, existing)
+            if context_length
+            else None
+        ),
+        stable_prefix=stable_prefix,
     )
 
     return {
@@ -10,6 +10,10 @@ from __future__ import annotations
 
 from augmentedquill.core.config import save_story_config
 from augmentedquill.services.llm import llm
+from augmentedquill.services.story.chapter_summary_ops import (
+    chapter_text_hash,
+    resolve_chapter_summary_messages,
+)
 from augmentedquill.services.story.story_api_prompt_ops import (  # noqa: F401
     resolve_model_runtime,
 )
@@ -22,7 +26,7 @@ from augmentedquill.services.story.story_generation_common import (
 
 
 async def generate_story_summary(
-    *, mode: str = "", payload: dict | None = None
+    *, mode: str = "", payload: dict | None = None, priority: str = "interactive"
 ) -> dict:
     payload = payload or {}
     prepared = prepare_story_summary_generation(payload, mode)
@@ -33,6 +37,8 @@ async def generate_story_summary(
         api_key=prepared["api_key"],
         model_id=prepared["model_id"],
         timeout_s=prepared["timeout_s"],
+        cacheable=True,
+        priority=priority,
     )
 
     new_summary = data.get("content", "")
@@ -48,15 +54,19 @@ async def generate_chapter_summary(
     prepared = prepare_chapter_summary_generation(payload, chap_id, mode)
 
     data = await llm.unified_chat_complete(
-        messages=prepared["messages"],
+        messages=await resolve_chapter_summary_messages(prepared),
         base_url=prepared["base_url"],
         api_key=prepared["api_key"],
         model_id=prepared["model_id"],
         timeout_s=prepared["timeout_s"],
+        cacheable=True,
     )
 
     new_summary = data.get("content", "")
     prepared["chapters_data"][prepared["pos"]]["summary"] = new_summary
+    prepared["chapters_data"][prepared["pos"]]["summary_hash"] = chapter_text_hash(
+        prepared["chapter_text"]
+    )
     prepared["story"]["chapters"] = prepared["chapters_data"]
     save_story_config(prepared["story_path"], prepared["story"])
 
@@ -0,0 +1,201 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the story suggest ops unit so this responsibility stays isolated, testable, and easy to evolve.
+
+"""
+Streaming of one or several next-paragraph suggestions for /story/suggest.
+
+Several alternatives are requested with a single completions call using the
+OpenAI `n` parameter, so the backend prefills the (long) prompt only once.
+Backends that reject `n` or silently return a single choice are remembered
+per (base_url, model) and served by concurrent requests sharing the prompt
+instead. Every choice is trimmed to its first line, as the single-suggestion
+endpoint always did.
+
+Suggestions are scheduled with the "suggest" priority. With a supersede_key
+(the route uses the project and chapter), a newer request for the same key
+ends the older stream early.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import nullcontext
+from typing import Any, AsyncIterator, Dict, Hashable, List, Set
+
+import httpx
+
+from augmentedquill.services.llm import llm
+from augmentedquill.services.llm.llm_capabilities import capabilities, learn
+from augmentedquill.services.llm.llm_scheduler import (
+    RequestSuperseded,
+    supersede_previous,
+)
+
+MAX_SUGGESTIONS = 8
+
+
+class _FirstLine:
+    """Trim a streamed choice to its first line.
+
+    Leading blank lines collapse into a single "\\n" marking a new paragraph.
+    """
+
+    def __init__(self) -> None:
+        self.start_found = False
+        self.new_paragraph = False
+        self.done = False
+
+    def feed(self, chunk: str) -> List[str]:
+        out: List[str] = []
+        if self.done:
+            return out
+        while chunk.lstrip(" \t").startswith("\n") and not self.start_found:
+            chunk = chunk.lstrip(" \t")[1:]
+            if not self.new_paragraph:
+                out.append("\n")
+            self.new_paragraph = True
+        if chunk == "":
+            return out
+        self.start_found = True
+        lines = chunk.splitlines()
+        out.append(lines[0])
+        if len(lines) > 1:
+            self.done = True
+        return out
+
+
+async def _single_choice(
+    index: int, trimmer: _FirstLine, request: Dict[str, Any]
+) -> AsyncIterator[dict]:
+    async for chunk in llm.openai_completions_stream(**request):
+        for text in trimmer.feed(chunk):
+            yield {"index": index, "content": text}
+        if trimmer.done:
+            break
+
+
+async def _fan_out(
+    indices: List[int], trimmers: List[_FirstLine], request: Dict[str, Any]
+) -> AsyncIterator[dict]:
+    """Run one request per index concurrently and merge their events."""
+    queue: asyncio.Queue[dict] = asyncio.Queue()
+
+    async def run(index: int) -> None:
+        try:
+            async for event in _single_choice(index, trimmers[index], request):
+                await queue.put(event)
+            await queue.put({"index": index, "done": True})
+        except Exception as exc:
+            await queue.put({"index": index, "error": str(exc)})
+
+    tasks = [asyncio.create_task(run(index)) for index in indices]
+    try:
+        remaining = len(indices)
+        while remaining:
+            event = await queue.get()
+            if request["ticket"] is not None:
+                request["ticket"].check()
+            if "done" in event or "error" in event:
+                remaining -= 1
+            yield event
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def stream_suggestions(
+    *,
+    prompt: str,
+    base_url: str,
+    api_key: str | None,
+    model_id: str,
+    timeout_s: int,
+    extra_body: dict,
+    n: int = 1,
+    supersede_key: Hashable | None = None,
+) -> AsyncIterator[dict]:
+    """Yield {"index", "content"} events and one {"index", "done"} per choice.
+
+    A choice that failed on its own ends with {"index", "error"} instead. A
+    stream superseded by a newer request with the same supersede_key just
+    stops.
+    """
+    claim = (
+        supersede_previous(supersede_key)
+        if supersede_key is not None
+        else nullcontext()
+    )
+    with claim as ticket:
+        request: Dict[str, Any] = {
+            "prompt": prompt,
+            "base_url": base_url,
+            "api_key": api_key,
+            "model_id": model_id,
+            "timeout_s": timeout_s,
+            "extra_body": extra_body,
+            "priority": "suggest",
+            "ticket": ticket,
+        }
+        try:
+            async for event in _stream_choices(request, n):
+                yield event
+        except RequestSuperseded:
+            return
+
+
+async def _stream_choices(request: Dict[str, Any], n: int) -> AsyncIterator[dict]:
+    base_url, model_id = request["base_url"], request["model_id"]
+    trimmers = [_FirstLine() for _ in range(n)]
+    if n == 1:
+        async for event in _single_choice(0, trimmers[0], request):
+            yield event
+        yield {"index": 0, "done": True}
+        return
+    if capabilities.get(base_url, model_id, "n") is False:
+        async for event in _fan_out(list(range(n)), trimmers, request):
+            yield event
+        return
+
+    seen: Set[int] = set()
+    finished: Set[int] = set()
+    try:
+        async for index, chunk in llm.openai_completions_stream_choices(n=n, **request):
+            if index >= n or index in finished:
+                continue
+            seen.add(index)
+            for text in trimmers[index].feed(chunk):
+                yield {"index": index, "content": text}
+            if trimmers[index].done:
+                finished.add(index)
+                yield {"index": index, "done": True}
+                if len(finished) == n:
+                    break
+    except httpx.HTTPStatusError as exc:
+        if seen or exc.response.status_code not in (400, 422):
+            raise
+        await learn(base_url, model_id, "n", False)
+        async for event in _fan_out(list(range(n)), trimmers, request):
+            yield event
+        return
+
+    if seen == {0}:
+        # The backend ignored n; fetch the missing alternatives separately.
+        await learn(base_url, model_id, "n", False)
+        if 0 not in finished:
+            finished.add(0)
+            yield {"index": 0, "done": True}
+        async for event in _fan_out(list(range(1, n)), trimmers, request):
+            yield event
+        return
+
+    if len(seen) > 1:
+        await learn(base_url, model_id, "n", True)
+    for index in range(n):
+        if index not in finished:
+            yield {"index": index, "done": True}
@@ -0,0 +1,326 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the summary refresh ops unit so this responsibility stays isolated, testable, and easy to evolve.
+
+"""
+Bulk refresh of all chapter summaries followed by the story summary.
+
+One job runs per project as a background task, so it survives the client
+disconnecting; progress events are kept and replayed to every subscriber.
+Chapters whose text hash matches the summary_hash stored with their summary
+are skipped. Finished chapter summaries are appended to a journal under
+data/cache/summary_refresh/ and written to story.json in one batch at the
+end (also on cancellation), after which the story summary is regenerated. A
+job interrupted by a restart leaves its journal behind; the next job reuses
+journal entries whose chapter text is unchanged instead of asking the model
+again.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List
+
+from augmentedquill.core.config import DATA_DIR, load_story_config, save_story_config
+from augmentedquill.services.chapters.chapter_helpers import (
+    _chapter_metadata_entries,
+    _normalize_chapter_entry,
+)
+from augmentedquill.services.chapters.chapter_index import get_chapter_index
+from augmentedquill.services.llm import llm
+from augmentedquill.services.projects.projects import get_active_project_dir
+from augmentedquill.services.story.chapter_summary_ops import (
+    chapter_text_hash,
+    endpoint_semaphore,
+    resolve_chapter_summary_messages,
+    summary_concurrency,
+)
+from augmentedquill.services.story.story_api_prompt_ops import (
+    resolve_prompt_runtime,
+)
+from augmentedquill.services.story.story_api_state_ops import get_story_max_tokens
+from augmentedquill.services.story.story_generation_common import (
+    chapter_summary_request,
+)
+from augmentedquill.services.story.story_generation_ops import (
+    generate_story_summary,
+)
+from augmentedquill.utils.storage_io import run_metadata_io, serialized_write
+
+JOURNAL_DIR = DATA_DIR / "cache" / "summary_refresh"
+
+
+def _journal_path(project_dir: Path) -> Path:
+    digest = hashlib.sha1(str(project_dir.resolve()).encode("utf-8")).hexdigest()
+    return JOURNAL_DIR / f"{project_dir.name}-{digest[:10]}.jsonl"
+
+
+def _read_journal(path: Path) -> Dict[str, dict]:
+    """Return {chapter file (relative): record}, later lines winning."""
+    records: Dict[str, dict] = {}
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return records
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue  # torn last line after a crash
+        if isinstance(record, dict) and isinstance(record.get("file"), str):
+            records[record["file"]] = record
+    return records
+
+
+def _append_journal(path: Path, record: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+@serialized_write(scope="project_dir")
+def _apply_summaries(project_dir: Path, results: Dict[str, dict]) -> int:
+    """Write results into story.json in one read-modify-write; return the count."""
+    story_path = project_dir / "story.json"
+    story = load_story_config(story_path) or {}
+    files = get_chapter_index(project_dir).entries()
+    entries = _chapter_metadata_entries(story, files)
+    applied = 0
+    for chap_id, path in files:
+        record = results.get(path.relative_to(project_dir).as_posix())
+        entry = entries.get(chap_id)
+        if record is None or entry is None:
+            continue
+        entry["summary"] = record["summary"]
+        entry["summary_hash"] = record["hash"]
+        applied += 1
+    if applied:
+        save_story_config(story_path, story)
+    return applied
+
+
+class SummaryRefreshJob:
+    """One bulk summary refresh of a project, observable through events()."""
+
+    def __init__(self, project_dir: Path, payload: dict, mode: str, force: bool):
+        self.project_dir = project_dir
+        self.payload = payload
+        self.mode = mode
+        self.force = force
+        self.state = "running"
+        self.total = 0
+        self.done = 0
+        self._events: List[dict] = []
+        self._changed = asyncio.Condition()
+        self._results: Dict[str, dict] = {}
+        self._journal = _journal_path(project_dir)
+        self.task: asyncio.Task | None = None
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "total": self.total,
+            "done": self.done,
+            "mode": self.mode,
+        }
+
+    async def _emit(self, event: dict) -> None:
+        async with self._changed:
+            self._events.append(event)
+            self._changed.notify_all()
+
+    async def events(self) -> AsyncIterator[dict]:
+        """Yield all events of the job so far, then live ones until it ends."""
+        index = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(
+                    lambda: index < len(self._events) or self.state != "running"
+                )
+                pending = self._events[index:]
+                finished = self.state != "running"
+            for event in pending:
+                yield event
+            index += len(pending)
+            if finished and index >= len(self._events):
+                return
+
+    def cancel(self) -> bool:
+        if self.task is None or self.task.done():
+            return False
+        self.task.cancel()
+        return True
+
+    async def run(self) -> None:
+        try:
+            await self._run()
+            await self._finish("done", {"type": "done"})
+        except asyncio.CancelledError:
+            await asyncio.shield(self._persist())
+            await self._finish("cancelled", {"type": "cancelled"})
+        except Exception as exc:
+            await asyncio.shield(self._persist())
+            await self._finish("error", {"type": "error", "detail": str(exc)})
+
+    async def _finish(self, state: str, event: dict) -> None:
+        async with self._changed:
+            self._events.append({**event, **self.status(), "state": state})
+            self.state = state
+            self._changed.notify_all()
+
+    async def _persist(self) -> int:
+        if not self._results:
+            return 0
+        results, self._results = self._results, {}
+        applied = await run_metadata_io(_apply_summaries, self.project_dir, results)
+        await run_metadata_io(self._journal.unlink, missing_ok=True)
+        return applied
+
+    async def _run(self) -> None:
+        story = await run_metadata_io(
+            load_story_config, self.project_dir / "story.json"
+        )
+        story = story or {}
+        files = await run_metadata_io(get_chapter_index(self.project_dir).entries)
+        entries = _chapter_metadata_entries(story, files)
+        journal = await run_metadata_io(_read_journal, self._journal)
+
+        runtime, context_length, _ = resolve_prompt_runtime(self.payload, "EDITING")
+        max_tokens = get_story_max_tokens(story)
+        limit = asyncio.Semaphore(summary_concurrency())
+        self.total = len(files)
+        await self._emit({"type": "start", **self.status()})
+
+        async def refresh(chap_id: int, path: Path) -> None:
+            entry = _normalize_chapter_entry(entries.get(chap_id) or {})
+            rel = path.relative_to(self.project_dir).as_posix()
+            event: Dict[str, Any] = {
+                "type": "chapter",
+                "chap_id": chap_id,
+                "title": entry.get("title") or path.name,
+            }
+            try:
+                async with limit:
+                    text = await run_metadata_io(path.read_text, encoding="utf-8")
+                    text_hash = chapter_text_hash(text)
+                    record = journal.get(rel)
+                    if (
+                        not self.force
+                        and entry.get("summary")
+                        and entry.get("summary_hash") == text_hash
+                    ):
+                        event["status"] = "skipped"
+                    elif record and record.get("hash") == text_hash:
+                        self._results[rel] = record
+                        event.update(status="resumed", summary=record["summary"])
+                    else:
+                        summary = await self._summarize(
+                            text, entry, runtime, context_length, max_tokens
+                        )
+                        record = {"file": rel, "hash": text_hash, "summary": summary}
+                        await run_metadata_io(_append_journal, self._journal, record)
+                        self._results[rel] = record
+                        event.update(status="done", summary=summary)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                event.update(status="error", detail=str(exc))
+            self.done += 1
+            await self._emit({**event, "done": self.done, "total": self.total})
+
+        async with asyncio.TaskGroup() as group:
+            for chap_id, path in files:
+                group.create_task(refresh(chap_id, path))
+
+        changed = len(self._results)
+        await self._emit({"type": "saved", "chapters": await self._persist()})
+
+        if changed or self.force or not story.get("story_summary"):
+            try:
+                data = await generate_story_summary(
+                    mode=self.mode, payload=self.payload, priority="background"
+                )
+                await self._emit({"type": "story_summary", "summary": data["summary"]})
+            except Exception as exc:
+                detail = getattr(exc, "detail", None) or str(exc)
+                await self._emit({"type": "story_summary", "error": str(detail)})
+
+    async def _summarize(
+        self,
+        text: str,
+        entry: dict,
+        runtime: tuple,
+        context_length: int | None,
+        max_tokens: int | None,
+    ) -> str:
+        prepared = chapter_summary_request(
+            mode=self.mode,
+            chapter_text=text,
+            current_summary=entry.get("summary", ""),
+            runtime=runtime,
+            context_length=context_length,
+            max_tokens=max_tokens,
+        )
+        messages = await resolve_chapter_summary_messages(prepared, "background")
+        async with endpoint_semaphore(prepared["base_url"]):
+            data = await llm.unified_chat_complete(
+                messages=messages,
+                base_url=prepared["base_url"],
+                api_key=prepared["api_key"],
+                model_id=prepared["model_id"],
+                timeout_s=prepared["timeout_s"],
+                cacheable=True,
+                priority="background",
+            )
+        return data.get("content", "")
+
+
+_jobs: Dict[Path, SummaryRefreshJob] = {}
+
+
+def _active_project_or_error() -> Path:
+    active = get_active_project_dir()
+    if not active:
+        raise ValueError("No active project")
+    return active
+
+
+def start_summary_refresh(payload: dict) -> SummaryRefreshJob:
+    """Start a refresh for the active project, or return the one running."""
+    project_dir = _active_project_or_error()
+    job = _jobs.get(project_dir)
+    if job is not None and job.state == "running":
+        return job
+    mode = (payload.get("mode") or "update").lower()
+    if mode not in ("discard", "update"):
+        raise ValueError("mode must be discard|update")
+    job = SummaryRefreshJob(project_dir, payload, mode, bool(payload.get("force")))
+    job.task = asyncio.create_task(job.run())
+    _jobs[project_dir] = job
+    return job
+
+
+def get_summary_refresh() -> SummaryRefreshJob | None:
+    return _jobs.get(_active_project_or_error())
+
+
+def summary_refresh_status() -> dict:
+    """Status of the last job, or idle with the number of resumable chapters."""
+    project_dir = _active_project_or_error()
+    job = _jobs.get(project_dir)
+    if job is not None:
+        return job.status()
+    journal = _read_journal(_journal_path(project_dir))
+    return {"state": "idle", "resumable": len(journal)}
+
+
+def cancel_summary_refresh() -> bool:
+    job = get_summary_refresh()
+    return job.cancel() if job is not None else False
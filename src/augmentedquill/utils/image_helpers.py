@@ -13,6 +13,7 @@ Helper functions for managing project images and their metadata.
 import json
 from pathlib import Path
 from augmentedquill.services.projects.projects import get_active_project_dir
+from augmentedquill.utils.storage_io import serialized_write
 
 
 def get_images_dir() -> Path | None:
@@ -39,6 +40,7 @@ def load_image_metadata() -> dict:
     return {}
 
 
+@serialized_write
 def save_image_metadata(data: dict):
     d = get_images_dir()
     if d:
@@ -52,6 +54,7 @@ def get_image_entry(filename: str) -> dict:
     return meta.get(filename, {})
 
 
+@serialized_write
 def update_image_metadata(filename: str, description: str = None, title: str = None):
     meta = load_image_metadata()
     if filename not in meta:
@@ -65,6 +68,7 @@ def update_image_metadata(filename: str, description: str = None, title: str = N
     save_image_metadata(meta)
 
 
+@serialized_write
 def delete_image_metadata(filename: str):
     meta = load_image_metadata()
     if filename in meta:
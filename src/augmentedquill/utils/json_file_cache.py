@@ -0,0 +1,162 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the json file cache unit so this responsibility stays isolated, testable, and easy to evolve.
+
+"""
+In-process cache for values derived from JSON config files.
+
+Entries are keyed by the absolute file path (plus an optional variant for values
+that also depend on something other than the file) and validated against the
+file's (st_mtime_ns, st_size) signature. Hits hand out a private copy so callers
+can keep mutating the returned dict, exactly as they did when every call
+re-parsed the file.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple
+
+# Timestamps on some filesystems are coarse (FAT: 2s, ext4 on low HZ kernels:
+# a few ms). A file modified within this window of being cached may have been
+# rewritten with an identical signature, so such entries are confirmed by
+# comparing content instead of trusting the signature alone.
+RACY_WINDOW_NS = 2_000_000_000
+
+_MAX_ENTRIES = 64
+
+
+def copy_json_value(value: Any) -> Any:
+    """Return a deep copy of a JSON-shaped value (dicts, lists and scalars).
+
+    Much cheaper than copy.deepcopy because it skips memo bookkeeping and only
+    needs to handle the types json.load can produce.
+    """
+    if isinstance(value, dict):
+        return {k: copy_json_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [copy_json_value(v) for v in value]
+    return value
+
+
+def file_signature(path: str) -> Tuple[int, int] | None:
+    """Return (mtime_ns, size) for path, or None when it cannot be stat'ed."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+@dataclass
+class _Entry:
+    signature: Tuple[int, int]
+    raw_text: str
+    config: Dict[str, Any]
+    cached_at_ns: int
+
+
+class JsonFileCache:
+    """Thread-safe LRU of JSON-shaped values keyed by file path and signature."""
+
+    def __init__(self, max_entries: int = _MAX_ENTRIES) -> None:
+        self._entries: OrderedDict[tuple[str, str], _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.rereads = 0
+
+    @staticmethod
+    def key_for(path: os.PathLike[str] | str) -> str:
+        return os.path.abspath(os.fspath(path))
+
+    def get(self, key: str, variant: str = "") -> Dict[str, Any] | None:
+        """Return a private copy of the cached value, or None on a miss."""
+        signature = file_signature(key)
+        with self._lock:
+            entry = self._entries.get((key, variant))
+        if entry is None or signature is None or entry.signature != signature:
+            self._record(hit=False)
+            return None
+
+        if signature[0] + RACY_WINDOW_NS >= entry.cached_at_ns:
+            try:
+                with open(key, "r", encoding="utf-8") as f:
+                    current_text = f.read()
+            except OSError:
+                current_text = None
+            if current_text != entry.raw_text:
+                self._record(hit=False)
+                return None
+            now_ns = time.time_ns()
+            with self._lock:
+                self.rereads += 1
+                # Confirmed after the window has passed: any later rewrite
+                # changes the signature, so the content need not be read again.
+                if now_ns > signature[0] + RACY_WINDOW_NS:
+                    entry.cached_at_ns = now_ns
+
+        with self._lock:
+            if (key, variant) in self._entries:
+                self._entries.move_to_end((key, variant))
+        self._record(hit=True)
+        return copy_json_value(entry.config)
+
+    def put(
+        self,
+        key: str,
+        signature: Tuple[int, int],
+        raw_text: str,
+        config: Dict[str, Any],
+        variant: str = "",
+    ) -> None:
+        """Store a private copy of a freshly loaded or written value."""
+        entry = _Entry(
+            signature=signature,
+            raw_text=raw_text,
+            config=copy_json_value(config),
+            cached_at_ns=time.time_ns(),
+        )
+        with self._lock:
+            self._entries[(key, variant)] = entry
+            self._entries.move_to_end((key, variant))
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        """Drop every variant cached for the file at key."""
+        with self._lock:
+            for entry_key in [k for k in self._entries if k[0] == key]:
+                del self._entries[entry_key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.rereads = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "rereads": self.rereads,
+                "entries": len(self._entries),
+            }
+
+    def _record(self, *, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
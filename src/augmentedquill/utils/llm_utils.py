@@ -10,9 +10,16 @@
 Common LLM-related utility functions, including capability verification and URL normalization.
 """
 
-import httpx
 import asyncio
 
+from augmentedquill.services.llm.llm_http_pool import pooled_client
+from augmentedquill.services.llm.llm_response_cache import (
+    response_cache,
+    response_cache_enabled,
+    response_cache_key,
+)
+from augmentedquill.utils.storage_io import run_metadata_io
+
 # 1x1 transparent pixel
 PIXEL_B64 = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII="
 
@@ -26,8 +33,17 @@ async def verify_model_capabilities(
 ) -> dict:
     """
     Dynamically tests the model for Vision and Function Calling capabilities by sending minimal requests.
+
+    With the response cache enabled, the result is reused for the same
+    endpoint and model.
     """
     url = _normalize_base_url(base_url) + "/chat/completions"
+    key = None
+    if response_cache_enabled():
+        key = response_cache_key("capabilities", url=url, model=model_id)
+        cached = await run_metadata_io(response_cache.get, key)
+        if cached is not None:
+            return cached
     headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
     headers["Content-Type"] = "application/json"
 
@@ -55,7 +71,7 @@ async def verify_model_capabilities(
             # If 200 OK, vision is supported.
             return response.status_code == 200
         except Exception:
-            return False
+            return None
 
     async def check_function_calling(client):
         try:
@@ -81,9 +97,9 @@ async def verify_model_capabilities(
             # If 400, it usually means 'tools' was not recognized.
             return response.status_code == 200
         except Exception:
-            return False
+            return None
 
-    async with httpx.AsyncClient(timeout=timeout_s) as client:
+    async with pooled_client(url, timeout_s) as client:
         # Run tests in parallel
         results = await asyncio.gather(
             check_vision(client), check_function_calling(client), return_exceptions=True
@@ -92,7 +108,11 @@ async def verify_model_capabilities(
     is_multimodal = results[0] if isinstance(results[0], bool) else False
     supports_function_calling = results[1] if isinstance(results[1], bool) else False
 
-    return {
+    capabilities = {
         "is_multimodal": is_multimodal,
         "supports_function_calling": supports_function_calling,
     }
+    # Only answers are cached, not a server that could not be reached.
+    if key is not None and all(isinstance(r, bool) for r in results):
+        await run_metadata_io(response_cache.put, key, capabilities)
+    return capabilities
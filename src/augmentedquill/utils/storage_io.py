@@ -0,0 +1,148 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the storage io unit so this responsibility stays isolated, testable, and easy to evolve.
+
+"""
+Run blocking project storage work off the event loop.
+
+Two bounded thread pools are used so a large export or import cannot starve
+the small reads and writes that interactive requests depend on:
+
+- metadata: story.json, chapter text, chat sessions, image metadata
+  (AUGQ_METADATA_IO_WORKERS, default 8)
+- bulk: ZIP export/import and image payloads
+  (AUGQ_BULK_IO_WORKERS, default 2)
+
+Service functions stay synchronous; async routes await them through
+run_metadata_io() / run_bulk_io(). Functions that read-modify-write project
+files are wrapped with serialized_write() so that moving them onto worker
+threads does not let two updates of the same file interleave. Locks are per
+project directory (or per file for files outside projects), so writes to
+different projects never wait for each other.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import inspect
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar, Union
+
+T = TypeVar("T")
+
+METADATA_POOL = "metadata"
+BULK_POOL = "bulk"
+
+_POOL_WORKERS = {
+    METADATA_POOL: ("AUGQ_METADATA_IO_WORKERS", 8),
+    BULK_POOL: ("AUGQ_BULK_IO_WORKERS", 2),
+}
+
+_pools: Dict[str, ThreadPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+# Reentrant because mutating ops call each other (e.g. create -> save story).
+_write_locks: Dict[str, threading.RLock] = {}
+_write_locks_lock = threading.Lock()
+
+
+def _pool_size(name: str) -> int:
+    env_name, default = _POOL_WORKERS[name]
+    try:
+        return max(1, int(os.getenv(env_name, default)))
+    except ValueError:
+        return default
+
+
+def _get_pool(name: str) -> ThreadPoolExecutor:
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = ThreadPoolExecutor(
+                max_workers=_pool_size(name), thread_name_prefix=f"augq-{name}-io"
+            )
+            _pools[name] = pool
+        return pool
+
+
+async def _run_in_pool(
+    pool_name: str, func: Callable[..., T], /, *args: Any, **kwargs: Any
+) -> T:
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    call = functools.partial(ctx.run, func, *args, **kwargs)
+    return await loop.run_in_executor(_get_pool(pool_name), call)
+
+
+async def run_metadata_io(func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    """Run a small blocking storage call on the metadata pool."""
+    return await _run_in_pool(METADATA_POOL, func, *args, **kwargs)
+
+
+async def run_bulk_io(func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    """Run a large blocking storage call (archives, binary payloads) on the bulk pool."""
+    return await _run_in_pool(BULK_POOL, func, *args, **kwargs)
+
+
+def write_lock(scope: Any) -> threading.RLock:
+    """The lock serializing writes below a project directory or to a file."""
+    key = os.path.abspath(os.fspath(scope)) if scope is not None else ""
+    with _write_locks_lock:
+        lock = _write_locks.get(key)
+        if lock is None:
+            lock = _write_locks[key] = threading.RLock()
+        return lock
+
+
+def _active_project_scope(*args: Any, **kwargs: Any) -> Any:
+    from augmentedquill.services.projects.projects import get_active_project_dir
+
+    return get_active_project_dir()
+
+
+def serialized_write(
+    func: Callable[..., T] | None = None,
+    *,
+    scope: Union[str, Callable[..., Any], None] = None,
+) -> Any:
+    """Serialize a read-modify-write storage function across threads.
+
+    scope selects the lock: the name of the parameter holding the project
+    directory, a callable that maps the call's arguments to a directory or
+    file, or None for the active project.
+    """
+    if func is None:
+        return functools.partial(serialized_write, scope=scope)
+    if isinstance(scope, str):
+        signature = inspect.signature(func)
+        name = scope
+
+        def resolve(*args: Any, **kwargs: Any) -> Any:
+            return signature.bind_partial(*args, **kwargs).arguments.get(name)
+
+    else:
+        resolve = scope or _active_project_scope
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with write_lock(resolve(*args, **kwargs)):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def shutdown_storage_io(wait: bool = True) -> None:
+    """Shut the pools down; they are recreated on next use."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=wait)
@@ -11,130 +11,319 @@ Utility functions for handling server-sent events (SSE) and data streaming.
 Includes stateful filtering for multi-channel LLM output.
 """
 
+import heapq
 import re
-from typing import List, Dict
+from bisect import bisect_left
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# Tag kinds recognized by ChannelFilter.
+_THOUGHT_OPEN = 0
+_THOUGHT_CLOSE = 1
+_TOOL_OPEN = 2  # <tool_call>
+_TOOL_CLOSE = 3  # </tool_call>
+_BRACKET_OPEN = 4  # [TOOL_CALL], swallows the whitespace after it
+_BRACKET_CLOSE = 5  # [/TOOL_CALL], swallows the whitespace before it
+_END = 6  # <|end|>
+_CHANNEL = 7  # <|channel|>NAME<|message|>
+_START = 8  # <|start|>assistant...<|message|>
+_MESSAGE = 9  # terminates _CHANNEL and _START
+
+# Literal tag texts, lower case. All start with "<" or "[" and none is a prefix
+# of another, so every match ends at a leaf of the trie.
+_LITERALS = (
+    ("<thought>", _THOUGHT_OPEN),
+    ("<thinking>", _THOUGHT_OPEN),
+    ("</thought>", _THOUGHT_CLOSE),
+    ("</thinking>", _THOUGHT_CLOSE),
+    ("<tool_call>", _TOOL_OPEN),
+    ("</tool_call>", _TOOL_CLOSE),
+    ("[tool_call]", _BRACKET_OPEN),
+    ("[/tool_call]", _BRACKET_CLOSE),
+    ("<|end|>", _END),
+    ("<|channel|>", _CHANNEL),
+    ("<|start|>assistant", _START),
+    ("<|message|>", _MESSAGE),
+)
+
+_TAG_START = re.compile(r"[<\[]")
+_WHITESPACE = re.compile(r"\s*")
+
+
+def _build_trie() -> Dict[str, Any]:
+    root: Dict[str, Any] = {}
+    for text, kind in _LITERALS:
+        node = root
+        for ch in text[:-1]:
+            node = node.setdefault(ch, {})
+        node[text[-1]] = kind
+    return root
+
+
+def _build_fold() -> Dict[str, str]:
+    """Map every character that re.IGNORECASE equates with a tag character.
+
+    Besides upper case ASCII this includes a few non-ASCII letters (such as
+    U+212A KELVIN SIGN for "k") so matching stays identical to the regex the
+    filter used before.
+    """
+    fold: Dict[str, str] = {}
+    for text, _kind in _LITERALS:
+        for ch in text:
+            for cand in (ch, ch.upper(), "İ", "ı", "ſ", "K"):
+                if re.fullmatch(re.escape(ch), cand, re.IGNORECASE):
+                    fold[cand] = ch
+    return fold
+
+
+_TRIE = _build_trie()
+_FOLD = _build_fold()
+
+
+class _TextWindow:
+    """Stream text addressed by absolute position, kept as the chunks that arrived.
+
+    Appending never copies earlier text, and slicing only touches the chunks
+    that overlap the requested range.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: Deque[str] = deque()
+        self.start = 0  # absolute position of the first retained character
+        self.end = 0
+
+    def append(self, text: str) -> None:
+        if text:
+            self._chunks.append(text)
+            self.end += len(text)
+
+    def get(self, a: int, b: int) -> str:
+        parts = []
+        pos = self.start
+        for chunk in self._chunks:
+            nxt = pos + len(chunk)
+            if nxt > a:
+                parts.append(chunk[max(a - pos, 0) : b - pos])
+            if nxt >= b:
+                break
+            pos = nxt
+        return "".join(parts)
+
+    def discard(self, upto: int) -> None:
+        chunks = self._chunks
+        while chunks and self.start + len(chunks[0]) <= upto:
+            self.start += len(chunks.popleft())
 
 
 class ChannelFilter:
-    """Stateful filter to separate thinking/analysis from final content."""
+    """Stateful filter to separate thinking/analysis from final content.
+
+    The filter scans each character of the stream a bounded number of times:
+    a trie follows every tag that may be forming (also across chunks), and the
+    text that has not been emitted yet is never searched again. The output is
+    identical to matching the tag regex below against the whole pending buffer
+    after every chunk, which is what earlier versions did:
+
+        <\\|channel\\|>(.*?)<\\|message\\|> | <\\|start\\|>assistant.*?<\\|message\\|>
+        | <\\|end\\|> | <(thought|thinking)> | </(thought|thinking)>
+        | \\[TOOL_CALL\\]\\s* | \\s*\\[/TOOL_CALL\\] | <tool_call> | </tool_call>
+
+    (case-insensitive). Text before the first "<" or "[" is emitted right away;
+    once more than 150 characters are held back without a tag completing, one
+    character is released per chunk.
+    """
 
     def __init__(self):
         self.current_channel = "final"
-        self.buffer = ""
-        # Combined pattern for all tags we care about
-        self.tag_pattern = re.compile(
-            r"(<\|channel\|>(.*?)<\|message\|>|"
-            r"<\|start\|>assistant.*?<\|message\|>|"
-            r"<\|end\|>|"
-            r"<(thought|thinking)>|"
-            r"</(thought|thinking)>|"
-            r"\[TOOL_CALL\]\s*|"
-            r"\s*\[/TOOL_CALL\]|"
-            r"<tool_call>|"
-            r"</tool_call>)",
-            re.IGNORECASE | re.DOTALL,
-        )
+        self._text = _TextWindow()
+        self._pos = 0  # first character not emitted yet
+        # Tags still forming: (start, trie node, whitespace run start).
+        self._partials: List[Tuple[int, Dict[str, Any], int]] = []
+        # Complete <|channel|> / <|start|>assistant tags waiting for
+        # <|message|>: (start, end of opening literal, kind).
+        self._openers: List[Tuple[int, int, int]] = []
+        self._brackets: Deque[int] = deque()
+        self._ws_start = 0  # start of the whitespace run ending the stream
+
+    @property
+    def buffer(self) -> str:
+        """Text received but not emitted yet."""
+        return self._text.get(self._pos, self._text.end)
 
     def feed(self, chunk: str) -> List[Dict[str, str]]:
         """Process a chunk and return a list of (channel, content) pairs."""
-        self.buffer += chunk
-        results = []
-
-        while True:
-            match = self.tag_pattern.search(self.buffer)
-            if not match:
-                # No complete tag found.
-                # We should yield everything that is definitely not part of a tag.
-                # Tags start with '<'.
-                check_chars = ["<", "["]
-                first_bracket = -1
-                for char in check_chars:
-                    idx = self.buffer.find(char)
-                    if idx != -1:
-                        if first_bracket == -1 or idx < first_bracket:
-                            first_bracket = idx
-
-                if first_bracket == -1:
-                    # No bracket at all, safe to yield everything
-                    if self.buffer:
-                        results.append(
-                            {"channel": self.current_channel, "content": self.buffer}
-                        )
-                        self.buffer = ""
-                elif first_bracket > 0:
-                    # Yield everything before the first bracket
-                    results.append(
-                        {
-                            "channel": self.current_channel,
-                            "content": self.buffer[:first_bracket],
-                        }
-                    )
-                    self.buffer = self.buffer[first_bracket:]
-
-                # Now the buffer starts with '<' or '[' (or is empty).
-                # Guard against pathological buffers by degrading to character
-                # passthrough when no recognizable tag is forming.
-                if len(self.buffer) > 150:
-                    # Emit a single character to keep progress monotonic and
-                    # prevent unbounded buffering.
-                    results.append(
-                        {"channel": self.current_channel, "content": self.buffer[0]}
-                    )
-                    self.buffer = self.buffer[1:]
-                break
-            else:
-                # Yield content before the tag
-                start, end = match.span()
-                if start > 0:
-                    content = self.buffer[:start]
-                    results.append(
-                        {"channel": self.current_channel, "content": content}
-                    )
-
-                # Process the tag
-                tag_text = match.group(0)
-
-                # Update output channel according to control tags.
-                if re.match(r"<(thought|thinking)>", tag_text, re.IGNORECASE):
-                    self.current_channel = "thought"
-                elif re.match(r"</(thought|thinking)>", tag_text, re.IGNORECASE):
-                    self.current_channel = "final"
-                elif re.match(r"\[TOOL_CALL\]\s*|<tool_call>", tag_text, re.IGNORECASE):
-                    self.current_channel = "tool_def"
-                elif re.match(r"\[/TOOL_CALL\]|</tool_call>", tag_text, re.IGNORECASE):
-                    self.current_channel = "final"
-                elif tag_text.startswith("<|channel|>"):
-                    channel_name = match.group(2)
-                    if channel_name:
-                        if "<|constrain|>" in channel_name:
-                            channel_name = channel_name.split("<|constrain|>", 1)[0]
-                        self.current_channel = channel_name.strip()
-                elif (
-                    tag_text.startswith("<|start|>assistant")
-                    and "<|channel|>" in tag_text
-                ):
-                    channel_name = tag_text.split("<|channel|>", 1)[1]
-                    channel_name = channel_name.split("<|message|>", 1)[0]
-                    if "<|constrain|>" in channel_name:
-                        channel_name = channel_name.split("<|constrain|>", 1)[0]
-                    self.current_channel = channel_name.strip()
-                elif "<|message|>" in tag_text:
-                    # Message boundaries without explicit channel changes do not
-                    # require state transitions.
-                    pass
-                elif "<|end|>" in tag_text:
-                    # End markers reset to final output as a safe default.
-                    self.current_channel = "final"
-
-                # Advance buffer past the tag
-                self.buffer = self.buffer[end:]
+        text = self._text
+        base = text.end
+        if (
+            self._pos == base
+            and not self._partials
+            and not self._openers
+            and "<" not in chunk
+            and "[" not in chunk
+        ):
+            # Common case: nothing held back and no tag can start in chunk.
+            if not chunk:
+                return []
+            stripped = chunk.rstrip()
+            if stripped:
+                self._ws_start = base + len(stripped)
+            text.start = text.end = self._pos = base + len(chunk)
+            return [{"channel": self.current_channel, "content": chunk}]
+
+        results: List[Dict[str, str]] = []
+        text.append(chunk)
 
+        candidates = self._scan(chunk, base)
+        if candidates:
+            heapq.heapify(candidates)
+            while candidates:
+                key, anchor, _seq, end, kind, inner = heapq.heappop(candidates)
+                if anchor < self._pos:
+                    continue
+                start = max(key, self._pos)
+                self._emit(results, start)
+                tag_text = text.get(start, end)
+                channel_name = text.get(*inner) if inner else None
+                self._apply_tag(kind, tag_text, channel_name)
+                self._pos = end
+                text.discard(end)
+
+        # No complete tag left: release what cannot belong to one.
+        brackets = self._brackets
+        while brackets and brackets[0] < self._pos:
+            brackets.popleft()
+        self._emit(results, brackets[0] if brackets else text.end)
+        if text.end - self._pos > 150:
+            self._emit(results, self._pos + 1)
+
+        self._prune()
         return results
 
     def flush(self) -> List[Dict[str, str]]:
         """Flush the buffer and return any remaining content."""
-        results = []
-        if self.buffer:
-            results.append({"channel": self.current_channel, "content": self.buffer})
-            self.buffer = ""
+        results: List[Dict[str, str]] = []
+        self._emit(results, self._text.end)
+        self._prune()
         return results
+
+    def _emit(self, results: List[Dict[str, str]], upto: int) -> None:
+        if upto > self._pos:
+            content = self._text.get(self._pos, upto)
+            results.append({"channel": self.current_channel, "content": content})
+            self._pos = upto
+            self._text.discard(upto)
+
+    def _prune(self) -> None:
+        pos = self._pos
+        self._partials = [p for p in self._partials if p[0] >= pos]
+        self._openers = [o for o in self._openers if o[0] >= pos]
+
+    def _scan(self, chunk: str, base: int) -> List[Tuple[Any, ...]]:
+        """Advance all forming tags over chunk and return the completed matches.
+
+        Matches are (start, anchor, seq, end, kind, channel name span); anchor
+        is the tag's own first character, start can reach back over whitespace.
+        """
+        tags: List[Tuple[int, int, int, int]] = []
+        partials: List[Tuple[int, Dict[str, Any], int]] = []
+        n = len(chunk)
+        fold = _FOLD
+
+        def walk(node: Dict[str, Any], start: int, i: int, ws_start: int) -> None:
+            while i < n:
+                ch = chunk[i]
+                nxt = node.get(fold.get(ch, ch))
+                i += 1
+                if nxt is None:
+                    return
+                if nxt.__class__ is not dict:
+                    tags.append((start, base + i, nxt, ws_start))
+                    return
+                node = nxt
+            partials.append((start, node, ws_start))
+
+        for start, node, ws_start in self._partials:
+            walk(node, start, 0, ws_start)
+
+        prev_ws_start = self._ws_start
+        brackets = self._brackets
+        for m in _TAG_START.finditer(chunk):
+            k = m.start()
+            brackets.append(base + k)
+            i = k
+            while i > 0 and chunk[i - 1].isspace():
+                i -= 1
+            walk(_TRIE, base + k, k, base + i if i else prev_ws_start)
+        self._partials = partials
+
+        stripped = chunk.rstrip()
+        if stripped:
+            self._ws_start = base + len(stripped)
+
+        candidates: List[Tuple[Any, ...]] = []
+        messages: List[Tuple[int, int]] = []
+        for seq, (start, end, kind, ws_start) in enumerate(tags):
+            if kind == _MESSAGE:
+                messages.append((start, end))
+            elif kind in (_CHANNEL, _START):
+                self._openers.append((start, end, kind))
+            elif kind == _BRACKET_OPEN:
+                end = base + _WHITESPACE.match(chunk, end - base).end()
+                candidates.append((start, start, seq, end, kind, None))
+            elif kind == _BRACKET_CLOSE:
+                candidates.append((ws_start, start, seq, end, kind, None))
+            else:
+                candidates.append((start, start, seq, end, kind, None))
+
+        if messages and self._openers:
+            # An opener ends at the first <|message|> after its opening literal.
+            messages.sort()
+            starts = [m[0] for m in messages]
+            waiting = []
+            for seq, (start, lit_end, kind) in enumerate(self._openers, len(tags)):
+                idx = bisect_left(starts, lit_end)
+                if idx == len(starts):
+                    waiting.append((start, lit_end, kind))
+                    continue
+                msg_start, msg_end = messages[idx]
+                inner = (lit_end, msg_start) if kind == _CHANNEL else None
+                candidates.append((start, start, seq, msg_end, kind, inner))
+            self._openers = waiting
+        return candidates
+
+    def _apply_tag(self, kind: int, tag_text: str, channel_name: Optional[str]) -> None:
+        """Update the output channel for a matched tag."""
+        if kind == _THOUGHT_OPEN:
+            self.current_channel = "thought"
+        elif kind == _THOUGHT_CLOSE:
+            self.current_channel = "final"
+        elif kind in (_TOOL_OPEN, _BRACKET_OPEN):
+            self.current_channel = "tool_def"
+        elif kind == _TOOL_CLOSE:
+            self.current_channel = "final"
+        elif kind == _BRACKET_CLOSE:
+            # A close tag that swallowed leading whitespace has always left the
+            # channel unchanged.
+            if tag_text.startswith("["):
+                self.current_channel = "final"
+        elif kind == _END:
+            if tag_text == "<|end|>":
+                self.current_channel = "final"
+        elif tag_text.startswith("<|channel|>"):
+            if channel_name:
+                if "<|constrain|>" in channel_name:
+                    channel_name = channel_name.split("<|constrain|>", 1)[0]
+                self.current_channel = channel_name.strip()
+        elif tag_text.startswith("<|start|>assistant") and "<|channel|>" in tag_text:
+            channel_name = tag_text.split("<|channel|>", 1)[1]
+            channel_name = channel_name.split("<|message|>", 1)[0]
+            if "<|constrain|>" in channel_name:
+                channel_name = channel_name.split("<|constrain|>", 1)[0]
+            self.current_channel = channel_name.strip()
+        elif "<|message|>" in tag_text:
+            # Message boundaries without explicit channel changes do not
+            # require state transitions.
+            pass
+        elif "<|end|>" in tag_text:
+            # End markers reset to final output as a safe default.
+            self.current_channel = "final"
@@ -391,7 +391,9 @@ export const DebugLogs: React.FC<DebugLogsProps> = ({ isOpen, onClose, theme })
                               <span className="text-blue-400">metadata:</span>
                               <JsonView
                                 data={{
-                                  chunks_count: log.response.chunks?.length,
+                                  chunks_count:
+                                    log.response.chunk_count ??
+                                    log.response.chunks?.length,
                                   streaming: true,
                                 }}
                                 theme={theme}
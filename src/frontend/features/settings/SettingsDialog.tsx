@@ -130,6 +130,11 @@ export const SettingsDialog: React.FC<SettingsDialogProps> = ({
                   ? Math.max(1, timeoutS) * 1000
                   : 60000,
                 modelId: String(m.model || '').trim(),
+                contextLength: m.context_length ?? null,
+                promptCache: m.prompt_cache ?? null,
+                maxInFlight: m.max_in_flight ?? null,
+                imageMaxEdge: m.image_max_edge ?? null,
+                imageFormat: m.image_format ?? null,
                 isMultimodal: m.is_multimodal,
                 supportsFunctionCalling: m.supports_function_calling,
                 prompts: {
@@ -370,6 +375,11 @@ export const SettingsDialog: React.FC<SettingsDialogProps> = ({
             api_key: p.apiKey || '',
             timeout_s: Math.max(1, Math.round((p.timeout || 10000) / 1000)),
             model: (p.modelId || '').trim(),
+            context_length: p.contextLength || null,
+            prompt_cache: p.promptCache || null,
+            max_in_flight: p.maxInFlight || null,
+            image_max_edge: p.imageMaxEdge ?? null,
+            image_format: p.imageFormat || null,
             is_multimodal: p.isMultimodal,
             supports_function_calling: p.supportsFunctionCalling,
             prompt_overrides: p.prompts || {},
@@ -19,7 +19,13 @@ import {
   Eye,
   Wand2,
 } from 'lucide-react';
-import { AppTheme, AppSettings, LLMConfig } from '../../../types';
+import {
+  AppTheme,
+  AppSettings,
+  ImageFormat,
+  LLMConfig,
+  PromptCacheMode,
+} from '../../../types';
 import { Button } from '../../../components/ui/Button';
 import { SettingsPrompts } from './SettingsPrompts';
 
@@ -612,6 +618,135 @@ export const SettingsMachine: React.FC<SettingsMachineProps> = ({
                 </div>
               </div>
 
+              <div className="grid grid-cols-2 gap-4">
+                <div className="space-y-1">
+                  <label className="text-xs font-medium text-brand-gray-500 uppercase">
+                    Context Length (tokens)
+                  </label>
+                  <input
+                    type="number"
+                    min={1}
+                    placeholder="Unlimited"
+                    value={activeProvider.contextLength ?? ''}
+                    onChange={(e) =>
+                      onUpdateProvider(activeProvider.id, {
+                        contextLength: e.target.value ? Number(e.target.value) : null,
+                      })
+                    }
+                    className={`w-full border rounded p-2 text-sm focus:border-brand-500 focus:outline-none ${
+                      isLight
+                        ? 'bg-brand-gray-50 border-brand-gray-300 text-brand-gray-800'
+                        : 'bg-brand-gray-950 border-brand-gray-700 text-brand-gray-300'
+                    }`}
+                  />
+                </div>
+
+                <div className="space-y-1">
+                  <label className="text-xs font-medium text-brand-gray-500 uppercase">
+                    Prompt Cache
+                  </label>
+                  <select
+                    value={activeProvider.promptCache ?? 'off'}
+                    onChange={(e) =>
+                      onUpdateProvider(activeProvider.id, {
+                        promptCache:
+                          e.target.value === 'off'
+                            ? null
+                            : (e.target.value as PromptCacheMode),
+                      })
+                    }
+                    className={`w-full border rounded p-2 text-sm focus:border-brand-500 focus:outline-none ${
+                      isLight
+                        ? 'bg-brand-gray-50 border-brand-gray-300 text-brand-gray-800'
+                        : 'bg-brand-gray-950 border-brand-gray-700 text-brand-gray-300'
+                    }`}
+                  >
+                    <option value="off">Off</option>
+                    <option value="layout">Stable layout</option>
+                    <option value="cache_prompt">
+                      Layout + cache_prompt (llama.cpp)
+                    </option>
+                    <option value="prompt_cache_key">Layout + prompt_cache_key</option>
+                  </select>
+                </div>
+              </div>
+
+              <div className="grid grid-cols-2 gap-4">
+                <div className="space-y-1">
+                  <label className="text-xs font-medium text-brand-gray-500 uppercase">
+                    Image Max Edge (px)
+                  </label>
+                  <input
+                    type="number"
+                    min={0}
+                    placeholder="Default (1536)"
+                    value={activeProvider.imageMaxEdge ?? ''}
+                    onChange={(e) =>
+                      onUpdateProvider(activeProvider.id, {
+                        imageMaxEdge: e.target.value ? Number(e.target.value) : null,
+                      })
+                    }
+                    className={`w-full border rounded p-2 text-sm focus:border-brand-500 focus:outline-none ${
+                      isLight
+                        ? 'bg-brand-gray-50 border-brand-gray-300 text-brand-gray-800'
+                        : 'bg-brand-gray-950 border-brand-gray-700 text-brand-gray-300'
+                    }`}
+                  />
+                </div>
+
+                <div className="space-y-1">
+                  <label className="text-xs font-medium text-brand-gray-500 uppercase">
+                    Image Format
+                  </label>
+                  <select
+                    value={activeProvider.imageFormat ?? 'default'}
+                    onChange={(e) =>
+                      onUpdateProvider(activeProvider.id, {
+                        imageFormat:
+                          e.target.value === 'default'
+                            ? null
+                            : (e.target.value as ImageFormat),
+                      })
+                    }
+                    className={`w-full border rounded p-2 text-sm focus:border-brand-500 focus:outline-none ${
+                      isLight
+                        ? 'bg-brand-gray-50 border-brand-gray-300 text-brand-gray-800'
+                        : 'bg-brand-gray-950 border-brand-gray-700 text-brand-gray-300'
+                    }`}
+                  >
+                    <option value="default">Default (JPEG)</option>
+                    <option value="jpeg">JPEG</option>
+                    <option value="webp">WebP</option>
+                    <option value="png">PNG</option>
+                    <option value="original">Original</option>
+                  </select>
+                </div>
+              </div>
+
+              <div className="grid grid-cols-2 gap-4">
+                <div className="space-y-1">
+                  <label className="text-xs font-medium text-brand-gray-500 uppercase">
+                    Max Parallel Requests
+                  </label>
+                  <input
+                    type="number"
+                    min={1}
+                    placeholder="Default (4)"
+                    value={activeProvider.maxInFlight ?? ''}
+                    onChange={(e) =>
+                      onUpdateProvider(activeProvider.id, {
+                        maxInFlight: e.target.value ? Number(e.target.value) : null,
+                      })
+                    }
+                    className={`w-full border rounded p-2 text-sm focus:border-brand-500 focus:outline-none ${
+                      isLight
+                        ? 'bg-brand-gray-50 border-brand-gray-300 text-brand-gray-800'
+                        : 'bg-brand-gray-950 border-brand-gray-700 text-brand-gray-300'
+                    }`}
+                  />
+                </div>
+              </div>
+
               <div
                 className={`pt-4 border-t ${
                   isLight ? 'border-brand-gray-200' : 'border-brand-gray-800'
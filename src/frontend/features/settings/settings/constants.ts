@@ -55,6 +55,21 @@ export const PROMPT_GROUPS = [
         label: 'Update Chapter Summary',
         type: 'EDITING',
       },
+      {
+        id: 'chapter_summary_part',
+        label: 'Chapter Summary: Part of Long Chapter',
+        type: 'EDITING',
+      },
+      {
+        id: 'chapter_summary_combine',
+        label: 'Chapter Summary: Combine Parts',
+        type: 'EDITING',
+      },
+      {
+        id: 'chapter_summary_combine_update',
+        label: 'Chapter Summary: Combine Parts (Update)',
+        type: 'EDITING',
+      },
       { id: 'write_chapter', label: 'Write Chapter', type: 'WRITING' },
       { id: 'continue_chapter', label: 'Continue Chapter', type: 'WRITING' },
       { id: 'story_summary_new', label: 'New Story Summary', type: 'EDITING' },
@@ -68,6 +83,16 @@ export const PROMPT_GROUPS = [
         label: 'Suggest Continuation (Autocomplete)',
         type: 'WRITING',
       },
+      {
+        id: 'story_context_summaries',
+        label: 'Story Context: Earlier Chapter Summaries',
+        type: 'WRITING',
+      },
+      {
+        id: 'story_context_reference',
+        label: 'Story Context: Sourcebook Reference',
+        type: 'WRITING',
+      },
       { id: 'chat_user_context', label: 'Chat User Context', type: 'CHAT' },
       {
         id: 'ai_action_summary_update_user',
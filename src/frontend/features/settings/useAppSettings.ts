@@ -60,6 +60,11 @@ export function useAppSettings(defaultSettings: AppSettings) {
                   ? Math.max(1, timeoutS) * 1000
                   : 60000,
                 modelId: String(model.model || '').trim(),
+                contextLength: model.context_length ?? null,
+                promptCache: model.prompt_cache ?? null,
+                maxInFlight: model.max_in_flight ?? null,
+                imageMaxEdge: model.image_max_edge ?? null,
+                imageFormat: model.image_format ?? null,
                 isMultimodal: model.is_multimodal,
                 supportsFunctionCalling: model.supports_function_calling,
                 prompts: {
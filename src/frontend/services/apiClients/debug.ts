@@ -12,7 +12,7 @@ import { fetchJson } from './shared';
 export const debugApi = {
   getLogs: async () => {
     return fetchJson<DebugLogEntry[]>(
-      '/debug/llm_logs',
+      '/debug/llm_logs?limit=100',
       undefined,
       'Failed to fetch debug logs'
     );
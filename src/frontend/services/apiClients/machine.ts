@@ -28,7 +28,12 @@ export const machineApi = {
       'Failed to save machine config'
     );
   },
-  test: async (payload: { base_url: string; api_key?: string; timeout_s?: number }) => {
+  test: async (payload: {
+    base_url: string;
+    api_key?: string;
+    timeout_s?: number;
+    refresh?: boolean;
+  }) => {
     return fetchJson<{ ok: boolean; models: string[]; detail?: string }>(
       '/machine/test',
       {
@@ -44,6 +49,7 @@ export const machineApi = {
     api_key?: string;
     timeout_s?: number;
     model_id: string;
+    refresh?: boolean;
   }) => {
     return fetchJson<{
       ok: boolean;
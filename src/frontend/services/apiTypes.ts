@@ -6,7 +6,14 @@
 // (at your option) any later version.
 // Purpose: Defines the api types unit so this responsibility stays isolated, testable, and easy to evolve.
 
-import { Book, Chapter, Conflict, SourcebookEntry } from '../types';
+import {
+  Book,
+  Chapter,
+  Conflict,
+  ImageFormat,
+  PromptCacheMode,
+  SourcebookEntry,
+} from '../types';
 
 export interface MachineModelConfig {
   name: string;
@@ -14,6 +21,11 @@ export interface MachineModelConfig {
   api_key?: string;
   model: string;
   timeout_s?: number;
+  context_length?: number | null;
+  prompt_cache?: PromptCacheMode | null;
+  max_in_flight?: number | null;
+  image_max_edge?: number | null;
+  image_format?: ImageFormat | null;
   is_multimodal?: boolean;
   supports_function_calling?: boolean;
   prompt_overrides?: Record<string, string>;
@@ -182,6 +194,7 @@ export interface DebugLogEntry {
     body?: unknown;
     streaming?: boolean;
     chunks?: unknown[];
+    chunk_count?: number | null;
     full_content?: string;
     error?: unknown;
     tool_calls?: unknown[];
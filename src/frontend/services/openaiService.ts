@@ -386,35 +386,55 @@ export const generateContinuations = async (
 ): Promise<string[]> => {
   if (!chapterId) return [];
 
-  const fetchSuggestion = async () => {
-    try {
-      const res = await fetch('/api/v1/story/suggest', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({
-          chap_id: Number(chapterId),
-          model_name: config.id,
-          current_text: currentContent,
-        }),
-      });
+  const count = 2;
+  const options: string[] = Array(count).fill('');
+  try {
+    const res = await fetch('/api/v1/story/suggest', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({
+        chap_id: Number(chapterId),
+        model_name: config.id,
+        current_text: currentContent,
+        n: count,
+      }),
+    });
 
-      if (!res.ok) return '';
+    if (!res.ok) return [];
 
-      const reader = res.body?.getReader();
-      let text = '';
-      if (reader) {
-        while (true) {
-          const { done, value } = await reader.read();
-          if (done) break;
-          text += new TextDecoder().decode(value);
+    // One SSE stream carries all alternatives, each event keyed by its index.
+    const reader = res.body?.getReader();
+    if (reader) {
+      const decoder = new TextDecoder();
+      let buffer = '';
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split('\n\n');
+        buffer = events.pop() || '';
+        for (const event of events) {
+          const trimmed = event.trim();
+          if (!trimmed.startsWith('data: ')) continue;
+          const dataStr = trimmed.slice(6);
+          if (dataStr === '[DONE]') continue;
+          try {
+            const data = JSON.parse(dataStr) as { index?: number; content?: string };
+            if (
+              typeof data.index === 'number' &&
+              data.index < count &&
+              typeof data.content === 'string'
+            ) {
+              options[data.index] += data.content;
+            }
+          } catch {
+            // Ignore malformed events
+          }
         }
       }
-      return text;
-    } catch (e) {
-      return '';
     }
-  };
-
-  const [opt1, opt2] = await Promise.all([fetchSuggestion(), fetchSuggestion()]);
-  return [opt1, opt2].filter((s) => s);
+  } catch {
+    // Keep whatever arrived before the stream failed
+  }
+  return options.filter((s) => s);
 };
@@ -108,6 +108,10 @@ export interface EditorSettings {
   sidebarWidth: number;
 }
 
+export type PromptCacheMode = 'layout' | 'cache_prompt' | 'prompt_cache_key';
+
+export type ImageFormat = 'jpeg' | 'webp' | 'png' | 'original';
+
 export interface LLMConfig {
   id: string;
   name: string;
@@ -115,6 +119,11 @@ export interface LLMConfig {
   apiKey: string;
   timeout: number;
   modelId: string;
+  contextLength?: number | null; // tokens; null/undefined = unbudgeted prompts
+  promptCache?: PromptCacheMode | null; // null/undefined = off
+  maxInFlight?: number | null; // null/undefined = server default
+  imageMaxEdge?: number | null; // pixels; null/undefined = server default
+  imageFormat?: ImageFormat | null; // null/undefined = server default
   temperature?: number;
   topP?: number;
   isMultimodal?: boolean | null; // null/undefined = auto-detect
@@ -29,10 +29,14 @@ def session_temp_env():
     # Store originals
     orig_root = os.environ.get("AUGQ_PROJECTS_ROOT")
     orig_reg = os.environ.get("AUGQ_PROJECTS_REGISTRY")
+    orig_caps = os.environ.get("AUGQ_MODEL_CAPABILITIES_PATH")
 
     # Set session-wide defaults
     os.environ["AUGQ_PROJECTS_ROOT"] = str(temp_projects)
     os.environ["AUGQ_PROJECTS_REGISTRY"] = str(temp_registry)
+    os.environ["AUGQ_MODEL_CAPABILITIES_PATH"] = str(
+        Path(_SESSION_TEMP_DIR.name) / "model_capabilities.json"
+    )
 
     yield
 
@@ -50,3 +54,8 @@ def session_temp_env():
         os.environ["AUGQ_PROJECTS_REGISTRY"] = orig_reg
     else:
         os.environ.pop("AUGQ_PROJECTS_REGISTRY", None)
+
+    if orig_caps is not None:
+        os.environ["AUGQ_MODEL_CAPABILITIES_PATH"] = orig_caps
+    else:
+        os.environ.pop("AUGQ_MODEL_CAPABILITIES_PATH", None)
@@ -57,9 +57,10 @@ class TestChatStreamCoverage(TestCase):
         }
         self.addCleanup(self.patcher_config.stop)
 
-    @patch("augmentedquill.services.llm.llm.httpx.AsyncClient")
+    @patch("augmentedquill.services.llm.llm_http_pool.httpx.AsyncClient")
     def test_streaming_tool_call_hidden_text(self, MockClientClass):
         mock_client_instance = MagicMock()
+        mock_client_instance.is_closed = False
         MockClientClass.return_value = mock_client_instance
         mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
         mock_client_instance.__aexit__ = AsyncMock()
@@ -119,9 +120,10 @@ class TestChatStreamCoverage(TestCase):
         found_tool = any(tc["function"]["name"] == "list_images" for tc in tool_calls)
         self.assertTrue(found_tool, "Did not find list_images tool call")
 
-    @patch("augmentedquill.services.llm.llm.httpx.AsyncClient")
+    @patch("augmentedquill.services.llm.llm_http_pool.httpx.AsyncClient")
     def test_editing_model_tools(self, MockClientClass):
         mock_client_instance = MagicMock()
+        mock_client_instance.is_closed = False
         MockClientClass.return_value = mock_client_instance
         mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
         mock_client_instance.__aexit__ = AsyncMock()
@@ -177,9 +179,10 @@ class TestChatStreamCoverage(TestCase):
         self.assertIn("Edit start", content_text)
         self.assertIn("Edit end", content_text)
 
-    @patch("augmentedquill.services.llm.llm.httpx.AsyncClient")
+    @patch("augmentedquill.services.llm.llm_http_pool.httpx.AsyncClient")
     def test_non_streaming_json_response(self, MockClientClass):
         mock_client_instance = MagicMock()
+        mock_client_instance.is_closed = False
         MockClientClass.return_value = mock_client_instance
         mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
         mock_client_instance.__aexit__ = AsyncMock()
@@ -230,10 +233,11 @@ class TestChatStreamCoverage(TestCase):
             "Tool call not found in parsed non-streaming response",
         )
 
-    @patch("augmentedquill.services.llm.llm.httpx.AsyncClient")
+    @patch("augmentedquill.services.llm.llm_http_pool.httpx.AsyncClient")
     def test_native_tool_calling_stream(self, MockClientClass):
         """Test modern models that return tool_calls in stream chunks natively."""
         mock_client_instance = MagicMock()
+        mock_client_instance.is_closed = False
         MockClientClass.return_value = mock_client_instance
         mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
         mock_client_instance.__aexit__ = AsyncMock()
@@ -337,10 +341,11 @@ class TestChatStreamCoverage(TestCase):
         # If it finds them, it re-emits them.
         self.assertTrue(found_tool, f"Native tool calls not emitted. Events: {events}")
 
-    @patch("augmentedquill.services.llm.llm.httpx.AsyncClient")
+    @patch("augmentedquill.services.llm.llm_http_pool.httpx.AsyncClient")
     def test_native_tool_calling_non_stream(self, MockClientClass):
         """Test modern models that return tool_calls in a single JSON response."""
         mock_client_instance = MagicMock()
+        mock_client_instance.is_closed = False
         MockClientClass.return_value = mock_client_instance
         mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
         mock_client_instance.__aexit__ = AsyncMock()
@@ -397,10 +402,11 @@ class TestChatStreamCoverage(TestCase):
             any(tc["function"]["name"] == "list_images" for tc in tool_calls)
         )
 
-    @patch("augmentedquill.api.v1.chat.httpx.AsyncClient")
+    @patch("augmentedquill.services.llm.llm_http_pool.httpx.AsyncClient")
     def test_stream_commentary_tool_call_suppresses_json(self, MockClientClass):
         """Commentary/tool-call output should emit tool_calls and no user-visible JSON."""
         mock_client_instance = MagicMock()
+        mock_client_instance.is_closed = False
         MockClientClass.return_value = mock_client_instance
         mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
         mock_client_instance.__aexit__ = AsyncMock()
@@ -464,10 +470,11 @@ class TestChatStreamCoverage(TestCase):
             any(tc["function"]["name"] == "get_chapter_metadata" for tc in tool_calls)
         )
 
-    @patch("augmentedquill.api.v1.chat.httpx.AsyncClient")
+    @patch("augmentedquill.services.llm.llm_http_pool.httpx.AsyncClient")
     def test_sanitizes_assistant_tool_content(self, MockClientClass):
         """Assistant messages with tool_calls should not send tool args as content."""
         mock_client_instance = MagicMock()
+        mock_client_instance.is_closed = False
         MockClientClass.return_value = mock_client_instance
         mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
         mock_client_instance.__aexit__ = AsyncMock()
@@ -0,0 +1,137 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the test generations unit so this responsibility stays isolated, testable, and easy to evolve.
+
+import asyncio
+import json
+import os
+import tempfile
+from pathlib import Path
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+import httpx
+
+from augmentedquill.main import app
+import augmentedquill.services.llm.llm as llm
+from augmentedquill.services.llm.llm_generations import (
+    GenerationCancelled,
+    active_generations,
+    guarded_stream,
+    start_generation,
+)
+from augmentedquill.services.projects.projects import select_project
+
+
+class GenerationCancelTest(IsolatedAsyncioTestCase):
+    def setUp(self):
+        td = tempfile.TemporaryDirectory()
+        self.addCleanup(td.cleanup)
+        root = Path(td.name)
+        os.environ["AUGQ_PROJECTS_ROOT"] = str(root / "projects")
+        os.environ["AUGQ_PROJECTS_REGISTRY"] = str(root / "projects.json")
+        self.addCleanup(os.environ.pop, "AUGQ_PROJECTS_ROOT", None)
+        self.addCleanup(os.environ.pop, "AUGQ_PROJECTS_REGISTRY", None)
+
+        ok, msg = select_project("novel")
+        self.assertTrue(ok, msg)
+        pdir = root / "projects" / "novel"
+        (pdir / "chapters").mkdir(parents=True, exist_ok=True)
+        self.chapter = pdir / "chapters" / "0001.txt"
+        self.chapter.write_text("Start.", encoding="utf-8")
+        (pdir / "story.json").write_text(
+            json.dumps(
+                {
+                    "project_title": "P",
+                    "format": "markdown",
+                    "chapters": [{"title": "T1", "summary": "S1"}],
+                    "metadata": {"version": 2},
+                }
+            ),
+            encoding="utf-8",
+        )
+
+        self.upstream_closed = asyncio.Event()
+
+        async def fake_stream(**kwargs):
+            try:
+                yield {"content": "Partial"}
+                await asyncio.sleep(3600)
+                yield {"content": " never"}
+            finally:
+                self.upstream_closed.set()
+
+        for name, fake in (
+            (
+                "resolve_openai_credentials",
+                lambda payload, **kwargs: ("https://fake/v1", None, "m", 5),
+            ),
+            ("unified_chat_stream", fake_stream),
+        ):
+            self.addCleanup(setattr, llm, name, getattr(llm, name))
+            setattr(llm, name, fake)
+
+    async def _continue_and_cancel(self, **extra):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            post = asyncio.create_task(
+                c.post(
+                    "/api/v1/story/continue/stream",
+                    json={"chap_id": 1, "generation_id": "gen-1", **extra},
+                )
+            )
+            while not any(g["streaming"] for g in active_generations()):
+                await asyncio.sleep(0.01)
+            cancel = await c.delete("/api/v1/generations/gen-1")
+            self.assertEqual(cancel.status_code, 200)
+            response = await asyncio.wait_for(post, 5)
+            self.assertEqual(
+                (await c.delete("/api/v1/generations/gen-1")).status_code, 404
+            )
+        self.assertEqual(response.headers["x-generation-id"], "gen-1")
+        self.assertEqual(response.text, "Partial")
+        self.assertTrue(self.upstream_closed.is_set())
+        self.assertEqual(active_generations(), [])
+
+    async def test_cancelled_generation_is_not_persisted(self):
+        await self._continue_and_cancel()
+        self.assertEqual(self.chapter.read_text(encoding="utf-8"), "Start.")
+
+    async def test_partial_output_is_persisted_on_request(self):
+        await self._continue_and_cancel(persist_partial=True)
+        self.assertEqual(self.chapter.read_text(encoding="utf-8"), "Start.\nPartial")
+
+    async def test_client_disconnect_closes_the_upstream_stream(self):
+        class Request:
+            polls = 0
+
+            async def is_disconnected(self):
+                self.polls += 1
+                return self.polls > 2
+
+        generation = start_generation("chat")
+        stream = guarded_stream(
+            generation,
+            llm.unified_chat_stream(messages=[]),
+            Request(),
+        )
+        with patch.dict(os.environ, {"AUGQ_DISCONNECT_POLL_S": "0.05"}):
+            self.assertEqual(await anext(stream), {"content": "Partial"})
+            with self.assertRaises(GenerationCancelled):
+                await anext(stream)
+        self.assertEqual(generation.reason, "disconnected")
+        self.assertTrue(self.upstream_closed.is_set())
+        self.assertEqual(active_generations(), [])
+
+    async def test_invalid_generation_id_is_rejected(self):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            r = await c.post(
+                "/api/v1/story/continue/stream",
+                json={"chap_id": 1, "generation_id": "../x"},
+            )
+        self.assertEqual(r.status_code, 400)
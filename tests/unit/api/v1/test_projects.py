@@ -11,12 +11,16 @@ import os
 import tempfile
 from pathlib import Path
 from unittest import TestCase
+from unittest.mock import patch
 
+from augmentedquill.services.projects.project_registry_ops import ProjectRegistry
 from augmentedquill.services.projects.projects import (
     validate_project_dir,
     initialize_project_dir,
     select_project,
     load_registry,
+    get_active_project_dir,
+    delete_project,
     write_chapter_content,
     write_chapter_summary,
 )
@@ -148,3 +152,57 @@ class ProjectsTest(TestCase):
         # Check the story.json was updated
         updated_story = json.loads(story_file.read_text(encoding="utf-8"))
         self.assertEqual(updated_story["chapters"][0]["summary"], new_summary)
+
+
+class ProjectRegistryTest(TestCase):
+    def setUp(self):
+        self.td = tempfile.TemporaryDirectory()
+        self.addCleanup(self.td.cleanup)
+        self.registry_path = Path(self.td.name) / "projects.json"
+
+    def test_active_project_is_served_from_memory(self):
+        registry = ProjectRegistry(revalidate_interval_s=60)
+        registry.save(self.registry_path, "/tmp/proj-a", [])
+
+        with patch(
+            "augmentedquill.services.projects.project_registry_ops.file_signature"
+        ) as stat_mock:
+            for _ in range(10):
+                self.assertEqual(
+                    registry.active_project_dir(self.registry_path),
+                    Path("/tmp/proj-a"),
+                )
+            stat_mock.assert_not_called()
+
+    def test_external_change_is_picked_up_after_revalidation(self):
+        registry = ProjectRegistry(revalidate_interval_s=0)
+        registry.save(self.registry_path, "/tmp/proj-a", [])
+        self.registry_path.write_text(
+            json.dumps({"current": "/tmp/proj-other-b", "recent": []}),
+            encoding="utf-8",
+        )
+        self.assertEqual(
+            registry.active_project_dir(self.registry_path),
+            Path("/tmp/proj-other-b"),
+        )
+
+    def test_select_and_delete_write_through(self):
+        td = tempfile.TemporaryDirectory()
+        self.addCleanup(td.cleanup)
+        projects_root = Path(td.name) / "projects"
+        with patch.dict(
+            os.environ,
+            {
+                "AUGQ_PROJECTS_ROOT": str(projects_root),
+                "AUGQ_PROJECTS_REGISTRY": str(self.registry_path),
+            },
+        ):
+            ok, _ = select_project("alpha")
+            self.assertTrue(ok)
+            self.assertEqual(get_active_project_dir(), projects_root / "alpha")
+
+            ok, _ = delete_project("alpha")
+            self.assertTrue(ok)
+            self.assertIsNone(get_active_project_dir())
+            on_disk = json.loads(self.registry_path.read_text(encoding="utf-8"))
+            self.assertEqual(on_disk["current"], "")
@@ -126,6 +126,9 @@ class RestContractsTest(TestCase):
         async def fake_verify_caps(**kwargs):
             return {"supports_function_calling": True}
 
+        async def fake_probe_capabilities(*args, **kwargs):
+            return {"n": True}
+
         with (
             patch(
                 "augmentedquill.api.v1.settings.list_remote_models",
@@ -139,6 +142,10 @@ class RestContractsTest(TestCase):
                 "augmentedquill.utils.llm_utils.verify_model_capabilities",
                 side_effect=fake_verify_caps,
             ),
+            patch(
+                "augmentedquill.api.v1.settings.probe_capabilities",
+                side_effect=fake_probe_capabilities,
+            ),
         ):
             r_machine_test = self.client.post(
                 "/api/v1/machine/test",
@@ -161,6 +168,9 @@ class RestContractsTest(TestCase):
             self.assertEqual(r_machine_model.status_code, 200)
             self.assertTrue(r_machine_model.json().get("ok"))
             self.assertTrue(r_machine_model.json().get("model_ok"))
+            self.assertEqual(
+                r_machine_model.json().get("learned_capabilities"), {"n": True}
+            )
 
             r_machine_model_invalid = self.client.post(
                 "/api/v1/machine/test_model", json={"model_id": "x"}
@@ -0,0 +1,186 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the test resumable streams unit so this responsibility stays isolated, testable, and easy to evolve.
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+import httpx
+
+from augmentedquill.main import app
+import augmentedquill.services.llm.llm as llm
+import augmentedquill.services.llm.llm_stream_buffer as llm_stream_buffer
+from augmentedquill.services.llm.llm_stream_buffer import (
+    get_stream_buffer,
+    sse_from_buffer,
+    start_buffered,
+)
+from augmentedquill.services.projects.projects import select_project
+
+
+def _events(sse: str):
+    """(id, data) of every event in an SSE body."""
+    events = []
+    for block in sse.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields.get("id"), fields["data"]))
+    return events
+
+
+class StreamBufferTest(IsolatedAsyncioTestCase):
+    def setUp(self):
+        td = tempfile.TemporaryDirectory()
+        self.addCleanup(td.cleanup)
+        self.dir = Path(td.name)
+        self.addCleanup(
+            setattr, llm_stream_buffer, "SPILL_DIR", llm_stream_buffer.SPILL_DIR
+        )
+        llm_stream_buffer.SPILL_DIR = self.dir
+        self.addCleanup(llm_stream_buffer._buffers.clear)
+
+    async def _words(self, n):
+        for i in range(n):
+            yield {"content": f"w{i}"}
+
+    async def test_spilled_events_resume_after_last_event_id(self):
+        with patch.dict(os.environ, {"AUGQ_STREAM_BUFFER_MEMORY_BYTES": "40"}):
+            buffer = start_buffered("g1", self._words(10))
+            await llm_stream_buffer._pumps["g1"]
+        self.assertTrue(buffer.spill_path.exists())
+
+        sse = "".join([chunk async for chunk in sse_from_buffer(buffer, "3")])
+        events = _events(sse)
+        self.assertEqual([e[0] for e in events[:-1]], [str(i) for i in range(4, 10)])
+        self.assertEqual(json.loads(events[0][1]), {"content": "w4"})
+        self.assertEqual(events[-1], (None, "[DONE]"))
+
+    async def test_finished_buffers_expire_after_ttl(self):
+        with patch.dict(os.environ, {"AUGQ_STREAM_BUFFER_MEMORY_BYTES": "0"}):
+            buffer = start_buffered("g2", self._words(2))
+            await llm_stream_buffer._pumps["g2"]
+        with self.assertRaises(ValueError):
+            start_buffered("g2", self._words(1))
+        buffer.finished_at = time.time() - 3600
+        self.assertIsNone(get_stream_buffer("g2"))
+        self.assertFalse(buffer.spill_path.exists())
+
+
+class ResumableRouteTest(IsolatedAsyncioTestCase):
+    def setUp(self):
+        td = tempfile.TemporaryDirectory()
+        self.addCleanup(td.cleanup)
+        root = Path(td.name)
+        os.environ["AUGQ_PROJECTS_ROOT"] = str(root / "projects")
+        os.environ["AUGQ_PROJECTS_REGISTRY"] = str(root / "projects.json")
+        self.addCleanup(os.environ.pop, "AUGQ_PROJECTS_ROOT", None)
+        self.addCleanup(os.environ.pop, "AUGQ_PROJECTS_REGISTRY", None)
+        self.addCleanup(
+            setattr, llm_stream_buffer, "SPILL_DIR", llm_stream_buffer.SPILL_DIR
+        )
+        llm_stream_buffer.SPILL_DIR = root / "streams"
+        self.addCleanup(llm_stream_buffer._buffers.clear)
+
+        ok, msg = select_project("novel")
+        self.assertTrue(ok, msg)
+        pdir = root / "projects" / "novel"
+        (pdir / "chapters").mkdir(parents=True, exist_ok=True)
+        self.chapter = pdir / "chapters" / "0001.txt"
+        self.chapter.write_text("Start.", encoding="utf-8")
+        (pdir / "story.json").write_text(
+            json.dumps(
+                {
+                    "project_title": "P",
+                    "format": "markdown",
+                    "chapters": [{"title": "T1", "summary": "S1"}],
+                    "metadata": {"version": 2},
+                }
+            ),
+            encoding="utf-8",
+        )
+
+        self.release = asyncio.Event()
+
+        async def fake_stream(**kwargs):
+            yield {"content": "Partial"}
+            await self.release.wait()
+            yield {"content": " and"}
+            yield {"content": " the rest."}
+
+        for name, fake in (
+            (
+                "resolve_openai_credentials",
+                lambda payload, **kwargs: ("https://fake/v1", None, "m", 5),
+            ),
+            ("unified_chat_stream", fake_stream),
+        ):
+            self.addCleanup(setattr, llm, name, getattr(llm, name))
+            setattr(llm, name, fake)
+
+    async def test_dropped_connection_keeps_generating_and_resumes(self):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            post = asyncio.create_task(
+                c.post(
+                    "/api/v1/story/continue/stream",
+                    json={"chap_id": 1, "generation_id": "gen-r", "resumable": True},
+                )
+            )
+            while get_stream_buffer("gen-r") is None:
+                await asyncio.sleep(0.01)
+            buffer = get_stream_buffer("gen-r")
+            async for _ in buffer.events():
+                break
+            # The client goes away after the first event.
+            post.cancel()
+            await asyncio.gather(post, return_exceptions=True)
+
+            self.release.set()
+            await asyncio.wait_for(llm_stream_buffer._pumps["gen-r"], 5)
+            self.assertEqual(
+                self.chapter.read_text(encoding="utf-8"),
+                "Start.\nPartial and the rest.",
+            )
+
+            r = await c.get(
+                "/api/v1/generations/gen-r/stream", headers={"Last-Event-ID": "0"}
+            )
+            missing = await c.get("/api/v1/generations/unknown/stream")
+        self.assertEqual(r.headers["content-type"].split(";")[0], "text/event-stream")
+        self.assertEqual(
+            _events(r.text),
+            [
+                ("1", json.dumps({"content": " and"})),
+                ("2", json.dumps({"content": " the rest."})),
+                (None, "[DONE]"),
+            ],
+        )
+        self.assertEqual(missing.status_code, 404)
+
+    async def test_chat_stream_is_resumable(self):
+        self.release.set()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            r = await c.post(
+                "/api/v1/chat/stream",
+                json={
+                    "messages": [{"role": "user", "content": "Hi"}],
+                    "generation_id": "chat-r",
+                    "resumable": True,
+                },
+            )
+            again = await c.get(
+                "/api/v1/generations/chat-r/stream", headers={"Last-Event-ID": "1"}
+            )
+        events = _events(r.text)
+        self.assertEqual([e[0] for e in events], ["0", "1", "2", None])
+        self.assertEqual(_events(again.text), events[2:])
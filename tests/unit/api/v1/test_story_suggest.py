@@ -0,0 +1,170 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the test story suggest unit so this responsibility stays isolated, testable, and easy to evolve.
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+import httpx
+from fastapi.testclient import TestClient
+
+from augmentedquill.main import app
+import augmentedquill.services.llm.llm as llm
+from augmentedquill.services.projects.projects import select_project
+from augmentedquill.services.llm.llm_capabilities import capabilities
+
+
+def _events(text: str) -> list:
+    return [
+        json.loads(line[len("data: ") :])
+        for line in text.splitlines()
+        if line.startswith("data: ") and line != "data: [DONE]"
+    ]
+
+
+def _choices(events: list) -> dict:
+    out: dict = {}
+    for event in events:
+        out[event["index"]] = out.get(event["index"], "") + event.get("content", "")
+    return out
+
+
+class StorySuggestChoicesTest(TestCase):
+    def setUp(self):
+        self.td = tempfile.TemporaryDirectory()
+        self.addCleanup(self.td.cleanup)
+        root = Path(self.td.name)
+        os.environ["AUGQ_PROJECTS_ROOT"] = str(root / "projects")
+        os.environ["AUGQ_PROJECTS_REGISTRY"] = str(root / "projects.json")
+        self.addCleanup(os.environ.pop, "AUGQ_PROJECTS_ROOT", None)
+        self.addCleanup(os.environ.pop, "AUGQ_PROJECTS_REGISTRY", None)
+        self.addCleanup(capabilities.clear)
+
+        ok, msg = select_project("novel")
+        self.assertTrue(ok, msg)
+        pdir = root / "projects" / "novel"
+        (pdir / "chapters").mkdir(parents=True, exist_ok=True)
+        (pdir / "chapters" / "0001.txt").write_text("Hello", encoding="utf-8")
+        (pdir / "story.json").write_text(
+            json.dumps(
+                {
+                    "project_title": "P",
+                    "format": "markdown",
+                    "chapters": [{"title": "T1", "summary": "S1"}],
+                    "metadata": {"version": 2},
+                }
+            ),
+            encoding="utf-8",
+        )
+
+        self.choice_calls = []
+        self.single_calls = []
+
+        async def fake_single(*, prompt, **kwargs):
+            self.single_calls.append(prompt)
+            yield f"\n\nAlt {len(self.single_calls)} line"
+            yield " end.\nIgnored"
+
+        for name, fake in (
+            (
+                "resolve_openai_credentials",
+                lambda payload, **kwargs: ("https://fake/v1", None, "m", 5),
+            ),
+            ("openai_completions_stream", fake_single),
+        ):
+            self.addCleanup(setattr, llm, name, getattr(llm, name))
+            setattr(llm, name, fake)
+        self.client = TestClient(app)
+
+    def _use_choices(self, fake):
+        async def recording(*, prompt, n, **kwargs):
+            self.choice_calls.append((prompt, n))
+            async for item in fake():
+                yield item
+
+        self.addCleanup(
+            setattr,
+            llm,
+            "openai_completions_stream_choices",
+            llm.openai_completions_stream_choices,
+        )
+        llm.openai_completions_stream_choices = recording
+
+    def _suggest(self, n=2):
+        r = self.client.post(
+            "/api/v1/story/suggest", json={"chap_id": 1, "current_text": "Hi", "n": n}
+        )
+        self.assertEqual(r.status_code, 200, r.text)
+        self.assertTrue(r.headers["content-type"].startswith("text/event-stream"))
+        self.assertTrue(r.text.endswith("data: [DONE]\n\n"))
+        return _events(r.text)
+
+    def test_one_upstream_call_multiplexes_choices(self):
+        async def interleaved():
+            yield 1, "Second"
+            yield 0, "First"
+            yield 0, " one.\nrest"
+            yield 1, " one.\n"
+            yield 0, "never sent"
+
+        self._use_choices(interleaved)
+        events = self._suggest()
+
+        self.assertEqual(len(self.choice_calls), 1)
+        self.assertEqual(self.choice_calls[0][1], 2)
+        self.assertEqual(self.single_calls, [])
+        self.assertEqual(_choices(events), {0: "First one.", 1: "Second one."})
+        done = [e["index"] for e in events if e.get("done")]
+        self.assertEqual(done, [0, 1])
+
+    def test_backend_ignoring_n_falls_back_to_fan_out(self):
+        async def only_first():
+            yield 0, "Only one.\n"
+
+        self._use_choices(only_first)
+        events = self._suggest(n=3)
+        self.assertEqual(
+            _choices(events),
+            {0: "Only one.", 1: "\nAlt 1 line end.", 2: "\nAlt 2 line end."},
+        )
+        self.assertEqual(len(self.single_calls), 2)
+        self.assertEqual(len({self.choice_calls[0][0], *self.single_calls}), 1)
+
+        # The backend is remembered and fanned out to directly next time.
+        self._suggest(n=2)
+        self.assertEqual(len(self.choice_calls), 1)
+        self.assertEqual(len(self.single_calls), 4)
+
+    def test_rejected_n_falls_back_to_fan_out(self):
+        async def rejected():
+            request = httpx.Request("POST", "https://fake/v1/completions")
+            raise httpx.HTTPStatusError(
+                "bad", request=request, response=httpx.Response(400, request=request)
+            )
+            yield  # pragma: no cover
+
+        self._use_choices(rejected)
+        events = self._suggest()
+        self.assertEqual(
+            _choices(events), {0: "\nAlt 1 line end.", 1: "\nAlt 2 line end."}
+        )
+
+    def test_without_n_the_response_stays_plain_text(self):
+        r = self.client.post(
+            "/api/v1/story/suggest", json={"chap_id": 1, "current_text": "Hi"}
+        )
+        self.assertEqual(r.status_code, 200, r.text)
+        self.assertTrue(r.headers["content-type"].startswith("text/plain"))
+        self.assertEqual(r.text, "\nAlt 1 line end.")
+
+    def test_invalid_n_is_rejected(self):
+        for n in (0, 99, "2", True):
+            r = self.client.post("/api/v1/story/suggest", json={"chap_id": 1, "n": n})
+            self.assertEqual(r.status_code, 400, n)
@@ -6,13 +6,28 @@
 # (at your option) any later version.
 # Purpose: Defines the test config unit so this responsibility stays isolated, testable, and easy to evolve.
 
+import contextvars
 import os
 import tempfile
 import json
+import time
 from pathlib import Path
 from unittest import TestCase
+from unittest.mock import patch
 
-from augmentedquill.core.config import load_machine_config, load_story_config
+from augmentedquill.core.config import (
+    StoryMergeConflict,
+    _get_story_validator,
+    begin_story_write_stage,
+    clear_story_config_cache,
+    end_story_write_stage,
+    load_machine_config,
+    load_story_config,
+    save_machine_config,
+    save_story_config,
+    story_config_cache_stats,
+)
+from augmentedquill.utils import json_file_cache
 
 
 class ConfigLoaderTest(TestCase):
@@ -84,3 +99,281 @@ class ConfigLoaderTest(TestCase):
             self.assertEqual(cfg["project_title"], "My Novel")
             self.assertEqual(cfg["format"], "markdown")
             self.assertEqual(cfg["chapters"], ["000-intro.md", "010-conflict.md"])
+
+
+class StoryConfigCacheTest(TestCase):
+    def setUp(self):
+        clear_story_config_cache()
+
+    def _write_story(self, path: Path, title: str) -> None:
+        path.write_text(
+            json.dumps(
+                {
+                    "metadata": {"version": 2},
+                    "project_title": title,
+                    "project_type": "novel",
+                    "chapters": [{"title": "One", "summary": ""}],
+                }
+            ),
+            encoding="utf-8",
+        )
+
+    def test_repeated_load_hits_cache_and_returns_copies(self):
+        with tempfile.TemporaryDirectory() as td:
+            cfg_path = Path(td) / "story.json"
+            self._write_story(cfg_path, "Cached")
+
+            first = load_story_config(cfg_path)
+            first["chapters"][0]["title"] = "Mutated by caller"
+            second = load_story_config(cfg_path)
+
+            self.assertEqual(second["chapters"][0]["title"], "One")
+            self.assertEqual(story_config_cache_stats()["misses"], 1)
+            self.assertEqual(story_config_cache_stats()["hits"], 1)
+
+    def test_external_rewrite_invalidates_entry(self):
+        with tempfile.TemporaryDirectory() as td:
+            cfg_path = Path(td) / "story.json"
+            self._write_story(cfg_path, "Before")
+            self.assertEqual(load_story_config(cfg_path)["project_title"], "Before")
+
+            # Same size, likely same mtime tick: must still be detected.
+            self._write_story(cfg_path, "After!")
+            self.assertEqual(load_story_config(cfg_path)["project_title"], "After!")
+
+    def test_save_writes_through_to_cache(self):
+        with tempfile.TemporaryDirectory() as td:
+            cfg_path = Path(td) / "story.json"
+            self._write_story(cfg_path, "Original")
+            story = load_story_config(cfg_path)
+            story["project_title"] = "Saved"
+            save_story_config(cfg_path, story)
+
+            stats_before = story_config_cache_stats()
+            reloaded = load_story_config(cfg_path)
+
+            self.assertEqual(reloaded["project_title"], "Saved")
+            self.assertEqual(
+                story_config_cache_stats()["hits"], stats_before["hits"] + 1
+            )
+            on_disk = json.loads(cfg_path.read_text(encoding="utf-8"))
+            self.assertEqual(on_disk["project_title"], "Saved")
+
+    def test_confirmed_entry_stops_rereading_after_save(self):
+        with tempfile.TemporaryDirectory() as td:
+            cfg_path = Path(td) / "story.json"
+            self._write_story(cfg_path, "Original")
+            story = load_story_config(cfg_path)
+            story["project_title"] = "Saved"
+            with patch.object(json_file_cache, "RACY_WINDOW_NS", 50_000_000):
+                save_story_config(cfg_path, story)
+                load_story_config(cfg_path)
+                # Still inside the window: the content is compared.
+                self.assertEqual(story_config_cache_stats()["rereads"], 1)
+
+                time.sleep(0.06)
+                for _ in range(3):
+                    loaded = load_story_config(cfg_path)
+                # One confirming read after the window, then none.
+                self.assertEqual(story_config_cache_stats()["rereads"], 2)
+                self.assertEqual(loaded["project_title"], "Saved")
+
+    def test_debug_endpoint_shows_and_clears_the_cache(self):
+        from fastapi.testclient import TestClient
+
+        import augmentedquill.main as main
+
+        with tempfile.TemporaryDirectory() as td:
+            cfg_path = Path(td) / "story.json"
+            self._write_story(cfg_path, "Original")
+            load_story_config(cfg_path)
+            load_story_config(cfg_path)
+
+            client = TestClient(main.app)
+            stats = client.get("/api/v1/debug/story_config_cache").json()
+            self.assertEqual(stats, story_config_cache_stats())
+            self.assertGreaterEqual(stats["entries"], 1)
+            self.assertGreaterEqual(stats["hits"], 1)
+            response = client.delete("/api/v1/debug/story_config_cache")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(story_config_cache_stats()["entries"], 0)
+
+
+class StoryWriteStageTest(TestCase):
+    def setUp(self):
+        clear_story_config_cache()
+        self.td = tempfile.TemporaryDirectory()
+        self.addCleanup(self.td.cleanup)
+        self.path = Path(self.td.name) / "story.json"
+        self.path.write_text(
+            json.dumps(
+                {
+                    "metadata": {"version": 2},
+                    "project_title": "Title",
+                    "project_type": "novel",
+                    "story_summary": "Old summary",
+                    "chapters": [{"title": "One", "summary": ""}],
+                }
+            ),
+            encoding="utf-8",
+        )
+
+    def _save_elsewhere(self, **changes):
+        """Save from a context without the stage, like another request."""
+
+        def save():
+            story = load_story_config(self.path)
+            story.update(changes)
+            save_story_config(self.path, story)
+
+        contextvars.Context().run(save)
+
+    def test_flush_writes_staged_config(self):
+        stage = begin_story_write_stage(self.path)
+        story = load_story_config(self.path)
+        story["story_summary"] = "Staged"
+        save_story_config(self.path, story)
+        on_disk = json.loads(self.path.read_text(encoding="utf-8"))
+        self.assertEqual(on_disk["story_summary"], "Old summary")
+
+        end_story_write_stage(stage)
+        on_disk = json.loads(self.path.read_text(encoding="utf-8"))
+        self.assertEqual(on_disk["story_summary"], "Staged")
+
+    def test_flush_keeps_changes_saved_by_others(self):
+        stage = begin_story_write_stage(self.path)
+        story = load_story_config(self.path)
+        story["story_summary"] = "Staged"
+        save_story_config(self.path, story)
+
+        self._save_elsewhere(project_title="Renamed", tags=["sea"])
+        end_story_write_stage(stage)
+
+        on_disk = json.loads(self.path.read_text(encoding="utf-8"))
+        self.assertEqual(on_disk["story_summary"], "Staged")
+        self.assertEqual(on_disk["project_title"], "Renamed")
+        self.assertEqual(on_disk["tags"], ["sea"])
+        self.assertEqual(load_story_config(self.path)["project_title"], "Renamed")
+
+    def test_flush_merges_edits_to_the_same_chapter(self):
+        stage = begin_story_write_stage(self.path)
+        story = load_story_config(self.path)
+        story["chapters"][0]["summary"] = "Staged"
+        save_story_config(self.path, story)
+
+        self._save_elsewhere(chapters=[{"title": "One", "summary": "", "notes": "N"}])
+        end_story_write_stage(stage)
+
+        chapter = json.loads(self.path.read_text(encoding="utf-8"))["chapters"][0]
+        self.assertEqual(chapter["summary"], "Staged")
+        self.assertEqual(chapter["notes"], "N")
+
+    def test_flush_refuses_conflicting_edits(self):
+        stage = begin_story_write_stage(self.path)
+        story = load_story_config(self.path)
+        story["chapters"][0]["summary"] = "Staged"
+        save_story_config(self.path, story)
+
+        self._save_elsewhere(chapters=[{"title": "One", "summary": "Theirs"}])
+        with self.assertRaises(StoryMergeConflict):
+            end_story_write_stage(stage)
+
+        chapter = json.loads(self.path.read_text(encoding="utf-8"))["chapters"][0]
+        self.assertEqual(chapter["summary"], "Theirs")
+
+
+class StoryValidationPolicyTest(TestCase):
+    def setUp(self):
+        clear_story_config_cache()
+        self._orig_policy = os.environ.pop("AUGQ_STORY_VALIDATION", None)
+
+    def tearDown(self):
+        os.environ.pop("AUGQ_STORY_VALIDATION", None)
+        if self._orig_policy is not None:
+            os.environ["AUGQ_STORY_VALIDATION"] = self._orig_policy
+
+    def _write_invalid_story(self, path: Path) -> None:
+        path.write_text(
+            json.dumps(
+                {
+                    "metadata": {"version": 2},
+                    "project_title": "Bad",
+                    "llm_prefs": {"temperature": 9, "max_tokens": 10},
+                }
+            ),
+            encoding="utf-8",
+        )
+
+    def test_validator_is_compiled_once_per_version(self):
+        self.assertIs(_get_story_validator(2), _get_story_validator(2))
+
+    def test_save_rejects_invalid_config_without_writing(self):
+        with tempfile.TemporaryDirectory() as td:
+            cfg_path = Path(td) / "story.json"
+            with self.assertRaises(ValueError):
+                save_story_config(
+                    cfg_path,
+                    {
+                        "project_title": "Bad",
+                        "llm_prefs": {"temperature": 9, "max_tokens": 10},
+                    },
+                )
+            self.assertFalse(cfg_path.exists())
+
+    def test_normal_policy_validates_files_read_from_disk(self):
+        with tempfile.TemporaryDirectory() as td:
+            cfg_path = Path(td) / "story.json"
+            self._write_invalid_story(cfg_path)
+            with self.assertRaises(ValueError):
+                load_story_config(cfg_path)
+
+    def test_writes_policy_trusts_files_on_disk(self):
+        os.environ["AUGQ_STORY_VALIDATION"] = "writes"
+        with tempfile.TemporaryDirectory() as td:
+            cfg_path = Path(td) / "story.json"
+            self._write_invalid_story(cfg_path)
+            cfg = load_story_config(cfg_path)
+            self.assertEqual(cfg["llm_prefs"]["temperature"], 9)
+
+
+class MachineConfigCacheTest(TestCase):
+    def _write_machine(self, path: Path, model: str) -> None:
+        path.write_text(
+            json.dumps({"openai": {"models": [{"name": "m", "model": model}]}}),
+            encoding="utf-8",
+        )
+
+    def test_returns_copies_and_sees_external_rewrites(self):
+        with tempfile.TemporaryDirectory() as td:
+            cfg_path = Path(td) / "machine.json"
+            self._write_machine(cfg_path, "model-a")
+
+            first = load_machine_config(cfg_path)
+            first["openai"]["models"][0]["model"] = "mutated"
+            self.assertEqual(
+                load_machine_config(cfg_path)["openai"]["models"][0]["model"],
+                "model-a",
+            )
+
+            self._write_machine(cfg_path, "model-b")
+            self.assertEqual(
+                load_machine_config(cfg_path)["openai"]["models"][0]["model"],
+                "model-b",
+            )
+
+    def test_save_machine_config_invalidates_and_env_overrides_apply(self):
+        with tempfile.TemporaryDirectory() as td:
+            cfg_path = Path(td) / "machine.json"
+            self._write_machine(cfg_path, "model-a")
+            load_machine_config(cfg_path)
+
+            save_machine_config(cfg_path, {"openai": {"selected": "m"}})
+            os.environ["OPENAI_MODEL"] = "gpt-env"
+            try:
+                cfg = load_machine_config(cfg_path)
+            finally:
+                os.environ.pop("OPENAI_MODEL")
+
+            self.assertEqual(cfg["openai"]["selected"], "m")
+            self.assertEqual(cfg["openai"]["model"], "gpt-env")
+            self.assertNotIn("model", load_machine_config(cfg_path)["openai"])
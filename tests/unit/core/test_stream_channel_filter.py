@@ -6,10 +6,155 @@
 # (at your option) any later version.
 # Purpose: Defines the test stream channel filter unit so this responsibility stays isolated, testable, and easy to evolve.
 
+import random
+import re
+import time
 import unittest
 from augmentedquill.utils.stream_helpers import ChannelFilter
 
 
+class _ReferenceChannelFilter:
+    """The regex filter used before the incremental scanner existed."""
+
+    def __init__(self):
+        self.current_channel = "final"
+        self.buffer = ""
+        self.tag_pattern = re.compile(
+            r"(<\|channel\|>(.*?)<\|message\|>|"
+            r"<\|start\|>assistant.*?<\|message\|>|"
+            r"<\|end\|>|"
+            r"<(thought|thinking)>|"
+            r"</(thought|thinking)>|"
+            r"\[TOOL_CALL\]\s*|"
+            r"\s*\[/TOOL_CALL\]|"
+            r"<tool_call>|"
+            r"</tool_call>)",
+            re.IGNORECASE | re.DOTALL,
+        )
+
+    def feed(self, chunk):
+        self.buffer += chunk
+        results = []
+        while True:
+            match = self.tag_pattern.search(self.buffer)
+            if not match:
+                idxs = [
+                    i for i in (self.buffer.find("<"), self.buffer.find("[")) if i != -1
+                ]
+                first_bracket = min(idxs) if idxs else -1
+                if first_bracket == -1:
+                    if self.buffer:
+                        results.append(
+                            {"channel": self.current_channel, "content": self.buffer}
+                        )
+                        self.buffer = ""
+                elif first_bracket > 0:
+                    results.append(
+                        {
+                            "channel": self.current_channel,
+                            "content": self.buffer[:first_bracket],
+                        }
+                    )
+                    self.buffer = self.buffer[first_bracket:]
+                if len(self.buffer) > 150:
+                    results.append(
+                        {"channel": self.current_channel, "content": self.buffer[0]}
+                    )
+                    self.buffer = self.buffer[1:]
+                break
+
+            start, end = match.span()
+            if start > 0:
+                results.append(
+                    {"channel": self.current_channel, "content": self.buffer[:start]}
+                )
+            tag_text = match.group(0)
+            if re.match(r"<(thought|thinking)>", tag_text, re.IGNORECASE):
+                self.current_channel = "thought"
+            elif re.match(r"</(thought|thinking)>", tag_text, re.IGNORECASE):
+                self.current_channel = "final"
+            elif re.match(r"\[TOOL_CALL\]\s*|<tool_call>", tag_text, re.IGNORECASE):
+                self.current_channel = "tool_def"
+            elif re.match(r"\[/TOOL_CALL\]|</tool_call>", tag_text, re.IGNORECASE):
+                self.current_channel = "final"
+            elif tag_text.startswith("<|channel|>"):
+                channel_name = match.group(2)
+                if channel_name:
+                    if "<|constrain|>" in channel_name:
+                        channel_name = channel_name.split("<|constrain|>", 1)[0]
+                    self.current_channel = channel_name.strip()
+            elif (
+                tag_text.startswith("<|start|>assistant") and "<|channel|>" in tag_text
+            ):
+                channel_name = tag_text.split("<|channel|>", 1)[1]
+                channel_name = channel_name.split("<|message|>", 1)[0]
+                if "<|constrain|>" in channel_name:
+                    channel_name = channel_name.split("<|constrain|>", 1)[0]
+                self.current_channel = channel_name.strip()
+            elif "<|message|>" in tag_text:
+                pass
+            elif "<|end|>" in tag_text:
+                self.current_channel = "final"
+            self.buffer = self.buffer[end:]
+        return results
+
+    def flush(self):
+        results = []
+        if self.buffer:
+            results.append({"channel": self.current_channel, "content": self.buffer})
+            self.buffer = ""
+        return results
+
+
+_FRAGMENTS = [
+    "Hello",
+    " world",
+    ".",
+    "\n",
+    "  ",
+    "\t",
+    "\u00a0",
+    "x" * 60,
+    "a < b",
+    "[1]",
+    "<",
+    "[",
+    "<|",
+    "<|channel|>",
+    "<|CHANNEL|>",
+    "analysis",
+    "final",
+    " commentary ",
+    "<|constrain|>json",
+    "<|message|>",
+    "<|MESSAGE|>",
+    "<|start|>assistant",
+    "<|START|>Assistant",
+    "<|end|>",
+    "<|END|>",
+    "<thought>",
+    "</thought>",
+    "<THINKING>",
+    "</thinking>",
+    "<tool_call>",
+    "</TOOL_CALL>",
+    "[TOOL_CALL]",
+    "[tool_call]",
+    "[/TOOL_CALL]",
+    "[/tool_caLL]",
+    "<thin",
+    "king>",
+    "[TOOL_",
+    "<thin\u212aing>",
+    "<|ſtart|>assiſtant",
+    "<thınking>",
+    '{"a": 1}',
+    "</",
+    "<|en",
+    "d|>",
+]
+
+
 class TestChannelFilter(unittest.TestCase):
     def test_tool_call_xml_tags_json_content(self):
         """Test that <tool_call> tags switch the channel correctly, prevention leakage."""
@@ -66,5 +211,75 @@ class TestChannelFilter(unittest.TestCase):
         self.assertEqual(cf.current_channel, "final")
 
 
+def _random_stream(rng: random.Random):
+    text = "".join(rng.choice(_FRAGMENTS) for _ in range(rng.randint(1, 80)))
+    chunks = []
+    pos = 0
+    while pos < len(text):
+        size = rng.choice((0, 1, 1, 2, 3, 5, 8, 20, 200))
+        chunks.append(text[pos : pos + size])
+        pos += size
+    return chunks
+
+
+class ChannelFilterReferenceTest(unittest.TestCase):
+    """The incremental filter must emit exactly what the regex filter did."""
+
+    def _assert_same(self, chunks):
+        new, ref = ChannelFilter(), _ReferenceChannelFilter()
+        for chunk in chunks:
+            self.assertEqual(new.feed(chunk), ref.feed(chunk), chunks)
+            self.assertEqual(new.current_channel, ref.current_channel, chunks)
+            self.assertEqual(new.buffer, ref.buffer, chunks)
+        self.assertEqual(new.flush(), ref.flush(), chunks)
+        self.assertEqual(new.feed("tail<"), ref.feed("tail<"), chunks)
+
+    def test_random_streams_match_reference(self):
+        rng = random.Random(2026)
+        for _ in range(3000):
+            self._assert_same(_random_stream(rng))
+
+    def test_edge_cases_match_reference(self):
+        cases = [
+            ["<|channel|>analysis<|message|>Think.<|end|>Done"],
+            ["<|start|>assistant<|channel|>final <|constrain|>json", "<|message|>{}"],
+            ["<|channel|>a", "<thought>b", "<|message|>c"],
+            ["x  ", " [/TOOL_CALL] after"],
+            ["x   [/TOOL", "_CALL]y"],
+            ["[TOOL_CALL]", "  {}", "  [/TOOL_CALL]"],
+            ["[TOOL_CALL]  \n", "{}"],
+            ["a < b " + "c" * 200, "d", "e", "<|end|>"],
+            ["<" * 300, "<|end|>", "<tool_call>"],
+            ["<thin", "", "king>deep", "</thinking>"],
+        ]
+        for chunks in cases:
+            self._assert_same(chunks)
+
+
+class ChannelFilterScalingTest(unittest.TestCase):
+    """Feeding must stay linear in the stream length, also when tags never close."""
+
+    @staticmethod
+    def _time(n: int) -> float:
+        # With a "<" in nearly every chunk the text is held back for good and
+        # the old filter searched the whole held-back buffer on every chunk.
+        chunks = ["a<<", "< ", "x[<"] * (n // 3)
+        best = float("inf")
+        for _ in range(3):
+            cf = ChannelFilter()
+            start = time.perf_counter()
+            for chunk in chunks:
+                cf.feed(chunk)
+            cf.flush()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    def test_scaling_2k_20k(self):
+        t2k = self._time(2_000)
+        t20k = self._time(20_000)
+        self.assertLess(t20k, t2k * 30, (t2k, t20k))
+        self.assertLess(t20k, 2.0, (t2k, t20k))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,126 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the test chapter index unit so this responsibility stays isolated, testable, and easy to evolve.
+
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from augmentedquill.services.chapters import chapter_index
+from augmentedquill.services.chapters.chapter_index import ChapterIndex
+
+
+def _age(path: Path) -> None:
+    """Move mtime out of the racy window so the index trusts it."""
+    old = time.time() - 60
+    os.utime(path, (old, old))
+
+
+class ChapterIndexTest(TestCase):
+    def setUp(self):
+        self.td = tempfile.TemporaryDirectory()
+        self.addCleanup(self.td.cleanup)
+        self.project = Path(self.td.name) / "proj"
+        self.project.mkdir()
+
+    def _write_story(self, story: dict) -> None:
+        (self.project / "story.json").write_text(json.dumps(story), encoding="utf-8")
+
+    def _make_series(self, books: int, chapters: int) -> list[Path]:
+        dirs = []
+        book_list = []
+        for b in range(books):
+            bid = f"book-{b:02d}"
+            d = self.project / "books" / bid / "chapters"
+            d.mkdir(parents=True)
+            for c in range(chapters):
+                (d / f"{c + 1:04d}.txt").write_text("", encoding="utf-8")
+            dirs.append(d)
+            book_list.append({"id": bid, "title": bid, "chapters": []})
+        self._write_story(
+            {"metadata": {"version": 2}, "project_type": "series", "books": book_list}
+        )
+        for d in dirs:
+            _age(d)
+        return dirs
+
+    def test_series_ids_are_linear_across_books(self):
+        self._make_series(books=3, chapters=2)
+        index = ChapterIndex(self.project)
+
+        entries = index.entries()
+        self.assertEqual([vid for vid, _ in entries], [1, 2, 3, 4, 5, 6])
+        path, pos = index.lookup(4)
+        self.assertEqual(
+            path, self.project / "books" / "book-01" / "chapters" / "0002.txt"
+        )
+        self.assertEqual(pos, 3)
+        self.assertEqual(index.id_for_path(path), 4)
+        self.assertIsNone(index.lookup(7))
+
+    def test_unchanged_directories_are_not_rescanned(self):
+        self._make_series(books=5, chapters=3)
+        index = ChapterIndex(self.project)
+        index.entries()
+
+        with patch.object(
+            chapter_index, "_scan_directory", wraps=chapter_index._scan_directory
+        ) as scan:
+            for _ in range(5):
+                index.lookup(7)
+            scan.assert_not_called()
+
+    def test_only_changed_directory_is_rescanned(self):
+        dirs = self._make_series(books=4, chapters=2)
+        index = ChapterIndex(self.project)
+        index.entries()
+
+        (dirs[1] / "0003.txt").write_text("", encoding="utf-8")
+        with patch.object(
+            chapter_index, "_scan_directory", wraps=chapter_index._scan_directory
+        ) as scan:
+            entries = index.entries()
+            scan.assert_called_once_with(dirs[1])
+
+        self.assertEqual(len(entries), 9)
+        self.assertEqual(index.lookup(5)[0], dirs[1] / "0003.txt")
+        self.assertEqual(index.lookup(6)[0], dirs[2] / "0001.txt")
+
+    def test_book_list_change_rebuilds(self):
+        self._make_series(books=2, chapters=1)
+        index = ChapterIndex(self.project)
+        self.assertEqual(len(index.entries()), 2)
+
+        story = json.loads((self.project / "story.json").read_text(encoding="utf-8"))
+        story["books"].reverse()
+        self._write_story(story)
+
+        self.assertEqual(
+            index.lookup(1)[0],
+            self.project / "books" / "book-01" / "chapters" / "0001.txt",
+        )
+
+    def test_novel_refresh_directory_after_delete(self):
+        chapters = self.project / "chapters"
+        chapters.mkdir()
+        for i in range(1, 4):
+            (chapters / f"{i:04d}.txt").write_text("", encoding="utf-8")
+        (chapters / "notes.txt").write_text("", encoding="utf-8")
+        self._write_story({"metadata": {"version": 2}, "project_type": "novel"})
+        index = ChapterIndex(self.project)
+        self.assertEqual(len(index.entries()), 3)
+
+        (chapters / "0002.txt").unlink()
+        index.refresh_directory(chapters)
+
+        self.assertEqual(
+            index.entries(), [(1, chapters / "0001.txt"), (2, chapters / "0003.txt")]
+        )
@@ -0,0 +1,208 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the test chapter matching unit so this responsibility stays isolated, testable, and easy to evolve.
+
+import copy
+import random
+import time
+from pathlib import Path
+from unittest import TestCase
+
+from augmentedquill.services.chapters.chapter_helpers import (
+    _chapter_metadata_entries,
+    _get_chapter_metadata_entry,
+)
+from augmentedquill.services.chapters.chapter_matching import (
+    FALLBACK_ANY,
+    FALLBACK_COMPATIBLE,
+    FALLBACK_UNFILED,
+    match_chapter_entries,
+    match_series_entries,
+)
+
+
+def _reference_match(entries, filenames, fallback):
+    """The nested next() scan used before the matcher existed."""
+    used = set()
+    out = []
+    for i, fname in enumerate(filenames):
+        match = next(
+            (
+                c
+                for c in entries
+                if isinstance(c, dict)
+                and c.get("filename") == fname
+                and id(c) not in used
+            ),
+            None,
+        )
+        if not match and i < len(entries):
+            cand = entries[i]
+            if id(cand) not in used:
+                if fallback == FALLBACK_ANY:
+                    match = cand
+                elif fallback == FALLBACK_UNFILED:
+                    if not cand.get("filename"):
+                        match = cand
+                elif (
+                    not isinstance(cand, dict)
+                    or not cand.get("filename")
+                    or cand.get("filename") == fname
+                ):
+                    match = cand
+        if match:
+            used.add(id(match))
+        out.append(match or None)
+    return out
+
+
+def _reference_series(all_metadata, all_files):
+    used = set()
+    out = []
+    for i, (idx, path) in enumerate(all_files):
+        fname = path.name
+        f_bid = path.parent.parent.name
+        match = next(
+            (
+                c
+                for c in all_metadata
+                if c.get("filename") == fname
+                and c.get("_parent_book_id") == f_bid
+                and id(c) not in used
+            ),
+            None,
+        )
+        if not match:
+            match = next(
+                (
+                    c
+                    for c in all_metadata
+                    if c.get("filename") == fname and id(c) not in used
+                ),
+                None,
+            )
+        if not match:
+            book_m = [c for c in all_metadata if c.get("_parent_book_id") == f_bid]
+            book_files = [f for f in all_files if f[1].parent.parent.name == f_bid]
+            f_pos = next((p for p, f in enumerate(book_files) if f[0] == idx), 0)
+            if f_pos < len(book_m):
+                cand = book_m[f_pos]
+                if id(cand) not in used and (
+                    not cand.get("filename") or cand.get("filename") == fname
+                ):
+                    match = cand
+        if not match and i < len(all_metadata):
+            cand = all_metadata[i]
+            if id(cand) not in used:
+                match = cand
+        if match:
+            used.add(id(match))
+        out.append(match)
+    return out
+
+
+def _random_entries(rng, n_files, dicts_only=False):
+    entries = []
+    for _ in range(n_files + rng.randint(-3, 3)):
+        roll = rng.random()
+        if roll < 0.15 and not dicts_only:
+            entries.append(f"Legacy {rng.randint(0, 3)}")
+        elif roll < 0.35:
+            entries.append({"title": "untitled"})
+        else:
+            name = f"{rng.randint(1, n_files + 2):04d}.txt"
+            entries.append({"title": name, "filename": name})
+    return entries
+
+
+class ChapterMatchingTest(TestCase):
+    def test_matches_reference_for_all_fallbacks(self):
+        rng = random.Random(1234)
+        for _ in range(300):
+            n = rng.randint(0, 12)
+            filenames = [f"{i + 1:04d}.txt" for i in range(n)]
+            rng.shuffle(filenames)
+            for fallback in (FALLBACK_COMPATIBLE, FALLBACK_ANY, FALLBACK_UNFILED):
+                entries = _random_entries(
+                    rng, n, dicts_only=fallback != FALLBACK_COMPATIBLE
+                )
+                expected = _reference_match(entries, filenames, fallback)
+                actual = match_chapter_entries(entries, filenames, fallback)
+                self.assertEqual(
+                    [id(m) for m in actual], [id(m) for m in expected], fallback
+                )
+
+    def test_series_matches_reference(self):
+        rng = random.Random(99)
+        for _ in range(200):
+            files = []
+            metadata = []
+            for b in range(rng.randint(1, 4)):
+                bid = f"b{b}"
+                count = rng.randint(0, 6)
+                for c in range(count):
+                    files.append(
+                        Path("/p/books") / bid / "chapters" / f"{c + 1:04d}.txt"
+                    )
+                for entry in _random_entries(rng, count, dicts_only=True):
+                    entry["_parent_book_id"] = rng.choice([bid, bid, f"b{b + 1}"])
+                    metadata.append(entry)
+            files = [(i + 1, p) for i, p in enumerate(files)]
+
+            expected = _reference_series(metadata, files)
+            actual = match_series_entries(metadata, files)
+            self.assertEqual([id(m) for m in actual], [id(m) for m in expected])
+
+    def test_batch_metadata_equals_per_chapter_lookup(self):
+        files = [(i + 1, Path(f"/p/chapters/{i + 1:04d}.txt")) for i in range(4)]
+        story = {
+            "project_type": "novel",
+            "chapters": [
+                "Old style title",
+                {"title": "Two", "filename": "0002.txt"},
+                {"title": "Unfiled"},
+                {"title": "Four", "filename": "0004.txt"},
+            ],
+        }
+        sequential_story = copy.deepcopy(story)
+        sequential = {
+            vid: _get_chapter_metadata_entry(sequential_story, vid, path, files)
+            for vid, path in files
+        }
+        batch = _chapter_metadata_entries(story, files)
+
+        self.assertEqual(batch, sequential)
+        self.assertEqual(story, sequential_story)
+        self.assertEqual(batch[1]["filename"], "0001.txt")
+
+
+class ChapterMatchingScalingTest(TestCase):
+    """Matching must stay linear in the number of chapters."""
+
+    @staticmethod
+    def _best_time(n: int) -> float:
+        filenames = [f"{i + 1:05d}.txt" for i in range(n)]
+        # Metadata in reverse file order: the old scan walked most of the list
+        # for every file.
+        entries = [{"title": name, "filename": name} for name in reversed(filenames)]
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            matches = match_chapter_entries(entries, filenames)
+            best = min(best, time.perf_counter() - start)
+        assert all(m["filename"] == f for m, f in zip(matches, filenames))
+        return best
+
+    def test_scaling_100_1k_10k(self):
+        t100 = self._best_time(100)
+        t1k = self._best_time(1_000)
+        t10k = self._best_time(10_000)
+
+        # Linear growth is ~10x per step; quadratic would be ~100x. Allow a
+        # wide margin for timer noise on small inputs.
+        self.assertLess(t10k, t1k * 30, (t100, t1k, t10k))
+        self.assertLess(t10k, 1.0, (t100, t1k, t10k))
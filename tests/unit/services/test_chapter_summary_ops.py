@@ -0,0 +1,219 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the test chapter summary ops unit so this responsibility stays isolated, testable, and easy to evolve.
+
+import asyncio
+import json
+import os
+import tempfile
+from pathlib import Path
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from fastapi.testclient import TestClient
+
+import augmentedquill.main as main
+import augmentedquill.services.llm.llm as llm
+from augmentedquill.services.projects.projects import select_project
+from augmentedquill.services.story import chapter_summary_ops
+from augmentedquill.services.story.chapter_summary_ops import (
+    SummaryCache,
+    resolve_chapter_summary_messages,
+    split_chapter_text,
+)
+from augmentedquill.services.story.story_api_prompt_ops import estimate_tokens
+
+
+def _chapter(paragraphs: int, prefix: str = "") -> str:
+    return "\n\n".join(
+        f"{prefix}Paragraph {i}: Mara walked along the quay and counted the boats."
+        for i in range(paragraphs)
+    )
+
+
+class _FakeUpstream:
+    """Stand-in for llm.unified_chat_complete that records concurrency."""
+
+    def __init__(self):
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, *, messages, **kwargs):
+        self.requests.append(messages)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        text = messages[-1]["content"]
+        first = text.split("Paragraph ", 1)[-1].split(":", 1)[0]
+        return {"content": f"part from {first}"}
+
+
+def _patch_env(test, **values):
+    for name, value in values.items():
+        old = os.environ.get(name)
+        os.environ[name] = value
+        test.addCleanup(
+            lambda n=name, o=old: (
+                os.environ.pop(n, None) if o is None else os.environ.update({n: o})
+            )
+        )
+
+
+def _use_temp_cache(test) -> Path:
+    td = tempfile.TemporaryDirectory()
+    test.addCleanup(td.cleanup)
+    path = Path(td.name) / "parts.json"
+    original = chapter_summary_ops.summary_cache
+    chapter_summary_ops.summary_cache = SummaryCache(path)
+    test.addCleanup(setattr, chapter_summary_ops, "summary_cache", original)
+    return path
+
+
+class SplitChapterTextTest(TestCase):
+    def test_chunks_are_bounded_and_lossless(self):
+        text = _chapter(300) + "\n\n* * *\n\n" + _chapter(50, "Later ")
+        chunks = split_chapter_text(text, 400)
+        self.assertEqual("".join(chunks), text)
+        self.assertTrue(all(estimate_tokens(c) <= 400 for c in chunks))
+        self.assertTrue(any(c.startswith("* * *") for c in chunks))
+
+    def test_overlong_paragraph_is_split(self):
+        text = " ".join(["A sentence that goes on."] * 400)
+        chunks = split_chapter_text(text, 300)
+        self.assertEqual("".join(chunks), text)
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(estimate_tokens(c) <= 300 for c in chunks))
+
+    def test_edit_only_moves_nearby_boundaries(self):
+        text = _chapter(400)
+        edited = text.replace("Paragraph 3:", "Paragraph 3: Suddenly it rained.", 1)
+        before = split_chapter_text(text, 400)
+        after = split_chapter_text(edited, 400)
+        self.assertGreater(len(before), 10)
+        unchanged = set(before) & set(after)
+        self.assertGreaterEqual(len(unchanged), len(before) - 2)
+
+
+class ChapterSummaryMapReduceTest(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.cache_path = _use_temp_cache(self)
+        _patch_env(self, AUGQ_SUMMARY_CHUNK_TOKENS="400", AUGQ_SUMMARY_CONCURRENCY="2")
+        self.upstream = _FakeUpstream()
+        original = llm.unified_chat_complete
+        llm.unified_chat_complete = self.upstream
+        self.addCleanup(setattr, llm, "unified_chat_complete", original)
+
+    def _prepared(self, text: str, mode: str = "discard") -> dict:
+        return {
+            "messages": [{"role": "user", "content": "single request"}],
+            "mode": mode,
+            "chapter_text": text,
+            "current_summary": "Old summary.",
+            "model_overrides": {},
+            "context_length": None,
+            "max_tokens": None,
+            "base_url": "http://upstream/v1",
+            "api_key": None,
+            "model_id": "m",
+            "timeout_s": 5,
+        }
+
+    async def test_short_chapter_keeps_single_request(self):
+        prepared = self._prepared(_chapter(3))
+        self.assertEqual(
+            await resolve_chapter_summary_messages(prepared), prepared["messages"]
+        )
+        self.assertEqual(self.upstream.requests, [])
+
+    async def test_long_chapter_is_mapped_and_combined(self):
+        text = _chapter(120)
+        parts = split_chapter_text(text, 400)
+        messages = await resolve_chapter_summary_messages(
+            self._prepared(text, "update")
+        )
+
+        self.assertEqual(len(self.upstream.requests), len(parts))
+        self.assertEqual(self.upstream.max_in_flight, 2)
+        combine = messages[-1]["content"]
+        self.assertTrue(combine.startswith("Existing summary:\n\nOld summary."))
+        expected = "\n\n".join(
+            "part from " + p.split("Paragraph ", 1)[1].split(":", 1)[0] for p in parts
+        )
+        self.assertIn(expected, combine)
+        self.assertTrue(self.cache_path.exists())
+
+    async def test_resummarizing_after_an_edit_only_sends_changed_chunks(self):
+        text = _chapter(120)
+        await resolve_chapter_summary_messages(self._prepared(text))
+        first_round = len(self.upstream.requests)
+
+        edited = text.replace("Paragraph 60:", "Paragraph 60: Rain.", 1)
+        chapter_summary_ops.summary_cache = SummaryCache(self.cache_path)
+        await resolve_chapter_summary_messages(self._prepared(edited))
+        self.assertGreater(first_round, 5)
+        self.assertLessEqual(len(self.upstream.requests) - first_round, 2)
+
+
+class ChapterSummaryStreamTest(TestCase):
+    def setUp(self):
+        self.td = tempfile.TemporaryDirectory()
+        self.addCleanup(self.td.cleanup)
+        _use_temp_cache(self)
+        root = Path(self.td.name)
+        _patch_env(
+            self,
+            AUGQ_PROJECTS_ROOT=str(root / "projects"),
+            AUGQ_PROJECTS_REGISTRY=str(root / "projects.json"),
+            AUGQ_SUMMARY_CHUNK_TOKENS="400",
+        )
+        ok, msg = select_project("novel")
+        self.assertTrue(ok, msg)
+        self.pdir = root / "projects" / "novel"
+        (self.pdir / "chapters").mkdir(parents=True, exist_ok=True)
+        (self.pdir / "chapters" / "0001.txt").write_text(_chapter(60), encoding="utf-8")
+        (self.pdir / "story.json").write_text(
+            json.dumps(
+                {
+                    "project_title": "P",
+                    "format": "markdown",
+                    "chapters": [{"title": "T1", "summary": ""}],
+                    "metadata": {"version": 2},
+                }
+            ),
+            encoding="utf-8",
+        )
+
+        self.upstream = _FakeUpstream()
+        self.streamed = []
+
+        def fake_resolve(payload, **kwargs):
+            return ("https://fake/v1", None, "fake-model", 5)
+
+        async def fake_stream(*, messages, **kwargs):
+            self.streamed.append(messages)
+            for part in ("Sum", "mary"):
+                yield {"content": part}
+
+        for name, fake in (
+            ("resolve_openai_credentials", fake_resolve),
+            ("unified_chat_complete", self.upstream),
+            ("unified_chat_stream", fake_stream),
+        ):
+            self.addCleanup(setattr, llm, name, getattr(llm, name))
+            setattr(llm, name, fake)
+
+    def test_summary_stream_combines_part_summaries(self):
+        client = TestClient(main.app)
+        r = client.post("/api/v1/story/summary/stream", json={"chap_id": 1})
+        self.assertEqual(r.status_code, 200, r.text)
+        self.assertEqual(r.text, "Summary")
+        self.assertGreater(len(self.upstream.requests), 1)
+        (messages,) = self.streamed
+        self.assertIn("part from 0", messages[-1]["content"])
+        story = json.loads((self.pdir / "story.json").read_text(encoding="utf-8"))
+        self.assertEqual(story["chapters"][0]["summary"], "Summary")
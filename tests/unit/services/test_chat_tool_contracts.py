@@ -258,7 +258,7 @@ class ChatToolContractsTest(TestCase):
         async def fake_story_summary(**kwargs):
             return {"story_summary": "AI story summary", "ok": True}
 
-        async def fake_image_description(filename: str, payload: dict):
+        async def fake_image_description(filename: str, payload: dict, ctx):
             return "Generated image description"
 
         with (
@@ -0,0 +1,179 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the test chat tool dispatcher unit so this responsibility stays isolated, testable, and easy to evolve.
+
+import asyncio
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+from augmentedquill.services.chat.chat_tool_decorator import is_read_only_tool
+from augmentedquill.services.chat.chat_tool_dispatcher import exec_chat_tools
+from augmentedquill.services.chat.chat_tools import chapter_tools
+from augmentedquill.services.projects import project_context
+from augmentedquill.services.projects.project_context import ProjectContext
+from augmentedquill.services.projects.projects import select_project
+
+
+class ExecChatToolsTest(IsolatedAsyncioTestCase):
+    def setUp(self):
+        td = tempfile.TemporaryDirectory()
+        self.addCleanup(td.cleanup)
+        root = Path(td.name) / "projects"
+        root.mkdir()
+        env = patch.dict(
+            os.environ,
+            {
+                "AUGQ_PROJECTS_ROOT": str(root),
+                "AUGQ_PROJECTS_REGISTRY": str(Path(td.name) / "projects.json"),
+            },
+        )
+        env.start()
+        self.addCleanup(env.stop)
+
+        ok, msg = select_project("demo")
+        self.assertTrue(ok, msg)
+        chapters = root / "demo" / "chapters"
+        chapters.mkdir(parents=True, exist_ok=True)
+        (chapters / "0001.txt").write_text("Alpha.", encoding="utf-8")
+        (chapters / "0002.txt").write_text("Beta.", encoding="utf-8")
+        (root / "demo" / "story.json").write_text(
+            json.dumps(
+                {
+                    "metadata": {"version": 2},
+                    "project_title": "Demo",
+                    "format": "markdown",
+                    "chapters": [{"title": "Intro"}, {"title": "Next"}],
+                }
+            ),
+            encoding="utf-8",
+        )
+
+    async def _run(self, calls):
+        mutations = {"story_changed": False}
+        async with ProjectContext() as ctx:
+            messages = await exec_chat_tools(
+                [(name, args, f"id-{i}") for i, (name, args) in enumerate(calls)],
+                {},
+                mutations,
+                ctx,
+            )
+        return [json.loads(m["content"]) for m in messages], mutations
+
+    async def test_read_only_flags(self):
+        self.assertTrue(is_read_only_tool("get_chapter_content"))
+        self.assertTrue(is_read_only_tool("get_story_metadata"))
+        self.assertFalse(is_read_only_tool("write_chapter_content"))
+        self.assertFalse(is_read_only_tool("generate_image_description"))
+        self.assertFalse(is_read_only_tool("unknown"))
+
+    async def test_reads_overlap_on_storage_threads(self):
+        # Both reads must be inside the slice at once to pass the barrier.
+        barrier = threading.Barrier(2, timeout=5)
+        threads = set()
+        real_slice = chapter_tools._chapter_content_slice
+
+        def slice_(*args, **kwargs):
+            threads.add(threading.get_ident())
+            barrier.wait()
+            return real_slice(*args, **kwargs)
+
+        with patch.object(chapter_tools, "_chapter_content_slice", slice_):
+            results, mutations = await self._run(
+                [
+                    ("get_chapter_content", {"chap_id": 1}),
+                    ("get_chapter_content", {"chap_id": 2}),
+                ]
+            )
+        self.assertEqual([r["content"] for r in results], ["Alpha.", "Beta."])
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(threading.get_ident(), threads)
+        self.assertFalse(mutations["story_changed"])
+
+    async def test_concurrent_reads_load_the_story_once(self):
+        loads = []
+        real_load = project_context.load_story_config
+
+        def load(path):
+            loads.append(path)
+            return real_load(path)
+
+        with patch.object(project_context, "load_story_config", load):
+            results, _ = await self._run([("get_story_metadata", {})] * 4)
+        self.assertEqual([r["title"] for r in results], ["Demo"] * 4)
+        self.assertEqual(len(loads), 1)
+
+    async def test_mutating_tools_read_off_the_loop(self):
+        threads = set()
+        real_scan = project_context._scan_chapter_files
+        real_active = project_context.get_active_project_dir
+
+        def scan():
+            threads.add(threading.get_ident())
+            return real_scan()
+
+        def active():
+            threads.add(threading.get_ident())
+            return real_active()
+
+        with (
+            patch.object(project_context, "_scan_chapter_files", scan),
+            patch.object(project_context, "get_active_project_dir", active),
+        ):
+            results, _ = await self._run(
+                [
+                    ("delete_chapter", {"chap_id": 2, "confirm": True}),
+                    ("set_story_tags", {"tags": ["sea"]}),
+                    ("get_story_tags", {}),
+                ]
+            )
+        self.assertTrue(results[0]["ok"])
+        self.assertEqual(results[2]["tags"], ["sea"])
+        self.assertTrue(threads)
+        self.assertNotIn(threading.get_ident(), threads)
+
+    async def test_writes_are_barriers_between_reads(self):
+        results, mutations = await self._run(
+            [
+                ("get_chapter_content", {"chap_id": 1}),
+                ("write_chapter_content", {"chap_id": 1, "content": "Gamma."}),
+                ("get_chapter_content", {"chap_id": 1}),
+            ]
+        )
+        self.assertEqual(results[0]["content"], "Alpha.")
+        self.assertEqual(results[2]["content"], "Gamma.")
+        self.assertTrue(mutations["story_changed"])
+
+    async def test_writes_of_concurrent_batches_do_not_overlap(self):
+        running = []
+        peak = []
+        real_write = chapter_tools._write_chapter_content
+
+        def write(*args, **kwargs):
+            running.append(1)
+            peak.append(len(running))
+            try:
+                return real_write(*args, **kwargs)
+            finally:
+                running.pop()
+
+        with patch.object(chapter_tools, "_write_chapter_content", write):
+            await asyncio.gather(
+                self._run(
+                    [
+                        ("write_chapter_content", {"chap_id": 1, "content": "A1"}),
+                        ("write_chapter_content", {"chap_id": 1, "content": "A2"}),
+                    ]
+                ),
+                self._run([("write_chapter_content", {"chap_id": 2, "content": "B1"})]),
+            )
+        self.assertEqual(len(peak), 3)
+        self.assertEqual(max(peak), 1)
@@ -25,6 +25,8 @@ from augmentedquill.utils.image_helpers import (
 )
 from augmentedquill.api.v1.chat import _inject_project_images
 from augmentedquill.services.chat.chat_tool_dispatcher import exec_chat_tool
+from augmentedquill.services.llm import llm_image_prep
+from augmentedquill.services.projects.project_context import ProjectContext
 
 
 class ImageFeaturesTest(TestCase):
@@ -37,6 +39,8 @@ class ImageFeaturesTest(TestCase):
         self.registry_path = Path(self.td.name) / "projects.json"
         os.environ["AUGQ_PROJECTS_ROOT"] = str(self.projects_root)
         os.environ["AUGQ_PROJECTS_REGISTRY"] = str(self.registry_path)
+        self.addCleanup(setattr, llm_image_prep, "CACHE_DIR", llm_image_prep.CACHE_DIR)
+        llm_image_prep.CACHE_DIR = Path(self.td.name) / "image_cache"
 
         # Create and select a test project
         self.project_name = "image_test_proj"
@@ -219,8 +223,13 @@ class ImageFeaturesTest(TestCase):
             call_id = "call_123"
             mutations = {}
 
+            # One context for the batch, as /chat/tools uses it.
+            ctx = ProjectContext()
+
             # Test Tool 1: list_images
-            res = await exec_chat_tool("list_images", {}, call_id, payload, mutations)
+            res = await exec_chat_tool(
+                "list_images", {}, call_id, payload, mutations, ctx
+            )
             content = json.loads(res["content"])
             # Should have ref.png from previous test? No, clean dir each setUp.
             # But wait, we just created desc_test.jpg
@@ -233,10 +242,18 @@ class ImageFeaturesTest(TestCase):
                 call_id,
                 payload,
                 mutations,
+                ctx,
             )
             resp_content = json.loads(res["content"])
             self.assertEqual(resp_content["description"], "A beautiful sunset.")
 
+            # A later list_images of the batch sees the new description.
+            res = await exec_chat_tool(
+                "list_images", {}, call_id, payload, mutations, ctx
+            )
+            listed = json.loads(res["content"])
+            self.assertEqual(listed[0]["description"], "A beautiful sunset.")
+
             # Verify description saved
             meta = load_image_metadata()
             self.assertEqual(
@@ -0,0 +1,137 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the test llm capabilities unit so this responsibility stays isolated, testable, and easy to evolve.
+
+import json
+import tempfile
+from pathlib import Path
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import patch
+
+import httpx
+
+from augmentedquill.services.llm import llm_capabilities, llm_stream_ops
+from augmentedquill.services.llm.llm_capabilities import (
+    CapabilityRegistry,
+    probe_capabilities,
+)
+from augmentedquill.services.llm.llm_http_pool import use_http_client
+
+_TOOLS = [{"type": "function", "function": {"name": "f", "parameters": {}}}]
+
+
+def _sse(*chunks):
+    body = "".join(f"data: {json.dumps(c)}\n\n" for c in chunks)
+    return httpx.Response(
+        200,
+        text=body + "data: [DONE]\n\n",
+        headers={"content-type": "text/event-stream"},
+    )
+
+
+class CapabilityRegistryTest(TestCase):
+    def test_values_persist_and_clear(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = Path(td) / "caps.json"
+            CapabilityRegistry(path).record("http://x/v1/", "m", "n", False)
+
+            registry = CapabilityRegistry(path)
+            self.assertIs(registry.get("http://x/v1", "m", "n"), False)
+            self.assertIsNone(registry.get("http://x/v1", "m", "tool_choice"))
+            self.assertEqual(registry.all(), {"http://x/v1": {"m": {"n": False}}})
+            with self.assertRaises(ValueError):
+                registry.record("http://x/v1", "m", "vision", True)
+
+            registry.clear()
+            self.assertFalse(path.exists())
+            self.assertEqual(CapabilityRegistry(path).all(), {})
+
+
+class LearnedCapabilitiesTest(IsolatedAsyncioTestCase):
+    def setUp(self):
+        td = tempfile.TemporaryDirectory()
+        self.addCleanup(td.cleanup)
+        registry = CapabilityRegistry(Path(td.name) / "caps.json")
+        for module in (llm_capabilities, llm_stream_ops):
+            self.addCleanup(setattr, module, "capabilities", module.capabilities)
+            module.capabilities = registry
+        self.registry = registry
+        self.bodies = []
+
+    async def _chat(self, handler):
+        def record(request):
+            self.bodies.append(json.loads(request.content))
+            return handler(request)
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(record)) as c:
+            with use_http_client(c):
+                return [
+                    chunk
+                    async for chunk in llm_stream_ops.unified_chat_stream(
+                        messages=[{"role": "user", "content": "Hi"}],
+                        base_url="http://llama/v1",
+                        api_key=None,
+                        model_id="m",
+                        timeout_s=5,
+                        tools=_TOOLS,
+                        tool_choice="auto",
+                    )
+                ]
+
+    async def test_tool_fallback_is_learned(self):
+        def handler(request):
+            if "tools" in json.loads(request.content):
+                return httpx.Response(400, text="tool choice requires --jinja")
+            return _sse({"choices": [{"delta": {"content": "ok"}}]})
+
+        self.assertIn({"content": "ok"}, await self._chat(handler))
+        self.assertEqual(len(self.bodies), 2)
+        self.assertIs(self.registry.get("http://llama/v1", "m", "native_tools"), False)
+
+        self.bodies.clear()
+        self.assertIn({"content": "ok"}, await self._chat(handler))
+        self.assertEqual(len(self.bodies), 1)
+        self.assertNotIn("tools", self.bodies[0])
+        self.assertIn("[TOOL_CALL]", self.bodies[0]["messages"][0]["content"])
+
+    async def test_rejected_tool_choice_is_dropped_and_remembered(self):
+        def handler(request):
+            if "tool_choice" in json.loads(request.content):
+                return httpx.Response(400, text="unsupported param: tool_choice")
+            return _sse(
+                {"choices": [{"delta": {"reasoning_content": "hm", "content": "ok"}}]}
+            )
+
+        chunks = await self._chat(handler)
+        self.assertIn({"thinking": "hm"}, chunks)
+        self.assertEqual(
+            [sorted(k for k in b if k.startswith("tool")) for b in self.bodies],
+            [["tool_choice", "tools"], ["tools"]],
+        )
+        self.assertEqual(
+            self.registry.model("http://llama/v1", "m"),
+            {"tool_choice": False, "native_tools": True, "reasoning_content": True},
+        )
+
+        self.bodies.clear()
+        await self._chat(handler)
+        self.assertEqual(len(self.bodies), 1)
+
+    async def test_probe_records_n_and_stream_options(self):
+        def handler(request):
+            if request.url.path == "/v1/completions":
+                return httpx.Response(200, json={"choices": [{"index": 0}]})
+            return httpx.Response(422, text="stream_options not supported")
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as c:
+            with use_http_client(c):
+                learned = await probe_capabilities("http://llama/v1", None, "m")
+        self.assertEqual(learned, {"n": False, "stream_options": False})
+        with patch.object(llm_stream_ops, "apply_prompt_cache_hints") as hints:
+            hints.side_effect = lambda body, **kw: body.update(stream_options={})
+            await self._chat(lambda request: _sse())
+        self.assertNotIn("stream_options", self.bodies[-1])
@@ -0,0 +1,122 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the test llm dump unit so this responsibility stays isolated, testable, and easy to evolve.
+
+import asyncio
+import gzip
+import json
+import os
+import tempfile
+from pathlib import Path
+from unittest import IsolatedAsyncioTestCase
+
+from augmentedquill.services.llm import llm_dump
+from augmentedquill.services.llm.llm_http_pool import close_http_clients
+from augmentedquill.services.llm.llm_stream_ops import unified_chat_stream
+
+_SSE_EVENTS = [
+    {"choices": [{"index": 0, "delta": {"role": "assistant", "content": ""}}]},
+    {"choices": [{"index": 0, "delta": {"content": "<think>plan</think>"}}]},
+    {"choices": [{"index": 0, "delta": {"content": "Hello "}}]},
+    {"choices": [{"index": 0, "delta": {"content": "world"}}]},
+]
+
+
+class LlmDumpTest(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.td = tempfile.TemporaryDirectory()
+        self.path = Path(self.td.name) / "dump.jsonl.gz"
+        os.environ["AUGQ_LLM_DUMP"] = "1"
+        os.environ["AUGQ_LLM_DUMP_PATH"] = str(self.path)
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}/v1"
+
+    async def asyncTearDown(self):
+        os.environ.pop("AUGQ_LLM_DUMP", None)
+        os.environ.pop("AUGQ_LLM_DUMP_PATH", None)
+        await close_http_clients()
+        await llm_dump.close_llm_dump()
+        self.server.close()
+        await self.server.wait_closed()
+        self.td.cleanup()
+
+    async def _handle(self, reader, writer):
+        """Answer one request with an SSE stream written in several pieces."""
+        head = await reader.readuntil(b"\r\n\r\n")
+        for line in head.split(b"\r\n"):
+            if line.lower().startswith(b"content-length:"):
+                await reader.readexactly(int(line.split(b":", 1)[1]))
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+            b"Connection: close\r\n\r\n"
+        )
+        for event in _SSE_EVENTS:
+            writer.write(f"data: {json.dumps(event)}\n\n".encode())
+            await writer.drain()
+            await asyncio.sleep(0.01)
+        writer.write(b"data: [DONE]\n\n")
+        await writer.drain()
+        writer.close()
+
+    async def _stream(self):
+        return [
+            event
+            async for event in unified_chat_stream(
+                messages=[{"role": "user", "content": "Hi"}],
+                base_url=self.base_url,
+                api_key="secret",
+                model_id="m",
+                timeout_s=5,
+                supports_function_calling=False,
+            )
+        ]
+
+    async def test_stream_is_recorded_and_replays_identically(self):
+        live = await self._stream()
+        await llm_dump.close_llm_dump()
+
+        path = llm_dump.recorder.file_path
+        self.assertEqual(path.parent, self.path.parent)
+        self.assertTrue(path.name.startswith("dump-"))
+        self.assertFalse(self.path.exists())
+        self.assertEqual(llm_dump.latest_dump(self.path), path)
+        records = list(llm_dump.iter_dump_records(path))
+        types = [r["type"] for r in records]
+        self.assertEqual(types[:2], ["request", "response"])
+        self.assertEqual(types[-1], "end")
+        self.assertGreater(types.count("chunk"), 1)
+        request = records[0]
+        self.assertIn(["authorization", "***"], request["headers"])
+        self.assertEqual(json.loads(request["body"]["text"])["model"], "m")
+
+        (exchange,) = llm_dump.read_dump(path)
+        self.assertIn(b"data: [DONE]", b"".join(exchange["chunks"]))
+        self.assertEqual(llm_dump.exchange_operation(exchange), "chat_stream")
+        self.assertEqual(await llm_dump.replay_exchange(exchange), live)
+
+    async def test_nothing_is_recorded_when_disabled(self):
+        os.environ.pop("AUGQ_LLM_DUMP")
+        await self._stream()
+        await llm_dump.close_llm_dump()
+        self.assertEqual(list(self.path.parent.iterdir()), [])
+
+    async def test_crashed_dump_is_not_appended_to_and_still_reads(self):
+        # A dump of an earlier process that died mid-write.
+        crashed = llm_dump.session_dump_path(self.path, 0, 1)
+        data = gzip.compress(b'{"type": "request", "id": "1-1"}\n' * 50)
+        crashed.write_bytes(data[: len(data) - 12])
+
+        await self._stream()
+        await llm_dump.close_llm_dump()
+
+        self.assertNotEqual(llm_dump.recorder.file_path, crashed)
+        self.assertEqual(crashed.read_bytes(), data[: len(data) - 12])
+        self.assertEqual(len(llm_dump.read_dump(llm_dump.recorder.file_path)), 1)
+        records = list(llm_dump.iter_dump_records(crashed))
+        self.assertTrue(records)
+        self.assertTrue(all(r["id"] == "1-1" for r in records))
@@ -0,0 +1,81 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the test llm http pool unit so this responsibility stays isolated, testable, and easy to evolve.
+
+import asyncio
+from unittest import IsolatedAsyncioTestCase
+
+from augmentedquill.services.llm import llm_http_pool
+from augmentedquill.services.llm.llm_http_pool import (
+    close_http_clients,
+    get_http_client,
+    http_pool_stats,
+    pooled_client,
+)
+
+
+class LlmHttpPoolTest(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.connections = 0
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}/v1"
+        llm_http_pool._stats.clear()
+
+    async def asyncTearDown(self):
+        await close_http_clients()
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        """Minimal keep-alive HTTP/1.1 server answering every request with {}."""
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                if length:
+                    await reader.readexactly(length)
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    b"Content-Length: 2\r\n\r\n{}"
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def test_requests_reuse_one_connection(self):
+        for _ in range(3):
+            async with pooled_client(self.base_url, 5) as client:
+                r = await client.post(self.base_url + "/chat/completions", json={})
+                self.assertEqual(r.json(), {})
+
+        self.assertEqual(self.connections, 1)
+        (stats,) = http_pool_stats()
+        self.assertEqual(stats["requests"], 3)
+        self.assertEqual(stats["new_connections"], 1)
+        self.assertEqual(stats["reused_connections"], 2)
+        self.assertAlmostEqual(stats["reuse_ratio"], 2 / 3)
+        self.assertEqual(stats["open_connections"], 1)
+
+    async def test_clients_are_keyed_by_origin_and_timeout(self):
+        a = get_http_client(self.base_url, 5)
+        self.assertIs(a, get_http_client(self.base_url + "/other", 5.0))
+        self.assertIsNot(a, get_http_client(self.base_url, 30))
+        self.assertIsNot(a, get_http_client("http://localhost:1/v1", 5))
+
+    async def test_closed_clients_are_replaced(self):
+        client = get_http_client(self.base_url, 5)
+        await close_http_clients()
+
+        self.assertTrue(client.is_closed)
+        self.assertIsNot(client, get_http_client(self.base_url, 5))
@@ -0,0 +1,107 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the test llm image prep unit so this responsibility stays isolated, testable, and easy to evolve.
+
+import base64
+import io
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from augmentedquill.services.llm import llm_image_prep
+from augmentedquill.services.llm.llm_image_prep import (
+    find_referenced_images,
+    image_data_url,
+    image_settings,
+    prepare_message_images,
+)
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+class ImagePrepTest(TestCase):
+    def setUp(self):
+        td = tempfile.TemporaryDirectory()
+        self.addCleanup(td.cleanup)
+        root = Path(td.name)
+        self.images_dir = root / "images"
+        self.images_dir.mkdir()
+        self.addCleanup(setattr, llm_image_prep, "CACHE_DIR", llm_image_prep.CACHE_DIR)
+        llm_image_prep.CACHE_DIR = root / "cache"
+
+    def test_index_is_only_rescanned_when_the_directory_changes(self):
+        (self.images_dir / "map.png").write_bytes(b"map")
+        (self.images_dir / "notes.txt").write_text("map.png")
+        text = "See map.png and cover.jpg"
+        self.assertEqual(
+            [p.name for p in find_referenced_images(self.images_dir, text)],
+            ["map.png"],
+        )
+
+        with patch.object(Path, "iterdir", side_effect=AssertionError("rescan")):
+            self.assertEqual(len(find_referenced_images(self.images_dir, text)), 1)
+
+        (self.images_dir / "cover.jpg").write_bytes(b"cover")
+        os.utime(self.images_dir, ns=(0, self.images_dir.stat().st_mtime_ns + 10**9))
+        self.assertEqual(
+            [p.name for p in find_referenced_images(self.images_dir, text)],
+            ["cover.jpg", "map.png"],
+        )
+        self.assertIsNone(prepare_message_images(self.images_dir, "nothing here"))
+
+    def test_data_urls_are_cached_by_content_and_target(self):
+        (self.images_dir / "a.png").write_bytes(b"same bytes")
+        (self.images_dir / "b.png").write_bytes(b"same bytes")
+        calls = []
+        real_encode = llm_image_prep._encode
+
+        def counting(*args):
+            calls.append(args[2:])
+            return real_encode(*args)
+
+        with patch.object(llm_image_prep, "_encode", counting):
+            url = image_data_url(self.images_dir / "a.png", 512, "jpeg")
+            self.assertEqual(
+                image_data_url(self.images_dir / "b.png", 512, "jpeg"), url
+            )
+            image_data_url(self.images_dir / "a.png", 256, "jpeg")
+
+        self.assertEqual(calls, [(512, "jpeg"), (256, "jpeg")])
+        # Unreadable images are passed through unchanged.
+        self.assertEqual(
+            url, "data:image/png;base64," + base64.b64encode(b"same bytes").decode()
+        )
+
+    def test_model_settings_fall_back_to_environment(self):
+        self.assertEqual(image_settings(None), (1536, "jpeg"))
+        self.assertEqual(
+            image_settings({"image_max_edge": 0, "image_format": "webp"}), (0, "webp")
+        )
+        with patch.dict(
+            os.environ, {"AUGQ_IMAGE_MAX_EDGE": "800", "AUGQ_IMAGE_FORMAT": "bad"}
+        ):
+            self.assertEqual(image_settings({"image_format": "gif"}), (800, "jpeg"))
+
+    @unittest.skipIf(Image is None, "Pillow is not installed")
+    def test_large_images_are_downscaled_and_reencoded(self):
+        buf = io.BytesIO()
+        Image.new("RGBA", (3000, 1500), (200, 10, 10, 128)).save(buf, format="PNG")
+        (self.images_dir / "big.png").write_bytes(buf.getvalue())
+
+        content = prepare_message_images(
+            self.images_dir, "big.png", {"image_max_edge": 600, "image_format": "jpeg"}
+        )
+        url = content[1]["image_url"]["url"]
+        self.assertTrue(url.startswith("data:image/jpeg;base64,"))
+        with Image.open(io.BytesIO(base64.b64decode(url.split(",", 1)[1]))) as img:
+            self.assertEqual(img.size, (600, 300))
@@ -0,0 +1,193 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the test llm logging unit so this responsibility stays isolated, testable, and easy to evolve.
+
+import json
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+import augmentedquill.main as main
+from augmentedquill.services.llm import llm_logging
+from augmentedquill.services.llm.llm_logging import (
+    SPILL_FILE_NAME,
+    LLMLogStore,
+    _entry_bytes,
+    append_stream_chunk,
+    create_log_entry,
+    llm_logs,
+)
+
+
+def _entry(text: str = "", model_type: str | None = None, status: int | None = 200):
+    entry = create_log_entry("http://x/v1/chat/completions", "POST", {}, {"t": text})
+    entry["response"]["status_code"] = status
+    if status is not None:
+        entry["timestamp_end"] = "2026-01-01T00:00:00"
+    if model_type:
+        entry["model_type"] = model_type
+    return entry
+
+
+class LLMLogStoreTest(TestCase):
+    def setUp(self):
+        self.td = tempfile.TemporaryDirectory()
+        self.addCleanup(self.td.cleanup)
+        self.dir = Path(self.td.name)
+
+    def _spilled(self):
+        lines = []
+        for path in sorted(self.dir.glob(SPILL_FILE_NAME + "*"), reverse=True):
+            lines += path.read_text(encoding="utf-8").splitlines()
+        return [json.loads(line) for line in lines]
+
+    def test_evicts_by_bytes_and_spills_to_rotating_files(self):
+        store = LLMLogStore(
+            max_bytes=3000, spill_dir=self.dir, file_max_bytes=2500, max_files=2
+        )
+        entries = [_entry("x" * 900) for _ in range(8)]
+        for entry in entries:
+            store.add(entry)
+        store.flush()
+
+        stats = store.stats()
+        self.assertLessEqual(stats["bytes"], 3000)
+        self.assertEqual(stats["entries"] + stats["evicted"], 8)
+        self.assertEqual(stats["spilled"], stats["evicted"])
+        kept = [e["id"] for e in store]
+        self.assertEqual(kept, [e["id"] for e in entries[-len(kept) :]])
+
+        files = sorted(p.name for p in self.dir.iterdir())
+        self.assertEqual(
+            files, [SPILL_FILE_NAME, SPILL_FILE_NAME + ".1", SPILL_FILE_NAME + ".2"]
+        )
+        spilled = [e["id"] for e in self._spilled()]
+        evicted = [e["id"] for e in entries[: stats["evicted"]]]
+        # The oldest rotated file was dropped; the rest are in order.
+        self.assertEqual(spilled, evicted[-len(spilled) :])
+
+    def test_unfinished_entries_grow_by_chunks_and_are_kept(self):
+        store = LLMLogStore(max_bytes=2000, spill=False)
+        streaming = create_log_entry("u", "POST", {}, {}, streaming=True)
+        store.add(streaming)
+        with patch.object(llm_logging, "llm_logs", store):
+            for _ in range(50):
+                text = "y" * 50
+                append_stream_chunk(
+                    streaming, {"choices": [{"index": 0, "delta": {"content": text}}]}
+                )
+                streaming["response"]["full_content"] += text
+        with patch.object(llm_logging, "_entry_bytes", wraps=_entry_bytes) as measure:
+            store.add(_entry())
+        # Only the new entry was serialized, the open one was not.
+        self.assertEqual(measure.call_count, 1)
+        self.assertGreater(store.stats()["bytes"], 5000)
+        self.assertIn(streaming["id"], [e["id"] for e in store])
+
+        streaming["timestamp_end"] = "2026-01-01T00:00:01"
+        store.add(_entry())
+        self.assertNotIn(streaming["id"], [e["id"] for e in store])
+
+    def test_finished_entry_size_is_exact(self):
+        store = LLMLogStore(spill=False)
+        streaming = create_log_entry("u", "POST", {}, {}, streaming=True)
+        store.add(streaming)
+        with patch.object(llm_logging, "llm_logs", store):
+            for delta in (
+                {"role": "assistant", "content": "Hi"},
+                {"content": " \u00e9"},
+            ):
+                append_stream_chunk(
+                    streaming, {"choices": [{"index": 0, "delta": delta}]}
+                )
+                streaming["response"]["full_content"] += delta["content"]
+        streaming["timestamp_end"] = "2026-01-01T00:00:01"
+        self.assertEqual(store.stats()["bytes"], _entry_bytes(streaming))
+
+    def test_text_chunks_are_coalesced(self):
+        entry = create_log_entry("u", "POST", {}, {}, streaming=True)
+        deltas = [{"role": "assistant", "content": ""}] + [
+            {"content": c} for c in "Hello"
+        ]
+        for delta in deltas:
+            append_stream_chunk(
+                entry, {"id": "c1", "choices": [{"index": 0, "delta": delta}]}
+            )
+        append_stream_chunk(
+            entry,
+            {
+                "id": "c1",
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            },
+        )
+
+        chunks = entry["response"]["chunks"]
+        self.assertEqual(entry["response"]["chunk_count"], 7)
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(
+            chunks[0]["choices"][0]["delta"], {"role": "assistant", "content": "Hello"}
+        )
+        self.assertEqual(chunks[1]["choices"][0]["finish_reason"], "stop")
+
+
+class LLMLogsApiTest(TestCase):
+    def setUp(self):
+        llm_logs.clear()
+        self.addCleanup(llm_logs.clear)
+        self.client = TestClient(main.app)
+        self.entries = [
+            _entry("a", "CHAT"),
+            _entry("b", "WRITING", status=500),
+            _entry("c", "CHAT"),
+            _entry("d", "CHAT", status=None),
+        ]
+        for entry in self.entries:
+            llm_logs.add(entry)
+
+    def test_pagination_returns_newest_page_in_order(self):
+        r = self.client.get("/api/v1/debug/llm_logs", params={"limit": 2})
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.headers["X-Total-Count"], "4")
+        self.assertEqual(
+            [e["id"] for e in r.json()], [e["id"] for e in self.entries[2:]]
+        )
+
+        r = self.client.get("/api/v1/debug/llm_logs", params={"limit": 2, "offset": 2})
+        self.assertEqual(
+            [e["id"] for e in r.json()], [e["id"] for e in self.entries[:2]]
+        )
+
+    def test_filters_and_projection(self):
+        r = self.client.get(
+            "/api/v1/debug/llm_logs",
+            params={
+                "model_type": "chat",
+                "status": "ok",
+                "fields": "id,response.status_code",
+            },
+        )
+        self.assertEqual(
+            r.json(),
+            [
+                {"id": self.entries[0]["id"], "response": {"status_code": 200}},
+                {"id": self.entries[2]["id"], "response": {"status_code": 200}},
+            ],
+        )
+
+        r = self.client.get("/api/v1/debug/llm_logs", params={"status": "error"})
+        self.assertEqual([e["id"] for e in r.json()], [self.entries[1]["id"]])
+        r = self.client.get("/api/v1/debug/llm_logs", params={"status": "pending"})
+        self.assertEqual([e["id"] for e in r.json()], [self.entries[3]["id"]])
+
+        r = self.client.get(f"/api/v1/debug/llm_logs/{self.entries[1]['id']}")
+        self.assertEqual(r.json()["request"]["body"], {"t": "b"})
+        self.assertEqual(
+            self.client.get("/api/v1/debug/llm_logs/nope").status_code, 404
+        )
@@ -0,0 +1,120 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the test llm model catalog unit so this responsibility stays isolated, testable, and easy to evolve.
+
+import asyncio
+import os
+import time
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+import httpx
+
+from augmentedquill.services.llm import llm_model_catalog
+from augmentedquill.services.llm.llm_http_pool import use_http_client
+from augmentedquill.services.llm.llm_model_catalog import ModelCatalog
+from augmentedquill.services.settings import settings_machine_ops
+from augmentedquill.services.settings.settings_machine_ops import (
+    list_remote_models,
+    remote_model_exists,
+)
+
+
+class ModelCatalogTest(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.requests = []
+        self.status = 200
+        self.release = asyncio.Event()
+        self.release.set()
+
+        async def handler(request):
+            self.requests.append(str(request.url))
+            await self.release.wait()
+            if self.status != 200:
+                return httpx.Response(self.status, json={"error": "down"})
+            n = len(self.requests)
+            return httpx.Response(200, json={"data": [{"id": f"m{n}"}, {"id": "m"}]})
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        self.addAsyncCleanup(client.aclose)
+        http = use_http_client(client)
+        http.__enter__()
+        self.addCleanup(http.__exit__, None, None, None)
+        self.catalog = ModelCatalog()
+        for module, name, value in (
+            (llm_model_catalog, "add_llm_log", lambda entry: None),
+            (settings_machine_ops, "model_catalog", self.catalog),
+        ):
+            self.addCleanup(setattr, module, name, getattr(module, name))
+            setattr(module, name, value)
+
+    async def test_concurrent_requests_share_one_fetch(self):
+        self.release.clear()
+        calls = [
+            asyncio.ensure_future(
+                list_remote_models(base_url="http://gw/v1/", api_key="k", timeout_s=5)
+            )
+            for _ in range(5)
+        ]
+        await asyncio.sleep(0.01)
+        self.release.set()
+        results = await asyncio.gather(*calls)
+
+        self.assertEqual(self.requests, ["http://gw/v1/models"])
+        self.assertEqual(set(map(tuple, (r[1] for r in results))), {("m1", "m")})
+        self.assertEqual(self.catalog.stats()["shared_fetches"], 4)
+
+    async def test_ttl_force_and_errors(self):
+        for _ in range(3):
+            ok, models, _ = await list_remote_models(
+                base_url="http://gw/v1", api_key=None, timeout_s=5
+            )
+        self.assertEqual((ok, models, len(self.requests)), (True, ["m1", "m"], 1))
+        # Another API key may see other models.
+        await list_remote_models(base_url="http://gw/v1", api_key="k2", timeout_s=5)
+        self.assertEqual(len(self.requests), 2)
+
+        ok, models, _ = await list_remote_models(
+            base_url="http://gw/v1", api_key=None, timeout_s=5, force=True
+        )
+        self.assertEqual((models, len(self.requests)), (["m3", "m"], 3))
+        self.assertEqual(
+            await remote_model_exists(
+                base_url="http://gw/v1", api_key=None, model_id="m3", timeout_s=5
+            ),
+            (True, None),
+        )
+        self.assertEqual(len(self.requests), 3)
+
+        self.status = 503
+        ok, _, detail = await list_remote_models(
+            base_url="http://gw/v1", api_key=None, timeout_s=5, force=True
+        )
+        self.assertEqual((ok, detail), (False, "HTTP 503"))
+        # The failure did not replace the cached list.
+        self.assertEqual(
+            (
+                await list_remote_models(
+                    base_url="http://gw/v1", api_key=None, timeout_s=5
+                )
+            )[1],
+            ["m3", "m"],
+        )
+
+    async def test_aging_entry_is_refreshed_in_background(self):
+        with patch.dict(os.environ, {"AUGQ_MODEL_LIST_TTL_S": "100"}):
+            await self.catalog.get("http://gw/v1", None)
+            key = next(iter(self.catalog._entries))
+            fetched, status, content = self.catalog._entries[key]
+            self.catalog._entries[key] = (time.monotonic() - 80, status, content)
+
+            _, served = await self.catalog.get("http://gw/v1", None)
+            self.assertEqual(served["data"][0]["id"], "m1")
+            await asyncio.gather(*self.catalog._inflight.values())
+            _, served = await self.catalog.get("http://gw/v1", None)
+        self.assertEqual(served["data"][0]["id"], "m2")
+        self.assertEqual(self.catalog.stats()["background_refreshes"], 1)
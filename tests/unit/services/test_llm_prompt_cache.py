@@ -0,0 +1,213 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the test llm prompt cache unit so this responsibility stays isolated, testable, and easy to evolve.
+
+import json
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import patch
+
+import httpx
+
+from augmentedquill.services.chat.chat_api_stream_ops import (
+    ensure_system_message_if_missing,
+)
+from augmentedquill.services.chat.chat_tools_schema import get_story_tools
+from augmentedquill.services.llm import llm_completion_ops, llm_prompt_cache
+from augmentedquill.services.llm.llm_http_pool import use_http_client
+from augmentedquill.services.llm.llm_logging import create_log_entry
+from augmentedquill.services.llm.llm_prompt_cache import (
+    apply_prompt_cache_hints,
+    canonical_tools,
+    prompt_cache_stats,
+    record_prompt_cache_usage,
+)
+from augmentedquill.services.story.story_api_prompt_ops import (
+    estimate_tokens,
+    fit_text_tail,
+)
+
+
+def _machine(mode):
+    return {
+        "openai": {
+            "models": [
+                {
+                    "name": "local",
+                    "base_url": "http://llama/v1",
+                    "model": "m",
+                    "prompt_cache": mode,
+                }
+            ],
+            "selected": "local",
+        }
+    }
+
+
+def _tool(name, **params):
+    return {
+        "type": "function",
+        "function": {"name": name, "parameters": {"type": "object", **params}},
+    }
+
+
+class PromptLayoutTest(TestCase):
+    def test_tool_schemas_serialize_identically(self):
+        a = canonical_tools([_tool("b", required=[], properties={}), _tool("a")])
+        b = canonical_tools([_tool("a"), _tool("b", properties={}, required=[])])
+        self.assertEqual(json.dumps(a), json.dumps(b))
+        self.assertEqual(a[0]["function"]["name"], "a")
+        tools = get_story_tools()
+        self.assertIsNot(tools, get_story_tools())
+        self.assertIs(tools[0], get_story_tools()[0])
+        tools.append(_tool("extra"))
+        self.assertNotIn("extra", [t["function"]["name"] for t in get_story_tools()])
+
+    def test_stable_layout_only_moves_the_base_system_message(self):
+        messages = [
+            {"role": "user", "content": "Hi"},
+            {"role": "system", "content": "Base"},
+            {"role": "assistant", "content": "Hello"},
+            {"role": "system", "content": "Note"},
+            {"role": "user", "content": "Go on"},
+        ]
+        ensure_system_message_if_missing(
+            messages,
+            model_type="CHAT",
+            machine={},
+            selected_name=None,
+            stable_layout=True,
+        )
+        self.assertEqual(
+            [m["content"] for m in messages], ["Base", "Hi", "Hello", "Note", "Go on"]
+        )
+
+    def test_hints_follow_the_model_config(self):
+        for mode, expected in (
+            (None, set()),
+            ("layout", {"stream_options"}),
+            ("cache_prompt", {"cache_prompt", "stream_options"}),
+            ("prompt_cache_key", {"prompt_cache_key", "stream_options"}),
+        ):
+            body = {"model": "m", "messages": [], "stream": True}
+            with patch.object(
+                llm_prompt_cache, "load_machine_config", return_value=_machine(mode)
+            ):
+                apply_prompt_cache_hints(
+                    body, base_url="http://llama/v1/", model_id="m"
+                )
+            added = set(body) - {"model", "messages", "stream"}
+            self.assertEqual(added, expected, mode)
+
+    def test_prompt_cache_key_only_depends_on_the_stable_prefix(self):
+        def key(user_text):
+            body = {
+                "model": "m",
+                "messages": [
+                    {"role": "system", "content": "You write."},
+                    {"role": "user", "content": user_text},
+                ],
+            }
+            with patch.object(
+                llm_prompt_cache,
+                "load_machine_config",
+                return_value=_machine("prompt_cache_key"),
+            ):
+                apply_prompt_cache_hints(body, base_url="http://llama/v1", model_id="m")
+            return body["prompt_cache_key"]
+
+        self.assertEqual(key("one"), key("two"))
+
+    def test_stable_tail_cut_survives_appended_text(self):
+        text = "\n".join(f"Paragraph {i}: the tide came in again." for i in range(400))
+        tails = [
+            fit_text_tail(text + f"\nNew line {i}.", 500, stable=True)
+            for i in range(20)
+        ]
+        starts = {tail.split("\n", 2)[1] for tail in tails}
+        self.assertEqual(len(starts), 1)
+        self.assertTrue(all(estimate_tokens(t) <= 500 for t in tails))
+        self.assertTrue(tails[-1].endswith("New line 19."))
+
+
+class PromptCacheTelemetryTest(IsolatedAsyncioTestCase):
+    def setUp(self):
+        prompt_cache_stats.clear()
+        self.addCleanup(prompt_cache_stats.clear)
+
+    def test_llama_cpp_timings_are_recorded(self):
+        entry = create_log_entry("u", "POST", {}, {"model": "m"}, streaming=True)
+        record_prompt_cache_usage(entry, {"timings": {"prompt_n": 20, "cache_n": 980}})
+        self.assertEqual(
+            entry["response"]["prompt_cache"],
+            {"prompt_tokens": 1000, "cached_tokens": 980},
+        )
+        self.assertEqual(prompt_cache_stats.snapshot()["m"]["reuse_rate"], 0.98)
+
+    async def test_streamed_usage_reaches_log_and_stats(self):
+        bodies = []
+        stream = "".join(
+            f"data: {json.dumps(chunk)}\n\n"
+            for chunk in (
+                {"choices": [{"index": 0, "text": "Hi"}]},
+                {
+                    "choices": [],
+                    "usage": {
+                        "prompt_tokens": 100,
+                        "prompt_tokens_details": {"cached_tokens": 75},
+                    },
+                },
+            )
+        )
+
+        def handler(request):
+            bodies.append(json.loads(request.content))
+            return httpx.Response(
+                200,
+                text=stream + "data: [DONE]\n\n",
+                headers={"content-type": "text/event-stream"},
+            )
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as c:
+            with (
+                use_http_client(c),
+                patch.object(
+                    llm_prompt_cache,
+                    "load_machine_config",
+                    return_value=_machine("cache_prompt"),
+                ),
+                patch.object(llm_completion_ops, "add_llm_log") as add_log,
+            ):
+                chunks = [
+                    chunk
+                    async for chunk in llm_completion_ops.openai_completions_stream(
+                        prompt="P",
+                        base_url="http://llama/v1",
+                        api_key=None,
+                        model_id="m",
+                        timeout_s=5,
+                    )
+                ]
+
+        self.assertEqual(chunks, ["Hi"])
+        self.assertTrue(bodies[0]["cache_prompt"])
+        self.assertEqual(bodies[0]["stream_options"], {"include_usage": True})
+        (entry,) = add_log.call_args.args
+        self.assertEqual(
+            entry["response"]["prompt_cache"],
+            {"prompt_tokens": 100, "cached_tokens": 75},
+        )
+        self.assertEqual(
+            prompt_cache_stats.snapshot(),
+            {
+                "m": {
+                    "requests": 1,
+                    "prompt_tokens": 100,
+                    "cached_tokens": 75,
+                    "reuse_rate": 0.75,
+                }
+            },
+        )
@@ -0,0 +1,145 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the test llm response cache unit so this responsibility stays isolated, testable, and easy to evolve.
+
+import os
+import tempfile
+import time
+from pathlib import Path
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from fastapi.testclient import TestClient
+
+import augmentedquill.main as main
+from augmentedquill.services.llm import llm, llm_completion_ops, llm_stream_ops
+from augmentedquill.services.llm.llm_response_cache import ResponseCache
+
+
+class ResponseCacheStoreTest(TestCase):
+    def setUp(self):
+        td = tempfile.TemporaryDirectory()
+        self.addCleanup(td.cleanup)
+        self.dir = Path(td.name)
+
+    def test_lru_eviction_by_size(self):
+        cache = ResponseCache(self.dir, max_bytes=25, ttl_s=60)
+        cache.put("a", "x" * 8)
+        cache.put("b", "y" * 8)
+        self.assertEqual(cache.get("a"), "x" * 8)
+        cache.put("c", "z" * 8)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "x" * 8)
+        self.assertEqual(sorted(p.stem for p in self.dir.glob("*.json")), ["a", "c"])
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 1))
+        self.assertEqual(stats["evicted"], 1)
+
+    def test_ttl_and_restart(self):
+        ResponseCache(self.dir, ttl_s=60).put("k", {"content": "kept"})
+        self.assertEqual(
+            ResponseCache(self.dir, ttl_s=60).get("k"), {"content": "kept"}
+        )
+
+        old = time.time() - 120
+        os.utime(self.dir / "k.json", (old, old))
+        cache = ResponseCache(self.dir, ttl_s=60)
+        self.assertIsNone(cache.get("k"))
+        self.assertEqual(cache.stats()["expired"], 1)
+        self.assertFalse((self.dir / "k.json").exists())
+
+
+class FacadeResponseCacheTest(IsolatedAsyncioTestCase):
+    def setUp(self):
+        td = tempfile.TemporaryDirectory()
+        self.addCleanup(td.cleanup)
+        os.environ["AUGQ_LLM_RESPONSE_CACHE"] = "1"
+        self.addCleanup(os.environ.pop, "AUGQ_LLM_RESPONSE_CACHE", None)
+        cache = ResponseCache(Path(td.name), ttl_s=60)
+        self.addCleanup(setattr, llm, "response_cache", llm.response_cache)
+        llm.response_cache = cache
+        self.cache = cache
+        self.calls = 0
+
+        async def fake_stream(**kwargs):
+            self.calls += 1
+            for piece in ("Once", " upon", " a time"):
+                yield {"content": piece}
+            yield {"done": True}
+
+        async def fake_complete(**kwargs):
+            self.calls += 1
+            return {"content": "A summary.", "tool_calls": [], "thinking": ""}
+
+        for module, name, fake in (
+            (llm_stream_ops, "unified_chat_stream", fake_stream),
+            (llm_completion_ops, "unified_chat_complete", fake_complete),
+        ):
+            self.addCleanup(setattr, module, name, getattr(module, name))
+            setattr(module, name, fake)
+
+    def _request(self, text="Hello"):
+        return {
+            "messages": [{"role": "user", "content": text}],
+            "base_url": "http://llm/v1",
+            "api_key": None,
+            "model_id": "m",
+            "timeout_s": 5,
+        }
+
+    async def _stream(self, **kwargs):
+        return [c async for c in llm.unified_chat_stream(**kwargs)]
+
+    async def test_deterministic_stream_is_replayed(self):
+        first = await self._stream(**self._request(), temperature=0)
+        second = await self._stream(**self._request(), temperature=0)
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(second, [{"content": "Once upon a time"}, {"done": True}])
+        self.assertEqual(
+            "".join(c.get("content", "") for c in first),
+            "".join(c.get("content", "") for c in second),
+        )
+        await self._stream(**self._request("Other"), temperature=0)
+        self.assertEqual(self.calls, 2)
+
+    async def test_sampled_requests_bypass_the_cache(self):
+        await self._stream(**self._request(), temperature=0.7)
+        await self._stream(**self._request(), temperature=0.7)
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    async def test_cacheable_complete_is_stored(self):
+        for _ in range(3):
+            data = await llm.unified_chat_complete(**self._request(), cacheable=True)
+            self.assertEqual(data["content"], "A summary.")
+        self.assertEqual(self.calls, 1)
+
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 1))
+        self.assertAlmostEqual(stats["hit_rate"], 2 / 3, places=3)
+
+    async def test_disabled_cache_is_not_consulted(self):
+        os.environ["AUGQ_LLM_RESPONSE_CACHE"] = "0"
+        await llm.unified_chat_complete(**self._request(), cacheable=True)
+        await llm.unified_chat_complete(**self._request(), cacheable=True)
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(self.cache.stats()["misses"], 0)
+
+    def test_debug_api_reports_hit_rate(self):
+        import augmentedquill.api.v1.debug as debug
+
+        self.addCleanup(setattr, debug, "response_cache", debug.response_cache)
+        debug.response_cache = self.cache
+        self.cache.put("k", "v")
+        self.cache.get("k")
+        client = TestClient(main.app)
+        stats = client.get("/api/v1/debug/response_cache").json()
+        self.assertTrue(stats["enabled"])
+        self.assertEqual(stats["hit_rate"], 1.0)
+        self.assertEqual(client.delete("/api/v1/debug/response_cache").status_code, 200)
+        self.assertEqual(self.cache.stats()["entries"], 0)
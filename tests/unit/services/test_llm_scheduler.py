@@ -0,0 +1,142 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the test llm scheduler unit so this responsibility stays isolated, testable, and easy to evolve.
+
+import asyncio
+import os
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+from augmentedquill.services.llm import llm, llm_completion_ops, llm_scheduler
+from augmentedquill.services.llm.llm_scheduler import (
+    RequestSuperseded,
+    endpoint_scheduler,
+    supersede_previous,
+    upstream_slot,
+)
+
+URL = "http://llama/v1"
+
+
+class SchedulerTest(IsolatedAsyncioTestCase):
+    def setUp(self):
+        patcher = patch.dict(
+            os.environ,
+            {"AUGQ_LLM_MAX_IN_FLIGHT": "1", "AUGQ_LLM_PRIORITY_AGING_S": "30"},
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        config = patch.object(llm_scheduler, "load_machine_config", return_value={})
+        config.start()
+        self.addCleanup(config.stop)
+        self.order = []
+
+    async def _request(self, name, priority, ticket=None, hold=None):
+        async with upstream_slot(URL, priority, ticket):
+            self.order.append(name)
+            if hold is not None:
+                await hold.wait()
+
+    async def _queue(self, *requests):
+        tasks = [asyncio.create_task(self._request(*r)) for r in requests]
+        await asyncio.sleep(0)
+        return tasks
+
+    async def test_waiting_requests_are_admitted_by_priority(self):
+        hold = asyncio.Event()
+        (first,) = await self._queue(("first", "background", None, hold))
+        tasks = await self._queue(
+            ("bg1", "background"),
+            ("suggest", "suggest"),
+            ("bg2", "background"),
+            ("chat", "interactive"),
+        )
+        stats = endpoint_scheduler(URL).stats()
+        self.assertEqual((stats["in_flight"], stats["queued"]), (1, 4))
+        self.assertEqual(stats["classes"]["background"]["queued"], 2)
+
+        hold.set()
+        await asyncio.gather(first, *tasks)
+        self.assertEqual(self.order, ["first", "chat", "suggest", "bg1", "bg2"])
+        stats = endpoint_scheduler(URL).stats()
+        self.assertEqual((stats["in_flight"], stats["queued"]), (0, 0))
+        self.assertEqual(stats["classes"]["background"]["served"], 3)
+        self.assertGreater(stats["classes"]["interactive"]["max_wait_ms"], 0)
+
+    async def test_long_waiting_background_requests_age_up(self):
+        hold = asyncio.Event()
+        (first,) = await self._queue(("first", "interactive", None, hold))
+        (old,) = await self._queue(("old background", "background"))
+        endpoint_scheduler(URL)._waiters[0].enqueued -= 61
+        (new,) = await self._queue(("new chat", "interactive"))
+
+        hold.set()
+        await asyncio.gather(first, old, new)
+        self.assertEqual(self.order, ["first", "old background", "new chat"])
+
+    async def test_cancelled_waiters_leave_the_queue(self):
+        hold = asyncio.Event()
+        first, waiting, later = await self._queue(
+            ("first", "interactive", None, hold),
+            ("cancelled", "interactive"),
+            ("later", "background"),
+        )
+        waiting.cancel()
+        await asyncio.sleep(0)
+        self.assertEqual(endpoint_scheduler(URL).stats()["queued"], 1)
+
+        hold.set()
+        await asyncio.gather(first, later)
+        self.assertEqual(self.order, ["first", "later"])
+
+    async def test_newer_request_supersedes_a_queued_one(self):
+        hold = asyncio.Event()
+        (first,) = await self._queue(("first", "interactive", None, hold))
+        with supersede_previous(("suggest", 1)) as old_ticket:
+            (old,) = await self._queue(("old", "suggest", old_ticket))
+            with supersede_previous(("suggest", 1)) as ticket:
+                (new,) = await self._queue(("new", "suggest", ticket))
+                with self.assertRaises(RequestSuperseded):
+                    await old
+                hold.set()
+                await asyncio.gather(first, new)
+
+        self.assertEqual(self.order, ["first", "new"])
+        stats = endpoint_scheduler(URL).stats()["classes"]["suggest"]
+        self.assertEqual((stats["served"], stats["superseded"]), (1, 1))
+
+    async def test_newer_request_stops_a_running_stream(self):
+        async def fake_stream(**kwargs):
+            for i in range(100):
+                await asyncio.sleep(0)
+                yield f"{kwargs['prompt']}{i} "
+
+        self.addCleanup(
+            setattr,
+            llm_completion_ops,
+            "openai_completions_stream",
+            llm_completion_ops.openai_completions_stream,
+        )
+        llm_completion_ops.openai_completions_stream = fake_stream
+        request = {"base_url": URL, "api_key": None, "model_id": "m", "timeout_s": 5}
+
+        with supersede_previous("chapter 1") as ticket:
+            old = llm.openai_completions_stream(
+                prompt="old", priority="suggest", ticket=ticket, **request
+            )
+            self.assertEqual(await anext(old), "old0 ")
+            with supersede_previous("chapter 1") as newer:
+                with self.assertRaises(RequestSuperseded):
+                    await anext(old)
+                chunks = [
+                    c
+                    async for c in llm.openai_completions_stream(
+                        prompt="new", priority="suggest", ticket=newer, **request
+                    )
+                ]
+        self.assertEqual(len(chunks), 100)
+        self.assertEqual(endpoint_scheduler(URL).stats()["in_flight"], 0)
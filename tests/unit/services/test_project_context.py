@@ -0,0 +1,121 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the test project context unit so this responsibility stays isolated, testable, and easy to evolve.
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+import augmentedquill.main as main
+from augmentedquill.core import config
+from augmentedquill.services.projects import project_context
+from augmentedquill.services.projects.projects import select_project
+
+
+def _call(call_id: str, name: str, **args) -> dict:
+    return {
+        "id": call_id,
+        "type": "function",
+        "function": {"name": name, "arguments": json.dumps(args)},
+    }
+
+
+class ProjectContextBatchTest(TestCase):
+    def setUp(self):
+        self.td = tempfile.TemporaryDirectory()
+        self.addCleanup(self.td.cleanup)
+        self.projects_root = Path(self.td.name) / "projects"
+        self.projects_root.mkdir(parents=True, exist_ok=True)
+        os.environ["AUGQ_PROJECTS_ROOT"] = str(self.projects_root)
+        os.environ["AUGQ_PROJECTS_REGISTRY"] = str(Path(self.td.name) / "p.json")
+        self.client = TestClient(main.app)
+
+        ok, msg = select_project("demo")
+        self.assertTrue(ok, msg)
+        self.pdir = self.projects_root / "demo"
+        chdir = self.pdir / "chapters"
+        chdir.mkdir(parents=True, exist_ok=True)
+        (chdir / "0001.txt").write_text("Alpha.", encoding="utf-8")
+        (chdir / "0002.txt").write_text("Beta.", encoding="utf-8")
+        (self.pdir / "story.json").write_text(
+            json.dumps(
+                {
+                    "metadata": {"version": 2},
+                    "project_title": "Demo",
+                    "chapters": [
+                        {"title": "Intro", "summary": "Start", "filename": "0001.txt"},
+                        {"title": "Next", "summary": "", "filename": "0002.txt"},
+                    ],
+                }
+            ),
+            encoding="utf-8",
+        )
+
+    def tearDown(self):
+        os.environ.pop("AUGQ_PROJECTS_ROOT", None)
+        os.environ.pop("AUGQ_PROJECTS_REGISTRY", None)
+
+    def _run(self, *calls) -> list:
+        body = {"messages": [{"role": "assistant", "tool_calls": list(calls)}]}
+        r = self.client.post("/api/v1/chat/tools", json=body)
+        self.assertEqual(r.status_code, 200, r.text)
+        return [json.loads(m["content"]) for m in r.json()["appended_messages"]]
+
+    def test_read_tools_share_one_overview(self):
+        with patch.object(
+            project_context,
+            "_project_overview",
+            wraps=project_context._project_overview,
+        ) as overview:
+            results = self._run(
+                _call("a", "get_project_overview"),
+                _call("b", "get_chapter_summaries"),
+                _call("c", "get_chapter_summary", chap_id=1),
+                _call("d", "get_chapter_heading", chap_id=2),
+                _call("e", "get_chapter_metadata", chap_id=1),
+            )
+
+        overview.assert_called_once()
+        self.assertEqual(results[0]["project_title"], "Demo")
+        self.assertEqual(results[2], {"summary": "Start"})
+        self.assertEqual(results[3], {"heading": "Next"})
+        self.assertEqual(results[4]["title"], "Intro")
+
+    def test_mutations_are_visible_in_batch_and_written_once(self):
+        with patch.object(
+            config, "_write_story_file", wraps=config._write_story_file
+        ) as write:
+            results = self._run(
+                _call("a", "get_chapter_summary", chap_id=2),
+                _call("b", "write_chapter_summary", chap_id=2, summary="Middle"),
+                _call("c", "get_chapter_summary", chap_id=2),
+                _call("d", "set_story_tags", tags=["x", "y"]),
+                _call("e", "get_story_tags"),
+            )
+
+        self.assertEqual(results[0], {"summary": ""})
+        self.assertEqual(results[2], {"summary": "Middle"})
+        self.assertEqual(results[4], {"tags": ["x", "y"]})
+        write.assert_called_once()
+
+        story = json.loads((self.pdir / "story.json").read_text(encoding="utf-8"))
+        self.assertEqual(story["chapters"][1]["summary"], "Middle")
+        self.assertEqual(story["tags"], ["x", "y"])
+
+    def test_story_is_written_immediately_outside_a_batch(self):
+        story_path = self.pdir / "story.json"
+        story = config.load_story_config(story_path)
+        story["project_title"] = "Renamed"
+        config.save_story_config(story_path, story)
+
+        on_disk = json.loads(story_path.read_text(encoding="utf-8"))
+        self.assertEqual(on_disk["project_title"], "Renamed")
@@ -0,0 +1,109 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the test storage io unit so this responsibility stays isolated, testable, and easy to evolve.
+
+import asyncio
+import threading
+import time
+from unittest import IsolatedAsyncioTestCase
+
+from augmentedquill.utils.storage_io import (
+    run_bulk_io,
+    run_metadata_io,
+    serialized_write,
+    shutdown_storage_io,
+)
+
+
+class StorageIoTest(IsolatedAsyncioTestCase):
+    async def asyncTearDown(self):
+        shutdown_storage_io()
+
+    async def test_runs_off_the_event_loop_thread(self):
+        loop_thread = threading.get_ident()
+
+        meta_thread = await run_metadata_io(threading.get_ident)
+        bulk_name = await run_bulk_io(lambda: threading.current_thread().name)
+
+        self.assertNotEqual(meta_thread, loop_thread)
+        self.assertTrue(bulk_name.startswith("augq-bulk-io"))
+
+    async def test_propagates_results_and_exceptions(self):
+        def join(a, b, sep=","):
+            return f"{a}{sep}{b}"
+
+        self.assertEqual(await run_metadata_io(join, "x", "y", sep="-"), "x-y")
+
+        def boom():
+            raise ValueError("bad")
+
+        with self.assertRaises(ValueError):
+            await run_bulk_io(boom)
+
+    async def test_loop_stays_responsive_during_bulk_work(self):
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        task = asyncio.create_task(ticker())
+        await run_bulk_io(time.sleep, 0.1)
+        task.cancel()
+
+        self.assertGreater(ticks, 5)
+
+    async def test_serialized_write_does_not_interleave(self):
+        active = 0
+        overlaps = 0
+
+        @serialized_write
+        def update():
+            nonlocal active, overlaps
+            active += 1
+            if active > 1:
+                overlaps += 1
+            time.sleep(0.01)
+            active -= 1
+
+        await asyncio.gather(*(run_metadata_io(update) for _ in range(8)))
+
+        self.assertEqual(overlaps, 0)
+
+    async def test_serialized_write_locks_per_scope(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        @serialized_write(scope="project")
+        def hold(project, wait):
+            started.set()
+            if wait:
+                release.wait(5)
+            return project
+
+        held = asyncio.ensure_future(run_metadata_io(hold, "/p/a", True))
+        await asyncio.to_thread(started.wait, 5)
+        # Another project does not wait for the held lock ...
+        self.assertEqual(
+            await asyncio.wait_for(run_metadata_io(hold, "/p/b", False), 2), "/p/b"
+        )
+        # ... the same project does.
+        same = asyncio.ensure_future(run_metadata_io(hold, project="/p/a", wait=False))
+        await asyncio.sleep(0.05)
+        self.assertFalse(same.done())
+
+        release.set()
+        self.assertEqual(await held, "/p/a")
+        self.assertEqual(await same, "/p/a")
+
+    async def test_pools_are_recreated_after_shutdown(self):
+        await run_metadata_io(int)
+        shutdown_storage_io()
+
+        self.assertEqual(await run_metadata_io(int, "5"), 5)
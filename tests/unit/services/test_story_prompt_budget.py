@@ -0,0 +1,145 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the test story prompt budget unit so this responsibility stays isolated, testable, and easy to evolve.
+
+from unittest import TestCase
+from unittest.mock import patch
+
+from augmentedquill.services.story import story_api_prompt_ops as prompt_ops
+from augmentedquill.services.story.story_api_prompt_ops import (
+    build_continue_chapter_messages,
+    build_suggest_prompt,
+    estimate_tokens,
+    fit_text_tail,
+    relevant_sourcebook_entries,
+)
+
+
+def _paragraphs(count: int) -> str:
+    return "\n".join(
+        f"Paragraph {i}: the rain kept falling on the old harbour town."
+        for i in range(count)
+    )
+
+
+class PromptBudgetTest(TestCase):
+    def test_unbudgeted_prompt_is_unchanged(self):
+        text = _paragraphs(2000)
+        messages = build_continue_chapter_messages(
+            chapter_title="T",
+            chapter_summary="S",
+            existing_text=text,
+            model_overrides={},
+            earlier_summaries=["Ch1:\nEarlier."],
+        )
+        content = messages[1]["content"]
+        self.assertTrue(content.startswith("Title: T\n"))
+        self.assertIn(text, content)
+        self.assertNotIn("Earlier.", content)
+
+    def test_long_chapter_is_fitted_into_context_window(self):
+        text = _paragraphs(5000) + "\nThe last line."
+        messages = build_continue_chapter_messages(
+            chapter_title="T",
+            chapter_summary="S",
+            existing_text=text,
+            model_overrides={},
+            context_length=8192,
+            max_tokens=2048,
+            earlier_summaries=["Ch1:\nThe beginning.", "Ch2:\nThe middle."],
+            sourcebook_entries=["Harbour: A fishing port."],
+        )
+        prompt_tokens = sum(estimate_tokens(m["content"]) for m in messages)
+        self.assertLessEqual(prompt_tokens + 2048, 8192)
+        self.assertGreater(prompt_tokens + 2048, 8192 * 0.8)
+
+        content = messages[1]["content"]
+        self.assertTrue(content.startswith("Story so far:\n\nCh1:\nThe beginning."))
+        self.assertIn("Reference:\nHarbour: A fishing port.\n\nTitle: T", content)
+        self.assertIn("The last line.\n\nTask: Continue the chapter", content)
+        self.assertIn("[...]\nParagraph ", content)
+
+    def test_story_context_headings_follow_model_overrides(self):
+        prompt = build_suggest_prompt(
+            chapter_title="T",
+            chapter_summary="S",
+            current_text=_paragraphs(50),
+            model_overrides={
+                "story_context_summaries": "Bisher:\n{summaries}",
+                "story_context_reference": "Nachschlagen:\n{entries}",
+            },
+            context_length=8192,
+            max_tokens=500,
+            earlier_summaries=["Ch1:\nThe beginning."],
+            sourcebook_entries=["Harbour: A fishing port."],
+        )
+        self.assertTrue(prompt.startswith("Bisher:\nCh1:\nThe beginning.\n\n"))
+        self.assertIn("Nachschlagen:\nHarbour: A fishing port.\n\nT\n", prompt)
+        self.assertNotIn("Story so far:", prompt)
+
+    def test_background_is_limited_to_its_share(self):
+        summaries = [f"Ch{i}:\n" + "x " * 400 for i in range(40)]
+        prompt = build_suggest_prompt(
+            chapter_title="T",
+            chapter_summary="S",
+            current_text=_paragraphs(500),
+            model_overrides={},
+            context_length=8192,
+            max_tokens=500,
+            earlier_summaries=summaries,
+        )
+        self.assertNotIn("Ch0:", prompt)
+        self.assertIn("Ch39:", prompt)
+        self.assertLess(prompt.index("Ch39:"), prompt.index("[...]"))
+        self.assertIn("Paragraph 499", prompt)
+
+    def test_fit_text_tail_cuts_at_a_paragraph(self):
+        text = _paragraphs(100)
+        tail = fit_text_tail(text, 200)
+        self.assertLessEqual(estimate_tokens(tail), 200)
+        self.assertTrue(tail.startswith("[...]\nParagraph "))
+        self.assertTrue(text.endswith(tail[len("[...]\n") :]))
+        self.assertEqual(fit_text_tail("short", 200), "short")
+
+    def test_relevant_sourcebook_entries_ranked_by_last_mention(self):
+        story = {
+            "sourcebook": {
+                "Mara": {"description": "The captain.", "synonyms": ["the Captain"]},
+                "Harbour": {"description": "A fishing port."},
+                "Owl": {"description": "Never mentioned."},
+            }
+        }
+        entries = relevant_sourcebook_entries(
+            story, "Summary.", "Mara walked to the harbour. Later THE CAPTAIN slept."
+        )
+        self.assertEqual(entries, ["Mara: The captain.", "Harbour: A fishing port."])
+
+    def test_context_length_comes_from_the_selected_model(self):
+        machine = {
+            "openai": {
+                "models": [
+                    {"name": "a", "model": "m", "base_url": "http://x"},
+                    {
+                        "name": "b",
+                        "model": "m",
+                        "base_url": "http://x",
+                        "context_length": 32768,
+                    },
+                ],
+                "selected": "a",
+                "selected_writing": "b",
+            }
+        }
+        with patch.object(
+            prompt_ops, "load_machine_config", return_value=machine
+        ) as load:
+            _, writing_length, _ = prompt_ops.resolve_prompt_runtime({}, "WRITING")
+            _, chat_length, _ = prompt_ops.resolve_prompt_runtime({}, "CHAT")
+        self.assertEqual(writing_length, 32768)
+        self.assertIsNone(chat_length)
+        # Runtime and prompt settings come from one machine config snapshot.
+        self.assertEqual(load.call_count, 2)
@@ -0,0 +1,198 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Defines the test summary refresh unit so this responsibility stays isolated, testable, and easy to evolve.
+
+import asyncio
+import json
+import os
+import tempfile
+from pathlib import Path
+from unittest import IsolatedAsyncioTestCase
+
+from fastapi.testclient import TestClient
+
+import augmentedquill.main as main
+import augmentedquill.services.llm.llm as llm
+from augmentedquill.services.projects.projects import select_project
+from augmentedquill.services.story import summary_refresh_ops
+from augmentedquill.services.story.chapter_summary_ops import chapter_text_hash
+
+
+class SummaryRefreshTest(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.td = tempfile.TemporaryDirectory()
+        self.addCleanup(self.td.cleanup)
+        root = Path(self.td.name)
+        os.environ["AUGQ_PROJECTS_ROOT"] = str(root / "projects")
+        os.environ["AUGQ_PROJECTS_REGISTRY"] = str(root / "projects.json")
+        self.addCleanup(os.environ.pop, "AUGQ_PROJECTS_ROOT", None)
+        self.addCleanup(os.environ.pop, "AUGQ_PROJECTS_REGISTRY", None)
+
+        self.addCleanup(
+            setattr, summary_refresh_ops, "JOURNAL_DIR", summary_refresh_ops.JOURNAL_DIR
+        )
+        summary_refresh_ops.JOURNAL_DIR = root / "journal"
+        self.addCleanup(summary_refresh_ops._jobs.clear)
+
+        ok, msg = select_project("novel")
+        self.assertTrue(ok, msg)
+        self.pdir = root / "projects" / "novel"
+        chapters = self.pdir / "chapters"
+        chapters.mkdir(parents=True, exist_ok=True)
+        self.texts = ["First text.", "Second text.", "Third text."]
+        for i, text in enumerate(self.texts, start=1):
+            (chapters / f"{i:04d}.txt").write_text(text, encoding="utf-8")
+        self._write_story(
+            [
+                {
+                    "title": "T1",
+                    "summary": "Kept.",
+                    "summary_hash": chapter_text_hash(self.texts[0]),
+                },
+                {"title": "T2", "summary": "Stale.", "summary_hash": "old"},
+                {"title": "T3", "summary": ""},
+            ]
+        )
+
+        self.requests = []
+        self.gate: asyncio.Event | None = None
+
+        def fake_resolve(payload, **kwargs):
+            return ("https://fake/v1", None, "fake-model", 5)
+
+        async def fake_complete(*, messages, **kwargs):
+            self.requests.append(messages)
+            if self.gate is not None:
+                await self.gate.wait()
+            text = messages[-1]["content"]
+            if "Chapter text:" in text:
+                return {"content": "New: " + text.split("Chapter text:")[1].split()[0]}
+            return {"content": "Story."}
+
+        for name, fake in (
+            ("resolve_openai_credentials", fake_resolve),
+            ("unified_chat_complete", fake_complete),
+        ):
+            self.addCleanup(setattr, llm, name, getattr(llm, name))
+            setattr(llm, name, fake)
+
+        self.saves = 0
+        original_save = summary_refresh_ops.save_story_config
+
+        def counting_save(*args, **kwargs):
+            self.saves += 1
+            return original_save(*args, **kwargs)
+
+        summary_refresh_ops.save_story_config = counting_save
+        self.addCleanup(
+            setattr, summary_refresh_ops, "save_story_config", original_save
+        )
+
+    def _write_story(self, chapters):
+        (self.pdir / "story.json").write_text(
+            json.dumps(
+                {
+                    "project_title": "P",
+                    "format": "markdown",
+                    "chapters": chapters,
+                    "metadata": {"version": 2},
+                }
+            ),
+            encoding="utf-8",
+        )
+
+    def _story(self) -> dict:
+        return json.loads((self.pdir / "story.json").read_text(encoding="utf-8"))
+
+    async def test_refresh_skips_unchanged_and_writes_once(self):
+        job = summary_refresh_ops.start_summary_refresh({})
+        events = [event async for event in job.events()]
+
+        statuses = {e["chap_id"]: e["status"] for e in events if e["type"] == "chapter"}
+        self.assertEqual(statuses, {1: "skipped", 2: "done", 3: "done"})
+        self.assertEqual(events[0]["type"], "start")
+        self.assertEqual(
+            [e["type"] for e in events[-3:]], ["saved", "story_summary", "done"]
+        )
+        self.assertEqual(events[-1]["done"], 3)
+        self.assertEqual(self.saves, 1)
+
+        story = self._story()
+        summaries = [c["summary"] for c in story["chapters"]]
+        self.assertEqual(summaries, ["Kept.", "New: Second", "New: Third"])
+        self.assertEqual(
+            story["chapters"][2]["summary_hash"], chapter_text_hash(self.texts[2])
+        )
+        self.assertEqual(story["story_summary"], "Story.")
+        self.assertFalse(any(summary_refresh_ops.JOURNAL_DIR.glob("*.jsonl")))
+
+    async def test_cancel_persists_finished_chapters(self):
+        os.environ["AUGQ_SUMMARY_CONCURRENCY"] = "1"
+        self.addCleanup(os.environ.pop, "AUGQ_SUMMARY_CONCURRENCY", None)
+        self.gate = asyncio.Event()
+        job = summary_refresh_ops.start_summary_refresh({})
+        seen = []
+        async for event in job.events():
+            seen.append(event)
+            if event["type"] == "start":
+                self.gate.set()
+            if event.get("status") == "done":
+                self.gate.clear()
+                self.assertTrue(summary_refresh_ops.cancel_summary_refresh())
+        self.assertEqual(seen[-1]["type"], "cancelled")
+        self.assertEqual(job.state, "cancelled")
+
+        summaries = [c["summary"] for c in self._story()["chapters"]]
+        self.assertEqual(summaries, ["Kept.", "New: Second", ""])
+        self.assertNotIn("story_summary", self._story())
+
+    async def test_journal_from_an_interrupted_job_is_resumed(self):
+        journal = summary_refresh_ops._journal_path(self.pdir)
+        journal.parent.mkdir(parents=True)
+        record = {
+            "file": "chapters/0002.txt",
+            "hash": chapter_text_hash(self.texts[1]),
+            "summary": "From journal.",
+        }
+        journal.write_text(json.dumps(record) + "\n{torn", encoding="utf-8")
+        self.assertEqual(
+            summary_refresh_ops.summary_refresh_status(),
+            {"state": "idle", "resumable": 1},
+        )
+
+        job = summary_refresh_ops.start_summary_refresh({})
+        events = [event async for event in job.events()]
+        statuses = {e["chap_id"]: e["status"] for e in events if e["type"] == "chapter"}
+        self.assertEqual(statuses[2], "resumed")
+        chapter_requests = [
+            m for m in self.requests if "Chapter text:" in m[-1]["content"]
+        ]
+        self.assertEqual(len(chapter_requests), 1)
+        summaries = [c["summary"] for c in self._story()["chapters"]]
+        self.assertEqual(summaries, ["Kept.", "From journal.", "New: Third"])
+        self.assertFalse(journal.exists())
+
+    def test_refresh_endpoint_streams_progress(self):
+        with TestClient(main.app) as client:
+            r = client.post("/api/v1/story/summaries/refresh", json={"force": True})
+            self.assertEqual(r.status_code, 200, r.text)
+            self.assertEqual(
+                r.headers["content-type"], "text/event-stream; charset=utf-8"
+            )
+            events = [
+                json.loads(line[len("data: ") :])
+                for line in r.text.splitlines()
+                if line.startswith("data: ")
+            ]
+            self.assertEqual(events[-1]["type"], "done")
+            self.assertEqual(sum(1 for e in events if e.get("status") == "done"), 3)
+            status = client.get("/api/v1/story/summaries/refresh").json()
+            self.assertEqual(status["state"], "done")
+            self.assertEqual(
+                client.delete("/api/v1/story/summaries/refresh").json(),
+                {"ok": True, "cancelled": False},
+            )
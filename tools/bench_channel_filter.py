@@ -0,0 +1,206 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Benchmarks ChannelFilter throughput on long streamed transcripts.
+
+"""
+Throughput benchmark for ChannelFilter on generated 100k-token transcripts.
+
+Feeds each transcript token by token, as llm_stream_ops does, through the
+previous regex filter (re-search the whole pending buffer per chunk) and the
+current incremental filter, and checks that both emit the same output.
+
+Transcripts:
+  prose     plain text, no tags
+  tagged    reasoning in <think>/<|channel|> blocks and tool calls
+  brackets  code-like text with many "<" and "[" that never form a tag
+  dense     a "<" in nearly every token, so text is held back for good
+
+The previous filter is quadratic on "dense"; it is measured on the first
+--legacy-tokens tokens only (marked with *), which flatters it.
+
+Usage:
+  python tools/bench_channel_filter.py [--tokens 100000] [--only prose,tagged]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from augmentedquill.utils.stream_helpers import ChannelFilter  # noqa: E402
+
+
+class LegacyChannelFilter:
+    """Replicates the filter before the incremental scanner existed."""
+
+    tag_pattern = re.compile(
+        r"(<\|channel\|>(.*?)<\|message\|>|"
+        r"<\|start\|>assistant.*?<\|message\|>|"
+        r"<\|end\|>|"
+        r"<(thought|thinking)>|"
+        r"</(thought|thinking)>|"
+        r"\[TOOL_CALL\]\s*|"
+        r"\s*\[/TOOL_CALL\]|"
+        r"<tool_call>|"
+        r"</tool_call>)",
+        re.IGNORECASE | re.DOTALL,
+    )
+
+    def __init__(self):
+        self.current_channel = "final"
+        self.buffer = ""
+
+    def feed(self, chunk: str) -> List[Dict[str, str]]:
+        self.buffer += chunk
+        results = []
+        while True:
+            match = self.tag_pattern.search(self.buffer)
+            if not match:
+                idxs = [
+                    i for i in (self.buffer.find("<"), self.buffer.find("[")) if i != -1
+                ]
+                first = min(idxs) if idxs else -1
+                if first == -1:
+                    if self.buffer:
+                        results.append(
+                            {"channel": self.current_channel, "content": self.buffer}
+                        )
+                        self.buffer = ""
+                elif first > 0:
+                    results.append(
+                        {
+                            "channel": self.current_channel,
+                            "content": self.buffer[:first],
+                        }
+                    )
+                    self.buffer = self.buffer[first:]
+                if len(self.buffer) > 150:
+                    results.append(
+                        {"channel": self.current_channel, "content": self.buffer[0]}
+                    )
+                    self.buffer = self.buffer[1:]
+                break
+            start, end = match.span()
+            if start > 0:
+                results.append(
+                    {"channel": self.current_channel, "content": self.buffer[:start]}
+                )
+            tag_text = match.group(0)
+            if re.match(r"<(thought|thinking)>", tag_text, re.IGNORECASE):
+                self.current_channel = "thought"
+            elif re.match(r"</(thought|thinking)>", tag_text, re.IGNORECASE):
+                self.current_channel = "final"
+            elif re.match(r"\[TOOL_CALL\]\s*|<tool_call>", tag_text, re.IGNORECASE):
+                self.current_channel = "tool_def"
+            elif re.match(r"\[/TOOL_CALL\]|</tool_call>", tag_text, re.IGNORECASE):
+                self.current_channel = "final"
+            elif tag_text.startswith("<|channel|>"):
+                name = match.group(2)
+                if name:
+                    self.current_channel = name.split("<|constrain|>", 1)[0].strip()
+            elif (
+                tag_text.startswith("<|start|>assistant") and "<|channel|>" in tag_text
+            ):
+                name = tag_text.split("<|channel|>", 1)[1].split("<|message|>", 1)[0]
+                self.current_channel = name.split("<|constrain|>", 1)[0].strip()
+            elif "<|message|>" in tag_text:
+                pass
+            elif "<|end|>" in tag_text:
+                self.current_channel = "final"
+            self.buffer = self.buffer[end:]
+        return results
+
+    def flush(self) -> List[Dict[str, str]]:
+        results = []
+        if self.buffer:
+            results.append({"channel": self.current_channel, "content": self.buffer})
+            self.buffer = ""
+        return results
+
+
+WORDS = "the of and a to in is was that with for on as at by it from he she".split()
+
+
+def _tokens(rng: random.Random, n: int, extra: Callable[[], str]) -> List[str]:
+    out = []
+    while len(out) < n:
+        piece = extra()
+        if piece:
+            # Tags arrive split over several tokens.
+            out.extend(piece[i : i + 4] for i in range(0, len(piece), 4))
+        else:
+            out.append(" " + rng.choice(WORDS))
+    return out[:n]
+
+
+def transcript(kind: str, n: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    if kind == "prose":
+        return _tokens(rng, n, lambda: "")
+    if kind == "tagged":
+        tags = [
+            "<think>",
+            "</think>",
+            "<|channel|>analysis<|message|>",
+            "<|end|><|start|>assistant<|channel|>final<|message|>",
+            '[TOOL_CALL] {"name": "x"} [/TOOL_CALL]',
+            '<tool_call>{"name": "y"}</tool_call>',
+        ]
+        return _tokens(rng, n, lambda: rng.choice(tags) if rng.random() < 0.02 else "")
+    if kind == "brackets":
+        code = ["if a < b:", "xs[i]", "List[int]", "<div>", "a<<2", "[0, 1]"]
+        return _tokens(rng, n, lambda: rng.choice(code) if rng.random() < 0.2 else "")
+    if kind == "dense":
+        return [rng.choice(("<<", "< ", "a<", "<[")) for _ in range(n)]
+    raise ValueError(kind)
+
+
+def run(filter_cls, tokens: List[str]) -> tuple[float, list]:
+    cf = filter_cls()
+    out = []
+    start = time.perf_counter()
+    for tok in tokens:
+        out.extend(cf.feed(tok))
+    out.extend(cf.flush())
+    return time.perf_counter() - start, out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tokens", type=int, default=100_000)
+    parser.add_argument("--only", default="prose,tagged,brackets,dense")
+    parser.add_argument("--legacy-tokens", type=int, default=20_000)
+    args = parser.parse_args()
+
+    print(f"{'transcript':<10} {'before tok/s':>14} {'after tok/s':>14} {'speedup':>8}")
+    for kind in args.only.split(","):
+        tokens = transcript(kind, args.tokens)
+        legacy_tokens = tokens
+        if kind == "dense":
+            legacy_tokens = tokens[: args.legacy_tokens]
+        before, expected = run(LegacyChannelFilter, legacy_tokens)
+        if run(ChannelFilter, legacy_tokens)[1] != expected:
+            raise SystemExit(f"{kind}: output differs from the previous filter")
+        after, _ = run(ChannelFilter, tokens)
+        before_rate = len(legacy_tokens) / before
+        after_rate = len(tokens) / after
+        mark = "*" if legacy_tokens is not tokens else " "
+        print(
+            f"{kind:<10} {before_rate:13,.0f}{mark} {after_rate:14,.0f}"
+            f" {after_rate / before_rate:7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Benchmarks story.json loading for large series projects.
+
+"""
+Micro-benchmark for load_story_config on a generated series story.json.
+
+Compares the previous load path (read schema file, jsonschema.validate on every
+call) with the current one: a cold read with the precompiled validator, a cold
+read under the "writes" validation policy, and a cache hit on repeated reads of
+an unchanged file.
+
+Usage:
+  python tools/bench_story_config.py [--chapters 2000] [--books 20] [--repeat 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import jsonschema
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from augmentedquill.core import config as cfg  # noqa: E402
+from augmentedquill.services.story.config_story_ops import (  # noqa: E402
+    normalize_validate_story_config,
+)
+
+
+def build_series_story(chapters: int, books: int) -> dict:
+    per_book = max(1, chapters // books)
+    book_list = []
+    for b in range(books):
+        book_chapters = [
+            {
+                "title": f"Chapter {c + 1}",
+                "summary": "A fairly typical chapter summary. " * 8,
+                "notes": "Some notes.",
+                "filename": f"{c + 1:04d}.txt",
+                "conflicts": [
+                    {"description": "Hero vs. villain", "resolution": "Pending"}
+                ],
+            }
+            for c in range(per_book)
+        ]
+        book_list.append(
+            {
+                "folder": f"book-{b:03d}",
+                "title": f"Book {b + 1}",
+                "chapters": book_chapters,
+            }
+        )
+    return {
+        "metadata": {"version": cfg.CURRENT_SCHEMA_VERSION},
+        "project_title": "Benchmark Series",
+        "project_type": "series",
+        "format": "markdown",
+        "books": book_list,
+        "llm_prefs": {"temperature": 0.7, "max_tokens": 2048},
+        "tags": ["bench"],
+        "sourcebook": {
+            f"Entry {i}": {"description": "Sourcebook text.", "category": "Lore"}
+            for i in range(200)
+        },
+    }
+
+
+def legacy_load(path: Path) -> dict:
+    """Replicates the load path before validators and caching existed."""
+
+    def validator_loader(version: int):
+        schema = cfg._get_story_schema(version)
+
+        class _PerCallValidator:
+            def iter_errors(self, instance):
+                try:
+                    jsonschema.validate(instance, schema)
+                except jsonschema.ValidationError as exc:
+                    yield exc
+
+        return _PerCallValidator()
+
+    data = cfg._interpolate_env(cfg.load_json_file(path))
+    merged = cfg._deep_merge({}, data)
+    return normalize_validate_story_config(
+        merged=merged,
+        path_label=str(path),
+        current_schema_version=cfg.CURRENT_SCHEMA_VERSION,
+        validator_loader=validator_loader,
+    )
+
+
+def _time(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chapters", type=int, default=2000)
+    parser.add_argument("--books", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as td:
+        path = Path(td) / "story.json"
+        path.write_text(
+            json.dumps(build_series_story(args.chapters, args.books), indent=2),
+            encoding="utf-8",
+        )
+        # Age the file past the racy-timestamp window so warm loads measure a
+        # plain signature check, as they would for a story.json at rest.
+        old = time.time() - 60
+        os.utime(path, (old, old))
+        size_kb = path.stat().st_size / 1024
+
+        def cold_load() -> None:
+            cfg.clear_story_config_cache()
+            cfg.load_story_config(path)
+
+        before = _time(lambda: legacy_load(path), args.repeat)
+        cold = _time(cold_load, args.repeat)
+        os.environ["AUGQ_STORY_VALIDATION"] = "writes"
+        cold_trusted = _time(cold_load, args.repeat)
+        os.environ.pop("AUGQ_STORY_VALIDATION")
+        cfg.load_story_config(path)
+        warm = _time(lambda: cfg.load_story_config(path), args.repeat)
+
+    print(f"story.json: {args.chapters} chapters, {size_kb:.0f} KiB")
+    print(f"before (re-read schema + jsonschema.validate): {before:8.2f} ms/load")
+    print(f"after, cold (compiled validator):              {cold:8.2f} ms/load")
+    print(f"after, cold (policy 'writes', no validation):  {cold_trusted:8.2f} ms/load")
+    print(f"after, warm (cache hit):                       {warm:8.2f} ms/load")
+    print(f"cache stats: {cfg.story_config_cache_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# Copyright (C) 2026 StableLlama
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# Purpose: Replays a --llm-dump recording through the LLM parsing pipeline.
+
+"""
+Replay a raw LLM traffic dump through the response parsing pipeline.
+
+Reads a dump written with --llm-dump (gzip JSONL) and feeds each recorded
+chat/completion response back through the same code that parsed it live
+(unified_chat_stream, unified_chat_complete, openai_completions*), without
+network access or delays. Prints per-operation throughput, which makes the
+dump usable as an offline benchmark for the streaming and parsing code.
+
+Usage:
+  python tools/replay_llm_dump.py [data/logs/llm_dump-<start>-<pid>.jsonl.gz] [--repeat 3] [--show]
+
+Without a path, the most recent dump in data/logs (or next to
+AUGQ_LLM_DUMP_PATH) is replayed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from augmentedquill.services.llm.llm_dump import (
+    exchange_operation,
+    latest_dump,
+    read_dump,
+    replay_exchange,
+)
+
+
+async def replay(path: Path, repeat: int, show: bool) -> None:
+    exchanges = read_dump(path)
+    totals = defaultdict(lambda: {"exchanges": 0, "bytes": 0, "events": 0, "s": 0.0})
+    skipped = 0
+    for exchange in exchanges:
+        op = exchange_operation(exchange)
+        if op is None or exchange["response"] is None:
+            skipped += 1
+            continue
+        size = sum(len(c) for c in exchange["chunks"])
+        best = float("inf")
+        events = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            events = await replay_exchange(exchange) or []
+            best = min(best, time.perf_counter() - start)
+        row = totals[op]
+        row["exchanges"] += 1
+        row["bytes"] += size
+        row["events"] += len(events)
+        row["s"] += best
+        if show:
+            print(f"--- {exchange['request']['id']} {op}")
+            for event in events:
+                print(f"  {event!r}")
+
+    print(f"{path}: {len(exchanges)} exchanges, {skipped} not replayable")
+    print(
+        f"{'operation':<20} {'count':>6} {'MiB':>8} {'events':>8} {'ms':>9} {'MiB/s':>8}"
+    )
+    for op, row in sorted(totals.items()):
+        mib = row["bytes"] / (1024 * 1024)
+        rate = mib / row["s"] if row["s"] else 0.0
+        print(
+            f"{op:<20} {row['exchanges']:>6} {mib:>8.2f} {row['events']:>8}"
+            f" {row['s'] * 1000:>9.1f} {rate:>8.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path", nargs="?", default=None)
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="runs per exchange, best time is kept"
+    )
+    parser.add_argument("--show", action="store_true", help="print the parsed events")
+    args = parser.parse_args()
+
+    path = Path(args.path) if args.path else latest_dump()
+    if not path.exists():
+        raise SystemExit(f"no dump at {path}")
+    asyncio.run(replay(path, max(1, args.repeat), args.show))
+
+
+if __name__ == "__main__":
+    main()